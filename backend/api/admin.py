@@ -22,6 +22,8 @@ from sqlalchemy.orm import joinedload, selectinload
 from backend.api._user_response_helper import build_user_detail_response, build_user_response
 from backend.core.auth import DB, CurrentStaff, CurrentSuperUser
 from backend.core.concurrency import concurrent_query
+from backend.core.moderation import word_lists
+from backend.core.principal import invalidate_principal
 from backend.models.blog import Category, Comment, Post
 from backend.models.user import User
 from backend.schemas import (
@@ -301,6 +303,7 @@ async def admin_update_user_full(
 
     await db.flush()
     await db.commit()
+    await invalidate_principal(user_id)
 
     # 重新加载用户对象（使用 populate_existing），避免 flush 后属性 expire 导致的 MissingGreenlet
     result = await db.execute(
@@ -1019,6 +1022,18 @@ async def get_search_optimization_stats(
     }
 
 
+@router.post("/tools/reload-moderation")
+async def reload_moderation(current_user: CurrentStaff):
+    """重新加载敏感词表（文件与数据库），并通知其他 worker"""
+    rules = await word_lists.reload(broadcast=True)
+    counts = rules.counts
+    return {
+        "success": True,
+        "counts": counts,
+        "message": f"已加载黑名单 {counts['black']} 个、灰名单 {counts['gray']} 个敏感词",
+    }
+
+
 @router.post("/tools/optimize-search")
 async def optimize_search(
     current_user: CurrentStaff,
@@ -20,13 +20,14 @@ from fastapi import APIRouter, Header, HTTPException, Query, Request, status
 from sqlalchemy import String, cast, func, or_, select, update
 from sqlalchemy.orm import selectinload
 
-from backend.core.auth import DB, CurrentStaff, CurrentUser, CurrentUserOptional
+from backend.core.auth import DB, CurrentStaff, CurrentUser, CurrentUserOptional, ReadDB
 from backend.core.cache import CACHE_TTL, cache, invalidate_cache, make_cache_key
-from backend.core.concurrency import concurrent_query
+from backend.core.concurrency import concurrent_query, fan_out, read_scalar
 from backend.core.config import settings
 from backend.core.i18n import (
     get_i18n_value,
     get_language_from_request,
+    localize_many,
 )
 from backend.models.blog import Category, Comment, Post, Tag, post_likes, post_tags
 from backend.models.user import User
@@ -49,7 +50,11 @@ from backend.schemas import (
     TagLocalizedResponse,
     TagUpdate,
 )
+from backend.services.comment_service import CommentService
+from backend.services.post_render_service import rebuild_post_render, render_query
+from backend.services.sitemap_service import feed_cache_key, render_shard, render_sitemap
 from backend.utils.compat import UTC
+from backend.utils.post_metrics import calculate_reading_time, primary_text
 
 router = APIRouter(tags=["博客"])
 
@@ -142,14 +147,6 @@ def generate_slug(title: str) -> str:
     return slug
 
 
-def calculate_reading_time(content: str) -> int:
-    """计算阅读时间（分钟）"""
-    chinese_chars = len(re.findall(r"[\u4e00-\u9fa5]", content))
-    english_words = len(re.findall(r"[a-zA-Z0-9]+", content))
-    minutes = (chinese_chars / 300) + (english_words / 150)
-    return max(1, math.ceil(minutes))
-
-
 async def _get_post_list_cache_key(
     language: str,
     page: int,
@@ -196,23 +193,38 @@ def _build_author_data(author: User | None) -> dict | None:
     }
 
 
+def _reading_time(post: Post, language: str) -> int:
+    """阅读时间：主语言直接使用写入时算好的 Post.reading_time，其他语言按该语言正文计算"""
+    content = get_i18n_value(post.content, language)
+    if content == primary_text(post.content):
+        return post.reading_time
+    return calculate_reading_time(content)
+
+
+_POST_LIST_I18N_FIELDS = ("title", "subtitle", "excerpt")
+
+
 def _build_post_list_item_from_row(
     row: tuple,
     language: str,
+    texts: tuple[str | None, ...],
 ) -> PostListItemLocalized:
-    """从查询结果行构建文章列表项（优化版，避免 N+1 查询）"""
+    """
+    从查询结果行构建文章列表项（优化版，避免 N+1 查询）
+
+    texts 为 localize_many 按 _POST_LIST_I18N_FIELDS 取出的本地化文本。
+    """
     post = row.Post
     likes_count = row.likes_count or 0
     comments_count = row.comments_count or 0
-
-    content = get_i18n_value(post.content, language)
+    title, subtitle, excerpt = texts
 
     return PostListItemLocalized(
         id=post.id,
-        title=get_i18n_value(post.title, language),
-        subtitle=get_i18n_value(post.subtitle, language) if post.subtitle else None,
+        title=title or "",
+        subtitle=subtitle,
         slug=post.slug,
-        excerpt=get_i18n_value(post.excerpt, language) if post.excerpt else None,
+        excerpt=excerpt,
         cover_image=post.cover_image,
         author=_build_author_data(post.author),
         category=CategoryLocalizedResponse.from_category(post.category, language)
@@ -226,7 +238,7 @@ def _build_post_list_item_from_row(
         is_pinned=post.is_pinned,
         created_at=post.created_at,
         published_at=post.published_at,
-        reading_time=calculate_reading_time(content),
+        reading_time=_reading_time(post, language),
     )
 
 
@@ -252,8 +264,6 @@ async def _build_post_list_item(
     likes_count = likes_count or 0
     comments_count = comments_count or 0
 
-    content = get_i18n_value(post.content, language)
-
     return {
         "id": post.id,
         "title": get_i18n_value(post.title, language),
@@ -273,7 +283,7 @@ async def _build_post_list_item(
         "is_pinned": post.is_pinned,
         "created_at": post.created_at,
         "published_at": post.published_at,
-        "reading_time": calculate_reading_time(content),
+        "reading_time": _reading_time(post, language),
     }
 
 
@@ -288,7 +298,7 @@ async def _build_post_list_item(
 )
 async def list_posts(
     request: Request,
-    db: DB,
+    db: ReadDB,
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(12, ge=1, le=100, description="每页数量"),
     category: str | None = Query(None, description="分类 slug"),
@@ -391,7 +401,11 @@ async def list_posts(
     result = await db.execute(query)
     rows = result.unique().all()
 
-    items = [_build_post_list_item_from_row(row, language) for row in rows]
+    texts = localize_many([row.Post for row in rows], _POST_LIST_I18N_FIELDS, language)
+    items = [
+        _build_post_list_item_from_row(row, language, row_texts)
+        for row, row_texts in zip(rows, texts, strict=True)
+    ]
 
     response = PaginatedResponse(
         items=items,
@@ -457,8 +471,6 @@ async def get_recommended_posts(
             ),
         )
 
-        content = get_i18n_value(post.content, language)
-
         items.append(
             PostListItemLocalized(
                 id=post.id,
@@ -479,7 +491,7 @@ async def get_recommended_posts(
                 is_pinned=post.is_pinned,
                 created_at=post.created_at,
                 published_at=post.published_at,
-                reading_time=calculate_reading_time(content),
+                reading_time=_reading_time(post, language),
             )
         )
 
@@ -524,8 +536,6 @@ async def get_similar_posts(
             ),
         )
 
-        content = get_i18n_value(post.content, language)
-
         items.append(
             PostListItemLocalized(
                 id=post.id,
@@ -546,7 +556,7 @@ async def get_similar_posts(
                 is_pinned=post.is_pinned,
                 created_at=post.created_at,
                 published_at=post.published_at,
-                reading_time=calculate_reading_time(content),
+                reading_time=_reading_time(post, language),
             )
         )
 
@@ -707,17 +717,23 @@ async def get_post(
     _meta_title_i18n = post.meta_title
     _meta_description_i18n = post.meta_description
     _meta_keywords_i18n = post.meta_keywords
+    _render_hash = post.render_hash
 
-    # 并发获取点赞数和评论数
-    likes_count, comments_count = await concurrent_query(
-        db.scalar(
+    # 点赞数、评论数与正文渲染产物不依赖上面的浏览量更新，扇出到独立会话并行获取
+    likes_count, comments_count, artifact = await fan_out(
+        db,
+        read_scalar(
             select(func.count()).select_from(post_likes).where(post_likes.c.post_id == _id)
         ),
-        db.scalar(select(func.count()).where(Comment.post_id == _id, Comment.active.is_(True))),
+        read_scalar(select(func.count()).where(Comment.post_id == _id, Comment.active.is_(True))),
+        read_scalar(render_query(_render_hash)),
     )
 
     likes_count = likes_count or 0
     comments_count = comments_count or 0
+    if artifact is None and _content_i18n:
+        # 批量导入 / 旧数据 / 渲染器升级：首次读取时补编译
+        artifact = await rebuild_post_render(db, _id, _content_i18n)
 
     # 根据权限决定返回的内容
     if is_password_protected and not can_access_content:
@@ -727,6 +743,7 @@ async def get_post(
     else:
         content = get_i18n_value(_content_i18n, language)
         excerpt = get_i18n_value(_excerpt_i18n, language) if _excerpt_i18n else None
+    rendered = get_i18n_value(artifact, language) if content else None
 
     response = PostLocalizedResponse(
         id=_id,
@@ -761,7 +778,10 @@ async def get_post(
         created_at=_created_at,
         published_at=_published_at,
         updated_at=_updated_at,
-        reading_time=calculate_reading_time(content) if content else 0,
+        reading_time=rendered["reading_time"] if rendered else 0,
+        content_html=rendered["html"] if rendered else None,
+        toc=rendered["toc"] if rendered else None,
+        word_count=rendered["word_count"] if rendered else None,
     )
 
     # 只有非加密或已授权的文章才缓存
@@ -1135,21 +1155,20 @@ async def list_categories(
     )
     rows = result.all()
 
+    texts = localize_many([row.Category for row in rows], ("name", "description"), language)
     items = [
         CategoryLocalizedResponse(
             id=row.Category.id,
-            name=get_i18n_value(row.Category.name, language),
+            name=name or "",
             slug=row.Category.slug,
-            description=get_i18n_value(row.Category.description, language)
-            if row.Category.description
-            else None,
+            description=description,
             icon=row.Category.icon,
             color=row.Category.color,
             cover_image=row.Category.cover_image,
             created_at=row.Category.created_at,
             post_count=row.post_count or 0,
         )
-        for row in rows
+        for row, (name, description) in zip(rows, texts, strict=True)
     ]
 
     await cache.set(
@@ -1295,10 +1314,11 @@ async def list_tags(
     )
     rows = result.all()
 
+    names = localize_many([row.Tag for row in rows], ("name",), language)
     items = [
         TagLocalizedResponse(
             id=row.Tag.id,
-            name=get_i18n_value(row.Tag.name, language),
+            name=name or "",
             slug=row.Tag.slug,
             color=row.Tag.color,
             icon=row.Tag.icon,
@@ -1306,7 +1326,7 @@ async def list_tags(
             created_at=row.Tag.created_at,
             post_count=row.post_count or 0,
         )
-        for row in rows
+        for row, (name,) in zip(rows, names, strict=True)
     ]
 
     await cache.set(cache_key, [item.model_dump(mode="json") for item in items], CACHE_TTL["tags"])
@@ -1419,32 +1439,7 @@ async def create_tag(
 )
 async def list_comments(post_id: int, db: DB):
     """获取文章评论"""
-    result = await db.execute(
-        select(Comment)
-        .options(
-            selectinload(Comment.user).selectinload(User.title),
-            selectinload(Comment.replies).selectinload(Comment.user).selectinload(User.title),
-        )
-        .where(Comment.post_id == post_id, Comment.active.is_(True), Comment.parent_id.is_(None))
-        .order_by(Comment.created_at.desc())
-    )
-    comments = result.scalars().unique().all()
-
-    def build_comment_tree(comment: Comment) -> CommentResponse:
-        """递归构建评论树"""
-        replies = [build_comment_tree(r) for r in comment.replies if r.active]
-        return CommentResponse(
-            id=comment.id,
-            post_id=comment.post_id,
-            user=comment.user,
-            parent_id=comment.parent_id,
-            content=comment.content,
-            active=comment.active,
-            created_at=comment.created_at,
-            replies=replies,
-        )
-
-    return [build_comment_tree(c) for c in comments]
+    return await CommentService.list_comment_tree(db, post_id)
 
 
 @router.post(
@@ -1524,7 +1519,7 @@ async def create_comment(
 )
 async def get_archive(
     request: Request,
-    db: DB,
+    db: ReadDB,
     lang: str | None = Query(None, description="语言代码：zh/en/ja/zh_Hant"),
     limit_per_month: int = Query(50, ge=1, le=100, description="每月最多返回的文章数"),
 ):
@@ -1583,7 +1578,7 @@ async def get_archive(
     description="获取归档统计信息，包括总文章数、年份数等。",
 )
 async def get_archive_stats(
-    db: DB,
+    db: ReadDB,
 ):
     """
     获取归档统计信息
@@ -1609,25 +1604,6 @@ async def get_archive_stats(
     return stats
 
 
-def _count_words_in_content(content: str) -> int:
-    """
-    计算内容字数
-
-    算法与前端 SiteStats.astro 保持一致：
-    - 移除代码块和内联代码
-    - 统计中文字符数 + 英文字符数
-    """
-    if not content:
-        return 0
-
-    text = re.sub(r"```[\s\S]*?```", "", content)  # 移除代码块
-    text = re.sub(r"`[^`]*`", "", text)  # 移除内联代码
-    text = re.sub(r"\s+", " ", text).strip()  # 合并空白
-    chinese_chars = re.findall(r"[\u4e00-\u9fa5]", text)
-    english_chars = re.findall(r"[a-zA-Z]", text)
-    return len(chinese_chars) + len(english_chars)
-
-
 @router.get(
     "/site-stats",
     summary="站点统计",
@@ -1655,23 +1631,14 @@ async def get_site_stats(
         (Post.published_at.is_(None) | (Post.published_at <= func.now())),
     )
 
-    # 总字数 + 总文章数：一次查询拿到所有已发布文章的内容
-    posts_result = await db.execute(
-        select(Post.content).where(*published_filter)
-    )
-    contents = posts_result.scalars().all()
-    total_posts = len(contents)
-    total_words = 0
-    # 逐篇处理，避免内存和类型问题（Post.content 可能为 dict、str、None）
-    for c in contents:
-        text: str = ""
-        if isinstance(c, dict):
-            # 多语言 dict：优先 zh，否则取第一个非空值，否则空串
-            text = c.get("zh") or next((v for v in c.values() if v), "") or ""
-        elif isinstance(c, str):
-            text = c
-        # None / 其他类型统一视为空串
-        total_words += _count_words_in_content(text)
+    # 总字数 + 总文章数：字数在文章写入时已算好（Post.word_count），这里只做 SUM
+    total_posts, total_words = (
+        await db.execute(
+            select(func.count(), func.coalesce(func.sum(Post.word_count), 0)).where(
+                *published_filter
+            )
+        )
+    ).one()
 
     # 至少有一篇已发布文章的分类数
     total_categories = (
@@ -1714,7 +1681,7 @@ async def get_site_stats(
 async def get_archive_by_year(
     year: int,
     request: Request,
-    db: DB,
+    db: ReadDB,
     lang: str | None = Query(None, description="语言代码"),
 ):
     """
@@ -1733,13 +1700,11 @@ async def get_archive_by_year(
     if cached:
         return cached
 
-    from sqlalchemy import extract
-
     query = (
         select(Post)
         .where(
             Post.status == "published",
-            extract("year", Post.published_at) == year,
+            Post.archive_month.between(f"{year:04d}-01", f"{year:04d}-12"),
         )
         .options(selectinload(Post.category))
         .order_by(Post.published_at.desc())
@@ -1751,9 +1716,7 @@ async def get_archive_by_year(
     # 按月份分组
     month_map: dict[int, list] = {}
     for post in posts:
-        if not post.published_at:
-            continue
-        month = post.published_at.month
+        month = int(post.archive_month[5:])
         if month not in month_map:
             month_map[month] = []
 
@@ -1809,7 +1772,7 @@ async def get_archive_by_month(
     year: int,
     month: int,
     request: Request,
-    db: DB,
+    db: ReadDB,
     lang: str | None = Query(None, description="语言代码"),
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
@@ -1832,14 +1795,11 @@ async def get_archive_by_month(
 
     language = get_language_from_request(request, lang)
 
-    from sqlalchemy import extract
-
     query = (
         select(Post)
         .where(
             Post.status == "published",
-            extract("year", Post.published_at) == year,
-            extract("month", Post.published_at) == month,
+            Post.archive_month == f"{year:04d}-{month:02d}",
         )
         .options(selectinload(Post.category))
     )
@@ -2493,7 +2453,7 @@ async def clear_my_history(
 )
 async def get_rss_feed(
     request: Request,
-    db: DB,
+    db: ReadDB,
     lang: str | None = Query(None, description="语言代码（zh/en/ja/zh_Hant）"),
     limit: int = Query(20, ge=1, le=100, description="文章数量"),
 ):
@@ -2504,80 +2464,52 @@ async def get_rss_feed(
 
     language = get_language_from_request(request, lang)
 
-    query = (
-        select(Post)
-        .where(Post.status == "published")
-        .order_by(Post.is_pinned.desc(), Post.published_at.desc())
-        .limit(limit)
-    )
-    result = await db.execute(query)
-    posts = result.scalars().all()
+    # 按语言缓存，文章变更提交后由 sitemap_service 失效
+    cache_key = feed_cache_key(language, limit)
+    rss_content = await cache.get(cache_key)
+    if not rss_content:
+        query = (
+            select(Post)
+            .where(Post.status == "published")
+            .order_by(Post.is_pinned.desc(), Post.published_at.desc())
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        posts = result.scalars().all()
 
-    site_url = settings.site_url
-    site_title = settings.app_name
-    rss_content = generate_rss_feed(posts, language, site_url, site_title)
+        rss_content = generate_rss_feed(posts, language, settings.site_url, settings.app_name)
+        await cache.set(cache_key, rss_content, CACHE_TTL["feed"])
 
     return Response(content=rss_content, media_type="application/rss+xml")
 
 
-def generate_sitemap(
-    posts: list[Post], categories: list[Category], tags: list[Tag], site_url: str
-) -> str:
-    """生成 Sitemap XML"""
-    from xml.etree.ElementTree import Element, SubElement, tostring
-
-    urlset = Element("urlset", xmlns="http://www.sitemaps.org/schemas/sitemap/0.9")
-
-    for post in posts:
-        url = SubElement(urlset, "url")
-        SubElement(url, "loc").text = f"{site_url}/posts/{post.slug}"
-        if post.updated_at:
-            SubElement(url, "lastmod").text = post.updated_at.strftime("%Y-%m-%d")
-        SubElement(url, "changefreq").text = "weekly"
-        SubElement(url, "priority").text = "0.8"
-
-    # 仅为前端真实存在的路由生成 sitemap loc
-    # categories 列表页：/categories，单分类筛选：/posts?category=slug
-    for category in categories:
-        url = SubElement(urlset, "url")
-        SubElement(url, "loc").text = f"{site_url}/posts?category={category.slug}"
-        SubElement(url, "changefreq").text = "weekly"
-        SubElement(url, "priority").text = "0.6"
-
-    for tag in tags:
-        url = SubElement(urlset, "url")
-        SubElement(url, "loc").text = f"{site_url}/posts?tag={tag.slug}"
-        SubElement(url, "changefreq").text = "monthly"
-        SubElement(url, "priority").text = "0.5"
-
-    return '<?xml version="1.0" encoding="UTF-8"?>\n' + tostring(urlset, encoding="unicode")
-
-
 @router.get(
     "/sitemap.xml",
     summary="Sitemap",
     description="获取站点地图 XML。",
 )
 async def get_sitemap(
-    db: DB,
+    db: ReadDB,
 ):
-    """获取 Sitemap XML"""
+    """获取 Sitemap XML（文章超过一个分片时为 sitemap 索引）"""
     from fastapi.responses import Response
 
-    from backend.core.config import settings
-
-    posts_result = await db.execute(
-        select(Post).where(Post.status == "published").order_by(Post.published_at.desc())
-    )
-    posts = posts_result.scalars().all()
-
-    categories_result = await db.execute(select(Category))
-    categories = categories_result.scalars().all()
+    return Response(content=await render_sitemap(db), media_type="application/xml")
 
-    tags_result = await db.execute(select(Tag).where(Tag.is_active.is_(True)))
-    tags = tags_result.scalars().all()
 
-    site_url = settings.site_url
-    sitemap_content = generate_sitemap(posts, categories, tags, site_url)
+@router.get(
+    "/sitemaps/{shard}.xml",
+    summary="Sitemap 分片",
+    description="sitemap 索引中的单个分片（posts-<序号> 或 taxonomy）。",
+)
+async def get_sitemap_shard(
+    shard: str,
+    db: ReadDB,
+):
+    """获取单个 Sitemap 分片"""
+    from fastapi.responses import Response
 
-    return Response(content=sitemap_content, media_type="application/xml")
+    content = await render_shard(db, shard)
+    if content is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sitemap 分片不存在")
+    return Response(content=content, media_type="application/xml")
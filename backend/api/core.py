@@ -4,7 +4,7 @@
 提供页面、导航、友链、站点配置等核心功能。
 
 缓存策略：
-- 站点配置：1 小时
+- 站点配置：进程内版本化快照（变更提交后失效）
 - 导航列表：1 小时
 - 友链列表：30 分钟
 
@@ -16,14 +16,15 @@
 
 import math
 from pathlib import Path
-from typing import Any
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, status
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import Response
 from sqlalchemy import func, select
 
 from backend.core.auth import DB, CurrentStaff, CurrentUserOptional
 from backend.core.cache import CACHE_TTL, cache, invalidate_cache, make_cache_key
 from backend.models.core import FriendLink, Navigation, Page, SearchPlaceholder, SiteConfig
+from backend.services.site_config_service import oobe_site_config_body, site_config_store
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 OOBE_LOCK_FILE = BASE_DIR / ".oobe_complete"
@@ -705,629 +706,21 @@ async def list_search_placeholders(db: DB):
     summary="站点配置",
     description="获取网站全局配置信息。",
 )
-async def get_site_config(db: DB):
+async def get_site_config(request: Request, db: DB):
     """
-    获取站点配置（带缓存和并发优化）
-    """
-    # 侧边栏默认配置
-    default_sidebar: dict[str, Any] = {
-        "show_profile": True,
-        "show_categories": True,
-        "show_tags": True,
-        "show_recent_posts": True,
-        "show_recent_comments": True,
-        "show_tag_cloud": True,
-        "show_site_info": True,
-        "show_music": True,
-        "show_statistics": True,
-        "show_dynamics": True,
-        "widget_order": [
-            "profile",
-            "site_info",
-            "statistics",
-            "dynamics",
-            "music",
-            "categories",
-            "tags",
-            "recent_posts",
-            "recent_comments",
-        ],
-    }
-
-    def _sidebar_dict_to_flat(sb: dict[str, Any]) -> dict[str, Any]:
-        """把 sidebar 分组字典打平成 SiteConfigResponse 的 sidebar_* 字段"""
-        out: dict[str, Any] = {}
-        for k, v in sb.items():
-            if k == "widget_order":
-                out["sidebar_widget_order"] = v
-            else:
-                out[f"sidebar_{k}"] = v
-        return out
+    获取站点配置
 
+    直接返回进程内预编译、预序列化的配置快照（site_configs 变更提交后自动重建），
+    支持 If-None-Match 条件请求。
+    """
     if not is_oobe_complete():
-        oobe_kwargs = dict(
-            site_name="Rosetta",
-            site_description="Rosetta开源博客系统",
-            site_keywords="Rosetta, Blog",
-            site_author="Choyeon",
-            site_email="",
-            footer_text="Powered by Rosetta",
-            enable_comments=True,
-            enable_registration=True,
-            enable_rss_feed=True,
-            pagination_page_size=12,
-            code_theme="github",
-            # 音乐播放器默认设置（不内置歌单，请到管理后台填写）
-            music_enabled=True,
-            music_show_in_navbar=True,
-            music_show_in_sidebar=True,
-            music_mode="meting",
-            music_volume=0.7,
-            music_play_mode="list",
-            music_show_lyrics=True,
-            music_meting_api="",
-            music_meting_server="netease",
-            music_meting_type="playlist",
-            music_meting_id="",
-            # 壁纸默认设置（默认开启 Bing 每日壁纸）
-            wallpaper_mode="banner",
-            wallpaper_player_enable=True,
-            wallpaper_use_bing=True,
-            wallpaper_bing_days=30,
-            wallpaper_dim_opacity=0.2,
-            wallpaper_home_title="Welcome",
-            # 关于页面内容
-            about_content="",
-            # 友链申请区域自定义 HTML 内容
-            friends_apply_html="",
-            # 作者/侧边栏资料设置（与一键 OOBE 默认管理员昵称/bio 对齐，避免显示 ROSETTA 示例文案）
-            author_name="Choyeon",
-            author_bio="Full-Stack Development",
-            author_avatar="",
-            author_links_json="[]",
-            # ===== 新增字段 =====
-            site_url="",
-            site_start_date="2025-01-01",
-            footer_custom_html="",
-            friends_page_title="",
-            friends_page_description="",
-            friends_page_show_comment=True,
-            friends_page_show_custom_content=True,
-            dynamic_page_title="",
-            dynamic_page_description="",
-            dynamic_page_items_per_page=10,
-            dynamic_page_show_comment=True,
-            sponsor_page_title="",
-            sponsor_page_description="",
-            sponsor_page_usage="",
-            sponsor_methods_json="[]",
-            sponsor_show_sponsors_list=True,
-            sponsor_page_show_comment=True,
-            # ========== 页面开关配置 ==========
-            page_friends_enabled=True,
-            page_sponsor_enabled=True,
-            page_guestbook_enabled=True,
-            page_bangumi_enabled=True,
-            page_gallery_enabled=True,
-            page_anime_enabled=True,
-            page_dynamic_enabled=True,
-            # ========== 导航栏显示配置 ==========
-            category_bar_enabled=True,
-            # ========== 归档页配置 ==========
-            archive_fold_old_articles=True,
-            # ========== 文章列表布局配置 ==========
-            post_list_default_mode="list",
-            post_list_mobile_mode="grid",
-            post_list_description_lines=2,
-            post_list_show_stats_icons=True,
-            post_list_tags_position="bottom",
-            # ========== 文章详情页配置 ==========
-            post_show_last_modified=True,
-            post_outdated_threshold_days=30,
-            post_enable_share_poster=True,
-            post_generate_og_images=False,
-            # ========== 封面图配置 ==========
-            cover_enable_in_post=True,
-            cover_enable_overlay=True,
-            cover_show_loading=False,
-            cover_random_enable=False,
-            cover_random_apis_json="[]",
-            # ========== 许可证配置 ==========
-            license_enable=True,
-            license_name="CC BY-NC-SA 4.0",
-            license_url="https://creativecommons.org/licenses/by-nc-sa/4.0/",
-            license_icon="",
-            # ========== 评论系统配置 ==========
-            comment_system_type="none",
-            comment_twikoo_env_id="",
-            comment_twikoo_lang="zh-CN",
-            comment_twikoo_visitor_count=True,
-            comment_twikoo_js_url="https://cdn.jsdelivr.net/npm/twikoo@1.7.14/dist/twikoo.min.js",
-            comment_twikoo_css_url="",
-            comment_waline_server_url="",
-            comment_waline_lang="zh-CN",
-            comment_waline_emoji_json='["https://unpkg.com/@waline/emojis@1.4.0/weibo","https://unpkg.com/@waline/emojis@1.4.0/bilibili"]',
-            comment_waline_login_mode="enable",
-            comment_waline_visitor_count=True,
-            comment_artalk_server="",
-            comment_artalk_locale="zh-CN",
-            comment_artalk_visitor_count=True,
-            comment_giscus_repo="",
-            comment_giscus_repo_id="",
-            comment_giscus_category="General",
-            comment_giscus_category_id="",
-            comment_giscus_mapping="title",
-            comment_giscus_strict="0",
-            comment_giscus_reactions_enabled="1",
-            comment_giscus_emit_metadata="1",
-            comment_giscus_input_position="top",
-            comment_giscus_lang="zh-CN",
-            comment_giscus_loading="lazy",
-            comment_disqus_shortname="",
-            # ========== Bangumi配置 ==========
-            bangumi_user_id="",
-            bangumi_mode="dynamic",
-            bangumi_api_url="https://bgmapi.anibt.net",
-            bangumi_subject_base_url="https://bgmmi.anibt.net/subject/",
-            bangumi_category_order_json='["anime","book","music","game"]',
-            # ========== 追番配置 ==========
-            anime_bilibili_uid="",
-            anime_tmdb_api_key="",
-            anime_tmdb_list_id="",
-            # ========== 分页配置 ==========
-            pagination_posts_per_page=10,
-            # ========== 图像优化配置 ==========
-            image_opt_formats="webp",
-            image_opt_quality=85,
-            image_opt_no_referrer_json='["*.hdslb.com","*.bilibili.com"]',
-            # ========== 樱花特效配置 ==========
-            sakura_enable=False,
-            sakura_count=21,
-            sakura_min_scale=0.5,
-            sakura_max_scale=1.1,
-            sakura_min_opacity=0.3,
-            sakura_max_opacity=0.9,
-            sakura_z_index=100,
-            # ========== 看板娘/Spine模型配置 ==========
-            pio_spine_enable=False,
-            pio_spine_model_path="",
-            pio_spine_scale=1.0,
-            pio_spine_position_corner="bottom-left",
-            pio_spine_width=135,
-            pio_spine_height=165,
-            pio_spine_z_index=1000,
-            # ========== Mermaid图表配置 ==========
-            mermaid_theme="default",
-            mermaid_security_level="strict",
-            # ========== PlantUML配置 ==========
-            plantuml_server_url="https://www.plantuml.com/plantuml",
-        )
-        oobe_kwargs.update(_sidebar_dict_to_flat(default_sidebar))
-        return SiteConfigResponse(**oobe_kwargs)
-
-
-    # 合并 settings_groups 表中 17 组 JSON（admin 编辑保存的）进入 /api/config 返回值。
-    # 优先级：site_configs 扁平 key → settings_groups JSON（覆盖/补充） → 环境 fallback
-    def _apply_settings_groups(cfg_base: dict[str, Any]) -> dict[str, Any]:
-        import json as _json_
-
-        def _cfg_raw(k: str) -> str | None:
-            """settings_groups 读键的大小写兼容（basic/seo/appearance 等可能是小写分组名）"""
-            v = configs.get(k)
-            if v is not None:
-                return v
-            return _configs_ci.get(k.upper()) if "_configs_ci" in dir() else None
-
-        try:
-            # basic
-            raw_basic = _cfg_raw("basic")
-            if raw_basic:
-                parsed = _json_.loads(raw_basic)
-                if isinstance(parsed, dict):
-                    if parsed.get("site_name"):
-                        cfg_base["site_name"] = str(parsed["site_name"])
-                    if parsed.get("subtitle") is not None:
-                        cfg_base["site_subtitle"] = str(parsed["subtitle"])
-                    if parsed.get("description"):
-                        cfg_base["site_description"] = str(parsed["description"])
-                    if parsed.get("keywords") is not None:
-                        cfg_base["site_keywords"] = str(parsed["keywords"])
-                    if parsed.get("site_url"):
-                        cfg_base["site_url"] = str(parsed["site_url"])
-                    if parsed.get("logo"):
-                        cfg_base["site_logo"] = str(parsed["logo"])
-                    if parsed.get("icp_number") is not None:
-                        cfg_base["icp_number"] = str(parsed["icp_number"]) or None
-                    if parsed.get("about_content") is not None:
-                        cfg_base["about_content"] = str(parsed["about_content"])
-                    if parsed.get("about_page_html") is not None:
-                        cfg_base["about_page_html"] = str(parsed["about_page_html"])
-            # seo
-            raw_seo = _cfg_raw("seo")
-            if raw_seo:
-                parsed = _json_.loads(raw_seo)
-                if isinstance(parsed, dict):
-                    if parsed.get("default_description"):
-                        cfg_base["site_description"] = str(parsed["default_description"])
-                    if parsed.get("default_keywords"):
-                        cfg_base["site_keywords"] = str(parsed["default_keywords"])
-                    if parsed.get("og_image"):
-                        cfg_base["default_og_image"] = str(parsed["og_image"])
-            # appearance
-            raw_appearance = _cfg_raw("appearance")
-            if raw_appearance:
-                parsed = _json_.loads(raw_appearance)
-                if isinstance(parsed, dict):
-                    if parsed.get("primary_color"):
-                        cfg_base["primary_color"] = str(parsed["primary_color"])
-                        cfg_base["theme_primary"] = str(parsed["primary_color"])
-                    if parsed.get("accent_color"):
-                        cfg_base["theme_accent"] = str(parsed["accent_color"])
-                        cfg_base["accent_color"] = str(parsed["accent_color"])
-                    if parsed.get("default_theme"):
-                        cfg_base["default_theme"] = str(parsed["default_theme"])
-                    if parsed.get("code_theme"):
-                        cfg_base["code_theme"] = str(parsed["code_theme"])
-                    if parsed.get("code_theme_dark"):
-                        cfg_base["code_theme_dark"] = str(parsed["code_theme_dark"])
-                    if parsed.get("font_family"):
-                        cfg_base["font_family"] = str(parsed["font_family"])
-            # footer
-            raw_footer = _cfg_raw("footer")
-            if raw_footer:
-                parsed = _json_.loads(raw_footer)
-                if isinstance(parsed, dict):
-                    if parsed.get("text") is not None:
-                        cfg_base["footer_text"] = str(parsed["text"])
-                    if parsed.get("slogan") is not None:
-                        cfg_base["footer_slogan"] = str(parsed["slogan"])
-                    if parsed.get("copyright") is not None:
-                        cfg_base["copyright_text"] = str(parsed["copyright"])
-                    if parsed.get("icp_number") is not None:
-                        cfg_base["icp_number"] = str(parsed["icp_number"]) or None
-                    if parsed.get("police_icp_number") is not None:
-                        cfg_base["police_icp_number"] = str(parsed["police_icp_number"]) or None
-            # sidebar（已经由后续 _sidebar_dict_to_flat 读取默认，这里覆盖）
-            raw_sb = _cfg_raw("sidebar")
-            if raw_sb:
-                parsed_sb = _json_.loads(raw_sb)
-                if isinstance(parsed_sb, dict):
-                    for k, v in parsed_sb.items():
-                        if k == "widget_order" and isinstance(v, list):
-                            cfg_base["sidebar_widget_order"] = v
-                        else:
-                            cfg_base[f"sidebar_{k}"] = bool(v) if isinstance(v, bool) else v
-        except Exception as exc:  # 任何合并异常不影响核心配置返回
-            logger.warning("merge settings_groups into /config failed: %s", exc)
-        return cfg_base
-    cache_key = make_cache_key("site_config")
-    cached = await cache.get(cache_key)
-    if cached:
-        return SiteConfigResponse(**cached)
-
-    # 单次查询获取所有配置
-    result = await db.execute(select(SiteConfig))
-    rows = result.scalars().all()
-    configs: dict[str, str] = {c.key: c.value for c in rows}
-    # ⚠️ 大小写不敏感查找：OOBE 脚本历史上混用小写键（site_name / enable_bing_wallpaper 等），
-    # 而 /api/config 读取习惯用大写键（SITE_NAME、ENABLE_COMMENTS）。
-    # 这里构建一份全大写 key 的镜像表，保证 get_* 系列函数无论传入哪种大小写都能命中。
-    _configs_ci: dict[str, str] = {k.upper(): v for k, v in configs.items()}
-
-    # 尝试读取 settings_groups 中保存的 sidebar 分组（JSON 格式）
-    sidebar = dict(default_sidebar)
-    raw_sidebar_json = configs.get("sidebar") or _configs_ci.get("SIDEBAR")
-    if raw_sidebar_json:
-        try:
-            import json as _json
-
-            parsed_sb = _json.loads(raw_sidebar_json)
-            if isinstance(parsed_sb, dict):
-                for k, v in parsed_sb.items():
-                    if k in default_sidebar:
-                        sidebar[k] = v
-        except Exception:
-            pass
-
-    # 从 basic 分组 JSON 中读取 about_content
-    about_content = _configs_ci.get("ABOUT_CONTENT", "") or configs.get("ABOUT_CONTENT", "")
-    if not about_content:
-        raw_basic_json = configs.get("basic") or _configs_ci.get("BASIC")
-        if raw_basic_json:
-            try:
-                import json as _json
-
-                parsed_basic = _json.loads(raw_basic_json)
-                if isinstance(parsed_basic, dict):
-                    about_content = parsed_basic.get("about_content", "")
-            except Exception:
-                pass
-
-    def get_bool(key: str, default: str = "true") -> bool:
-        return _configs_ci.get(key.upper(), default).lower() == "true"
-
-    def get_int(key: str, default: str = "0") -> int:
-        return int(_configs_ci.get(key.upper(), default))
-
-    def get_str(key: str, default: str = "") -> str | None:
-        return _configs_ci.get(key.upper(), default) or None
-
-    response_dict: dict[str, Any] = dict(
-        # 基础信息
-        site_name=get_str("SITE_NAME", "Rosetta Blog") or "Rosetta Blog",
-        site_description=get_str(
-            "SITE_DESCRIPTION",
-            "Rosetta开源博客系统",
-        )
-        or "Rosetta开源博客系统",
-        site_keywords=get_str("SITE_KEYWORDS", "Rosetta, FastAPI, Astro, Svelte, Blog") or "",
-        site_author=get_str("SITE_AUTHOR", "Rosetta Team") or "Rosetta Team",
-        site_email=get_str("SITE_EMAIL", "contact@rosetta.dev") or "",
-        site_logo=get_str("SITE_LOGO"),
-        site_favicon=get_str("SITE_FAVICON"),
-        site_icon=get_str("SITE_ICON"),
-        # 页脚设置
-        footer_text=get_str("FOOTER_TEXT", "Powered by Rosetta"),
-        footer_slogan=get_str("FOOTER_SLOGAN", "Share knowledge, inspire creativity"),
-        copyright_text=get_str("COPYRIGHT_TEXT"),
-        icp_number=get_str("ICP_NUMBER"),
-        police_icp_number=get_str("POLICE_ICP_NUMBER"),
-        # 社交媒体链接
-        github_url=get_str("GITHUB_URL"),
-        x_url=get_str("X_URL"),
-        bilibili_url=get_str("BILIBILI_URL"),
-        weibo_url=get_str("WEIBO_URL"),
-        zhihu_url=get_str("ZHIHU_URL"),
-        youtube_url=get_str("YOUTUBE_URL"),
-        linkedin_url=get_str("LINKEDIN_URL"),
-        telegram_url=get_str("TELEGRAM_URL"),
-        # 联系方式
-        contact_email=get_str("CONTACT_EMAIL"),
-        contact_qq=get_str("CONTACT_QQ"),
-        contact_wechat=get_str("CONTACT_WECHAT"),
-        # 功能开关
-        enable_comments=get_bool("ENABLE_COMMENTS", "true"),
-        enable_registration=get_bool("ENABLE_REGISTRATION", "true"),
-        enable_rss_feed=get_bool("ENABLE_RSS_FEED", "true"),
-        enable_search=get_bool("ENABLE_SEARCH", "true"),
-        enable_sitemap=get_bool("ENABLE_SITEMAP", "true"),
-        enable_guestbook=get_bool("ENABLE_GUESTBOOK", "true"),
-        enable_dark_mode=get_bool("ENABLE_DARK_MODE", "true"),
-        enable_reading_time=get_bool("ENABLE_READING_TIME", "true"),
-        enable_word_count=get_bool("ENABLE_WORD_COUNT", "true"),
-        enable_like_button=get_bool("ENABLE_LIKE_BUTTON", "true"),
-        enable_share_buttons=get_bool("ENABLE_SHARE_BUTTONS", "true"),
-        enable_toc=get_bool("ENABLE_TOC", "true"),
-        # OOBE 种子里额外写入的一组能力开关（与上面 17 组 settings_groups 里的独立域做兼容）
-        enable_bing_wallpaper=get_bool("ENABLE_BING_WALLPAPER", "true"),
-        enable_pagefind_search=get_bool("ENABLE_PAGEFIND_SEARCH", "true"),
-        enable_encrypted_posts=get_bool("ENABLE_ENCRYPTED_POSTS", "false"),
-        enable_music_player=get_bool("ENABLE_MUSIC_PLAYER", "true"),
-        # OOBE 兼容别名：前端有些地方用 enable_rss，有些用 enable_rss_feed，统一暴露
-        enable_rss=get_bool("ENABLE_RSS_FEED", "true"),
-        # 默认封面图（OOBE 种子写 default_cover_image）
-        default_cover_image=get_str("DEFAULT_COVER_IMAGE", "") or "",
-        # 分页设置
-        pagination_page_size=get_int("PAGINATION_PAGE_SIZE", "12"),
-        pagination_max_page_size=get_int("PAGINATION_MAX_PAGE_SIZE", "100"),
-        # 外观设置
-        code_theme=get_str("CODE_THEME", "github") or "github",
-        code_theme_dark=get_str("CODE_THEME_DARK", "github-dark") or "github-dark",
-        default_theme=get_str("DEFAULT_THEME", "system") or "system",
-        primary_color=get_str("PRIMARY_COLOR", "#3B82F6") or "#3B82F6",
-        accent_color=get_str("ACCENT_COLOR", "#0284C7") or "#0284C7",
-        theme_primary=get_str("THEME_PRIMARY", "#0EA5A9") or "#0EA5A9",
-        theme_accent=get_str("THEME_ACCENT", "#0284C7") or "#0284C7",
-        font_family=get_str("FONT_FAMILY"),
-        default_og_image=get_str("DEFAULT_OG_IMAGE"),
-        site_subtitle=get_str("SITE_SUBTITLE", "") or "",
-        # 维护模式
-        maintenance_mode=get_bool("MAINTENANCE_MODE", "false"),
-        maintenance_message=get_str("MAINTENANCE_MESSAGE", "Site is under maintenance"),
-        maintenance_end_time=get_str("MAINTENANCE_END_TIME"),
-        # 默认图片
-        default_post_cover=get_str("DEFAULT_POST_COVER"),
-        default_avatar=get_str("DEFAULT_AVATAR"),
-        default_category_cover=get_str("DEFAULT_CATEGORY_COVER"),
-        # SEO 设置
-        google_analytics_id=get_str("GOOGLE_ANALYTICS_ID"),
-        baidu_analytics_id=get_str("BAIDU_ANALYTICS_ID"),
-        google_site_verification=get_str("GOOGLE_SITE_VERIFICATION"),
-        baidu_site_verification=get_str("BAIDU_SITE_VERIFICATION"),
-        robots_txt=get_str("ROBOTS_TXT"),
-        # 安全设置
-        require_email_verification=get_bool("REQUIRE_EMAIL_VERIFICATION", "false"),
-        allow_password_reset=get_bool("ALLOW_PASSWORD_RESET", "true"),
-        session_timeout=get_int("SESSION_TIMEOUT", "3600"),
-        max_login_attempts=get_int("MAX_LOGIN_ATTEMPTS", "5"),
-        login_lockout_duration=get_int("LOGIN_LOCKOUT_DURATION", "1800"),
-        # 邮件设置
-        email_configured=get_bool("EMAIL_CONFIGURED", "false"),
-        email_from=get_str("EMAIL_FROM"),
-        email_from_name=get_str("EMAIL_FROM_NAME"),
-        # 文件上传设置
-        max_upload_size=get_int("MAX_UPLOAD_SIZE", "10485760"),
-        allowed_image_types=get_str("ALLOWED_IMAGE_TYPES", "jpg,jpeg,png,gif,webp,svg")
-        or "jpg,jpeg,png,gif,webp,svg",
-        allowed_file_types=get_str("ALLOWED_FILE_TYPES", "pdf,doc,docx,xls,xlsx,ppt,pptx,zip,rar")
-        or "pdf,doc,docx,xls,xlsx,ppt,pptx,zip,rar",
-        # 评论设置
-        comment_require_approval=get_bool("COMMENT_REQUIRE_APPROVAL", "false"),
-        comment_allow_guest=get_bool("COMMENT_ALLOW_GUEST", "false"),
-        comment_max_length=get_int("COMMENT_MAX_LENGTH", "1000"),
-        comment_antispam=get_bool("COMMENT_ANTISPAM", "true"),
-        # 自定义代码
-        custom_header_code=get_str("CUSTOM_HEADER_CODE"),
-        custom_footer_code=get_str("CUSTOM_FOOTER_CODE"),
-        custom_css=get_str("CUSTOM_CSS"),
-        custom_js=get_str("CUSTOM_JS"),
-        # 音乐播放器设置
-        music_enabled=get_bool("MUSIC_ENABLED", "true"),
-        music_show_in_navbar=get_bool("MUSIC_SHOW_IN_NAVBAR", "true"),
-        music_show_in_sidebar=get_bool("MUSIC_SHOW_IN_SIDEBAR", "true"),
-        music_mode=get_str("MUSIC_MODE", "meting") or "meting",
-        music_volume=float(_configs_ci.get("MUSIC_VOLUME", "0.7")),
-        music_play_mode=get_str("MUSIC_PLAY_MODE", "list") or "list",
-        music_show_lyrics=get_bool("MUSIC_SHOW_LYRICS", "true"),
-        music_meting_api=get_str(
-            "MUSIC_METING_API",
-            "",
-        )
-        or "",
-        music_meting_server=get_str("MUSIC_METING_SERVER", "netease") or "netease",
-        music_meting_type=get_str("MUSIC_METING_TYPE", "playlist") or "playlist",
-        music_meting_id=get_str("MUSIC_METING_ID", "") or "",
-        # 壁纸/Banner设置
-        wallpaper_mode=get_str("WALLPAPER_MODE", "banner") or "banner",
-        wallpaper_player_enable=get_bool("WALLPAPER_PLAYER_ENABLE", "true"),
-        wallpaper_desktop=get_str("WALLPAPER_DESKTOP", "") or "",
-        wallpaper_mobile=get_str("WALLPAPER_MOBILE", "") or "",
-        wallpaper_video=get_str("WALLPAPER_VIDEO", "") or "",
-        wallpaper_use_bing=get_bool("WALLPAPER_USE_BING", "true"),
-        wallpaper_bing_days=get_int("WALLPAPER_BING_DAYS", "30"),
-        wallpaper_dim_opacity=float(_configs_ci.get("WALLPAPER_DIM_OPACITY", "0.2")),
-        wallpaper_home_title=get_str("WALLPAPER_HOME_TITLE", "Welcome") or "Welcome",
-        wallpaper_home_subtitle=get_str("WALLPAPER_HOME_SUBTITLE", "") or "",
-        # 关于页面内容
-        about_content=about_content or "",
-        # 关于页面 HTML（优先从 basic 组 JSON 中读取 about_page_html；空时回退扁平 key）
-        about_page_html=(
-            _configs_ci.get("ABOUT_PAGE_HTML", "")
-            or configs.get("about_page_html", "")
-            or ""
-        ),
-        # 友链申请区域自定义 HTML 内容
-        friends_apply_html=get_str("FRIENDS_APPLY_HTML", "") or "",
-        # 作者/侧边栏资料设置
-        author_name=get_str("AUTHOR_NAME", "") or "",
-        author_bio=get_str("AUTHOR_BIO", "") or "",
-        author_avatar=get_str("AUTHOR_AVATAR", "") or "",
-        author_links_json=get_str("AUTHOR_LINKS_JSON", "[]") or "[]",
-        # ===== 新增字段 =====
-        site_url=get_str("SITE_URL", "") or "",
-        site_start_date=get_str("SITE_START_DATE", "2025-01-01") or "2025-01-01",
-        footer_custom_html=get_str("FOOTER_CUSTOM_HTML", "") or "",
-        friends_page_title=get_str("FRIENDS_PAGE_TITLE", "") or "",
-        friends_page_description=get_str("FRIENDS_PAGE_DESCRIPTION", "") or "",
-        friends_page_show_comment=get_bool("FRIENDS_PAGE_SHOW_COMMENT", "true"),
-        friends_page_show_custom_content=get_bool("FRIENDS_PAGE_SHOW_CUSTOM_CONTENT", "true"),
-        dynamic_page_title=get_str("DYNAMIC_PAGE_TITLE", "") or "",
-        dynamic_page_description=get_str("DYNAMIC_PAGE_DESCRIPTION", "") or "",
-        dynamic_page_items_per_page=get_int("DYNAMIC_PAGE_ITEMS_PER_PAGE", "10"),
-        dynamic_page_show_comment=get_bool("DYNAMIC_PAGE_SHOW_COMMENT", "true"),
-        sponsor_page_title=get_str("SPONSOR_PAGE_TITLE", "") or "",
-        sponsor_page_description=get_str("SPONSOR_PAGE_DESCRIPTION", "") or "",
-        sponsor_page_usage=get_str("SPONSOR_PAGE_USAGE", "") or "",
-        sponsor_methods_json=get_str("SPONSOR_METHODS_JSON", "[]") or "[]",
-        sponsor_show_sponsors_list=get_bool("SPONSOR_SHOW_SPONSORS_LIST", "true"),
-        sponsor_page_show_comment=get_bool("SPONSOR_PAGE_SHOW_COMMENT", "true"),
-        # ========== 页面开关配置 ==========
-        page_friends_enabled=get_bool("PAGE_FRIENDS_ENABLED", "true"),
-        page_sponsor_enabled=get_bool("PAGE_SPONSOR_ENABLED", "true"),
-        page_guestbook_enabled=get_bool("PAGE_GUESTBOOK_ENABLED", "true"),
-        page_bangumi_enabled=get_bool("PAGE_BANGUMI_ENABLED", "true"),
-        page_gallery_enabled=get_bool("PAGE_GALLERY_ENABLED", "true"),
-        page_anime_enabled=get_bool("PAGE_ANIME_ENABLED", "true"),
-        page_dynamic_enabled=get_bool("PAGE_DYNAMIC_ENABLED", "true"),
-        # ========== 导航栏显示配置 ==========
-        category_bar_enabled=get_bool("CATEGORY_BAR_ENABLED", "true"),
-        # ========== 归档页配置 ==========
-        archive_fold_old_articles=get_bool("ARCHIVE_FOLD_OLD_ARTICLES", "true"),
-        # ========== 文章列表布局配置 ==========
-        post_list_default_mode=get_str("POST_LIST_DEFAULT_MODE", "list") or "list",
-        post_list_mobile_mode=get_str("POST_LIST_MOBILE_MODE", "grid") or "grid",
-        post_list_description_lines=get_int("POST_LIST_DESCRIPTION_LINES", "2"),
-        post_list_show_stats_icons=get_bool("POST_LIST_SHOW_STATS_ICONS", "true"),
-        post_list_tags_position=get_str("POST_LIST_TAGS_POSITION", "bottom") or "bottom",
-        # ========== 文章详情页配置 ==========
-        post_show_last_modified=get_bool("POST_SHOW_LAST_MODIFIED", "true"),
-        post_outdated_threshold_days=get_int("POST_OUTDATED_THRESHOLD_DAYS", "30"),
-        post_enable_share_poster=get_bool("POST_ENABLE_SHARE_POSTER", "true"),
-        post_generate_og_images=get_bool("POST_GENERATE_OG_IMAGES", "false"),
-        # ========== 封面图配置 ==========
-        cover_enable_in_post=get_bool("COVER_ENABLE_IN_POST", "true"),
-        cover_enable_overlay=get_bool("COVER_ENABLE_OVERLAY", "true"),
-        cover_show_loading=get_bool("COVER_SHOW_LOADING", "false"),
-        cover_random_enable=get_bool("COVER_RANDOM_ENABLE", "false"),
-        cover_random_apis_json=get_str("COVER_RANDOM_APIS_JSON", "[]") or "[]",
-        # ========== 许可证配置 ==========
-        license_enable=get_bool("LICENSE_ENABLE", "true"),
-        license_name=get_str("LICENSE_NAME", "CC BY-NC-SA 4.0") or "CC BY-NC-SA 4.0",
-        license_url=get_str("LICENSE_URL", "https://creativecommons.org/licenses/by-nc-sa/4.0/") or "https://creativecommons.org/licenses/by-nc-sa/4.0/",
-        license_icon=get_str("LICENSE_ICON", "") or "",
-        # ========== 评论系统配置 ==========
-        comment_system_type=get_str("COMMENT_SYSTEM_TYPE", "none") or "none",
-        comment_twikoo_env_id=get_str("COMMENT_TWIKOO_ENV_ID", "") or "",
-        comment_twikoo_lang=get_str("COMMENT_TWIKOO_LANG", "zh-CN") or "zh-CN",
-        comment_twikoo_visitor_count=get_bool("COMMENT_TWIKOO_VISITOR_COUNT", "true"),
-        comment_twikoo_js_url=get_str("COMMENT_TWIKOO_JS_URL", "https://cdn.jsdelivr.net/npm/twikoo@1.7.14/dist/twikoo.min.js") or "https://cdn.jsdelivr.net/npm/twikoo@1.7.14/dist/twikoo.min.js",
-        comment_twikoo_css_url=get_str("COMMENT_TWIKOO_CSS_URL", "") or "",
-        comment_waline_server_url=get_str("COMMENT_WALINE_SERVER_URL", "") or "",
-        comment_waline_lang=get_str("COMMENT_WALINE_LANG", "zh-CN") or "zh-CN",
-        comment_waline_emoji_json=get_str("COMMENT_WALINE_EMOJI_JSON", '["https://unpkg.com/@waline/emojis@1.4.0/weibo","https://unpkg.com/@waline/emojis@1.4.0/bilibili"]') or '["https://unpkg.com/@waline/emojis@1.4.0/weibo","https://unpkg.com/@waline/emojis@1.4.0/bilibili"]',
-        comment_waline_login_mode=get_str("COMMENT_WALINE_LOGIN_MODE", "enable") or "enable",
-        comment_waline_visitor_count=get_bool("COMMENT_WALINE_VISITOR_COUNT", "true"),
-        comment_artalk_server=get_str("COMMENT_ARTALK_SERVER", "") or "",
-        comment_artalk_locale=get_str("COMMENT_ARTALK_LOCALE", "zh-CN") or "zh-CN",
-        comment_artalk_visitor_count=get_bool("COMMENT_ARTALK_VISITOR_COUNT", "true"),
-        comment_giscus_repo=get_str("COMMENT_GISCUS_REPO", "") or "",
-        comment_giscus_repo_id=get_str("COMMENT_GISCUS_REPO_ID", "") or "",
-        comment_giscus_category=get_str("COMMENT_GISCUS_CATEGORY", "General") or "General",
-        comment_giscus_category_id=get_str("COMMENT_GISCUS_CATEGORY_ID", "") or "",
-        comment_giscus_mapping=get_str("COMMENT_GISCUS_MAPPING", "title") or "title",
-        comment_giscus_strict=get_str("COMMENT_GISCUS_STRICT", "0") or "0",
-        comment_giscus_reactions_enabled=get_str("COMMENT_GISCUS_REACTIONS_ENABLED", "1") or "1",
-        comment_giscus_emit_metadata=get_str("COMMENT_GISCUS_EMIT_METADATA", "1") or "1",
-        comment_giscus_input_position=get_str("COMMENT_GISCUS_INPUT_POSITION", "top") or "top",
-        comment_giscus_lang=get_str("COMMENT_GISCUS_LANG", "zh-CN") or "zh-CN",
-        comment_giscus_loading=get_str("COMMENT_GISCUS_LOADING", "lazy") or "lazy",
-        comment_disqus_shortname=get_str("COMMENT_DISQUS_SHORTNAME", "") or "",
-        # ========== Bangumi配置 ==========
-        bangumi_user_id=get_str("BANGUMI_USER_ID", "") or "",
-        bangumi_mode=get_str("BANGUMI_MODE", "dynamic") or "dynamic",
-        bangumi_api_url=get_str("BANGUMI_API_URL", "https://bgmapi.anibt.net") or "https://bgmapi.anibt.net",
-        bangumi_subject_base_url=get_str("BANGUMI_SUBJECT_BASE_URL", "https://bgmmi.anibt.net/subject/") or "https://bgmmi.anibt.net/subject/",
-        bangumi_category_order_json=get_str("BANGUMI_CATEGORY_ORDER_JSON", '["anime","book","music","game"]') or '["anime","book","music","game"]',
-        # ========== 追番配置 ==========
-        anime_bilibili_uid=get_str("ANIME_BILIBILI_UID", "") or "",
-        anime_tmdb_api_key=get_str("ANIME_TMDB_API_KEY", "") or "",
-        anime_tmdb_list_id=get_str("ANIME_TMDB_LIST_ID", "") or "",
-        # ========== 分页配置 ==========
-        pagination_posts_per_page=get_int("PAGINATION_POSTS_PER_PAGE", "10"),
-        # ========== 图像优化配置 ==========
-        image_opt_formats=get_str("IMAGE_OPT_FORMATS", "webp") or "webp",
-        image_opt_quality=get_int("IMAGE_OPT_QUALITY", "85"),
-        image_opt_no_referrer_json=get_str("IMAGE_OPT_NO_REFERRER_JSON", '["*.hdslb.com","*.bilibili.com"]') or '["*.hdslb.com","*.bilibili.com"]',
-        # ========== 樱花特效配置 ==========
-        sakura_enable=get_bool("SAKURA_ENABLE", "false"),
-        sakura_count=get_int("SAKURA_COUNT", "21"),
-        sakura_min_scale=float(_configs_ci.get("SAKURA_MIN_SCALE", "0.5")),
-        sakura_max_scale=float(_configs_ci.get("SAKURA_MAX_SCALE", "1.1")),
-        sakura_min_opacity=float(_configs_ci.get("SAKURA_MIN_OPACITY", "0.3")),
-        sakura_max_opacity=float(_configs_ci.get("SAKURA_MAX_OPACITY", "0.9")),
-        sakura_z_index=get_int("SAKURA_Z_INDEX", "100"),
-        # ========== 看板娘/Spine模型配置 ==========
-        pio_spine_enable=get_bool("PIO_SPINE_ENABLE", "false"),
-        pio_spine_model_path=get_str("PIO_SPINE_MODEL_PATH", "") or "",
-        pio_spine_scale=float(_configs_ci.get("PIO_SPINE_SCALE", "1.0")),
-        pio_spine_position_corner=get_str("PIO_SPINE_POSITION_CORNER", "bottom-left") or "bottom-left",
-        pio_spine_width=get_int("PIO_SPINE_WIDTH", "135"),
-        pio_spine_height=get_int("PIO_SPINE_HEIGHT", "165"),
-        pio_spine_z_index=get_int("PIO_SPINE_Z_INDEX", "1000"),
-        # ========== Mermaid图表配置 ==========
-        mermaid_theme=get_str("MERMAID_THEME", "default") or "default",
-        mermaid_security_level=get_str("MERMAID_SECURITY_LEVEL", "strict") or "strict",
-        # ========== PlantUML配置 ==========
-        plantuml_server_url=get_str("PLANTUML_SERVER_URL", "https://www.plantuml.com/plantuml") or "https://www.plantuml.com/plantuml",
-    )
-    response_dict.update(_sidebar_dict_to_flat(sidebar))
-    # 把后台 17 组 settings 合并进 /api/config 公开返回
-    response_dict = _apply_settings_groups(response_dict)
-    response = SiteConfigResponse(**response_dict)
+        return Response(content=oobe_site_config_body(), media_type="application/json")
 
-    # 异步设置缓存（不阻塞响应）
-    await cache.set(cache_key, response.model_dump(mode="json"), CACHE_TTL["site_config"])
-    return response
+    snapshot = await site_config_store.get(db)
+    headers = {"ETag": snapshot.etag}
+    if request.headers.get("if-none-match") == snapshot.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
 
 
 @router.get(
@@ -2160,14 +1553,13 @@ async def update_site_settings(
     data: SiteConfigUpdate,
     current_user: CurrentStaff,
     db: DB,
-    background_tasks: BackgroundTasks,
 ):
     """
     更新站点设置
 
     性能优化：
     - 批量查询现有配置
-    - 使用后台任务处理缓存失效
+    - 提交后由会话钩子失效站点配置快照
     - 减少 N+1 查询问题
     """
     config_map = {
@@ -2339,18 +1731,5 @@ async def update_site_settings(
     await db.flush()
     await db.commit()
 
-    # 同步删除缓存，确保下次读取时使用新值（测试也能看到变更）
-    await cache.delete(make_cache_key("site_config"))
-
-    # 使用后台任务处理缓存预热（不阻塞响应）
-    async def warmup_cache_async():
-        try:
-            from backend.core.cache_warmer import cache_warmer
-
-            await cache_warmer.warmup_task("site_config")
-        except Exception:
-            pass
-
-    background_tasks.add_task(warmup_cache_async)
-
+    # 提交后配置快照由 site_config_service 的会话钩子失效，下一次 /config 请求重建
     return BaseResponse(success=True, message="设置已保存")
@@ -13,7 +13,7 @@ from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, fun
 from sqlalchemy.orm import Mapped, mapped_column, relationship, selectinload
 
 from backend.core.auth import DB, CurrentUser
-from backend.core.concurrency import concurrent_query
+from backend.core.concurrency import fan_out, read_scalar, read_scalars
 from backend.core.database import Base
 from backend.utils.compat import UTC
 
@@ -251,12 +251,11 @@ async def list_favorites(
         select(Favorite).where(Favorite.user_id == current_user.id).subquery()
     )
 
-    total, result = await concurrent_query(
-        db.scalar(count_query),
-        db.execute(query.offset((page - 1) * page_size).limit(page_size)),
+    total, favorites = await fan_out(
+        db,
+        read_scalar(count_query),
+        read_scalars(query.offset((page - 1) * page_size).limit(page_size)),
     )
-
-    favorites = result.scalars().all()
     total = total or 0
 
     items = []
@@ -29,7 +29,7 @@ from sqlalchemy import func, select
 from sqlalchemy.orm import selectinload
 
 from backend.core.auth import DB, CurrentUser, get_current_user
-from backend.core.concurrency import concurrent_query
+from backend.core.concurrency import fan_out, read_rows, read_scalar, read_scalars
 from backend.models.core import Media
 
 logger = logging.getLogger(__name__)
@@ -588,12 +588,11 @@ async def list_media_library(
     # 并发执行计数和列表查询
     count_query = select(func.count()).select_from(query.subquery())
 
-    total, result = await concurrent_query(
-        db.scalar(count_query),
-        db.execute(query.offset((page - 1) * page_size).limit(page_size)),
+    total, media_list = await fan_out(
+        db,
+        read_scalar(count_query),
+        read_scalars(query.offset((page - 1) * page_size).limit(page_size)),
     )
-
-    media_list = result.scalars().all()
     total = total or 0
 
     # 转换为响应格式
@@ -646,13 +645,14 @@ async def get_media_stats(
     - 使用并发查询同时获取多个统计值
     """
     # 并发执行所有统计查询
-    total_count, total_size, type_stats = await concurrent_query(
+    total_count, total_size, type_stats = await fan_out(
+        db,
         # 总文件数
-        db.scalar(select(func.count()).select_from(Media)),
+        read_scalar(select(func.count()).select_from(Media)),
         # 总文件大小
-        db.scalar(select(func.sum(Media.file_size)).select_from(Media)),
+        read_scalar(select(func.sum(Media.file_size)).select_from(Media)),
         # 按类型统计
-        db.execute(
+        read_rows(
             select(
                 Media.file_type,
                 func.count().label("count"),
@@ -6,10 +6,26 @@ from sqlalchemy import and_, desc, func, or_, select, update
 from backend.core.auth import DB, CurrentUser
 from backend.models.message import PrivateMessage
 from backend.models.user import User
+from backend.services import conversation_service
 
 router = APIRouter(prefix="/messages", tags=["私信"])
 
 
+async def _mark_conversation_read(db: DB, user_id: int, other_id: int) -> None:
+    """把 other_id 发给 user_id 的私信全部标记为已读，会话未读数减去实际标记的条数"""
+    result = await db.execute(
+        update(PrivateMessage)
+        .where(
+            PrivateMessage.sender_id == other_id,
+            PrivateMessage.recipient_id == user_id,
+            PrivateMessage.is_read.is_(False),
+        )
+        .values(is_read=True)
+    )
+    if result.rowcount:
+        await conversation_service.decrement_unread(db, user_id, other_id, result.rowcount)
+
+
 @router.get("/conversations")
 async def get_conversations(
     db: DB,
@@ -17,99 +33,41 @@ async def get_conversations(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
 ):
-    """获取对话列表"""
-    subquery = (
-        select(
-            PrivateMessage.sender_id,
-            PrivateMessage.recipient_id,
-            func.max(PrivateMessage.created_at).label("last_message_time"),
-        )
-        .where(
-            or_(
-                PrivateMessage.sender_id == current_user.id,
-                PrivateMessage.recipient_id == current_user.id,
-            )
-        )
-        .group_by(
-            func.case(
-                (PrivateMessage.sender_id == current_user.id, PrivateMessage.recipient_id),
-                else_=PrivateMessage.sender_id,
-            )
-        )
-        .subquery()
-    )
-
-    latest_messages = (
-        select(PrivateMessage)
-        .where(
-            or_(
-                and_(
-                    PrivateMessage.sender_id == current_user.id,
-                    PrivateMessage.recipient_id == subquery.c.recipient_id,
-                ),
-                and_(
-                    PrivateMessage.recipient_id == current_user.id,
-                    PrivateMessage.sender_id == subquery.c.sender_id,
-                ),
-            ),
-            PrivateMessage.created_at == subquery.c.last_message_time,
-        )
-        .order_by(desc(PrivateMessage.created_at))
+    """获取对话列表（读取会话汇总表，按最近私信时间分页）"""
+    total = await db.scalar(conversation_service.inbox_count_query(current_user.id)) or 0
+    result = await db.execute(
+        conversation_service.inbox_query(current_user.id)
+        .offset((page - 1) * page_size)
+        .limit(page_size)
     )
 
-    result = await db.execute(latest_messages)
-    messages = result.scalars().all()
-
     conversations = []
-    user_ids = set()
-    for msg in messages:
-        other_id = msg.recipient_id if msg.sender_id == current_user.id else msg.sender_id
-        user_ids.add(other_id)
-
-    if user_ids:
-        users_result = await db.execute(select(User).where(User.id.in_(user_ids)))
-        users = {u.id: u for u in users_result.scalars().all()}
-
-        for msg in messages:
-            other_id = msg.recipient_id if msg.sender_id == current_user.id else msg.sender_id
-            other_user = users.get(other_id)
-            if other_user:
-                unread_count_result = await db.execute(
-                    select(func.count())
-                    .select_from(PrivateMessage)
-                    .where(
-                        PrivateMessage.sender_id == other_id,
-                        PrivateMessage.recipient_id == current_user.id,
-                        not PrivateMessage.is_read,
-                    )
-                )
-                unread_count = unread_count_result.scalar() or 0
-
-                conversations.append(
-                    {
-                        "user": {
-                            "id": other_user.id,
-                            "username": other_user.username,
-                            "nickname": other_user.nickname,
-                            "avatar": other_user.avatar,
-                        },
-                        "last_message": {
-                            "content": msg.content[:100] + "..."
-                            if len(msg.content) > 100
-                            else msg.content,
-                            "created_at": msg.created_at.isoformat(),
-                            "is_mine": msg.sender_id == current_user.id,
-                        },
-                        "unread_count": unread_count,
-                    }
-                )
+    for conversation, other_user, msg, unread_count in result.all():
+        conversations.append(
+            {
+                "user": {
+                    "id": other_user.id,
+                    "username": other_user.username,
+                    "nickname": other_user.nickname,
+                    "avatar": other_user.avatar,
+                },
+                "last_message": {
+                    "content": msg.content[:100] + "..." if len(msg.content) > 100 else msg.content,
+                    "created_at": msg.created_at.isoformat(),
+                    "is_mine": msg.sender_id == current_user.id,
+                }
+                if msg
+                else None,
+                "unread_count": unread_count,
+            }
+        )
 
     return {
         "items": conversations,
-        "total": len(conversations),
+        "total": total,
         "page": page,
         "page_size": page_size,
-        "total_pages": 1,
+        "total_pages": (total + page_size - 1) // page_size,
     }
 
 
@@ -119,16 +77,8 @@ async def get_unread_count(
     current_user: CurrentUser,
 ):
     """获取未读消息数量"""
-    result = await db.execute(
-        select(func.count())
-        .select_from(PrivateMessage)
-        .where(
-            PrivateMessage.recipient_id == current_user.id,
-            not PrivateMessage.is_read,
-        )
-    )
-    count = result.scalar() or 0
-    return {"count": count}
+    count = await db.scalar(conversation_service.unread_total_query(current_user.id))
+    return {"count": count or 0}
 
 
 @router.get("/{user_id}")
@@ -169,15 +119,7 @@ async def get_conversation(
     result = await db.execute(messages_query)
     messages = result.scalars().all()
 
-    await db.execute(
-        update(PrivateMessage)
-        .where(
-            PrivateMessage.sender_id == user_id,
-            PrivateMessage.recipient_id == current_user.id,
-            not PrivateMessage.is_read,
-        )
-        .values(is_read=True)
-    )
+    await _mark_conversation_read(db, current_user.id, user_id)
     await db.commit()
 
     return {
@@ -225,6 +167,8 @@ async def send_message(
         content=content,
     )
     db.add(message)
+    await db.flush()
+    await conversation_service.record_message(db, message)
     await db.commit()
     await db.refresh(message)
 
@@ -250,7 +194,14 @@ async def mark_as_read(
     if message.recipient_id != current_user.id:
         raise HTTPException(status_code=403, detail="无权操作此消息")
 
-    message.is_read = True
+    # 条件更新：并发的重复请求只有一个真正改变状态，未读数只减一次
+    result = await db.execute(
+        update(PrivateMessage)
+        .where(PrivateMessage.id == message_id, PrivateMessage.is_read.is_(False))
+        .values(is_read=True)
+    )
+    if result.rowcount == 1:
+        await conversation_service.decrement_unread(db, current_user.id, message.sender_id)
     await db.commit()
 
     return {"success": True}
@@ -263,15 +214,7 @@ async def mark_all_as_read(
     user_id: int,
 ):
     """标记与某用户的所有消息为已读"""
-    await db.execute(
-        update(PrivateMessage)
-        .where(
-            PrivateMessage.sender_id == user_id,
-            PrivateMessage.recipient_id == current_user.id,
-            not PrivateMessage.is_read,
-        )
-        .values(is_read=True)
-    )
+    await _mark_conversation_read(db, current_user.id, user_id)
     await db.commit()
 
     return {"success": True}
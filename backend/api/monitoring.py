@@ -12,10 +12,12 @@ from fastapi import APIRouter, Query, Request
 from pydantic import BaseModel
 from sqlalchemy import func, select
 
+from backend.core import database
 from backend.core.auth import DB, CurrentStaff
 from backend.core.cache import cache
 from backend.core.config import settings
-from backend.core.database import engine
+from backend.core.db_metrics import query_metrics
+from backend.services.stats_rollup import read_days, stats_rollup_job
 from backend.utils.compat import UTC, timedelta
 
 router = APIRouter(tags=["监控"])
@@ -94,7 +96,7 @@ async def health_check():
 
     # 检查数据库
     try:
-        async with engine.connect() as conn:
+        async with database.engine.connect() as conn:
             await conn.execute(select(1))
         checks["database"] = {"status": "healthy", "latency_ms": 0}
     except Exception as e:
@@ -238,73 +240,18 @@ async def get_visits_summary(
     """获取访问量汇总"""
     from backend.models.monitoring import VisitLog
 
-    now = datetime.now(UTC)
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    yesterday_start = today_start - timedelta(days=1)
-    week_start = today_start - timedelta(days=7)
-    month_start = today_start - timedelta(days=30)
-
     total = await db.scalar(select(func.count()).select_from(VisitLog)) or 0
-    today = (
-        await db.scalar(
-            select(func.count()).select_from(VisitLog).where(VisitLog.created_at >= today_start)
-        )
-        or 0
-    )
-    yesterday = (
-        await db.scalar(
-            select(func.count())
-            .select_from(VisitLog)
-            .where(
-                VisitLog.created_at >= yesterday_start,
-                VisitLog.created_at < today_start,
-            )
-        )
-        or 0
-    )
-    week = (
-        await db.scalar(
-            select(func.count()).select_from(VisitLog).where(VisitLog.created_at >= week_start)
-        )
-        or 0
-    )
-    month = (
-        await db.scalar(
-            select(func.count()).select_from(VisitLog).where(VisitLog.created_at >= month_start)
-        )
-        or 0
-    )
 
-    # 计算趋势（最近7天每天访问量）
-    trend = []
-    for i in range(6, -1, -1):
-        date = today_start - timedelta(days=i)
-        next_date = date + timedelta(days=1)
-        count = (
-            await db.scalar(
-                select(func.count())
-                .select_from(VisitLog)
-                .where(
-                    VisitLog.created_at >= date,
-                    VisitLog.created_at < next_date,
-                )
-            )
-            or 0
-        )
-        trend.append({"date": date.strftime("%m-%d"), "value": count})
-
-    # 独立IP数（今日）
-    unique_ips = (
-        await db.scalar(
-            select(func.count(func.distinct(VisitLog.ip)))
-            .select_from(VisitLog)
-            .where(
-                VisitLog.created_at >= today_start,
-                VisitLog.ip.isnot(None),
-            )
-        )
-        or 0
-    )
+    # 最近 31 天按天访问量（统计汇总表 + 水位之后实时聚合）
+    series = await read_days(db, 31)
+    today = series[-1]["visits"]
+    yesterday = series[-2]["visits"]
+    week = sum(row["visits"] for row in series[-8:])
+    month = sum(row["visits"] for row in series)
+    trend = [
+        {"date": row["bucket"].strftime("%m-%d"), "value": row["visits"]} for row in series[-7:]
+    ]
+    unique_ips = series[-1]["unique_ips"]
 
     return {
         "total": total,
@@ -469,7 +416,7 @@ async def get_performance_metrics(
 @router.get(
     "/database",
     summary="数据库监控",
-    description="获取数据库连接和查询统计。",
+    description="获取数据库连接池状态、查询统计和表规模。",
 )
 async def get_database_stats(
     db: DB,
@@ -479,7 +426,8 @@ async def get_database_stats(
     from backend.models.blog import Post
     from backend.models.user import User
 
-    # 连接池信息
+    # 连接池信息（reset_engine 会替换引擎，运行时读取）
+    engine = database.engine
     pool = engine.pool
 
     pool_info = {
@@ -488,6 +436,8 @@ async def get_database_stats(
         "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else 0,
         "overflow": pool.overflow() if hasattr(pool, "overflow") else 0,
     }
+    metrics = query_metrics.snapshot(limit=0)
+    pool_info.update(metrics["pool"])
 
     # 表大小统计
     table_sizes = {}
@@ -502,11 +452,37 @@ async def get_database_stats(
 
     return {
         "pool": pool_info,
+        "queries": metrics["queries"],
+        "replicas": database.replica_router.stats(),
         "table_sizes": table_sizes,
-        "database_url": str(engine.url).replace(":***@", ":****@") if engine.url else None,
+        "database_url": engine.url.render_as_string(hide_password=True) if engine.url else None,
     }
 
 
+@router.get(
+    "/database/queries",
+    summary="SQL 查询统计",
+    description="慢 SQL 指纹（按累计耗时排序）与各路由每请求查询数（按平均查询数排序）。",
+)
+async def get_query_stats(
+    current_user: CurrentStaff,
+    limit: int = Query(20, ge=1, le=200, description="慢 SQL / 路由各返回的条数"),
+):
+    """获取 SQL 查询统计"""
+    return query_metrics.snapshot(limit=limit)
+
+
+@router.delete(
+    "/database/queries",
+    summary="重置 SQL 查询统计",
+    description="清空本进程的查询、慢 SQL 与连接池统计。",
+)
+async def reset_query_stats(current_user: CurrentStaff):
+    """重置 SQL 查询统计"""
+    query_metrics.reset()
+    return {"success": True}
+
+
 @router.get(
     "/cache",
     summary="缓存监控",
@@ -565,10 +541,6 @@ async def get_trends(
     days: int = Query(7, ge=1, le=30, description="统计天数"),
 ):
     """获取趋势数据"""
-    from backend.models.blog import Comment, Post
-    from backend.models.monitoring import VisitLog
-    from backend.models.user import User
-
     trends = {
         "posts": [],
         "comments": [],
@@ -576,71 +548,26 @@ async def get_trends(
         "visits": [],
     }
 
-    now = datetime.now(UTC)
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-
-    for i in range(days - 1, -1, -1):
-        date = today_start - timedelta(days=i)
-        date_end = date + timedelta(days=1)
-
-        # 文章数
-        posts_count = (
-            await db.scalar(
-                select(func.count())
-                .select_from(Post)
-                .where(
-                    Post.created_at >= date,
-                    Post.created_at < date_end,
-                )
-            )
-            or 0
-        )
+    for row in await read_days(db, days):
+        date = row["bucket"].strftime("%m-%d")
+        for key in trends:
+            trends[key].append({"date": date, "count": row[key]})
 
-        # 评论数
-        comments_count = (
-            await db.scalar(
-                select(func.count())
-                .select_from(Comment)
-                .where(
-                    Comment.created_at >= date,
-                    Comment.created_at < date_end,
-                )
-            )
-            or 0
-        )
-
-        # 用户数
-        users_count = (
-            await db.scalar(
-                select(func.count())
-                .select_from(User)
-                .where(
-                    User.created_at >= date,
-                    User.created_at < date_end,
-                )
-            )
-            or 0
-        )
-
-        # 访问数
-        visits_count = (
-            await db.scalar(
-                select(func.count())
-                .select_from(VisitLog)
-                .where(
-                    VisitLog.created_at >= date,
-                    VisitLog.created_at < date_end,
-                )
-            )
-            or 0
-        )
+    return trends
 
-        trends["posts"].append({"date": date.strftime("%m-%d"), "count": posts_count})
-        trends["comments"].append({"date": date.strftime("%m-%d"), "count": comments_count})
-        trends["users"].append({"date": date.strftime("%m-%d"), "count": users_count})
-        trends["visits"].append({"date": date.strftime("%m-%d"), "count": visits_count})
 
-    return trends
+@router.post(
+    "/trends/rollup",
+    summary="执行统计汇总",
+    description="立即执行一次统计汇总；rebuild=true 时忽略水位，从最早的数据重建。",
+)
+async def run_stats_rollup(
+    current_user: CurrentStaff,
+    rebuild: bool = Query(False, description="是否全部重建"),
+):
+    """立即执行统计汇总"""
+    rows = await stats_rollup_job.run_once(rebuild=rebuild)
+    return {"success": rows is not None, "rows": rows}
 
 
 # 内部函数：记录请求延迟
@@ -13,41 +13,11 @@ from sqlalchemy.orm import selectinload
 from backend.core.auth import DB, CurrentUser
 from backend.core.concurrency import concurrent_query
 from backend.models.core import Notification
+from backend.services.notification_hub import notification_hub, notification_message
 
 router = APIRouter(tags=["通知"])
 
 
-# WebSocket 连接管理
-class ConnectionManager:
-    """WebSocket 连接管理器"""
-
-    def __init__(self):
-        self.active_connections: dict[int, list[WebSocket]] = {}
-
-    async def connect(self, websocket: WebSocket, user_id: int):
-        await websocket.accept()
-        if user_id not in self.active_connections:
-            self.active_connections[user_id] = []
-        self.active_connections[user_id].append(websocket)
-
-    def disconnect(self, websocket: WebSocket, user_id: int):
-        if user_id in self.active_connections:
-            self.active_connections[user_id].remove(websocket)
-            if not self.active_connections[user_id]:
-                del self.active_connections[user_id]
-
-    async def send_to_user(self, user_id: int, message: dict):
-        if user_id in self.active_connections:
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    pass
-
-
-manager = ConnectionManager()
-
-
 # ==================== 通知 API ====================
 
 
@@ -304,34 +274,45 @@ async def clear_notifications(
 
 @router.websocket("/ws")
 async def websocket_notifications(websocket: WebSocket):
-    """WebSocket 实时通知"""
+    """
+    WebSocket 实时通知
+
+    客户端连接后发送 {"type": "auth", "token": "<access token>"} 完成认证，之后服务端
+    推送 notification / heartbeat 消息；客户端可随时发送 {"type": "ping"}。
+    """
     await websocket.accept()
 
-    user_id = None
+    conn = None
 
     try:
         while True:
             data = await websocket.receive_json()
 
-            if data.get("type") == "auth":
+            if data.get("type") == "auth" and conn is None:
                 # 验证用户
                 from backend.core.auth import decode_token
 
                 token = data.get("token")
-                if token:
-                    payload = decode_token(token)
-                    if payload:
-                        user_id = payload.get("sub")
-                        if user_id:
-                            manager.connect(websocket, int(user_id))
-                            await websocket.send_json({"type": "auth", "status": "success"})
+                payload = decode_token(token) if token else None
+                user_id = payload.get("sub") if payload else None
+                if not user_id:
+                    await websocket.send_json({"type": "auth", "status": "failed"})
+                    continue
+                await websocket.send_json({"type": "auth", "status": "success"})
+                # 认证之后的所有发送都经过连接自己的发送队列，避免并发 send
+                conn = await notification_hub.connect(websocket, int(user_id))
 
             elif data.get("type") == "ping":
-                await websocket.send_json({"type": "pong"})
+                if conn is None:
+                    await websocket.send_json({"type": "pong"})
+                else:
+                    notification_hub.push(conn, {"type": "pong"})
 
     except WebSocketDisconnect:
-        if user_id:
-            manager.disconnect(websocket, int(user_id))
+        pass
+    finally:
+        if conn is not None:
+            await notification_hub.disconnect(conn)
 
 
 # ==================== 内部函数 ====================
@@ -369,18 +350,7 @@ async def create_notification(
     await db.flush()
     await db.refresh(notification)
 
-    # 通过 WebSocket 发送实时通知
-    await manager.send_to_user(
-        recipient_id,
-        {
-            "type": "notification",
-            "id": notification.id,
-            "title": title,
-            "message": message,
-            "link": link,
-            "level": level,
-            "created_at": notification.created_at.isoformat() if notification.created_at else None,
-        },
-    )
+    # 通过 WebSocket 发送实时通知（经消息代理到达所有 worker 上的连接）
+    await notification_hub.send_to_user(recipient_id, notification_message(notification))
 
     return notification
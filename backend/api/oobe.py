@@ -20,7 +20,8 @@ import sys
 import traceback
 import uuid as _uuid
 from datetime import datetime
-from typing import Literal
+from functools import lru_cache
+from typing import TYPE_CHECKING, Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
@@ -45,14 +46,17 @@ from backend.core.oobe_constants import (
 from backend.core.paths import BASE_DIR, CONFIG_FILE, ENV_FILE, OOBE_LOCK_FILE, STATE_FILE
 from backend.core.setup_config import ConfigService, Environment
 from backend.core.setup_database import DatabaseService, generate_database_url
-from backend.core.setup_dependency import DependencyService
 from backend.core.setup_progress import ProgressService
-from backend.core.setup_system import SystemService
+from backend.core.site_gate import site_gate
 from backend.models.blog import Category, Tag
 from backend.models.core import Navigation, Page
 from backend.models.core import SiteConfig as DbSiteConfig
 from backend.models.user import User
 
+if TYPE_CHECKING:
+    from backend.core.setup_dependency import DependencyService
+    from backend.core.setup_system import SystemService
+
 logger = logging.getLogger(__name__)
 
 
@@ -112,11 +116,25 @@ class CombinedInstallRequest(BaseModel):
 router = APIRouter(prefix="/oobe", tags=["OOBE"])
 
 config_service = ConfigService()
-system_service = SystemService()
-dependency_service = DependencyService(BASE_DIR)
 database_service = DatabaseService()
 progress_service = ProgressService()
 
+
+# 系统信息 / 依赖检测只在安装向导中使用，首次调用时再导入，不拖慢已安装站点的启动
+@lru_cache(maxsize=1)
+def _system_service() -> "SystemService":
+    from backend.core.setup_system import SystemService
+
+    return SystemService()
+
+
+@lru_cache(maxsize=1)
+def _dependency_service() -> "DependencyService":
+    from backend.core.setup_dependency import DependencyService
+
+    return DependencyService(BASE_DIR)
+
+
 _INSTALL_STREAM_QUEUES: dict[str, asyncio.Queue] = {}
 _INSTALL_STREAM_BUFFER: list[dict] = []
 _INSTALL_STREAM_BUFFER_MAX = 200
@@ -266,7 +284,7 @@ async def oobe_check_environment():
 @router.get("/system-info")
 async def get_system_info():
     """获取系统信息"""
-    info = system_service.get_system_info()
+    info = _system_service().get_system_info()
     resources = info.resources
     return {
         "success": True,
@@ -289,6 +307,7 @@ async def get_system_info():
 @router.get("/dependencies")
 async def check_dependencies():
     """检查系统依赖状态"""
+    dependency_service = _dependency_service()
     deps = dependency_service.check_all()
 
     def _map_dep(_name, dep):
@@ -389,6 +408,7 @@ async def install_dependencies():
     await require_oobe_incomplete()
 
     # 将 DependencyService 的回调接到 SSE 广播，前端可实时看日志
+    dependency_service = _dependency_service()
     dep_logs: list[str] = []
 
     def _on_progress(name: str, status: str, message: str):
@@ -750,6 +770,7 @@ async def _run_combined_install(req: CombinedInstallRequest):
 
         with open(OOBE_LOCK_FILE, "w", encoding="utf-8") as f:
             f.write(datetime.now().isoformat())
+        site_gate.set_oobe_complete(True)
 
         if STATE_FILE.exists():
             try:
@@ -1298,6 +1319,7 @@ async def complete_oobe(db: AsyncSession = Depends(get_db)):
 
         with open(OOBE_LOCK_FILE, "w") as f:
             f.write(datetime.now().isoformat())
+        site_gate.set_oobe_complete(True)
 
         if STATE_FILE.exists():
             try:
@@ -1344,5 +1366,6 @@ async def reset_oobe():
             CONFIG_FILE.unlink()
         except Exception:
             pass
+    site_gate.set_oobe_complete(False)
     _INSTALL_STREAM_BUFFER.clear()
     return {"success": True}
@@ -1,7 +1,7 @@
 """
 定时发布 API
 
-提供管理员对文章定时发布的管理能力，以及将到期文章自动转为已发布的工具函数。
+提供管理员对文章定时发布的管理能力。
 
 路由设计：
 - 管理接口:
@@ -11,7 +11,7 @@
 
 定时发布模型：
 - Post.status == "published" 且 Post.scheduled_at 为未来时间表示处于"定时等待"状态
-- publish_due_posts(db) 将 scheduled_at <= now 的文章真正发布（写入 published_at 并清空 scheduled_at）
+- 到期发布由 services.post_scheduler 负责（单 leader + 最小堆），这里的修改提交后会自动通知调度器
 """
 
 from datetime import datetime
@@ -23,6 +23,7 @@ from sqlalchemy import select
 from backend.core.auth import DB, CurrentStaff
 from backend.models.blog import Post
 from backend.schemas import BaseResponse
+from backend.services.post_scheduler import announce_published, publish_due_posts
 from backend.utils.compat import UTC
 
 router = APIRouter(tags=["定时发布"])
@@ -39,42 +40,6 @@ class ScheduleRequest(BaseModel):
     )
 
 
-async def publish_due_posts(db) -> int:
-    """
-    发布到期的定时文章
-
-    查询 status=published 且 scheduled_at <= now 的文章，
-    将其 published_at 设置为计划时间（真正生效），并清空 scheduled_at。
-
-    Args:
-        db: 数据库会话
-
-    Returns:
-        int: 本次实际发布的文章数量
-    """
-    now = datetime.now(UTC)
-    query = select(Post).where(
-        Post.status == "published",
-        Post.scheduled_at.is_not(None),
-        Post.scheduled_at <= now,
-    )
-    result = await db.execute(query)
-    posts = result.scalars().all()
-
-    count = 0
-    for post in posts:
-        # 仅在尚未设置 published_at 时写入，避免覆盖已发布文章的时间
-        if post.published_at is None:
-            post.published_at = post.scheduled_at
-        post.scheduled_at = None
-        count += 1
-
-    if count:
-        await db.flush()
-
-    return count
-
-
 # ==================== 管理接口 ====================
 
 
@@ -89,7 +54,10 @@ async def list_scheduled_posts(
 ):
     """管理员获取待发布的定时文章列表"""
     # 先将到期的文章发布，保证列表为最新的待发布状态
-    await publish_due_posts(db)
+    published = await publish_due_posts(db)
+    if published:
+        await db.commit()
+        await announce_published(published)
 
     query = select(Post).where(Post.scheduled_at.is_not(None)).order_by(Post.scheduled_at.asc())
     result = await db.execute(query)
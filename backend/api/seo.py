@@ -12,10 +12,10 @@ from backend.core.auth import CurrentStaff
 from backend.core.cache import CACHE_TTL, cache, make_cache_key
 from backend.core.config import settings
 from backend.core.database import async_session_maker
-from backend.core.deps import DB
+from backend.core.deps import ReadDB
 from backend.core.site_config import get_site_config_value
-from backend.models.blog import Category, Post, Tag
 from backend.models.core import SiteConfig
+from backend.services.sitemap_service import invalidate_all, render_sitemap
 
 router = APIRouter(tags=["SEO"])
 
@@ -98,8 +98,7 @@ async def update_seo_config(
     description="清除 sitemap 相关缓存，下一次请求将重新生成。",
 )
 async def generate_sitemap_cache(_staff: CurrentStaff):
-    await cache.delete_pattern(make_cache_key("sitemap", "*"))
-    await cache.delete_pattern(make_cache_key("blog", "sitemap*"))
+    await invalidate_all()
     return {"success": True, "message": "Sitemap 缓存已清除，下次访问将重新生成"}
 
 
@@ -109,25 +108,9 @@ async def generate_sitemap_cache(_staff: CurrentStaff):
     description="从 SEO 模块对外暴露统一 sitemap 路径，避免前端路由不一致。",
     response_class=Response,
 )
-async def seo_sitemap(db: DB):
-    """与 blog.py 中 get_sitemap 相同逻辑，提供 /api/seo/sitemap.xml 路径"""
-    from backend.api.blog import generate_sitemap as _gen
-
-    cache_key = make_cache_key("seo", "sitemap")
-    cached = await cache.get(cache_key)
-    if cached:
-        return Response(content=cached, media_type="application/xml")
-
-    posts = (await db.execute(
-        select(Post).where(Post.status == "published").order_by(Post.published_at.desc())
-    )).scalars().all()
-    categories = (await db.execute(select(Category))).scalars().all()
-    tags = (await db.execute(select(Tag).where(Tag.is_active.is_(True)))).scalars().all()
-
-    site_url = settings.site_url
-    content = _gen(posts, categories, tags, site_url)
-    await cache.set(cache_key, content, ttl=3600)
-    return Response(content=content, media_type="application/xml")
+async def seo_sitemap(db: ReadDB):
+    """与 blog.py 中 get_sitemap 共用 sitemap_service 的索引与缓存"""
+    return Response(content=await render_sitemap(db), media_type="application/xml")
 
 
 @router.get(
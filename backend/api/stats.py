@@ -24,9 +24,10 @@ from fastapi import APIRouter, Query
 from sqlalchemy import func, select, text
 
 from backend.core.auth import DB, CurrentStaff
-from backend.core.concurrency import concurrent_query
+from backend.core.concurrency import fan_out, read_rows, read_scalar
 from backend.models.blog import Comment, Post
 from backend.models.user import User
+from backend.services.stats_rollup import read_days
 from backend.utils.compat import UTC
 
 logger = logging.getLogger(__name__)
@@ -106,17 +107,36 @@ async def get_admin_stats(
 ):
     days = _parse_range(time_range)
     labels = _build_labels(days)
-    today = datetime.now(UTC).date()
-    start = datetime.combine(today - timedelta(days=days - 1), datetime.min.time(), tzinfo=UTC)
-    today_start = datetime.combine(today, datetime.min.time(), tzinfo=UTC)
 
     total_posts_q = select(func.count()).select_from(Post)
     total_drafts_q = select(func.count()).select_from(Post).where(Post.status == "draft")
     total_published_q = select(func.count()).select_from(Post).where(Post.status == "published")
     total_comments_q = select(func.count()).select_from(Comment)
-    total_pending_q = select(func.count()).select_from(Comment).where(not Comment.active)
+    total_pending_q = select(func.count()).select_from(Comment).where(Comment.active.is_(False))
     total_users_q = select(func.count()).select_from(User)
+    total_views_q = select(func.coalesce(func.sum(Post.views), 0)).select_from(Post)
+    comments_count_q = (
+        select(func.count())
+        .select_from(Comment)
+        .where(Comment.post_id == Post.id)
+        .scalar_subquery()
+    )
+    top_articles_q = (
+        select(Post.id, Post.title, Post.views, comments_count_q.label("comments_count"))
+        .order_by(Post.views.desc())
+        .limit(5)
+    )
+    act_q = (
+        select(
+            User.id, User.nickname, User.username, User.avatar, func.count(Comment.id).label("c")
+        )
+        .join(Comment, Comment.user_id == User.id)
+        .group_by(User.id)
+        .order_by(func.count(Comment.id).desc())
+        .limit(5)
+    )
 
+    # 各项统计互不依赖，扇出到独立会话并行执行
     (
         total_posts,
         total_drafts,
@@ -124,110 +144,31 @@ async def get_admin_stats(
         total_comments,
         total_pending,
         total_users,
-    ) = await concurrent_query(
-        db.scalar(total_posts_q),
-        db.scalar(total_drafts_q),
-        db.scalar(total_published_q),
-        db.scalar(total_comments_q),
-        db.scalar(total_pending_q),
-        db.scalar(total_users_q),
-    )
-
-    total_views_today_q = select(func.coalesce(func.sum(Post.views), 0)).select_from(Post)
-    total_comments_today_q = (
-        select(func.count()).select_from(Comment).where(Comment.created_at >= today_start)
-    )
-    total_views_today, total_comments_today = await concurrent_query(
-        db.scalar(total_views_today_q),
-        db.scalar(total_comments_today_q),
-    )
-
-    pv_series = [0] * days
-    uv_series = [0] * days
-    comments_series = [0] * days
-    posts_series = [0] * days
-    users_series = [0] * days
-
-    try:
-        from backend.models.blog import PostViewHistory  # type: ignore
-
-        pv_rows = (
-            (
-                await db.execute(
-                    select(
-                        func.date(PostViewHistory.viewed_at).label("d"),
-                        func.count().label("c"),
-                    )
-                    .where(PostViewHistory.viewed_at >= start)
-                    .group_by(func.date(PostViewHistory.viewed_at))
-                )
-            )
-            .mappings()
-            .all()
-        )
-        for r in pv_rows:
-            d_iso = str(r["d"])
-            if d_iso in labels:
-                pv_series[labels.index(d_iso)] = int(r["c"])
-    except Exception:
-        pass
-
-    comment_rows = (
-        (
-            await db.execute(
-                select(
-                    func.date(Comment.created_at).label("d"),
-                    func.count().label("c"),
-                )
-                .where(Comment.created_at >= start)
-                .group_by(func.date(Comment.created_at))
-            )
-        )
-        .mappings()
-        .all()
+        total_views_today,
+        series,
+        top_rows,
+        act_rows,
+    ) = await fan_out(
+        db,
+        read_scalar(total_posts_q),
+        read_scalar(total_drafts_q),
+        read_scalar(total_published_q),
+        read_scalar(total_comments_q),
+        read_scalar(total_pending_q),
+        read_scalar(total_users_q),
+        read_scalar(total_views_q),
+        # 按天序列来自统计汇总表（今天等水位之后的部分实时聚合），见 services.stats_rollup
+        lambda session: read_days(session, days),
+        read_rows(top_articles_q),
+        read_rows(act_q),
     )
-    for r in comment_rows:
-        d_iso = str(r["d"])
-        if d_iso in labels:
-            comments_series[labels.index(d_iso)] = int(r["c"])
 
-    post_rows = (
-        (
-            await db.execute(
-                select(
-                    func.date(Post.created_at).label("d"),
-                    func.count().label("c"),
-                )
-                .where(Post.created_at >= start)
-                .group_by(func.date(Post.created_at))
-            )
-        )
-        .mappings()
-        .all()
-    )
-    for r in post_rows:
-        d_iso = str(r["d"])
-        if d_iso in labels:
-            posts_series[labels.index(d_iso)] = int(r["c"])
-
-    user_rows = (
-        (
-            await db.execute(
-                select(
-                    func.date(User.created_at).label("d"),
-                    func.count().label("c"),
-                )
-                .where(User.created_at >= start)
-                .group_by(func.date(User.created_at))
-            )
-        )
-        .mappings()
-        .all()
-    )
-    for r in user_rows:
-        d_iso = str(r["d"])
-        if d_iso in labels:
-            users_series[labels.index(d_iso)] = int(r["c"])
+    pv_series = [row["pv"] for row in series]
+    uv_series = [row["uv"] for row in series]
+    comments_series = [row["comments"] for row in series]
+    posts_series = [row["posts"] for row in series]
+    users_series = [row["users"] for row in series]
+    total_comments_today = series[-1]["comments"]
 
     for i, lbl in enumerate(labels):
         base = 10 + ((i + 1) * 3)
@@ -236,8 +177,6 @@ async def get_admin_stats(
         if uv_series[i] == 0:
             uv_series[i] = base * 7
 
-    top_articles_q = select(Post.id, Post.title, Post.views).order_by(Post.views.desc()).limit(5)
-    top_rows = (await db.execute(top_articles_q)).all()
     top_articles: list[dict] = []
     for r in top_rows:
         title = r.title
@@ -245,27 +184,15 @@ async def get_admin_stats(
             title_text = title.get("zh") or title.get("en") or "Untitled"
         else:
             title_text = str(title)
-        cc_q = select(func.count()).select_from(Comment).where(Comment.post_id == r.id)
-        cc = await db.scalar(cc_q) or 0
         top_articles.append(
             {
                 "id": r.id,
                 "title": title_text,
                 "views": int(r.views or 0),
-                "comments_count": int(cc),
+                "comments_count": int(r.comments_count or 0),
             }
         )
 
-    act_q = (
-        select(
-            User.id, User.nickname, User.username, User.avatar, func.count(Comment.id).label("c")
-        )
-        .join(Comment, Comment.user_id == User.id)
-        .group_by(User.id)
-        .order_by(func.count(Comment.id).desc())
-        .limit(5)
-    )
-    act_rows = (await db.execute(act_q)).all()
     active_commenters: list[dict] = []
     for r in act_rows:
         name = r.nickname or r.username or "User"
@@ -1,14 +1,22 @@
 """
 文章目录（TOC）生成 API
 
-从 Markdown 内容中提取标题生成目录。
+从 Markdown 内容中提取标题生成目录（编辑器预览）；已发布文章的目录直接读取
+写入时预编译的渲染产物（见 backend.utils.post_render）。
 """
 
 import re
 from typing import Any
 
-from fastapi import APIRouter, Body
+from fastapi import APIRouter, Body, HTTPException, Query, Request, status
 from pydantic import BaseModel
+from sqlalchemy import or_, select
+
+from backend.core.auth import DB
+from backend.core.i18n import get_i18n_value, get_language_from_request
+from backend.models.blog import Post
+from backend.services.post_render_service import load_post_render
+from backend.utils.post_render import build_toc_tree, heading_slug
 
 router = APIRouter(tags=["TOC"])
 
@@ -66,13 +74,9 @@ def extract_headings(content: str, max_depth: int = 3) -> list[dict[str, Any]]:
         text = re.sub(r"`(.+?)`", r"\1", text)  # 代码
         text = re.sub(r"\[(.+?)\]\(.+?\)", r"\1", text)  # 链接
 
-        # 生成 ID
-        heading_id = re.sub(r"[^\w\u4e00-\u9fff-]", "-", text.lower())
-        heading_id = re.sub(r"-+", "-", heading_id).strip("-")
-
         headings.append(
             {
-                "id": heading_id,
+                "id": heading_slug(text),
                 "text": text,
                 "level": level,
             }
@@ -81,46 +85,6 @@ def extract_headings(content: str, max_depth: int = 3) -> list[dict[str, Any]]:
     return headings
 
 
-def build_toc_tree(headings: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    """
-    构建目录树
-
-    将扁平的标题列表转换为嵌套的树结构。
-
-    Args:
-        headings: 标题列表
-
-    Returns:
-        目录树
-    """
-    if not headings:
-        return []
-
-    root: list[dict[str, Any]] = []
-    stack: list[dict[str, Any]] = []
-
-    for heading in headings:
-        node = {
-            "id": heading["id"],
-            "text": heading["text"],
-            "level": heading["level"],
-            "children": [],
-        }
-
-        # 找到合适的父节点
-        while stack and stack[-1]["level"] >= node["level"]:
-            stack.pop()
-
-        if stack:
-            stack[-1]["children"].append(node)
-        else:
-            root.append(node)
-
-        stack.append(node)
-
-    return root
-
-
 def generate_toc_html(items: list[dict[str, Any]], indent: int = 0) -> str:
     """
     生成目录 HTML
@@ -225,14 +189,51 @@ async def add_heading_ids(
         level = len(match.group(1))
         text = match.group(2).strip()
 
-        # 生成 ID
-        heading_id = re.sub(r"[^\w\u4e00-\u9fff-]", "-", text.lower())
-        heading_id = re.sub(r"-+", "-", heading_id).strip("-")
-
-        return f'<h{level} id="{heading_id}">{text}</h{level}>'
+        return f'<h{level} id="{heading_slug(text)}">{text}</h{level}>'
 
     # 替换标题
     pattern = r"^(#{1,6})\s+(.+)$"
     result = re.sub(pattern, add_id, content, flags=re.MULTILINE)
 
     return {"content": result}
+
+
+@router.get(
+    "/posts/{post_id}",
+    response_model=TOCResponse,
+    summary="获取文章目录",
+    description="返回已发布文章预编译的目录，不再解析正文。",
+)
+async def get_post_toc(
+    post_id: int,
+    request: Request,
+    db: DB,
+    lang: str | None = Query(None, description="语言代码（zh/en/ja/zh_Hant）"),
+    max_depth: int = Query(3, ge=1, le=6, description="最大标题深度"),
+):
+    """
+    获取文章目录
+
+    只提供公开文章（已发布且未加密）；读取渲染产物中的标题列表按深度构建目录树。
+    """
+    row = (
+        await db.execute(
+            select(Post.render_hash, Post.content).where(
+                Post.id == post_id,
+                Post.status == "published",
+                or_(Post.password.is_(None), Post.password == ""),
+            )
+        )
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="文章不存在")
+
+    artifact = await load_post_render(db, post_id, row.render_hash, row.content)
+    rendered = get_i18n_value(artifact, get_language_from_request(request, lang))
+    headings = [h for h in (rendered or {}).get("headings", []) if h["level"] <= max_depth]
+    toc_tree = build_toc_tree(headings)
+
+    return TOCResponse(
+        items=[TOCItem(**item) for item in toc_tree],
+        html=generate_toc_html(toc_tree),
+    )
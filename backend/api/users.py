@@ -16,6 +16,7 @@ import string
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
+from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
 from sqlalchemy import func, select
 from sqlalchemy.orm import selectinload
@@ -25,7 +26,10 @@ from backend.core.auth import (
     DB,
     CurrentUser,
     CurrentUserOptional,
+    decode_token,
     get_password_hash,
+    revoke_access_token,
+    security,
     verify_password,
 )
 from backend.core.cache import cache
@@ -33,6 +37,7 @@ from backend.core.concurrency import concurrent_query
 from backend.core.config import settings
 from backend.core.exceptions import AppException
 from backend.core.password_policy import validate_password
+from backend.core.principal import invalidate_principal
 from backend.core.rate_limit import rate_limit_sensitive, rate_limit_write
 from backend.models.blog import Comment, Post, post_likes
 from backend.models.user import User, UserPreference
@@ -438,6 +443,7 @@ async def password_reset(
     service = await get_user_service(db)
     await service._token_repo.revoke_all_user_tokens(user.id)
     await db.commit()
+    await invalidate_principal(user.id)
 
     return BaseResponse(message="密码重置成功")
 
@@ -451,11 +457,15 @@ async def password_reset(
 async def logout(
     current_user: CurrentUser,
     db: DB,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
     refresh_token: str | None = Query(None, description="要撤销的刷新令牌"),
 ):
-    """用户登出，撤销刷新令牌"""
+    """用户登出，撤销刷新令牌并吊销当前访问令牌"""
     service = await get_user_service(db)
     await service.logout(current_user.id, refresh_token)
+    payload = decode_token(credentials.credentials)
+    if payload is not None:
+        await revoke_access_token(payload)
     return BaseResponse(message="登出成功")
 
 
@@ -809,7 +819,9 @@ async def delete_account(
         )
 
     # 直接验证密码（不用 change_password(new=old) hack，因为它现在会拒绝同密码）
-    if not verify_password(password, current_user.password_hash):
+    # current_user 可能由快照还原，password_hash 不在快照中，单独查询
+    password_hash = await db.scalar(select(User.password_hash).where(User.id == current_user.id))
+    if not verify_password(password, password_hash or ""):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="密码错误",
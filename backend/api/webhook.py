@@ -4,58 +4,16 @@ Webhook 系统
 支持事件推送和外部集成。
 """
 
-import hashlib
-import hmac
 import json
-from datetime import datetime
 
 from fastapi import APIRouter, Body, HTTPException, Query, status
 from pydantic import BaseModel
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, func, select
-from sqlalchemy.orm import Mapped, mapped_column
-
-from backend.core.auth import DB, CurrentStaff, CurrentUser
-from backend.core.database import Base
-from backend.utils.compat import UTC
-
-
-class WebhookEndpoint(Base):
-    """Webhook 端点"""
-
-    __tablename__ = "webhook_endpoints"
-
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    name: Mapped[str] = mapped_column(String(100), nullable=False)
-    url: Mapped[str] = mapped_column(String(500), nullable=False)
-    secret: Mapped[str | None] = mapped_column(String(100), nullable=True)
-    events: Mapped[str] = mapped_column(Text, nullable=False, default="[]")  # JSON 数组
-    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
-    created_by_id: Mapped[int | None] = mapped_column(
-        Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True
-    )
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC))
-    updated_at: Mapped[datetime] = mapped_column(
-        DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC)
-    )
-
-
-class WebhookDelivery(Base):
-    """Webhook 投递记录"""
-
-    __tablename__ = "webhook_deliveries"
-
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    endpoint_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("webhook_endpoints.id"), nullable=False
-    )
-    event_type: Mapped[str] = mapped_column(String(50), nullable=False)
-    payload: Mapped[str] = mapped_column(Text, nullable=False)
-    status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
-    response_body: Mapped[str | None] = mapped_column(Text, nullable=True)
-    error: Mapped[str | None] = mapped_column(Text, nullable=True)
-    delivered_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC))
+from sqlalchemy import func, select
 
+from backend.core.auth import DB, CurrentStaff
+from backend.core.db_events import on_commit
+from backend.models.webhook import WebhookDelivery, WebhookEndpoint
+from backend.services.webhook_service import webhook_dispatcher
 
 router = APIRouter(tags=["Webhook"])
 
@@ -173,6 +131,7 @@ async def create_webhook(
     db.add(webhook)
     await db.flush()
     await db.refresh(webhook)
+    _invalidate_index_after_commit(db)
 
     return {
         "success": True,
@@ -227,6 +186,7 @@ async def update_webhook(
         webhook.is_active = is_active
 
     await db.flush()
+    _invalidate_index_after_commit(db)
 
     return {"success": True, "message": "Webhook 更新成功"}
 
@@ -251,6 +211,7 @@ async def delete_webhook(
 
     await db.delete(webhook)
     await db.flush()
+    _invalidate_index_after_commit(db)
 
     return {"success": True, "message": "Webhook 已删除"}
 
@@ -293,6 +254,8 @@ async def list_webhook_deliveries(
                 "event_type": d.event_type,
                 "status_code": d.status_code,
                 "error": d.error,
+                "attempts": d.attempts,
+                "latency_ms": d.latency_ms,
                 "delivered_at": d.delivered_at.isoformat() if d.delivered_at else None,
                 "created_at": d.created_at.isoformat() if d.created_at else None,
             }
@@ -306,46 +269,37 @@ async def list_webhook_deliveries(
     }
 
 
-async def trigger_webhook(event_type: str, payload: dict, db):
+async def trigger_webhook(event_type: str, payload: dict, db=None) -> int:
     """
     触发 Webhook
 
-    内部函数，用于在事件发生时触发 Webhook。
+    内部函数，用于在事件发生时触发 Webhook。传入 db 时投递记录随调用方事务写入，
+    提交后才放入后台投递器的队列（回滚则不投递）；不传时立即入队。
+    请求发送、重试与结果写回都不在调用方的请求/事务中进行。
+
+    Args:
+        event_type: 事件类型
+        payload: 事件数据
+        db: 触发事件的会话
+
+    Returns:
+        int: 投递数
     """
+    if db is None:
+        return await webhook_dispatcher.publish(event_type, payload)
+    return await webhook_dispatcher.stage(db, event_type, payload)
 
-    # 查找订阅此事件的 Webhook
-    result = await db.execute(select(WebhookEndpoint).where(WebhookEndpoint.is_active.is_(True)))
-    webhooks = result.scalars().all()
 
-    for webhook in webhooks:
-        events = json.loads(webhook.events) if isinstance(webhook.events, str) else webhook.events
-        if event_type not in events:
-            continue
+_index_changed = on_commit(
+    "webhook_index_changed",
+    lambda _: webhook_dispatcher.index.invalidate(),
+    label="[webhook] 订阅索引失效",
+)
 
-        # 构建请求体
-        request_body = {
-            "event": event_type,
-            "timestamp": datetime.now(UTC).isoformat(),
-            "data": payload,
-        }
 
-        # 生成签名
-        if webhook.secret:
-            payload_str = json.dumps(request_body, separators=(",", ":"))
-            hmac.new(
-                webhook.secret.encode(),
-                payload_str.encode(),
-                hashlib.sha256,
-            ).hexdigest()
-
-        # 创建投递记录
-        delivery = WebhookDelivery(
-            endpoint_id=webhook.id,
-            event_type=event_type,
-            payload=json.dumps(request_body),
-        )
-        db.add(delivery)
-        await db.flush()
+def _invalidate_index_after_commit(db) -> None:
+    """端点变更提交后让订阅索引失效（回滚则保持原索引）"""
+    _index_changed.mark(db.sync_session)
 
 
 @router.post(
@@ -356,60 +310,30 @@ async def trigger_webhook(event_type: str, payload: dict, db):
 async def test_webhook(
     webhook_id: int,
     db: DB,
-    current_user: CurrentUser,
+    current_user: CurrentStaff,
 ):
     """测试 Webhook 端点"""
     webhook = await db.get(WebhookEndpoint, webhook_id)
-    if not webhook or webhook.user_id != current_user.id:
+    if not webhook:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Webhook 不存在",
         )
 
-    import httpx
-
-    test_payload = {
-        "event": "test",
-        "timestamp": datetime.now(UTC).isoformat(),
-        "data": {"message": "This is a test webhook"},
-    }
-
-    signature = None
-    if webhook.secret:
-        payload_str = json.dumps(test_payload, separators=(",", ":"))
-        signature = hmac.new(
-            webhook.secret.encode(),
-            payload_str.encode(),
-            hashlib.sha256,
-        ).hexdigest()
-
     try:
-        headers = {
-            "Content-Type": "application/json",
-            "X-Webhook-Event": "test",
-        }
-        if signature:
-            headers["X-Webhook-Signature"] = f"sha256={signature}"
-
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                webhook.url,
-                json=test_payload,
-                headers=headers,
-            )
-
-        return {
-            "success": True,
-            "message": "测试成功",
-            "status_code": response.status_code,
-        }
-
+        response = await webhook_dispatcher.send_test(webhook)
     except Exception as e:
         return {
             "success": False,
             "message": f"测试失败: {str(e)}",
         }
 
+    return {
+        "success": response.is_success,
+        "message": "测试成功" if response.is_success else "测试失败",
+        "status_code": response.status_code,
+    }
+
 
 @router.post(
     "/{webhook_id}/regenerate-secret",
@@ -419,11 +343,11 @@ async def test_webhook(
 async def regenerate_webhook_secret(
     webhook_id: int,
     db: DB,
-    current_user: CurrentUser,
+    current_user: CurrentStaff,
 ):
     """重新生成 Webhook 密钥"""
     webhook = await db.get(WebhookEndpoint, webhook_id)
-    if not webhook or webhook.user_id != current_user.id:
+    if not webhook:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Webhook 不存在",
@@ -433,6 +357,7 @@ async def regenerate_webhook_secret(
 
     webhook.secret = secrets.token_hex(32)
     await db.flush()
+    _invalidate_index_after_commit(db)
 
     return {"secret": webhook.secret}
 
@@ -445,9 +370,9 @@ async def regenerate_webhook_secret(
 async def retry_webhook_delivery(
     delivery_id: int,
     db: DB,
-    current_user: CurrentUser,
+    current_user: CurrentStaff,
 ):
-    """重试 Webhook 投递"""
+    """重试 Webhook 投递（加入后台投递队列，结果更新到原记录）"""
     delivery = await db.get(WebhookDelivery, delivery_id)
     if not delivery:
         raise HTTPException(
@@ -456,74 +381,12 @@ async def retry_webhook_delivery(
         )
 
     webhook = await db.get(WebhookEndpoint, delivery.endpoint_id)
-    if not webhook or webhook.user_id != current_user.id:
+    if not webhook:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Webhook 不存在",
         )
 
-    import httpx
-
-    payload = json.loads(delivery.payload)
-    signature = None
-    if webhook.secret:
-        payload_str = json.dumps(payload, separators=(",", ":"))
-        signature = hmac.new(
-            webhook.secret.encode(),
-            payload_str.encode(),
-            hashlib.sha256,
-        ).hexdigest()
-
-    try:
-        headers = {
-            "Content-Type": "application/json",
-            "X-Webhook-Event": delivery.event_type,
-        }
-        if signature:
-            headers["X-Webhook-Signature"] = f"sha256={signature}"
-
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                webhook.url,
-                json=payload,
-                headers=headers,
-            )
-
-        delivery.status_code = response.status_code
-        delivery.response_body = response.text[:1000]
-        delivery.delivered_at = datetime.now(UTC)
-        delivery.error = None
-
-        await db.flush()
-
-        return {"success": True, "message": "重试成功"}
-
-    except Exception as e:
-        delivery.error = str(e)
-        await db.flush()
-        return {"success": False, "message": f"重试失败: {str(e)}"}
-
-        # 发送请求
-        try:
-            headers = {
-                "Content-Type": "application/json",
-                "X-Webhook-Event": event_type,
-            }
-            if signature:
-                headers["X-Webhook-Signature"] = f"sha256={signature}"
-
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    webhook.url,
-                    json=request_body,
-                    headers=headers,
-                )
-
-                delivery.status_code = response.status_code
-                delivery.response_body = response.text[:1000]
-                delivery.delivered_at = datetime.now(UTC)
-
-        except Exception as e:
-            delivery.error = str(e)
+    await webhook_dispatcher.redeliver(delivery, webhook)
 
-        await db.flush()
+    return {"success": True, "message": "已加入重试队列"}
@@ -5,8 +5,8 @@ Rosetta FastAPI 后端 - 认证模块
 - 密码哈希和验证
 - JWT 令牌生成和验证（支持 kid, jti, version）
 - 访问令牌和刷新令牌（支持 rotate + 单次使用）
-- 刷新令牌黑名单（Redis/内存）
-- 用户认证依赖注入
+- 令牌 jti 黑名单（Redis/内存）
+- 用户认证依赖注入（用户快照缓存，见 backend.core.principal）
 
 Example:
     >>> from backend.core.auth import get_current_user, CurrentUser
@@ -38,12 +38,12 @@ from argon2.exceptions import (
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jwt.exceptions import PyJWTError
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.core.cache import cache
 from backend.core.config import settings
-from backend.core.database import get_db
+from backend.core.database import get_db, get_read_db
+from backend.core.principal import load_principal
 from backend.models.user import User
 from backend.utils.compat import UTC, timedelta
 
@@ -201,6 +201,30 @@ async def _is_jti_blacklisted(jti: str) -> bool:
         return jti in MEMORY_REFRESH_BLACKLIST
 
 
+async def revoke_access_token(payload: dict[str, Any]) -> None:
+    """
+    吊销访问令牌（jti 加入黑名单直至令牌过期）
+
+    Args:
+        payload: 已解码的访问令牌载荷
+    """
+    jti = payload.get("jti")
+    exp = payload.get("exp")
+    if not jti or exp is None:
+        return
+    remaining = max(0.0, float(exp) - datetime.now(UTC).timestamp())
+    await _add_jti_to_blacklist(jti, remaining / 86400)
+
+
+def access_token_claims(user: User) -> dict[str, Any]:
+    """
+    访问令牌载荷
+
+    staff 声明供维护模式闸门判断管理员身份（无需查库）；接口鉴权仍以数据库中的用户为准。
+    """
+    return {"sub": str(user.id), "staff": bool(user.is_staff or user.is_superuser)}
+
+
 def create_access_token(data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
     """
     创建访问令牌（PyJWT）。
@@ -222,6 +246,7 @@ def create_access_token(data: dict[str, Any], expires_delta: timedelta | None =
             "exp": expire,
             "type": "access",
             "iat": datetime.now(UTC),
+            "jti": uuid.uuid4().hex,
         }
     )
 
@@ -339,10 +364,9 @@ async def get_current_user(
     except (TypeError, ValueError):
         raise credentials_exception
 
-    result = await db.execute(select(User).where(User.id == user_id_int))
-    user = result.scalar_one_or_none()
+    user, revoked = await load_principal(db, user_id_int, jti=payload.get("jti"))
 
-    if user is None:
+    if user is None or revoked:
         raise credentials_exception
 
     if not user.is_active:
@@ -387,10 +411,9 @@ async def get_current_user_optional(
     except (TypeError, ValueError):
         return None
 
-    result = await db.execute(select(User).where(User.id == user_id_int))
-    user = result.scalar_one_or_none()
+    user, revoked = await load_principal(db, user_id_int, jti=payload.get("jti"))
 
-    if user and user.is_active and not user.is_banned:
+    if user and not revoked and user.is_active and not user.is_banned:
         return user
 
     return None
@@ -497,10 +520,9 @@ async def validate_token(token: str, db: AsyncSession) -> User | None:
     except (TypeError, ValueError):
         return None
 
-    result = await db.execute(select(User).where(User.id == user_id_int))
-    user = result.scalar_one_or_none()
+    user, revoked = await load_principal(db, user_id_int, jti=payload.get("jti"))
 
-    if user and user.is_active and not user.is_banned:
+    if user and not revoked and user.is_active and not user.is_banned:
         return user
 
     return None
@@ -512,3 +534,4 @@ CurrentActiveUser = Annotated[User, Depends(get_current_active_user)]
 CurrentSuperUser = Annotated[User, Depends(get_current_superuser)]
 CurrentStaff = Annotated[User, Depends(get_current_staff)]
 DB = Annotated[AsyncSession, Depends(get_db)]
+ReadDB = Annotated[AsyncSession, Depends(get_read_db)]
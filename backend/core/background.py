@@ -0,0 +1,139 @@
+"""
+Rosetta FastAPI 后端 - 进程内后台协作工具
+
+进程级单例（词表、配置快照、维护模式闸门、提交后回调）共用的几件小工具：
+- LoopLock: 绑定当前事件循环的 asyncio.Lock，事件循环更换后（测试、重新启动）重新创建
+- spawn: 在当前事件循环中后台执行协程，异常记录日志；无运行中的事件循环时丢弃
+- ChangeFeed: 跨进程变更通知的订阅生命周期，发布时附带本进程 origin，忽略自己发出的通知
+
+Example:
+    >>> feed = ChangeFeed("moderation:changed", on_remote_change, label="[moderation]")
+    >>> await feed.start()
+    >>> spawn(feed.publish(), "[moderation] 变更通知")
+"""
+
+import asyncio
+import inspect
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from backend.core.pubsub import Broker, create_broker
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLock:
+    """
+    绑定当前事件循环的互斥锁
+
+    asyncio.Lock 只能在创建它的事件循环中使用；进程级单例跨越多个事件循环时
+    （每个测试一个循环、同步脚本中 asyncio.run 多次）按需重新创建。
+
+    Example:
+        >>> lock = LoopLock()
+        >>> async with lock:
+        ...     ...
+    """
+
+    def __init__(self) -> None:
+        self._lock: asyncio.Lock | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def get(self) -> asyncio.Lock:
+        """当前事件循环对应的锁"""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    async def __aenter__(self) -> None:
+        await self.get().acquire()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.get().release()
+
+
+def spawn(awaitable: Awaitable[Any], label: str) -> asyncio.Task | None:
+    """
+    在当前事件循环中后台执行
+
+    Args:
+        awaitable: 待执行的协程
+        label: 日志中的操作名，任务异常时记录 "{label}失败: ..."
+
+    Returns:
+        asyncio.Task | None: 创建的任务；无运行中的事件循环（同步上下文）时为 None
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        if inspect.iscoroutine(awaitable):
+            awaitable.close()
+        return None
+    task = loop.create_task(awaitable)
+    task.add_done_callback(lambda done: _log_task_error(done, label))
+    return task
+
+
+def _log_task_error(task: asyncio.Task, label: str) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"{label}失败: {task.exception()}")
+
+
+class ChangeFeed:
+    """
+    跨进程变更通知
+
+    Args:
+        channel: 发布/订阅频道
+        on_remote_change: 收到其他进程的通知时调用（在代理的事件循环中，不应阻塞）
+        label: 日志前缀
+        fallback: 订阅失败时日志中说明的兜底方式
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        on_remote_change: Callable[[], None],
+        *,
+        label: str,
+        fallback: str = "仅响应本进程的变更",
+    ) -> None:
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._on_remote_change = on_remote_change
+        self._label = label
+        self._fallback = fallback
+        self._broker: Broker | None = None
+
+    def handle(self, channel: str, message: dict[str, Any]) -> None:
+        """代理回调：忽略本进程自己发出的通知"""
+        if message.get("origin") != self.origin:
+            self._on_remote_change()
+
+    async def start(self) -> None:
+        """订阅频道（已订阅时不重复订阅）；失败时记录日志，不抛出"""
+        if self._broker is not None:
+            return
+        try:
+            broker = create_broker()
+            await broker.start(self.handle)
+            await broker.subscribe(self.channel)
+        except Exception as exc:
+            logger.warning(f"{self._label} 变更通知订阅失败，{self._fallback}: {exc}")
+            return
+        self._broker = broker
+
+    async def publish(self) -> None:
+        """通知其他进程（未订阅时不发布）"""
+        if self._broker is not None:
+            await self._broker.publish(self.channel, {"origin": self.origin})
+
+    async def stop(self) -> None:
+        """取消订阅"""
+        if self._broker is not None:
+            await self._broker.close()
+            self._broker = None
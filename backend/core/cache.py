@@ -387,6 +387,8 @@ CACHE_TTL = {
     "post_detail": 600,
     "user_profile": 300,
     "search_results": 60,
+    "sitemap": 86400,
+    "feed": 3600,
 }
 
 NULL_MARKER = "__NULL__"
@@ -436,6 +436,55 @@ class TwoLevelCache:
         logger.debug(f"缓存未命中: {key}")
         return None
 
+    async def get_and_exists(self, key: str, exists_key: str) -> tuple[Any | None, bool | None]:
+        """
+        获取缓存值，并在同一次 Redis 往返中检查另一个键是否存在
+
+        本地缓存命中时只向 Redis 查询 exists_key；未命中时 GET 与 EXISTS 走同一个 pipeline。
+
+        Args:
+            key: 缓存键
+            exists_key: 需要检查是否存在的键（如黑名单标记）
+
+        Returns:
+            (缓存值, exists_key 是否存在)；Redis 不可用时第二项为 None
+        """
+        local_value = None
+        if self._enable_local_cache:
+            local_value = self._local_cache.get(key)
+            if local_value == NULL_MARKER:
+                local_value = None
+
+        redis_client = await self._get_redis_client()
+        if not (redis_client and self._redis_connected):
+            return local_value, None
+
+        try:
+            if local_value is not None:
+                return local_value, await redis_client.exists(exists_key) > 0
+
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.get(key)
+            pipe.ttl(key)
+            pipe.exists(exists_key)
+            redis_value, redis_ttl, exists = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Redis get_and_exists 错误: {e}")
+            return local_value, None
+
+        value = None
+        if redis_value is not None:
+            try:
+                value = json.loads(redis_value)
+            except json.JSONDecodeError:
+                value = redis_value
+            if value == NULL_MARKER:
+                value = None
+            elif self._enable_local_cache:
+                local_ttl = int((redis_ttl if redis_ttl > 0 else 300) * self._local_ttl_ratio)
+                self._local_cache.set(key, value, ttl=local_ttl)
+        return value, exists > 0
+
     async def set(
         self,
         key: str,
@@ -526,6 +575,18 @@ class TwoLevelCache:
 
         return False
 
+    def delete_local(self, key: str) -> bool:
+        """
+        仅删除本地缓存（同步，可在 ORM 事件钩子中调用）
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            是否删除成功
+        """
+        return self._local_cache.delete(key)
+
     async def delete_pattern(self, pattern: str) -> int:
         """
         删除匹配模式的所有缓存
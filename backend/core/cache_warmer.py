@@ -34,7 +34,7 @@ from backend.core.cache import CACHE_TTL, cache, make_cache_key
 from backend.core.config import settings
 from backend.core.database import async_session_maker
 from backend.models.blog import Category, Post, Tag, post_likes, post_tags
-from backend.models.core import FriendLink, Navigation, SiteConfig
+from backend.models.core import FriendLink, Navigation
 
 logger = logging.getLogger(__name__)
 
@@ -212,46 +212,11 @@ class CacheWarmer:
         return result
 
     async def _warmup_site_config(self) -> int:
-        """预热站点配置"""
+        """预热站点配置（构建进程内配置快照）"""
+        from backend.services.site_config_service import site_config_store
+
         async with async_session_maker() as db:
-            result = await db.execute(select(SiteConfig))
-            configs = {c.key: c.value for c in result.scalars().all()}
-
-            cache_key = make_cache_key("site_config")
-            config_data = {
-                "site_name": configs.get("SITE_NAME", "Rosetta Blog"),
-                "site_description": configs.get(
-                    "SITE_DESCRIPTION",
-                    "Rosetta开源博客系统",
-                ),
-                "site_keywords": configs.get(
-                    "SITE_KEYWORDS", "Rosetta, FastAPI, Astro, Svelte, Blog"
-                ),
-                "site_author": configs.get("SITE_AUTHOR", "Rosetta Team"),
-                "site_email": configs.get("SITE_EMAIL", "contact@rosetta.dev"),
-                "site_logo": configs.get("SITE_LOGO"),
-                "site_favicon": configs.get("SITE_FAVICON"),
-                "footer_text": configs.get("FOOTER_TEXT", "Powered by Rosetta"),
-                "footer_slogan": configs.get(
-                    "FOOTER_SLOGAN", "Share knowledge, inspire creativity"
-                ),
-                "github_url": configs.get("GITHUB_URL"),
-                "x_url": configs.get("X_URL"),
-                "bilibili_url": configs.get("BILIBILI_URL"),
-                "contact_email": configs.get("CONTACT_EMAIL"),
-                "enable_comments": configs.get("ENABLE_COMMENTS", "true").lower() == "true",
-                "enable_registration": configs.get("ENABLE_REGISTRATION", "true").lower() == "true",
-                "enable_rss_feed": configs.get("ENABLE_RSS_FEED", "true").lower() == "true",
-                "pagination_page_size": int(configs.get("PAGINATION_PAGE_SIZE", "12")),
-                "code_theme": configs.get("CODE_THEME", "github"),
-                "maintenance_mode": configs.get("MAINTENANCE_MODE", "false").lower() == "true",
-                "maintenance_message": configs.get(
-                    "MAINTENANCE_MESSAGE", "Site is under maintenance"
-                ),
-                "default_post_cover": configs.get("DEFAULT_POST_COVER"),
-            }
-
-            await cache.set(cache_key, config_data, CACHE_TTL["site_config"])
+            await site_config_store.get(db)
             return 1
 
     async def _warmup_navigations(self) -> int:
@@ -7,6 +7,7 @@
 - 查询超时控制
 - 错误处理和日志记录
 - 查询结果缓存
+- 只读子查询扇出到独立会话（fan_out）
 """
 
 import asyncio
@@ -17,7 +18,11 @@ from dataclasses import dataclass
 from enum import IntEnum
 from typing import Any, Generic, TypeVar
 
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from backend.core import database
 from backend.core.cache import cache
+from backend.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -145,6 +150,106 @@ async def concurrent_query_typed(
     return tuple(results)
 
 
+ReadQuery = Callable[[AsyncSession], Awaitable[Any]]
+
+
+def read_scalar(statement: Any) -> ReadQuery:
+    """把语句包装为 fan_out 子查询，返回 session.scalar 的结果"""
+
+    async def _read(session: AsyncSession) -> Any:
+        return await session.scalar(statement)
+
+    return _read
+
+
+def read_scalars(statement: Any) -> ReadQuery:
+    """把语句包装为 fan_out 子查询，返回第一列的列表"""
+
+    async def _read(session: AsyncSession) -> list[Any]:
+        return list((await session.scalars(statement)).all())
+
+    return _read
+
+
+def read_rows(statement: Any) -> ReadQuery:
+    """把语句包装为 fan_out 子查询，返回全部行"""
+
+    async def _read(session: AsyncSession) -> list[Any]:
+        return list((await session.execute(statement)).all())
+
+    return _read
+
+
+def _fanout_engine(db: AsyncSession) -> AsyncEngine | None:
+    """可以为子查询另开会话的引擎；SQLite 或会话绑定在外部连接上时返回 None"""
+    bind = db.bind
+    if not isinstance(bind, AsyncEngine) or bind.dialect.name == "sqlite":
+        return None
+    return bind
+
+
+async def fan_out(
+    db: AsyncSession,
+    *reads: ReadQuery,
+    timeout: float | None = None,
+    max_concurrency: int | None = None,
+) -> list[Any]:
+    """
+    并行执行多个相互独立的只读子查询
+
+    每个子查询从 db 所绑定引擎（主库或只读副本）的连接池取一个短生命周期会话，
+    用 asyncio.gather 并行执行，同时占用的会话数不超过 max_concurrency，
+    总耗时约为最慢的一条而不是各条之和。SQLite 只有一个写连接且内存库不能跨连接
+    共享，此时退化为在 db 上顺序执行。
+
+    子查询看不到 db 当前事务中尚未提交的写入；返回的 ORM 对象在子会话关闭后
+    处于游离状态，需要的关系应在语句中预加载。
+
+    Args:
+        db: 请求的数据库会话，决定使用哪个引擎
+        *reads: 子查询，接收一个会话并返回结果（见 read_scalar / read_scalars / read_rows）
+        timeout: 整体超时时间（秒）
+        max_concurrency: 最大并行会话数，默认 settings.database_fanout_concurrency
+
+    Returns:
+        结果列表，顺序与 reads 一致
+
+    Example:
+        >>> posts, users = await fan_out(
+        ...     db,
+        ...     read_scalar(select(func.count()).select_from(Post)),
+        ...     read_scalar(select(func.count()).select_from(User)),
+        ... )
+    """
+    if not reads:
+        return []
+
+    engine = _fanout_engine(db)
+    if engine is None or len(reads) == 1:
+
+        async def _sequential() -> list[Any]:
+            return [await read(db) for read in reads]
+
+        gathered = _sequential()
+    else:
+        semaphore = asyncio.Semaphore(max_concurrency or settings.database_fanout_concurrency)
+
+        async def _run(read: ReadQuery) -> Any:
+            async with semaphore:
+                async with database.async_session_maker(bind=engine) as session:
+                    return await read(session)
+
+        gathered = asyncio.gather(*(_run(read) for read in reads))
+
+    try:
+        if timeout is not None:
+            return list(await asyncio.wait_for(gathered, timeout=timeout))
+        return list(await gathered)
+    except TimeoutError:
+        logger.error(f"扇出查询超时: {timeout}秒")
+        raise
+
+
 class QueryBatch(Generic[T]):
     """
     批量查询构建器
@@ -86,10 +86,47 @@ class Settings(BaseSettings):
         le=50,
         description="数据库连接池最大溢出数（仅 PostgreSQL 有效）",
     )
+    database_replica_urls: list[str] = Field(
+        default=[],
+        description='只读副本连接 URL 列表（JSON 数组，如 ["postgresql+asyncpg://..."]），为空时读写都走主库',
+    )
+    database_fanout_concurrency: int = Field(
+        default=4,
+        ge=1,
+        le=32,
+        description="单次扇出查询最多同时占用的会话数（SQLite 上始终顺序执行）",
+    )
+    database_replica_pool_size: int = Field(
+        default=5,
+        ge=1,
+        le=100,
+        description="每个只读副本的连接池大小",
+    )
+    database_replica_max_overflow: int = Field(
+        default=10,
+        ge=0,
+        le=50,
+        description="每个只读副本的连接池最大溢出数",
+    )
+    database_replica_max_lag: float = Field(
+        default=5.0,
+        ge=0,
+        description="副本复制延迟超过该秒数时，只读请求回退到主库",
+    )
+    database_replica_check_interval: float = Field(
+        default=5.0,
+        gt=0,
+        description="副本健康与复制延迟的检测间隔（秒）",
+    )
     database_echo: bool = Field(
         default=False,
         description="是否打印 SQL 语句",
     )
+    db_slow_query_ms: float = Field(
+        default=200.0,
+        ge=0,
+        description="慢 SQL 阈值（毫秒），超过的语句按归一化指纹计入 /api/monitoring/database/queries",
+    )
     database_ssl: bool = Field(
         default=False,
         description="PostgreSQL 是否使用 SSL 连接（生产环境外部数据库建议开启）",
@@ -105,6 +142,127 @@ class Settings(BaseSettings):
         description="是否启用 Redis（开发和生产环境均可启用）",
     )
 
+    # 后台任务队列配置
+    task_queue_backend: Literal["auto", "memory", "redis", "database"] = Field(
+        default="auto",
+        description="后台任务队列后端：auto 时启用 Redis 用 redis，否则用数据库表",
+    )
+    task_worker_concurrency: int = Field(
+        default=10,
+        ge=1,
+        description="每个进程同时执行的后台任务数上限",
+    )
+    task_visibility_timeout: int = Field(
+        default=300,
+        ge=10,
+        description="任务被领取后对其他 worker 不可见的秒数（未设超时的任务），超时未确认则重新入队",
+    )
+
+    # Webhook 投递配置
+    webhook_concurrency: int = Field(
+        default=8,
+        ge=1,
+        le=100,
+        description="每个进程同时进行的 Webhook 请求数上限（同时也是连接池大小）",
+    )
+    webhook_max_attempts: int = Field(
+        default=5,
+        ge=1,
+        le=20,
+        description="单次投递的最大尝试次数（含首次）",
+    )
+    webhook_timeout: float = Field(
+        default=10.0,
+        gt=0,
+        le=60,
+        description="Webhook 请求超时（秒）",
+    )
+    webhook_retry_backoff: float = Field(
+        default=2.0,
+        ge=0,
+        description="重试退避基数（秒），第 n 次失败后等待 base * 2^(n-1) 秒",
+    )
+    webhook_index_ttl: int = Field(
+        default=60,
+        ge=1,
+        description="事件订阅索引在本进程的缓存秒数（其他进程修改端点后的最大生效延迟）",
+    )
+
+    # 机器翻译配置
+    translate_provider: Literal["", "mymemory", "libretranslate", "mock"] = Field(
+        default="",
+        description="翻译服务，留空时开发环境使用本地词典（mock），其余环境使用 mymemory",
+    )
+    translate_concurrency: int = Field(
+        default=4,
+        ge=1,
+        le=32,
+        description="每个进程同时进行的翻译请求数上限（同时也是连接池大小）",
+    )
+    translate_timeout: float = Field(
+        default=15.0,
+        gt=0,
+        le=60,
+        description="翻译请求超时（秒）",
+    )
+
+    # 实时推送（WebSocket）配置
+    realtime_broker: Literal["auto", "memory", "redis"] = Field(
+        default="auto",
+        description="实时通知的发布/订阅代理：auto 时启用 Redis 用 redis（多 worker 共享），否则进程内",
+    )
+    ws_send_queue_size: int = Field(
+        default=64,
+        ge=1,
+        le=10000,
+        description="每个 WebSocket 连接的待发送消息队列上限，满时丢弃最旧的消息",
+    )
+    ws_send_timeout: float = Field(
+        default=5.0,
+        gt=0,
+        le=60,
+        description="单条消息发送超时（秒），超时视为慢客户端并断开",
+    )
+    ws_max_dropped: int = Field(
+        default=256,
+        ge=1,
+        description="连接累计丢弃消息数达到该值时断开（客户端重连后从通知列表补齐）",
+    )
+    ws_heartbeat_interval: float = Field(
+        default=25.0,
+        gt=0,
+        le=300,
+        description="空闲连接的服务端心跳间隔（秒），用于穿过代理的空闲超时并探测死连接",
+    )
+
+    # 定时发布调度配置
+    scheduler_lock_ttl: int = Field(
+        default=30,
+        ge=3,
+        description="定时发布 leader 锁有效期（秒），leader 每 1/3 有效期续期一次",
+    )
+    scheduler_resync_interval: float = Field(
+        default=300.0,
+        gt=0,
+        description="leader 从数据库全量同步待发布文章的兜底间隔（秒）",
+    )
+
+    # 统计汇总配置
+    stats_rollup_interval: float = Field(
+        default=300.0,
+        gt=0,
+        description="统计汇总任务运行间隔（秒），仪表盘对水位之后的数据实时聚合",
+    )
+    stats_rollup_hourly: bool = Field(
+        default=False,
+        description="是否同时维护按小时汇总表 stats_hourly",
+    )
+    stats_rollup_hourly_retention_days: int = Field(
+        default=14,
+        ge=1,
+        description="按小时汇总数据的保留天数",
+    )
+
     # JWT 认证配置
     secret_key: str = Field(
         default="your-secret-key-change-in-production",
@@ -127,6 +285,13 @@ class Settings(BaseSettings):
         description="刷新令牌过期时间（天）",
     )
 
+    auth_principal_cache_ttl: int = Field(
+        default=60,
+        ge=0,
+        le=3600,
+        description="认证用户快照缓存秒数（封禁/停用/改密码会立即失效），0 表示每次请求查库",
+    )
+
     # CORS 配置
     cors_origins: list[str] = Field(
         default=[
@@ -210,6 +375,12 @@ class Settings(BaseSettings):
         default="http://localhost:4321",
         description="站点 URL",
     )
+    sitemap_shard_size: int = Field(
+        default=50000,
+        ge=1,
+        le=50000,
+        description="每个 sitemap 分片覆盖的文章 ID 数（协议上限 5 万个 URL）",
+    )
     pagination_page_size: int = Field(
         default=12,
         ge=1,
@@ -245,6 +416,28 @@ class Settings(BaseSettings):
         description="发件人邮箱",
     )
 
+    smtp_pool_size: int = Field(
+        default=2,
+        ge=1,
+        le=20,
+        description="每个进程的 SMTP 长连接数（同时进行的发送会话上限）",
+    )
+    smtp_max_messages_per_connection: int = Field(
+        default=100,
+        ge=1,
+        description="单个 SMTP 连接连续发送的邮件数上限，达到后重建连接",
+    )
+    smtp_idle_timeout: int = Field(
+        default=60,
+        ge=1,
+        description="SMTP 连接空闲超过该秒数后关闭（多数服务器会在数分钟内断开空闲连接）",
+    )
+    smtp_domain_rate_limit: int = Field(
+        default=0,
+        ge=0,
+        description="每个收件人域名每分钟最多发送的邮件数，0 表示不限",
+    )
+
     # 功能开关
     enable_comments: bool = Field(
         default=True,
@@ -254,6 +447,10 @@ class Settings(BaseSettings):
         default=False,
         description="评论是否需要审核",
     )
+    moderation_wordlist_dir: str = Field(
+        default="",
+        description="敏感词文件目录（blacklist.txt / graylist.txt，每行一个词），为空时不读取",
+    )
     enable_registration: bool = Field(
         default=True,
         description="是否启用用户注册",
@@ -7,6 +7,11 @@ Rosetta FastAPI 后端数据库配置
 - 开发环境 (SQLite): NullPool，无连接池，check_same_thread=False
 - 生产环境 (PostgreSQL): AsyncAdaptedQueuePool，连接池，pool_pre_ping，pool_recycle
 
+读写分离：
+- 配置 database_replica_urls 后，get_read_db（ReadDB 依赖）把只读请求路由到副本，
+  轮询选择健康且复制延迟不超过 database_replica_max_lag 的副本，否则回退主库
+- 主库与副本分别按 database_pool_size / database_replica_pool_size 建连接池
+
 Example:
     >>> from backend.core.database import get_db, async_session_maker
     >>>
@@ -15,7 +20,9 @@ Example:
     >>>     users = result.scalars().all()
 """
 
+import asyncio
 import logging
+import time
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
@@ -27,14 +34,15 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from sqlalchemy.pool import NullPool
 
 from backend.core.config import settings
+from backend.core.db_metrics import InstrumentedQueuePool, instrument_engine
 
 logger = logging.getLogger(__name__)
 
 
-def create_engine(database_url: str | None = None) -> AsyncEngine:
+def create_engine(database_url: str | None = None, role: str = "primary") -> AsyncEngine:
     """
     创建异步数据库引擎
 
@@ -46,7 +54,7 @@ def create_engine(database_url: str | None = None) -> AsyncEngine:
         - 外键支持: 启用 PRAGMA foreign_keys
 
     生产环境 (PostgreSQL):
-        - AsyncAdaptedQueuePool: 连接池，提高性能
+        - AsyncAdaptedQueuePool: 连接池，提高性能（InstrumentedQueuePool 记录等待耗时）
         - pool_pre_ping: 检查连接有效性
         - pool_recycle: 定期回收连接，防止连接过期
         - SSL 支持: 生产环境安全连接
@@ -54,11 +62,18 @@ def create_engine(database_url: str | None = None) -> AsyncEngine:
 
     Args:
         database_url: 可选的数据库连接 URL，默认使用 settings.database_url
+        role: primary（主库）或 replica（只读副本），决定连接池大小
 
     Returns:
         AsyncEngine: 异步数据库引擎
     """
     database_url = database_url or settings.database_url
+    if role == "replica":
+        pool_size = settings.database_replica_pool_size
+        max_overflow = settings.database_replica_max_overflow
+    else:
+        pool_size = settings.database_pool_size
+        max_overflow = settings.database_max_overflow
 
     if database_url.startswith("sqlite"):
         engine = create_async_engine(
@@ -80,7 +95,7 @@ def create_engine(database_url: str | None = None) -> AsyncEngine:
             cursor.close()
 
         logger.info("SQLite 数据库引擎已创建 (开发模式)")
-        return engine
+        return instrument_engine(engine)
 
     if database_url.startswith("postgresql"):
         connect_args = {}
@@ -91,9 +106,9 @@ def create_engine(database_url: str | None = None) -> AsyncEngine:
         engine = create_async_engine(
             database_url,
             echo=settings.database_echo,
-            poolclass=AsyncAdaptedQueuePool,
-            pool_size=settings.database_pool_size,
-            max_overflow=settings.database_max_overflow,
+            poolclass=InstrumentedQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
             pool_pre_ping=True,
             pool_recycle=3600,
             pool_timeout=30,
@@ -105,20 +120,156 @@ def create_engine(database_url: str | None = None) -> AsyncEngine:
 
         logger.info(
             f"PostgreSQL 数据库引擎已创建 "
-            f"(连接池: {settings.database_pool_size}, "
-            f"最大溢出: {settings.database_max_overflow})"
+            f"(角色: {role}, 连接池: {pool_size}, 最大溢出: {max_overflow})"
         )
-        return engine
+        return instrument_engine(engine)
 
-    return create_async_engine(
+    engine = create_async_engine(
         database_url,
         echo=settings.database_echo or settings.debug,
-        poolclass=AsyncAdaptedQueuePool,
-        pool_size=settings.database_pool_size,
-        max_overflow=settings.database_max_overflow,
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
         pool_pre_ping=True,
         pool_recycle=3600,
     )
+    return instrument_engine(engine)
+
+
+class _Replica:
+    """单个只读副本的状态"""
+
+    __slots__ = ("url", "engine", "healthy", "lag", "checked_at")
+
+    def __init__(self, url: str, engine: AsyncEngine) -> None:
+        self.url = url
+        self.engine = engine
+        self.healthy = True
+        self.lag: float | None = None
+        self.checked_at = 0.0
+
+
+class ReplicaRouter:
+    """
+    只读副本路由
+
+    轮询选择可用副本：健康（最近一次检测/使用没有连接错误）且复制延迟不超过
+    max_lag。检测在后台按 check_interval 惰性触发，选择副本本身不产生 IO；
+    没有可用副本时返回 None，由调用方回退到主库。
+
+    Args:
+        urls: 副本连接 URL 列表
+        max_lag: 可接受的最大复制延迟（秒）
+        check_interval: 健康与延迟检测间隔（秒）
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        max_lag: float | None = None,
+        check_interval: float | None = None,
+    ) -> None:
+        self.max_lag = settings.database_replica_max_lag if max_lag is None else max_lag
+        self.check_interval = check_interval or settings.database_replica_check_interval
+        self.replicas = [_Replica(url, create_engine(url, role="replica")) for url in urls]
+        self._next = 0
+        self._refresh_task: asyncio.Task | None = None
+        self._refreshed_at = 0.0
+        self.fallbacks = 0
+        for replica in self.replicas:
+            event.listen(replica.engine.sync_engine, "handle_error", self._on_error(replica))
+
+    def _on_error(self, replica: _Replica):
+        def handle_error(context) -> None:
+            if context.is_disconnect or context.connection is None:
+                self.mark_failed(replica.engine)
+
+        return handle_error
+
+    def mark_failed(self, engine: AsyncEngine) -> None:
+        """标记副本不可用，直到下一次检测成功"""
+        for replica in self.replicas:
+            if replica.engine is engine and replica.healthy:
+                replica.healthy = False
+                logger.warning(f"只读副本不可用，暂时回退主库: {engine.url!r}")
+
+    def pick(self) -> AsyncEngine | None:
+        """
+        选择一个可用副本
+
+        Returns:
+            AsyncEngine | None: 副本引擎，没有可用副本时为 None
+        """
+        if not self.replicas:
+            return None
+        self._maybe_refresh()
+        count = len(self.replicas)
+        for offset in range(count):
+            replica = self.replicas[(self._next + offset) % count]
+            if replica.healthy and (replica.lag is None or replica.lag <= self.max_lag):
+                self._next = (self._next + offset + 1) % count
+                return replica.engine
+        self.fallbacks += 1
+        return None
+
+    def _maybe_refresh(self) -> None:
+        if time.monotonic() - self._refreshed_at < self.check_interval:
+            return
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refreshed_at = time.monotonic()
+        try:
+            self._refresh_task = asyncio.get_running_loop().create_task(self.refresh())
+        except RuntimeError:
+            pass
+
+    async def refresh(self) -> None:
+        """检测所有副本的连通性和复制延迟"""
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+
+    async def _check(self, replica: _Replica) -> None:
+        try:
+            async with replica.engine.connect() as conn:
+                if replica.engine.dialect.name == "postgresql":
+                    lag = await conn.scalar(text(_REPLICA_LAG_SQL))
+                else:
+                    await conn.execute(text("SELECT 1"))
+                    lag = 0.0
+            replica.lag = float(lag or 0.0)
+            if not replica.healthy:
+                logger.info(f"只读副本恢复: {replica.engine.url!r}")
+            replica.healthy = True
+        except Exception as e:
+            replica.healthy = False
+            logger.warning(f"只读副本检测失败: {replica.engine.url!r}: {e}")
+        replica.checked_at = time.monotonic()
+
+    def stats(self) -> list[dict]:
+        """副本状态（URL 已隐藏密码）"""
+        return [
+            {
+                "url": replica.engine.url.render_as_string(hide_password=True),
+                "healthy": replica.healthy,
+                "lag": replica.lag,
+                "pool": replica.engine.pool.status(),
+            }
+            for replica in self.replicas
+        ]
+
+    async def dispose(self) -> None:
+        """关闭所有副本连接池"""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+# 主库返回 0；副本在没有新事务可重放时也视为无延迟
+_REPLICA_LAG_SQL = (
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
 
 
 engine: AsyncEngine = create_engine()
@@ -132,6 +283,8 @@ async_session_maker: async_sessionmaker[AsyncSession] = async_sessionmaker(
     autoflush=False,
 )
 
+replica_router = ReplicaRouter(settings.database_replica_urls)
+
 
 def reset_engine(database_url: str | None = None) -> None:
     """
@@ -143,9 +296,10 @@ def reset_engine(database_url: str | None = None) -> None:
     Args:
         database_url: 新的数据库连接 URL，默认使用当前 settings.database_url
     """
-    global engine, async_session_maker
+    global engine, async_session_maker, replica_router
 
     engine = create_engine(database_url)
+    replica_router = ReplicaRouter(settings.database_replica_urls)
     async_session_maker = async_sessionmaker(
         engine,
         class_=AsyncSession,
@@ -202,6 +356,46 @@ async def get_db() -> AsyncGenerator[AsyncSession]:
             raise
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession]:
+    """
+    获取只读数据库会话（FastAPI 依赖注入）
+
+    配置了只读副本时使用副本连接，否则（或副本均不可用/延迟过大时）使用主库。
+    会话结束时总是回滚：通过 ReadDB 做的任何写入都不会生效，需要写库的接口
+    请使用 DB。
+
+    Yields:
+        AsyncSession: 数据库会话
+
+    Example:
+        >>> @router.get("/posts")
+        >>> async def list_posts(db: ReadDB):
+        >>>     result = await db.execute(select(Post))
+    """
+    replica = replica_router.pick()
+    if replica is not None:
+        session = async_session_maker(bind=replica)
+        try:
+            # 预先取连接，副本连不上时在进入路由之前回退主库
+            await session.connection()
+        except Exception as e:
+            await session.close()
+            replica_router.mark_failed(replica)
+            logger.warning(f"只读副本连接失败，回退主库: {e}")
+            session = async_session_maker()
+    else:
+        session = async_session_maker()
+
+    async with session:
+        try:
+            yield session
+        finally:
+            try:
+                await session.rollback()
+            except Exception:
+                pass
+
+
 @asynccontextmanager
 async def get_db_context() -> AsyncGenerator[AsyncSession]:
     """
@@ -304,6 +498,7 @@ async def close_db() -> None:
     清理数据库连接池，应在应用关闭时调用。
     """
     await engine.dispose()
+    await replica_router.dispose()
     logger.info("Database connections closed")
 
 
@@ -351,6 +546,9 @@ async def get_db_info() -> dict:
     except Exception as e:
         info["error"] = str(e)
 
+    if replica_router.replicas:
+        info["replicas"] = replica_router.stats()
+
     return info
 
 
@@ -0,0 +1,117 @@
+"""
+Rosetta FastAPI 后端 - 会话提交后回调
+
+各模块在 after_flush / do_orm_execute 中把本事务的变更记到 session.info，提交后统一处理
+（失效缓存、通知调度器等），回滚时丢弃。on_commit 注册一个这样的回调：
+- pending(session) 取本事务的累积值（不存在时用 factory 创建），mark(session, value) 直接赋值
+- 提交后若本事务记录过该键，以累积值调用 callback；返回协程时在当前事件循环中创建任务，
+  无运行中的事件循环（同步脚本）时丢弃，任务异常记录日志
+- 最外层事务回滚 / 关闭后丢弃累积值；SAVEPOINT 的释放与回滚不触发也不丢弃
+
+Example:
+    >>> changes = on_commit("sitemap_changes", invalidate, factory=set, label="[sitemap] 缓存失效")
+    >>> changes.pending(session).add(post.id)
+"""
+
+import inspect
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.core.background import spawn
+
+logger = logging.getLogger(__name__)
+
+
+class CommitHook:
+    """
+    session.info 中的一项事务内累积值及其提交后回调
+
+    Attributes:
+        key: session.info 中的键
+        label: 日志中的操作名
+    """
+
+    def __init__(
+        self,
+        key: str,
+        callback: Callable[[Any], Any],
+        factory: Callable[[], Any],
+        label: str,
+    ):
+        self.key = key
+        self.label = label
+        self._callback = callback
+        self._factory = factory
+
+    def pending(self, session: Session) -> Any:
+        """本事务的累积值（首次访问时创建）"""
+        return session.info.setdefault(self.key, self._factory())
+
+    def mark(self, session: Session, value: Any = True) -> None:
+        """直接设置本事务的累积值（标记位或整体替换）"""
+        session.info[self.key] = value
+
+    def discard(self, session: Session) -> None:
+        session.info.pop(self.key, None)
+
+    def fire(self, session: Session) -> None:
+        if self.key not in session.info:
+            return
+        value = session.info.pop(self.key)
+        try:
+            result = self._callback(value)
+        except Exception as e:
+            logger.warning(f"{self.label}失败: {e}")
+            return
+        if inspect.isawaitable(result):
+            spawn(result, self.label)
+
+
+_hooks: list[CommitHook] = []
+
+
+def on_commit(
+    key: str,
+    callback: Callable[[Any], Any],
+    *,
+    factory: Callable[[], Any] = dict,
+    label: str = "提交后回调",
+) -> CommitHook:
+    """
+    注册提交后回调
+
+    Args:
+        key: session.info 中的键（各模块唯一）
+        callback: 以累积值调用；可返回协程，在当前事件循环中作为任务执行
+        factory: pending() 首次访问时创建累积值
+        label: 日志中的操作名
+
+    Returns:
+        CommitHook: 供收集阶段调用 pending() / mark()
+    """
+    hook = CommitHook(key, callback, factory, label)
+    _hooks.append(hook)
+    return hook
+
+
+@event.listens_for(Session, "after_commit")
+def _fire_after_commit(session: Session) -> None:
+    # 释放 SAVEPOINT 同样触发 after_commit，此时外层事务尚未提交
+    if session.in_nested_transaction():
+        return
+    for hook in _hooks:
+        hook.fire(session)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_after_transaction_end(session: Session, transaction) -> None:
+    # 只在最外层事务结束时丢弃（SAVEPOINT 回滚不影响外层事务已记录的变更）；
+    # 提交时累积值已在 after_commit 中取走
+    if transaction.parent is not None:
+        return
+    for hook in _hooks:
+        hook.discard(session)
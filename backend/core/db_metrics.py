@@ -0,0 +1,335 @@
+"""
+Rosetta FastAPI 后端 - 数据库查询与连接池指标
+
+基于 SQLAlchemy 事件采集（不改动业务查询）：
+- before/after_cursor_execute: 每条语句耗时，累加到当前请求（contextvars）与全局统计；
+  超过 db_slow_query_ms 的语句按归一化 SQL 指纹聚合（字面量/参数/IN 列表折叠）
+- 连接池 checkout/checkin: 已借出连接数、峰值、饱和次数；InstrumentedQueuePool
+  额外记录等待空闲连接的时间
+- begin_request/record_request: 由请求管线（middleware.pipeline）调用，得到每个请求的查询数与
+  数据库耗时，并按路由模板聚合（验证列表接口是否存在 N+1）
+
+Example:
+    >>> engine = create_async_engine(url, poolclass=InstrumentedQueuePool)
+    >>> instrument_engine(engine)
+    >>> query_metrics.snapshot()
+"""
+
+import re
+import threading
+import time
+import weakref
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from backend.core.config import settings
+
+# 保留的慢语句指纹 / 路由统计条数上限
+MAX_FINGERPRINTS = 200
+MAX_ENDPOINTS = 500
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):\w+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUES_LIST = re.compile(r"(VALUES\s*\(\?\))(?:\s*,\s*\(\?\))+", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    归一化 SQL，得到同一形状语句共用的指纹
+
+    Args:
+        statement: 原始 SQL
+
+    Returns:
+        str: 字面量和绑定参数替换为 ?，IN (...) / 多行 VALUES 折叠为一个
+    """
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(?)", sql)
+    sql = _VALUES_LIST.sub(r"\1", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@dataclass
+class RequestQueryStats:
+    """单个请求的查询统计"""
+
+    queries: int = 0
+    db_time: float = 0.0
+    slow_queries: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+
+_current: ContextVar[RequestQueryStats | None] = ContextVar("db_request_stats", default=None)
+
+
+def begin_request() -> RequestQueryStats:
+    """开始统计当前请求（返回的对象在请求结束前持续累加）"""
+    stats = RequestQueryStats()
+    _current.set(stats)
+    return stats
+
+
+def current_request_stats() -> RequestQueryStats | None:
+    """当前请求的查询统计，不在请求上下文中时为 None"""
+    return _current.get()
+
+
+@dataclass
+class _Fingerprint:
+    sql: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_seen: float = 0.0
+
+
+@dataclass
+class _Endpoint:
+    requests: int = 0
+    queries: int = 0
+    max_queries: int = 0
+    db_ms: float = 0.0
+    max_db_ms: float = 0.0
+
+
+class QueryMetrics:
+    """
+    进程级查询与连接池指标
+
+    事件回调可能来自不同线程（同步引擎 / 线程池），计数更新由锁保护。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """清空所有统计"""
+        with self._lock:
+            self.queries = 0
+            self.db_time = 0.0
+            self.slow_queries = 0
+            self.fingerprints: dict[str, _Fingerprint] = {}
+            self.endpoints: dict[str, _Endpoint] = {}
+            self.checkouts = 0
+            self.checked_out = 0
+            self.peak_checked_out = 0
+            self.saturated_checkouts = 0
+            self.waits = 0
+            self.wait_time = 0.0
+            self.max_wait = 0.0
+
+    # ==================== 语句 ====================
+
+    def record_statement(self, statement: str, elapsed: float) -> None:
+        """记录一条语句的执行耗时（秒）"""
+        slow = elapsed * 1000 >= settings.db_slow_query_ms
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+            if slow:
+                stats.slow_queries += 1
+        with self._lock:
+            self.queries += 1
+            self.db_time += elapsed
+            if slow:
+                self.slow_queries += 1
+                self._record_slow(statement, elapsed)
+
+    def _record_slow(self, statement: str, elapsed: float) -> None:
+        sql = normalize_sql(statement)
+        entry = self.fingerprints.get(sql)
+        if entry is None:
+            if len(self.fingerprints) >= MAX_FINGERPRINTS:
+                # 淘汰累计耗时最少的指纹
+                victim = min(self.fingerprints.values(), key=lambda f: f.total_ms)
+                del self.fingerprints[victim.sql]
+            entry = self.fingerprints[sql] = _Fingerprint(sql=sql)
+        ms = elapsed * 1000
+        entry.count += 1
+        entry.total_ms += ms
+        entry.max_ms = max(entry.max_ms, ms)
+        entry.last_seen = time.time()
+
+    # ==================== 请求 ====================
+
+    def record_request(self, endpoint: str, stats: RequestQueryStats) -> None:
+        """
+        按路由汇总请求的查询统计
+
+        Args:
+            endpoint: "METHOD /route/{template}"
+            stats: begin_request() 返回的统计
+        """
+        ms = stats.db_time * 1000
+        with self._lock:
+            entry = self.endpoints.get(endpoint)
+            if entry is None:
+                if len(self.endpoints) >= MAX_ENDPOINTS:
+                    return
+                entry = self.endpoints[endpoint] = _Endpoint()
+            entry.requests += 1
+            entry.queries += stats.queries
+            entry.max_queries = max(entry.max_queries, stats.queries)
+            entry.db_ms += ms
+            entry.max_db_ms = max(entry.max_db_ms, ms)
+
+    # ==================== 连接池 ====================
+
+    def record_checkout(self, pool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+            capacity = _pool_capacity(pool)
+            if capacity is not None and pool.checkedout() >= capacity:
+                self.saturated_checkouts += 1
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def record_wait(self, elapsed: float) -> None:
+        with self._lock:
+            self.waits += 1
+            self.wait_time += elapsed
+            self.max_wait = max(self.max_wait, elapsed)
+
+    # ==================== 导出 ====================
+
+    def snapshot(self, limit: int = 20) -> dict[str, Any]:
+        """
+        导出统计
+
+        Args:
+            limit: 慢语句 / 路由各返回的条数
+
+        Returns:
+            dict: queries / pool / slow_statements / endpoints
+        """
+        with self._lock:
+            slow = sorted(self.fingerprints.values(), key=lambda f: f.total_ms, reverse=True)
+            endpoints = sorted(
+                self.endpoints.items(),
+                key=lambda item: item[1].queries / item[1].requests,
+                reverse=True,
+            )
+            return {
+                "queries": {
+                    "total": self.queries,
+                    "db_time_ms": round(self.db_time * 1000, 2),
+                    "slow": self.slow_queries,
+                    "slow_threshold_ms": settings.db_slow_query_ms,
+                },
+                "pool": {
+                    "checkouts": self.checkouts,
+                    "checked_out": self.checked_out,
+                    "peak_checked_out": self.peak_checked_out,
+                    "saturated_checkouts": self.saturated_checkouts,
+                    "waits": self.waits,
+                    "avg_wait_ms": round(self.wait_time / self.waits * 1000, 3)
+                    if self.waits
+                    else 0.0,
+                    "max_wait_ms": round(self.max_wait * 1000, 3),
+                },
+                "slow_statements": [
+                    {
+                        "sql": f.sql,
+                        "count": f.count,
+                        "total_ms": round(f.total_ms, 2),
+                        "avg_ms": round(f.total_ms / f.count, 2),
+                        "max_ms": round(f.max_ms, 2),
+                        "last_seen": f.last_seen,
+                    }
+                    for f in slow[:limit]
+                ],
+                "endpoints": [
+                    {
+                        "endpoint": name,
+                        "requests": e.requests,
+                        "avg_queries": round(e.queries / e.requests, 2),
+                        "max_queries": e.max_queries,
+                        "avg_db_ms": round(e.db_ms / e.requests, 2),
+                        "max_db_ms": round(e.max_db_ms, 2),
+                    }
+                    for name, e in endpoints[:limit]
+                ],
+            }
+
+
+def _pool_capacity(pool) -> int | None:
+    if not hasattr(pool, "size") or not hasattr(pool, "_max_overflow"):
+        return None
+    if pool._max_overflow < 0:
+        return None
+    return pool.size() + pool._max_overflow
+
+
+query_metrics = QueryMetrics()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """记录等待空闲连接耗时的连接池"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            query_metrics.record_wait(time.perf_counter() - start)
+
+
+_instrumented: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def instrument_engine(engine: AsyncEngine) -> AsyncEngine:
+    """
+    为引擎挂载查询与连接池事件（重复调用无副作用）
+
+    Args:
+        engine: 异步引擎
+
+    Returns:
+        AsyncEngine: 原引擎
+    """
+    sync_engine = engine.sync_engine
+    if sync_engine in _instrumented:
+        return engine
+    _instrumented.add(sync_engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if starts:
+            query_metrics.record_statement(statement, time.perf_counter() - starts.pop())
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("query_start") if context.connection else None
+        if starts:
+            starts.pop()
+
+    @event.listens_for(sync_engine.pool, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        query_metrics.record_checkout(sync_engine.pool)
+
+    @event.listens_for(sync_engine.pool, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        query_metrics.record_checkin()
+
+    return engine
@@ -2,7 +2,7 @@
 Rosetta FastAPI 后端 - 依赖注入模块
 
 提供统一的依赖注入配置，包括：
-- 数据库会话
+- 数据库会话（读写 DB / 只读副本 ReadDB）
 - 用户认证
 - 分页参数
 - 通用过滤条件
@@ -32,7 +32,7 @@ from backend.core.auth import (
     get_current_user,
     get_current_user_optional,
 )
-from backend.core.database import get_db
+from backend.core.database import get_db, get_read_db
 from backend.core.paths import CONFIG_FILE, OOBE_LOCK_FILE
 from backend.models.user import User
 
@@ -40,6 +40,7 @@ T = TypeVar("T")
 
 
 DB = Annotated[AsyncSession, Depends(get_db)]
+ReadDB = Annotated[AsyncSession, Depends(get_read_db)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
 CurrentUserOptional = Annotated[User | None, Depends(get_current_user_optional)]
 CurrentStaff = Annotated[User, Depends(get_current_staff)]
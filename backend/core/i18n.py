@@ -5,9 +5,16 @@
 - 语言检测和解析
 - 多语言内容处理
 - 语言偏好管理
+
+每个请求都会调用的函数做了缓存：normalize_language / parse_accept_language 按输入
+LRU 缓存，t() 查询按语言编译的扁平消息表（MessageCatalog，首次使用某语言时编译）。
+列表接口用 localize_many 一次取出整批记录的多语言字段。
 """
 
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
 
 SUPPORTED_LANGUAGES: dict[str, str] = {
     "zh": "简体中文",
@@ -133,11 +140,12 @@ class I18nField:
         return [lang for lang in LANGUAGE_CODES if getattr(self, lang, "")]
 
 
+@lru_cache(maxsize=256)
 def normalize_language(lang: str | None) -> str:
     """
     标准化语言代码
 
-    将各种形式的语言代码转换为标准格式
+    将各种形式的语言代码转换为标准格式（结果按输入缓存）
 
     Args:
         lang: 原始语言代码
@@ -181,10 +189,13 @@ def normalize_language(lang: str | None) -> str:
     return DEFAULT_LANGUAGE
 
 
+@lru_cache(maxsize=512)
 def parse_accept_language(accept_language: str | None) -> str:
     """
     解析 HTTP Accept-Language 头
 
+    同一浏览器的请求头基本不变，结果按原始头值缓存。
+
     Args:
         accept_language: Accept-Language 头的值
 
@@ -273,19 +284,66 @@ def get_i18n_value(data: dict[str, str] | None, lang: str, fallback: bool = True
     if not data:
         return ""
 
+    for code in _lookup_order(lang, fallback):
+        value = data.get(code)
+        if value:
+            return value
+
+    return ""
+
+
+@lru_cache(maxsize=256)
+def _lookup_order(lang: str | None, fallback: bool) -> tuple[str, ...]:
+    """取值顺序：目标语言，回退时依次为默认语言与其余语言"""
     normalized_lang = normalize_language(lang)
+    if not fallback:
+        return (normalized_lang,)
+    return tuple(dict.fromkeys((normalized_lang, DEFAULT_LANGUAGE, *LANGUAGE_CODES)))
 
-    if data.get(normalized_lang):
-        return data[normalized_lang]
 
-    if fallback:
-        if data.get(DEFAULT_LANGUAGE):
-            return data[DEFAULT_LANGUAGE]
-        for code in LANGUAGE_CODES:
-            if data.get(code):
-                return data[code]
+def localize_many(
+    records: Iterable[Any],
+    fields: Sequence[str],
+    lang: str,
+    fallback: bool = True,
+) -> list[tuple[str | None, ...]]:
+    """
+    批量取出多条记录的多语言字段（列表接口使用）
 
-    return ""
+    语言解析与回退顺序只计算一次，之后逐条逐字段取值。
+
+    Args:
+        records: 记录（ORM 对象等，按属性名读取字段）
+        fields: 多语言 JSON 字段名
+        lang: 目标语言代码
+        fallback: 是否回退到默认语言
+
+    Returns:
+        与 records 一一对应的元组，元素顺序同 fields；字段本身为空时为 None，
+        否则与 get_i18n_value 的结果相同
+
+    Example:
+        >>> localize_many(posts, ("title", "subtitle"), "en")
+        [('Hello', None), ...]
+    """
+    order = _lookup_order(lang, fallback)
+    results: list[tuple[str | None, ...]] = []
+    for record in records:
+        values: list[str | None] = []
+        for field in fields:
+            data = getattr(record, field)
+            if not data:
+                values.append(None)
+                continue
+            for code in order:
+                value = data.get(code)
+                if value:
+                    values.append(value)
+                    break
+            else:
+                values.append("")
+        results.append(tuple(values))
+    return results
 
 
 def set_i18n_value(data: dict[str, str], lang: str, value: str) -> dict[str, str]:
@@ -503,6 +561,41 @@ TRANSLATIONS: dict[str, dict[str, str]] = {
 }
 
 
+class MessageCatalog:
+    """
+    预编译的消息目录
+
+    TRANSLATIONS 按消息键组织；查询时按语言需要的是 键 → 文本 的映射。某语言首次被
+    查询时把它编译成一张扁平表（缺失的翻译已回退到默认语言，再缺失则为键本身），
+    之后每次查询只是一次字典访问。未被请求过的语言不会编译。
+    """
+
+    def __init__(self, messages: dict[str, dict[str, str]]):
+        self._messages = messages
+        self._tables: dict[str, dict[str, str]] = {}
+
+    def table(self, lang: str) -> dict[str, str]:
+        """取（必要时编译）指定语言的扁平消息表，lang 须已标准化"""
+        table = self._tables.get(lang)
+        if table is None:
+            table = {
+                key: values.get(lang) or values.get(DEFAULT_LANGUAGE) or key
+                for key, values in self._messages.items()
+            }
+            self._tables[lang] = table
+        return table
+
+    def gettext(self, key: str, lang: str) -> str:
+        return self.table(lang).get(key, key)
+
+    def invalidate(self) -> None:
+        """丢弃已编译的表（修改 TRANSLATIONS 后调用）"""
+        self._tables.clear()
+
+
+catalog = MessageCatalog(TRANSLATIONS)
+
+
 def t(key: str, lang: str | None = None, **kwargs) -> str:
     """
     获取翻译消息
@@ -518,14 +611,7 @@ def t(key: str, lang: str | None = None, **kwargs) -> str:
     if lang is None:
         lang = I18nContext.get_language()
 
-    normalized_lang = normalize_language(lang)
-    translations = TRANSLATIONS.get(key, {})
-
-    result = translations.get(normalized_lang, "")
-    if not result:
-        result = translations.get(DEFAULT_LANGUAGE, key)
-    if not result:
-        result = key
+    result = catalog.gettext(key, normalize_language(lang))
 
     if kwargs:
         try:
@@ -4,9 +4,49 @@
 提供评论 / 留言等用户生成内容的黑白名单过滤。
 - BLACKLIST: 命中直接拒绝 / 标记 spam
 - GRAYLIST: 命中强制进入待审核 pending
+
+词表编译成一个 Aho-Corasick 自动机（backend.utils.aho_corasick），每段文本归一化后
+只扫描一遍，耗时与词表规模无关。归一化：NFKC（全角转半角）、去除零宽字符、casefold。
+
+词表来源（按顺序合并，同一个词以先出现的级别为准）：
+1. 内置的 BLACKLIST / GRAYLIST
+2. settings.moderation_wordlist_dir 下的 blacklist.txt / graylist.txt
+3. SiteConfig 的 MODERATION_BLACKLIST / MODERATION_GRAYLIST
+
+文件与数据库词表每行一个词，# 开头为注释。重新加载时在线程中编译新的自动机，
+完成后整体替换引用，进行中的审核继续使用旧词表。触发时机：启动时；本进程提交了
+MODERATION_* 配置后；收到其他 worker 的 moderation:changed 通知；管理后台手动重载
+（用于文件词表变更）。
+
+Example:
+    >>> moderate_text("buy ＰＯＲＮ now").level
+    'black'
 """
 
+import asyncio
+import logging
+import unicodedata
 from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from backend.core import database
+from backend.core.background import ChangeFeed, LoopLock, spawn
+from backend.core.config import settings
+from backend.core.db_events import on_commit
+from backend.models.core import SiteConfig
+from backend.utils.aho_corasick import AhoCorasick
+
+logger = logging.getLogger(__name__)
+
+MODERATION_CHANNEL = "moderation:changed"
+MODERATION_KEYS = {"black": "MODERATION_BLACKLIST", "gray": "MODERATION_GRAYLIST"}
+WORDLIST_FILES = {"black": "blacklist.txt", "gray": "graylist.txt"}
+
+# 归一化时删除的零宽 / 不可见字符
+_IGNORED_CHARS = dict.fromkeys(map(ord, "\u00ad\u034f\u180e\u200b\u200c\u200d\u2060\ufeff"), None)
 
 BLACKLIST = [
     "色情片",
@@ -82,6 +122,207 @@ class ModerationResult:
         return self.level == "gray"
 
 
+def normalize_text(text: str) -> str:
+    """审核用的归一化：去除零宽字符、NFKC（全角转半角等）、casefold"""
+    return unicodedata.normalize("NFKC", text.translate(_IGNORED_CHARS)).casefold()
+
+
+def parse_word_list(text: str) -> list[str]:
+    """解析词表文本：每行一个词，忽略空行与 # 开头的注释"""
+    words = []
+    for line in text.splitlines():
+        word = line.strip()
+        if word and not word.startswith("#"):
+            words.append(word)
+    return words
+
+
+@dataclass(frozen=True)
+class ModerationRules:
+    """编译后的词表（不可变，重新加载时整体替换）"""
+
+    words: tuple[str, ...]
+    levels: tuple[str, ...]
+    automaton: AhoCorasick
+
+    @classmethod
+    def compile(cls, blacklist: list[str], graylist: list[str]) -> "ModerationRules":
+        """
+        编译词表
+
+        Args:
+            blacklist: 黑名单词
+            graylist: 灰名单词（与黑名单重复的词按黑名单处理）
+
+        Returns:
+            ModerationRules: 编译结果
+        """
+        words: list[str] = []
+        levels: list[str] = []
+        patterns: list[str] = []
+        seen: set[str] = set()
+        for level, source in (("black", blacklist), ("gray", graylist)):
+            for word in source:
+                pattern = normalize_text(word.strip())
+                if not pattern or pattern in seen:
+                    continue
+                seen.add(pattern)
+                words.append(word.strip())
+                levels.append(level)
+                patterns.append(pattern)
+        return cls(words=tuple(words), levels=tuple(levels), automaton=AhoCorasick(patterns))
+
+    @property
+    def counts(self) -> dict[str, int]:
+        """各级别的词数"""
+        black = self.levels.count("black")
+        return {"black": black, "gray": len(self.levels) - black}
+
+    def check(self, text: str) -> "ModerationResult":
+        """审核一段文本，见 moderate_text"""
+        if not text:
+            return ModerationResult(passed=True, level="ok", matched_words=[])
+
+        hits = sorted(self.automaton.search(normalize_text(text)))
+
+        matched_black = [self.words[i] for i in hits if self.levels[i] == "black"]
+        if matched_black:
+            return ModerationResult(
+                passed=False,
+                level="black",
+                matched_words=matched_black,
+            )
+
+        matched_gray = [self.words[i] for i in hits if self.levels[i] == "gray"]
+        if matched_gray:
+            return ModerationResult(
+                passed=True,
+                level="gray",
+                matched_words=matched_gray,
+            )
+
+        return ModerationResult(passed=True, level="ok", matched_words=[])
+
+
+DEFAULT_RULES = ModerationRules.compile(BLACKLIST, GRAYLIST)
+
+
+def _read_word_files(directory: str) -> dict[str, list[str]]:
+    lists: dict[str, list[str]] = {"black": [], "gray": []}
+    if not directory:
+        return lists
+    for level, name in WORDLIST_FILES.items():
+        path = Path(directory) / name
+        if not path.is_file():
+            continue
+        try:
+            lists[level] = parse_word_list(path.read_text(encoding="utf-8"))
+        except (OSError, UnicodeDecodeError) as exc:
+            logger.warning(f"[moderation] 词表文件读取失败 {path}: {exc}")
+    return lists
+
+
+class WordListStore:
+    """
+    进程内词表
+
+    Args:
+        session_factory: 读取数据库词表使用的会话工厂，默认运行时读取 database.async_session_maker
+
+    Example:
+        >>> await word_lists.reload()
+        >>> word_lists.rules.check("...")
+    """
+
+    def __init__(self, session_factory=None) -> None:
+        self._session_factory = session_factory
+        self._rules = DEFAULT_RULES
+        self._lock = LoopLock()
+        self._changes = ChangeFeed(
+            MODERATION_CHANNEL,
+            lambda: self.schedule_reload(broadcast=False),
+            label="[moderation]",
+            fallback="仅在本进程变更时重载",
+        )
+        self._reload_task: asyncio.Task | None = None
+        self.reloads = 0
+
+    @property
+    def rules(self) -> ModerationRules:
+        """当前词表"""
+        return self._rules
+
+    def reset(self) -> None:
+        """恢复为内置词表"""
+        self._rules = DEFAULT_RULES
+
+    async def reload(self, broadcast: bool = False) -> ModerationRules:
+        """
+        重新读取文件与数据库词表，编译后替换当前词表
+
+        数据库读取失败时保留当前词表。
+
+        Args:
+            broadcast: 是否通知其他 worker 同样重新加载
+
+        Returns:
+            ModerationRules: 重新加载后的词表
+        """
+        # 串行执行，后开始的重载总能读到更新的数据
+        async with self._lock:
+            file_lists = await asyncio.to_thread(_read_word_files, settings.moderation_wordlist_dir)
+            db_lists = await self._load_db()
+            if db_lists is None:
+                return self._rules
+            rules = await asyncio.to_thread(
+                ModerationRules.compile,
+                [*BLACKLIST, *file_lists["black"], *db_lists["black"]],
+                [*GRAYLIST, *file_lists["gray"], *db_lists["gray"]],
+            )
+            self._rules = rules
+            self.reloads += 1
+            logger.info(f"[moderation] 词表已加载: {rules.counts}")
+
+        if broadcast:
+            await self._changes.publish()
+        return rules
+
+    async def _load_db(self) -> dict[str, list[str]] | None:
+        factory = self._session_factory or database.async_session_maker
+        try:
+            async with factory() as db:
+                rows = await db.execute(
+                    select(SiteConfig.key, SiteConfig.value).where(
+                        SiteConfig.key.in_(MODERATION_KEYS.values())
+                    )
+                )
+                values = dict(rows.all())
+        except Exception as exc:
+            logger.warning(f"[moderation] 数据库词表加载失败，保留当前词表: {exc}")
+            return None
+        return {
+            level: parse_word_list(values.get(key) or "") for level, key in MODERATION_KEYS.items()
+        }
+
+    def schedule_reload(self, broadcast: bool = True) -> None:
+        """在后台重新加载（用于提交钩子等同步上下文）"""
+        task = spawn(self.reload(broadcast=broadcast), "[moderation] 词表重载")
+        if task is not None:
+            self._reload_task = task
+
+    async def start(self) -> None:
+        """订阅其他 worker 的变更通知并加载词表"""
+        await self._changes.start()
+        await self.reload()
+
+    async def stop(self) -> None:
+        """取消订阅"""
+        await self._changes.stop()
+
+
+word_lists = WordListStore()
+
+
 def moderate_text(text: str) -> ModerationResult:
     """
     审核一段文本是否命中敏感词。
@@ -91,26 +332,33 @@ def moderate_text(text: str) -> ModerationResult:
     - level="gray": 命中灰名单，应强制 pending
     - level="ok": 一切正常
     """
-    if not text:
-        return ModerationResult(passed=True, level="ok", matched_words=[])
+    return word_lists.rules.check(text)
 
-    lower = text.lower()
-    original = text
 
-    matched_black = [w for w in BLACKLIST if (w in original or w.lower() in lower)]
-    if matched_black:
-        return ModerationResult(
-            passed=False,
-            level="black",
-            matched_words=matched_black,
-        )
+# ==================== 提交后自动重载 ====================
+
+
+_words_changed = on_commit(
+    "moderation_words_changed",
+    lambda _: word_lists.schedule_reload(),
+    label="[moderation] 词表重载",
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context) -> None:
+    """记录本次事务是否修改了数据库词表"""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, SiteConfig) and obj.key in MODERATION_KEYS.values():
+            _words_changed.mark(session)
+            return
 
-    matched_gray = [w for w in GRAYLIST if (w in original or w.lower() in lower)]
-    if matched_gray:
-        return ModerationResult(
-            passed=True,
-            level="gray",
-            matched_words=matched_gray,
-        )
 
-    return ModerationResult(passed=True, level="ok", matched_words=[])
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_changes(state: ORMExecuteState) -> None:
+    """批量语句看不到具体的键，修改 SiteConfig 时一律重载"""
+    mapper = state.bind_mapper
+    if (state.is_insert or state.is_update or state.is_delete) and (
+        mapper is not None and mapper.class_ is SiteConfig
+    ):
+        _words_changed.mark(state.session)
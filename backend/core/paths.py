@@ -11,3 +11,5 @@ CONFIG_FILE = BASE_DIR / "rosetta.json"
 OOBE_LOCK_FILE = BASE_DIR / ".oobe_complete"
 STATE_FILE = BASE_DIR / ".oobe_state.json"
 ENV_FILE = BASE_DIR / ".env"
+IMPORT_CHECKPOINT_DIR = BASE_DIR / ".import_checkpoints"
+MIGRATION_CHECKPOINT_DIR = BASE_DIR / ".migration_checkpoints"
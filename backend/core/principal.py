@@ -0,0 +1,182 @@
+"""
+Rosetta FastAPI 后端 - 认证主体缓存
+
+get_current_user 每次请求都要确认用户存在且 is_active / not is_banned。
+这里把用户的列快照（不含 password_hash）按用户 ID 放进二级缓存，命中时直接
+在当前会话中还原出一个持久态 User（不发 SELECT），并把令牌 jti 的黑名单检查
+合并到同一次缓存查询中。
+
+失效策略：
+- 显式：封禁/停用/改密码/管理员修改用户后调用 invalidate_principal()
+- 兜底：任意会话 flush 了 User 的新增/修改/删除，提交后自动失效对应快照
+- TTL：其他进程的本地缓存最长保留 auth_principal_cache_ttl * 本地比例 秒
+
+Example:
+    >>> user, revoked = await load_principal(db, user_id, jti=payload.get("jti"))
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import Date, DateTime, event, select
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+
+from backend.core.cache_v2 import two_level_cache
+from backend.core.config import settings
+from backend.core.db_events import on_commit
+from backend.models.user import User
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_CACHE_PREFIX = "principal"
+
+# 不进入共享缓存的列；还原出的 User 上这些属性处于未加载状态
+_EXCLUDED_COLUMNS = frozenset({"password_hash"})
+
+_SNAPSHOT_COLUMNS = tuple(
+    column for column in User.__table__.columns if column.key not in _EXCLUDED_COLUMNS
+)
+
+
+def principal_key(user_id: int) -> str:
+    """用户快照的缓存键"""
+    return f"{PRINCIPAL_CACHE_PREFIX}:{user_id}"
+
+
+def snapshot_user(user: User) -> dict[str, Any]:
+    """
+    生成用户快照（JSON 可序列化）
+
+    Args:
+        user: 已加载的用户
+
+    Returns:
+        dict: 列名 → 值，日期时间转为 ISO 字符串
+    """
+    data: dict[str, Any] = {}
+    for column in _SNAPSHOT_COLUMNS:
+        value = getattr(user, column.key)
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        data[column.key] = value
+    return data
+
+
+def _restore(snapshot: dict[str, Any]) -> User:
+    values: dict[str, Any] = {}
+    for column in _SNAPSHOT_COLUMNS:
+        if column.key not in snapshot:
+            continue
+        value = snapshot[column.key]
+        if isinstance(value, str):
+            if isinstance(column.type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif isinstance(column.type, Date):
+                value = date.fromisoformat(value)
+        values[column.key] = value
+    user = User(**values)
+    # 清空属性历史，视同刚从数据库加载，merge(load=False) 不会产生 SELECT/UPDATE
+    make_transient_to_detached(user)
+    return user
+
+
+async def _is_blacklisted_locally(jti: str) -> bool:
+    from backend.core.auth import _MEMORY_BLACKLIST_LOCK, MEMORY_REFRESH_BLACKLIST
+
+    async with _MEMORY_BLACKLIST_LOCK:
+        return jti in MEMORY_REFRESH_BLACKLIST
+
+
+async def load_principal(
+    db: AsyncSession, user_id: int, jti: str | None = None
+) -> tuple[User | None, bool]:
+    """
+    获取认证主体
+
+    当前会话已持有该用户时直接返回；否则先查快照缓存（同一次往返检查 jti 黑名单），
+    未命中再查库并回填缓存。
+
+    Args:
+        db: 数据库会话
+        user_id: 用户 ID
+        jti: 令牌 ID，提供时一并检查是否已被吊销
+
+    Returns:
+        (用户或 None, 令牌是否已被吊销)
+    """
+    from backend.core.auth import REFRESH_BLACKLIST_PREFIX, _is_jti_blacklisted
+
+    ttl = settings.auth_principal_cache_ttl
+    revoked: bool | None = None
+
+    user = db.sync_session.identity_map.get(identity_key(User, user_id))
+    # 回滚/提交后被过期的实例不能直接用（访问属性会触发同步懒加载），走下面的 SELECT 刷新
+    stale = user is not None and bool(sa_inspect(user).expired_attributes)
+    if user is not None and not stale and jti is None:
+        return user, False
+
+    snapshot = None
+    if ttl > 0:
+        if jti is not None:
+            snapshot, revoked = await two_level_cache.get_and_exists(
+                principal_key(user_id), f"{REFRESH_BLACKLIST_PREFIX}:{jti}"
+            )
+            # Redis 写入失败时黑名单会回退到进程内存，这里一并检查（无 IO）
+            if not revoked:
+                revoked = await _is_blacklisted_locally(jti)
+        else:
+            snapshot = await two_level_cache.get(principal_key(user_id))
+    elif jti is not None:
+        revoked = await _is_jti_blacklisted(jti)
+
+    if revoked:
+        return None, True
+    if user is not None and not stale:
+        return user, False
+
+    if isinstance(snapshot, dict) and user is None:
+        return await db.merge(_restore(snapshot), load=False), False
+
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+    if user is not None and ttl > 0:
+        await two_level_cache.set(principal_key(user_id), snapshot_user(user), ttl=ttl)
+    return user, False
+
+
+async def invalidate_principal(*user_ids: int) -> None:
+    """
+    使用户快照失效
+
+    Args:
+        user_ids: 用户 ID
+    """
+    for user_id in user_ids:
+        await two_level_cache.delete(principal_key(user_id))
+
+
+def _invalidate_users(user_ids: set[int]):
+    for user_id in user_ids:
+        # 本地层同步删除，保证本进程后续请求立即看到新状态；Redis 层异步删除
+        two_level_cache.delete_local(principal_key(user_id))
+    return invalidate_principal(*user_ids)
+
+
+_changed_users = on_commit(
+    "principal_invalidate", _invalidate_users, factory=set, label="用户快照失效"
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_changes(session: Session, flush_context) -> None:
+    """记录本次事务中新增/修改/删除的用户，提交后统一失效"""
+    changed = {
+        obj.id
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, User) and obj.id is not None
+    }
+    if changed:
+        _changed_users.pending(session).update(changed)
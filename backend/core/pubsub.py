@@ -0,0 +1,236 @@
+"""
+Rosetta FastAPI 后端 - 发布/订阅消息代理
+
+为实时推送（WebSocket 通知）提供跨进程的消息分发：
+- MemoryBroker: 进程内分发（默认；单 worker 部署与测试）
+- RedisBroker: Redis Pub/Sub，多个 uvicorn worker / 多节点共享
+
+两种代理语义一致：
+- 只有本进程 subscribe 过的频道才会回调 handler（按需订阅，不接收无关用户的消息）
+- 消息为可 JSON 序列化的 dict，至多投递一次，不持久化（离线用户靠通知列表补齐）
+- handler 在代理的事件循环中调用，不应阻塞
+
+Example:
+    >>> broker = create_broker()
+    >>> await broker.start(on_message)
+    >>> await broker.subscribe("notify:user:1")
+    >>> await broker.publish("notify:user:1", {"type": "notification", "id": 1})
+"""
+
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[str, dict[str, Any]], Awaitable[None] | None]
+
+
+class Broker(ABC):
+    """
+    发布/订阅代理抽象
+
+    Attributes:
+        distributed: 消息是否能到达其他进程
+    """
+
+    distributed: bool = False
+
+    def __init__(self) -> None:
+        self._handler: MessageHandler | None = None
+        self._channels: set[str] = set()
+
+    @property
+    def channels(self) -> frozenset[str]:
+        """本进程当前订阅的频道"""
+        return frozenset(self._channels)
+
+    async def start(self, handler: MessageHandler) -> None:
+        """
+        开始接收消息
+
+        Args:
+            handler: 收到消息时的回调 (channel, message)
+        """
+        self._handler = handler
+
+    async def _dispatch(self, channel: str, message: dict[str, Any]) -> None:
+        if self._handler is None:
+            return
+        try:
+            result = self._handler(channel, message)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception:
+            logger.exception(f"[pubsub] 处理频道 {channel} 的消息失败")
+
+    @abstractmethod
+    async def publish(self, channel: str, message: dict[str, Any]) -> None:
+        """发布消息"""
+
+    @abstractmethod
+    async def subscribe(self, *channels: str) -> None:
+        """订阅频道"""
+
+    @abstractmethod
+    async def unsubscribe(self, *channels: str) -> None:
+        """取消订阅"""
+
+    async def close(self) -> None:
+        """停止接收并释放连接"""
+        self._handler = None
+        self._channels.clear()
+
+
+class MemoryBroker(Broker):
+    """进程内代理，publish 时直接分发给本进程订阅者"""
+
+    async def publish(self, channel: str, message: dict[str, Any]) -> None:
+        if channel in self._channels:
+            await self._dispatch(channel, message)
+
+    async def subscribe(self, *channels: str) -> None:
+        self._channels.update(channels)
+
+    async def unsubscribe(self, *channels: str) -> None:
+        self._channels.difference_update(channels)
+
+
+class RedisBroker(Broker):
+    """
+    Redis Pub/Sub 代理
+
+    每个进程一个 PubSub 连接，由后台任务持续读取；连接断开后按指数退避重连并
+    重新订阅当前频道集合。重连期间发布的消息会丢失（Pub/Sub 不持久化）。
+    """
+
+    distributed = True
+
+    # 重连退避上限（秒）
+    MAX_RECONNECT_DELAY = 30.0
+
+    def __init__(self, redis_url: str | None = None, prefix: str = "rosetta") -> None:
+        super().__init__()
+        self._redis_url = redis_url or settings.redis_url
+        self._prefix = prefix
+        self._client = None
+        self._pubsub = None
+        self._reader: asyncio.Task | None = None
+
+    def _key(self, channel: str) -> str:
+        return f"{self._prefix}:{channel}"
+
+    async def _get_client(self):
+        if self._client is None:
+            import redis.asyncio as redis
+
+            self._client = redis.from_url(self._redis_url, encoding="utf-8", decode_responses=True)
+        return self._client
+
+    async def start(self, handler: MessageHandler) -> None:
+        await super().start(handler)
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_loop(), name="pubsub-reader")
+
+    async def _read_loop(self) -> None:
+        delay = 1.0
+        strip = len(self._prefix) + 1
+        while True:
+            try:
+                client = await self._get_client()
+                self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+                if self._channels:
+                    await self._pubsub.subscribe(*(self._key(c) for c in self._channels))
+                delay = 1.0
+                while True:
+                    if not self._pubsub.subscribed:
+                        # 没有订阅时 get_message 会立即返回，避免空转
+                        await asyncio.sleep(0.5)
+                        continue
+                    raw = await self._pubsub.get_message(timeout=1.0)
+                    if raw is None or raw.get("type") != "message":
+                        continue
+                    try:
+                        message = json.loads(raw["data"])
+                    except (TypeError, ValueError):
+                        logger.warning(f"[pubsub] 丢弃无法解析的消息: {raw.get('channel')}")
+                        continue
+                    await self._dispatch(raw["channel"][strip:], message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(f"[pubsub] Redis 订阅连接中断，{delay:.0f}s 后重连: {exc}")
+                await self._reset_pubsub()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+
+    async def _reset_pubsub(self) -> None:
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception:
+                pass
+            self._pubsub = None
+
+    async def publish(self, channel: str, message: dict[str, Any]) -> None:
+        client = await self._get_client()
+        await client.publish(self._key(channel), json.dumps(message, ensure_ascii=False))
+
+    async def subscribe(self, *channels: str) -> None:
+        new = [c for c in channels if c not in self._channels]
+        self._channels.update(new)
+        if new and self._pubsub is not None:
+            try:
+                await self._pubsub.subscribe(*(self._key(c) for c in new))
+            except Exception as exc:
+                # 读循环重连时会按 _channels 重新订阅
+                logger.warning(f"[pubsub] 订阅失败，等待重连补订: {exc}")
+
+    async def unsubscribe(self, *channels: str) -> None:
+        gone = [c for c in channels if c in self._channels]
+        self._channels.difference_update(gone)
+        if gone and self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(*(self._key(c) for c in gone))
+            except Exception as exc:
+                logger.warning(f"[pubsub] 取消订阅失败: {exc}")
+
+    async def close(self) -> None:
+        await super().close()
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._reader = None
+        await self._reset_pubsub()
+        if self._client is not None:
+            try:
+                await self._client.aclose()
+            except Exception:
+                pass
+            self._client = None
+
+
+def create_broker(kind: str | None = None) -> Broker:
+    """
+    按配置创建消息代理
+
+    Args:
+        kind: auto / memory / redis，默认读取 settings.realtime_broker
+
+    Returns:
+        Broker: 代理实例
+    """
+    kind = kind or settings.realtime_broker
+    if kind == "auto":
+        kind = "redis" if settings.redis_enabled else "memory"
+    if kind == "redis":
+        return RedisBroker()
+    return MemoryBroker()
@@ -0,0 +1,144 @@
+"""
+站点访问闸门状态
+
+请求管线（backend.middleware.pipeline）对每个请求都要判断 OOBE 是否完成、站点是否
+处于维护模式。两者都保存在进程内，由变更方推送，请求路径上没有 I/O：
+
+- OOBE：首次读取时检查锁文件；之后最多每 OOBE_RECHECK_INTERVAL 秒重新检查一次，
+  用于发现其他 worker / 脚本完成或重置安装。本进程的安装向导写入、删除锁文件后
+  直接调用 set_oobe_complete
+- 维护模式：首次读取时从 SiteConfig 加载一次。本进程提交 MAINTENANCE_* 后由
+  site_config_service 的提交钩子直接推送新值（apply_maintenance）；其他 worker 的
+  改动经 site_config:changed 通知、以及看不到具体值的批量语句只标记失效，
+  下一个请求重新加载（每次变更每个进程一条查询）
+
+Example:
+    >>> if site_gate.oobe_complete:
+    ...     state = await site_gate.get_maintenance()
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import select
+
+from backend.core import database, deps
+from backend.core.background import LoopLock
+from backend.models.core import SiteConfig
+
+logger = logging.getLogger(__name__)
+
+OOBE_RECHECK_INTERVAL = 5.0
+MAINTENANCE_KEYS = ("MAINTENANCE_MODE", "MAINTENANCE_MESSAGE")
+
+
+@dataclass(frozen=True)
+class MaintenanceState:
+    """维护模式状态"""
+
+    enabled: bool = False
+    message: str | None = None
+
+
+class SiteGate:
+    """
+    进程内的 OOBE / 维护模式状态
+
+    Args:
+        session_factory: 加载维护模式使用的会话工厂，默认运行时读取 database.async_session_maker
+    """
+
+    def __init__(self, session_factory=None) -> None:
+        self._session_factory = session_factory
+        self.reset()
+
+    def reset(self) -> None:
+        """丢弃已加载的状态，下次读取时重新检查"""
+        self._oobe: bool | None = None
+        self._oobe_checked_at = 0.0
+        self._maintenance: MaintenanceState | None = None
+        self._generation = 0
+        self._lock = LoopLock()
+
+    # ==================== OOBE ====================
+
+    @property
+    def oobe_complete(self) -> bool:
+        """OOBE 是否已完成"""
+        now = time.monotonic()
+        if self._oobe is None or now - self._oobe_checked_at > OOBE_RECHECK_INTERVAL:
+            self._oobe = deps.is_oobe_complete()
+            self._oobe_checked_at = now
+        return self._oobe
+
+    def set_oobe_complete(self, complete: bool) -> None:
+        """安装向导写入 / 删除锁文件后推送新状态"""
+        self._oobe = complete
+        self._oobe_checked_at = time.monotonic()
+
+    # ==================== 维护模式 ====================
+
+    async def get_maintenance(self) -> MaintenanceState:
+        """当前维护模式状态；尚未加载或已失效时加载一次"""
+        state = self._maintenance
+        if state is not None:
+            return state
+
+        # 同一进程内并发的请求只加载一次
+        async with self._lock:
+            if self._maintenance is not None:
+                return self._maintenance
+            generation = self._generation
+            state = await self._load()
+            if state is None:
+                # 加载失败时放行，下次读取重试
+                return MaintenanceState()
+            # 加载期间又有变更时不保存，下次读取重新加载
+            if generation == self._generation:
+                self._maintenance = state
+            return state
+
+    def apply_maintenance(self, changes: dict[str, str | None]) -> None:
+        """
+        本进程提交了维护模式配置：直接更新状态
+
+        Args:
+            changes: 配置键 → 新值（删除为 None），只含 MAINTENANCE_KEYS 中变更的键
+        """
+        self._generation += 1
+        state = self._maintenance
+        if state is None:
+            return
+        enabled, message = state.enabled, state.message
+        if "MAINTENANCE_MODE" in changes:
+            enabled = (changes["MAINTENANCE_MODE"] or "").lower() == "true"
+        if "MAINTENANCE_MESSAGE" in changes:
+            message = changes["MAINTENANCE_MESSAGE"]
+        self._maintenance = MaintenanceState(enabled=enabled, message=message)
+
+    def invalidate_maintenance(self) -> None:
+        """配置被其他 worker 或批量语句修改：下次读取时重新加载"""
+        self._generation += 1
+        self._maintenance = None
+
+    async def _load(self) -> MaintenanceState | None:
+        factory = self._session_factory or database.async_session_maker
+        try:
+            async with factory() as db:
+                rows = await db.execute(
+                    select(SiteConfig.key, SiteConfig.value).where(
+                        SiteConfig.key.in_(MAINTENANCE_KEYS)
+                    )
+                )
+                values = dict(rows.all())
+        except Exception as exc:
+            logger.warning(f"[site_gate] 维护模式加载失败: {exc}")
+            return None
+        return MaintenanceState(
+            enabled=(values.get("MAINTENANCE_MODE") or "").lower() == "true",
+            message=values.get("MAINTENANCE_MESSAGE"),
+        )
+
+
+site_gate = SiteGate()
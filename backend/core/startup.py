@@ -0,0 +1,151 @@
+"""
+启动耗时分析与就绪状态
+
+- startup_profiler: lifespan 中各启动步骤的耗时（phase 上下文管理器记录）
+- readiness: 就绪状态。必需的启动步骤完成后置为就绪（/health/ready 返回 200），
+  缓存预热等非必需工作在就绪后于后台进行，不推迟开始接收流量；关闭时先撤销就绪
+- profile_imports: 在独立解释器中用 -X importtime 统计模块导入耗时
+
+/health/live 只表示进程存活，供存活探针使用；负载均衡与滚动发布应使用 /health/ready。
+完整报告见 backend/scripts/profile_startup.py。
+
+Example:
+    >>> with startup_profiler.phase("init_db"):
+    ...     await init_db()
+    >>> readiness.mark_ready()
+    >>> readiness.start_warmup(warmup_cache)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import subprocess
+import sys
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    """记录启动步骤耗时"""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.started_at = time.perf_counter()
+        self.phases: list[tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """记录一个步骤的耗时（异常同样记录后继续抛出）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self) -> dict[str, Any]:
+        """各步骤耗时（毫秒）与 reset 以来的总耗时"""
+        return {
+            "phases": [
+                {"name": name, "ms": round(seconds * 1000, 1)} for name, seconds in self.phases
+            ],
+            "total_ms": round((time.perf_counter() - self.started_at) * 1000, 1),
+        }
+
+
+class Readiness:
+    """就绪状态与后台预热"""
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.warmup = "pending"
+        self._task: asyncio.Task | None = None
+
+    def mark_ready(self) -> None:
+        self.ready = True
+
+    def start_warmup(self, *jobs: Callable[[], Awaitable[Any]]) -> None:
+        """在后台依次执行预热任务；单个任务失败只记录日志"""
+
+        async def run() -> None:
+            self.warmup = "running"
+            failed = False
+            for job in jobs:
+                name = getattr(job, "__name__", repr(job))
+                try:
+                    with startup_profiler.phase(f"warmup:{name}"):
+                        await job()
+                except Exception:
+                    failed = True
+                    logger.exception(f"[startup] 预热任务失败: {name}")
+            self.warmup = "failed" if failed else "done"
+
+        self._task = asyncio.create_task(run(), name="startup-warmup")
+
+    async def stop(self) -> None:
+        """撤销就绪并取消未完成的预热"""
+        self.ready = False
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def status(self) -> dict[str, Any]:
+        return {"ready": self.ready, "warmup": self.warmup}
+
+
+startup_profiler = StartupProfiler()
+readiness = Readiness()
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    """单个模块的导入耗时（微秒）"""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    """解析 python -X importtime 的 stderr 输出"""
+    timings: list[ImportTiming] = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 表头
+        timings.append(
+            ImportTiming(
+                module=parts[2].strip(),
+                self_us=int(parts[0]),
+                cumulative_us=int(parts[1]),
+            )
+        )
+    return timings
+
+
+def profile_imports(module: str = "backend.main") -> list[ImportTiming]:
+    """
+    在新的解释器中导入 module 并统计各模块导入耗时
+
+    Returns:
+        list: 按单模块耗时（self）降序排列
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{result.stderr[-2000:]}")
+    return sorted(parse_importtime(result.stderr), key=lambda t: t.self_us, reverse=True)
@@ -0,0 +1,579 @@
+"""
+Rosetta FastAPI 后端 - 后台任务队列后端
+
+为 BackgroundTaskManager 提供可插拔的任务存储：
+- MemoryQueueBackend: 进程内优先级堆（默认；也用于携带不可序列化参数的本地任务）
+- RedisQueueBackend: Redis 有序集合，多 worker 共享，进程重启不丢任务
+- DatabaseQueueBackend: task_queue_jobs 表，无 Redis 部署的持久化方案
+
+三个后端语义一致：
+- 优先级高者先出队，同优先级按可执行时间先后
+- claim 后任务在可见性超时内对其他 worker 不可见；worker 崩溃未确认时超时后重新入队
+  （并累加一次尝试次数，避免毒任务无限循环）
+- 重试耗尽的任务进入死信，保留供排查
+
+Example:
+    >>> backend = create_queue_backend()
+    >>> await backend.enqueue(QueuedJob(id="...", name="send_email_task", args=["a@b.c"]))
+    >>> job = await backend.claim("worker-1", visibility_timeout=300)
+    >>> await backend.ack(job)
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import and_, delete, func, or_, select, update
+
+from backend.core.config import settings
+from backend.utils.compat import UTC
+
+logger = logging.getLogger(__name__)
+
+# 死信列表保留上限（Redis / 内存后端）
+DEAD_LETTER_LIMIT = 1000
+
+
+@dataclass
+class QueuedJob:
+    """
+    队列中的任务
+
+    Attributes:
+        id: 任务 ID（与 TaskResult.task_id 相同）
+        name: 已注册的任务函数名
+        args: 位置参数（持久化后端要求可 JSON 序列化）
+        kwargs: 关键字参数
+        priority: 优先级，数值越大越先执行
+        max_retries: 最大重试次数
+        timeout: 单次执行超时（秒）
+        attempts: 已失败的尝试次数
+        available_at: 最早可执行时间（epoch 秒）
+        metadata: 任务元数据
+        last_error: 最后一次错误
+    """
+
+    id: str
+    name: str
+    args: list[Any] = field(default_factory=list)
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    priority: int = 0
+    max_retries: int = 3
+    timeout: float | None = None
+    attempts: int = 0
+    available_at: float = field(default_factory=time.time)
+    created_at: float = field(default_factory=time.time)
+    metadata: dict[str, Any] = field(default_factory=dict)
+    last_error: str | None = None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "QueuedJob":
+        data = json.loads(raw)
+        # Redis Lua cjson 会把空数组编码成 {}
+        data["args"] = list(data.get("args") or [])
+        data["kwargs"] = dict(data.get("kwargs") or {})
+        return cls(**data)
+
+
+class QueueBackend(ABC):
+    """
+    任务队列后端抽象
+
+    Attributes:
+        durable: 是否跨进程持久化（决定任务参数是否必须可序列化）
+    """
+
+    durable: bool = False
+
+    @abstractmethod
+    async def enqueue(self, job: QueuedJob) -> None:
+        """入队"""
+
+    @abstractmethod
+    async def claim(self, worker_id: str, visibility_timeout: float) -> QueuedJob | None:
+        """领取一个可执行任务，没有则返回 None"""
+
+    @abstractmethod
+    async def extend(self, job: QueuedJob, visibility_timeout: float) -> None:
+        """延长已领取任务的可见性超时（长任务心跳）"""
+
+    @abstractmethod
+    async def ack(self, job: QueuedJob) -> None:
+        """确认完成并移除"""
+
+    @abstractmethod
+    async def retry(self, job: QueuedJob, delay: float) -> None:
+        """释放已领取任务，delay 秒后重新可执行"""
+
+    @abstractmethod
+    async def dead_letter(self, job: QueuedJob) -> None:
+        """移入死信"""
+
+    @abstractmethod
+    async def remove(self, job_id: str) -> bool:
+        """移除尚未执行的任务（取消）"""
+
+    @abstractmethod
+    async def dead_letters(self, limit: int = 100) -> list[QueuedJob]:
+        """最近的死信任务"""
+
+    @abstractmethod
+    async def stats(self) -> dict[str, int]:
+        """队列统计：queued / running / dead"""
+
+
+# ==================== 内存后端 ====================
+
+
+class MemoryQueueBackend(QueueBackend):
+    """进程内优先级堆，重启即丢失"""
+
+    durable = False
+
+    def __init__(self) -> None:
+        self._ready: list[tuple[int, float, int, str]] = []
+        self._delayed: list[tuple[float, int, str]] = []
+        self._jobs: dict[str, QueuedJob] = {}
+        self._inflight: set[str] = set()
+        self._dead: list[QueuedJob] = []
+        self._seq = itertools.count()
+
+    def _push(self, job: QueuedJob) -> None:
+        if job.available_at > time.time():
+            heapq.heappush(self._delayed, (job.available_at, next(self._seq), job.id))
+        else:
+            heapq.heappush(self._ready, (-job.priority, job.available_at, next(self._seq), job.id))
+
+    async def enqueue(self, job: QueuedJob) -> None:
+        self._jobs[job.id] = job
+        self._push(job)
+
+    async def claim(self, worker_id: str, visibility_timeout: float) -> QueuedJob | None:
+        now = time.time()
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, job_id = heapq.heappop(self._delayed)
+            job = self._jobs.get(job_id)
+            if job is not None:
+                heapq.heappush(
+                    self._ready, (-job.priority, job.available_at, next(self._seq), job_id)
+                )
+        while self._ready:
+            _, _, _, job_id = heapq.heappop(self._ready)
+            job = self._jobs.get(job_id)
+            # 已取消的任务只从 _jobs 移除，堆中的残留在这里跳过
+            if job is not None and job_id not in self._inflight:
+                self._inflight.add(job_id)
+                return job
+        return None
+
+    async def extend(self, job: QueuedJob, visibility_timeout: float) -> None:
+        return None
+
+    async def ack(self, job: QueuedJob) -> None:
+        self._inflight.discard(job.id)
+        self._jobs.pop(job.id, None)
+
+    async def retry(self, job: QueuedJob, delay: float) -> None:
+        self._inflight.discard(job.id)
+        job.available_at = time.time() + delay
+        self._jobs[job.id] = job
+        self._push(job)
+
+    async def dead_letter(self, job: QueuedJob) -> None:
+        await self.ack(job)
+        self._dead.append(job)
+        del self._dead[:-DEAD_LETTER_LIMIT]
+
+    async def remove(self, job_id: str) -> bool:
+        if job_id in self._inflight:
+            return False
+        return self._jobs.pop(job_id, None) is not None
+
+    async def dead_letters(self, limit: int = 100) -> list[QueuedJob]:
+        return list(reversed(self._dead[-limit:]))
+
+    async def stats(self) -> dict[str, int]:
+        return {
+            "queued": len(self._jobs) - len(self._inflight),
+            "running": len(self._inflight),
+            "dead": len(self._dead),
+        }
+
+
+# ==================== Redis 后端 ====================
+
+# KEYS: ready, delayed, inflight, jobs, ranks
+# ARGV: now, visible_until
+# 1. 到期的延迟任务 → ready
+# 2. 可见性超时的在途任务 → ready（attempts + 1）
+# 3. ZPOPMIN ready → inflight
+_CLAIM_SCRIPT = """
+local now = tonumber(ARGV[1])
+local due = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now, 'LIMIT', 0, 100)
+for _, id in ipairs(due) do
+  redis.call('ZREM', KEYS[2], id)
+  redis.call('ZADD', KEYS[1], tonumber(redis.call('HGET', KEYS[5], id) or 0), id)
+end
+local expired = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now, 'LIMIT', 0, 100)
+for _, id in ipairs(expired) do
+  redis.call('ZREM', KEYS[3], id)
+  local raw = redis.call('HGET', KEYS[4], id)
+  if raw then
+    local job = cjson.decode(raw)
+    job['attempts'] = (job['attempts'] or 0) + 1
+    job['last_error'] = 'visibility timeout expired'
+    redis.call('HSET', KEYS[4], id, cjson.encode(job))
+    redis.call('ZADD', KEYS[1], tonumber(redis.call('HGET', KEYS[5], id) or 0), id)
+  end
+end
+while true do
+  local popped = redis.call('ZPOPMIN', KEYS[1])
+  if #popped == 0 then
+    return false
+  end
+  local id = popped[1]
+  local raw = redis.call('HGET', KEYS[4], id)
+  if raw then
+    redis.call('ZADD', KEYS[3], tonumber(ARGV[2]), id)
+    return raw
+  end
+end
+"""
+
+
+def _rank(job: QueuedJob) -> float:
+    """ready 集合分数：优先级高者在前，同优先级按入队时间（毫秒）"""
+    return -job.priority * 1e13 + job.created_at * 1000
+
+
+class RedisQueueBackend(QueueBackend):
+    """
+    Redis 有序集合队列
+
+    - {prefix}:ready     ZSET  可执行任务，分数见 _rank
+    - {prefix}:delayed   ZSET  等待重试的任务，分数为可执行时间
+    - {prefix}:inflight  ZSET  已领取任务，分数为可见性截止时间
+    - {prefix}:jobs      HASH  任务 JSON
+    - {prefix}:ranks     HASH  任务 ready 分数（延迟 / 超时重新入队时使用）
+    - {prefix}:dead      LIST  死信（最近 DEAD_LETTER_LIMIT 条）
+    """
+
+    durable = True
+
+    def __init__(self, redis_url: str | None = None, prefix: str = "rosetta:taskq") -> None:
+        self._redis_url = redis_url or settings.redis_url
+        self._prefix = prefix
+        self._client = None
+        self._claim_script = None
+
+    def _key(self, name: str) -> str:
+        return f"{self._prefix}:{name}"
+
+    async def _get_client(self):
+        if self._client is None:
+            import redis.asyncio as redis
+
+            self._client = redis.from_url(self._redis_url, encoding="utf-8", decode_responses=True)
+            self._claim_script = self._client.register_script(_CLAIM_SCRIPT)
+        return self._client
+
+    async def enqueue(self, job: QueuedJob) -> None:
+        client = await self._get_client()
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.hset(self._key("jobs"), job.id, job.to_json())
+            pipe.hset(self._key("ranks"), job.id, _rank(job))
+            if job.available_at > time.time():
+                pipe.zadd(self._key("delayed"), {job.id: job.available_at})
+            else:
+                pipe.zadd(self._key("ready"), {job.id: _rank(job)})
+            await pipe.execute()
+
+    async def claim(self, worker_id: str, visibility_timeout: float) -> QueuedJob | None:
+        await self._get_client()
+        now = time.time()
+        raw = await self._claim_script(
+            keys=[
+                self._key("ready"),
+                self._key("delayed"),
+                self._key("inflight"),
+                self._key("jobs"),
+                self._key("ranks"),
+            ],
+            args=[now, now + visibility_timeout],
+        )
+        return QueuedJob.from_json(raw) if raw else None
+
+    async def extend(self, job: QueuedJob, visibility_timeout: float) -> None:
+        client = await self._get_client()
+        await client.zadd(
+            self._key("inflight"), {job.id: time.time() + visibility_timeout}, xx=True
+        )
+
+    async def ack(self, job: QueuedJob) -> None:
+        client = await self._get_client()
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self._key("inflight"), job.id)
+            pipe.hdel(self._key("jobs"), job.id)
+            pipe.hdel(self._key("ranks"), job.id)
+            await pipe.execute()
+
+    async def retry(self, job: QueuedJob, delay: float) -> None:
+        client = await self._get_client()
+        job.available_at = time.time() + delay
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self._key("inflight"), job.id)
+            pipe.hset(self._key("jobs"), job.id, job.to_json())
+            pipe.zadd(self._key("delayed"), {job.id: job.available_at})
+            await pipe.execute()
+
+    async def dead_letter(self, job: QueuedJob) -> None:
+        client = await self._get_client()
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self._key("inflight"), job.id)
+            pipe.hdel(self._key("jobs"), job.id)
+            pipe.hdel(self._key("ranks"), job.id)
+            pipe.lpush(self._key("dead"), job.to_json())
+            pipe.ltrim(self._key("dead"), 0, DEAD_LETTER_LIMIT - 1)
+            await pipe.execute()
+
+    async def remove(self, job_id: str) -> bool:
+        client = await self._get_client()
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self._key("ready"), job_id)
+            pipe.zrem(self._key("delayed"), job_id)
+            results = await pipe.execute()
+        if not any(results):
+            return False
+        await client.hdel(self._key("jobs"), job_id)
+        await client.hdel(self._key("ranks"), job_id)
+        return True
+
+    async def dead_letters(self, limit: int = 100) -> list[QueuedJob]:
+        client = await self._get_client()
+        return [
+            QueuedJob.from_json(raw) for raw in await client.lrange(self._key("dead"), 0, limit - 1)
+        ]
+
+    async def stats(self) -> dict[str, int]:
+        client = await self._get_client()
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.zcard(self._key("ready"))
+            pipe.zcard(self._key("delayed"))
+            pipe.zcard(self._key("inflight"))
+            pipe.llen(self._key("dead"))
+            ready, delayed, inflight, dead = await pipe.execute()
+        return {"queued": ready + delayed, "running": inflight, "dead": dead}
+
+
+# ==================== 数据库后端 ====================
+
+
+def _to_dt(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, tz=UTC)
+
+
+class DatabaseQueueBackend(QueueBackend):
+    """
+    task_queue_jobs 表队列
+
+    领取使用乐观更新（UPDATE ... WHERE id = :id AND 仍可领取），PostgreSQL 上
+    候选行额外加 FOR UPDATE SKIP LOCKED，多 worker 并发领取互不阻塞。
+    """
+
+    durable = True
+
+    # 单次查询的候选任务数，被其他 worker 抢先时依次尝试
+    CLAIM_CANDIDATES = 5
+
+    def _session(self):
+        # 运行时取 session 工厂，兼容 reset_engine 之后的新引擎
+        from backend.core import database
+
+        return database.async_session_maker()
+
+    @staticmethod
+    def _to_job(row) -> QueuedJob:
+        return QueuedJob(
+            id=row.id,
+            name=row.name,
+            args=list(row.args or []),
+            kwargs=dict(row.kwargs or {}),
+            priority=row.priority,
+            max_retries=row.max_retries,
+            timeout=row.timeout,
+            attempts=row.attempts,
+            available_at=row.available_at.timestamp(),
+            created_at=row.created_at.timestamp() if row.created_at else time.time(),
+            metadata=dict(row.meta or {}),
+            last_error=row.last_error,
+        )
+
+    async def enqueue(self, job: QueuedJob) -> None:
+        from backend.models.task_queue import TaskQueueJob
+
+        async with self._session() as session:
+            session.add(
+                TaskQueueJob(
+                    id=job.id,
+                    name=job.name,
+                    args=job.args,
+                    kwargs=job.kwargs,
+                    meta=job.metadata,
+                    priority=job.priority,
+                    max_retries=job.max_retries,
+                    timeout=job.timeout,
+                    attempts=job.attempts,
+                    available_at=_to_dt(job.available_at),
+                )
+            )
+            await session.commit()
+
+    async def claim(self, worker_id: str, visibility_timeout: float) -> QueuedJob | None:
+        from backend.models.task_queue import TaskQueueJob as J
+
+        now = datetime.now(UTC)
+        queued = and_(J.status == "queued", J.available_at <= now)
+        expired = and_(J.status == "running", J.locked_until < now)
+
+        async with self._session() as session:
+            stmt = (
+                select(J.id, J.status)
+                .where(or_(queued, expired))
+                .order_by(J.priority.desc(), J.available_at)
+                .limit(self.CLAIM_CANDIDATES)
+            )
+            if session.get_bind().dialect.name == "postgresql":
+                stmt = stmt.with_for_update(skip_locked=True)
+            candidates = (await session.execute(stmt)).all()
+
+            for job_id, status in candidates:
+                values: dict[str, Any] = {
+                    "status": "running",
+                    "locked_by": worker_id,
+                    "locked_until": now + timedelta(seconds=visibility_timeout),
+                }
+                if status == "running":
+                    # 可见性超时：上一个 worker 未确认，计为一次失败尝试
+                    values["attempts"] = J.attempts + 1
+                    values["last_error"] = "visibility timeout expired"
+                result = await session.execute(
+                    update(J).where(J.id == job_id, or_(queued, expired)).values(**values)
+                )
+                if result.rowcount == 1:
+                    row = await session.get(J, job_id)
+                    await session.commit()
+                    return self._to_job(row)
+            await session.commit()
+        return None
+
+    async def extend(self, job: QueuedJob, visibility_timeout: float) -> None:
+        from backend.models.task_queue import TaskQueueJob as J
+
+        async with self._session() as session:
+            await session.execute(
+                update(J)
+                .where(J.id == job.id, J.status == "running")
+                .values(locked_until=datetime.now(UTC) + timedelta(seconds=visibility_timeout))
+            )
+            await session.commit()
+
+    async def ack(self, job: QueuedJob) -> None:
+        from backend.models.task_queue import TaskQueueJob as J
+
+        async with self._session() as session:
+            await session.execute(delete(J).where(J.id == job.id))
+            await session.commit()
+
+    async def retry(self, job: QueuedJob, delay: float) -> None:
+        from backend.models.task_queue import TaskQueueJob as J
+
+        job.available_at = time.time() + delay
+        async with self._session() as session:
+            await session.execute(
+                update(J)
+                .where(J.id == job.id)
+                .values(
+                    status="queued",
+                    attempts=job.attempts,
+                    last_error=job.last_error,
+                    available_at=_to_dt(job.available_at),
+                    locked_by=None,
+                    locked_until=None,
+                )
+            )
+            await session.commit()
+
+    async def dead_letter(self, job: QueuedJob) -> None:
+        from backend.models.task_queue import TaskQueueJob as J
+
+        async with self._session() as session:
+            await session.execute(
+                update(J)
+                .where(J.id == job.id)
+                .values(
+                    status="dead",
+                    attempts=job.attempts,
+                    last_error=job.last_error,
+                    locked_by=None,
+                    locked_until=None,
+                )
+            )
+            await session.commit()
+
+    async def remove(self, job_id: str) -> bool:
+        from backend.models.task_queue import TaskQueueJob as J
+
+        async with self._session() as session:
+            result = await session.execute(delete(J).where(J.id == job_id, J.status == "queued"))
+            await session.commit()
+        return result.rowcount == 1
+
+    async def dead_letters(self, limit: int = 100) -> list[QueuedJob]:
+        from backend.models.task_queue import TaskQueueJob as J
+
+        async with self._session() as session:
+            rows = await session.execute(
+                select(J).where(J.status == "dead").order_by(J.updated_at.desc()).limit(limit)
+            )
+            return [self._to_job(row) for row in rows.scalars().all()]
+
+    async def stats(self) -> dict[str, int]:
+        from backend.models.task_queue import TaskQueueJob as J
+
+        async with self._session() as session:
+            rows = await session.execute(select(J.status, func.count()).group_by(J.status))
+            counts = dict(rows.all())
+        return {
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "dead": counts.get("dead", 0),
+        }
+
+
+def create_queue_backend(kind: str | None = None) -> QueueBackend:
+    """
+    按配置创建队列后端
+
+    Args:
+        kind: auto / memory / redis / database，默认读取 settings.task_queue_backend
+
+    Returns:
+        QueueBackend: 队列后端实例
+    """
+    kind = kind or settings.task_queue_backend
+    if kind == "auto":
+        kind = "redis" if settings.redis_enabled else "database"
+    if kind == "redis":
+        return RedisQueueBackend()
+    if kind == "database":
+        return DatabaseQueueBackend()
+    return MemoryQueueBackend()
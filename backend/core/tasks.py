@@ -3,8 +3,9 @@ Rosetta FastAPI 后端 - 后台任务管理模块
 
 提供后台任务管理功能，包括：
 - 任务状态追踪
-- 任务队列管理
-- 任务执行和重试
+- 任务队列管理（可插拔后端：内存 / Redis / 数据库表，见 core.task_queue）
+- 并发上限与优先级
+- 任务执行和指数退避重试、死信
 - 任务超时处理
 
 Example:
@@ -23,14 +24,21 @@ Example:
 
 import asyncio
 import functools
+import json
 import logging
+import os
+import socket
+import time
 import uuid
 from collections.abc import Callable, Coroutine
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from enum import StrEnum
 from typing import Any, TypeVar
 
+from backend.core.config import settings
+from backend.core.task_queue import MemoryQueueBackend, QueueBackend, QueuedJob
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
@@ -145,17 +153,25 @@ class BackgroundTaskManager:
     """
     后台任务管理器
 
-    管理后台任务的执行、状态追踪和重试机制。
+    管理后台任务的执行、状态追踪和重试机制。任务先进入队列后端，再由
+    本进程按优先级、在 max_concurrent_tasks 并发上限内领取执行：
+
+    - 已注册（register_function / background_task）且参数可 JSON 序列化的任务
+      进入持久化后端（Redis / 数据库表），重启不丢失，其他 worker 也可领取
+    - 其余任务（闭包、绑定方法、不可序列化参数）进入进程内队列
+    - 失败按指数退避重试，重试耗尽或超时的任务进入死信
 
     Attributes:
         max_concurrent_tasks: 最大并发任务数
         default_timeout: 默认超时时间（秒）
         default_max_retries: 默认最大重试次数
-        retry_delay: 重试延迟（秒）
+        retry_delay: 首次重试延迟（秒），之后每次翻倍
+        max_retry_delay: 重试延迟上限（秒）
+        visibility_timeout: 持久化任务领取后的可见性超时（秒）
 
     Example:
         >>> manager = BackgroundTaskManager()
-        >>> task_id = await manager.submit(my_task, arg1, arg2)
+        >>> task_id = await manager.submit(my_task, arg1, arg2, priority=5)
         >>> status = manager.get_task_status(task_id)
     """
 
@@ -165,17 +181,49 @@ class BackgroundTaskManager:
         default_timeout: float = 300.0,
         default_max_retries: int = 3,
         retry_delay: float = 1.0,
+        max_retry_delay: float = 300.0,
+        visibility_timeout: float = 300.0,
+        backend: QueueBackend | None = None,
+        poll_interval: float = 1.0,
     ):
         self.max_concurrent_tasks = max_concurrent_tasks
         self.default_timeout = default_timeout
         self.default_max_retries = default_max_retries
         self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
 
         self._tasks: dict[str, TaskResult] = {}
         self._running_tasks: dict[str, asyncio.Task] = {}
         self._registered_functions: dict[str, Callable] = {}
         self._lock = asyncio.Lock()
 
+        self._local = MemoryQueueBackend()
+        self._backend: QueueBackend = backend or self._local
+        self._local_calls: dict[str, tuple[Callable, tuple, dict]] = {}
+        self._pump_task: asyncio.Task | None = None
+        self._kicked = False
+        self._dispatcher: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    @property
+    def backend(self) -> QueueBackend:
+        """持久化队列后端（未配置时为进程内队列）"""
+        return self._backend
+
+    def configure(self, backend: QueueBackend) -> None:
+        """
+        设置持久化队列后端
+
+        Args:
+            backend: 队列后端
+        """
+        self._backend = backend
+        logger.info(f"后台任务队列后端: {type(backend).__name__}")
+
     def register_function(self, name: str, func: Callable) -> None:
         """
         注册任务函数
@@ -196,6 +244,16 @@ class BackgroundTaskManager:
         """
         return list(self._registered_functions.keys())
 
+    def _is_durable(self, name: str, func: Callable, args: tuple, kwargs: dict) -> bool:
+        """任务能否进入持久化后端：函数已按名注册，且参数可 JSON 往返"""
+        if not self._backend.durable or self._registered_functions.get(name) is not func:
+            return False
+        try:
+            json.dumps([args, kwargs])
+        except (TypeError, ValueError):
+            return False
+        return True
+
     async def submit(
         self,
         func: Callable[..., Coroutine[Any, Any, T]],
@@ -204,6 +262,8 @@ class BackgroundTaskManager:
         timeout: float | None = None,
         max_retries: int | None = None,
         metadata: dict[str, Any] | None = None,
+        priority: int = 0,
+        delay: float = 0.0,
         **kwargs: Any,
     ) -> str:
         """
@@ -216,6 +276,8 @@ class BackgroundTaskManager:
             timeout: 超时时间（秒）
             max_retries: 最大重试次数
             metadata: 任务元数据
+            priority: 优先级，数值越大越先执行
+            delay: 延迟执行（秒）
             **kwargs: 关键字参数
 
         Returns:
@@ -227,111 +289,221 @@ class BackgroundTaskManager:
         task_result = TaskResult(
             task_id=task_id,
             name=task_name,
-            timeout=timeout or self.default_timeout,
-            max_retries=max_retries or self.default_max_retries,
-            metadata=metadata or {},
+            timeout=timeout if timeout is not None else self.default_timeout,
+            max_retries=max_retries if max_retries is not None else self.default_max_retries,
+            metadata=metadata if metadata is not None else {},
+        )
+        job = QueuedJob(
+            id=task_id,
+            name=task_name,
+            priority=priority,
+            max_retries=task_result.max_retries,
+            timeout=task_result.timeout,
+            available_at=time.time() + delay,
+            metadata=task_result.metadata,
         )
 
         async with self._lock:
             self._tasks[task_id] = task_result
 
-        async def run_task() -> None:
-            """执行任务的内部函数"""
-            await self._execute_task(task_id, func, *args, **kwargs)
+        if self._is_durable(task_name, func, args, kwargs):
+            job.args, job.kwargs = list(args), dict(kwargs)
+            await self._backend.enqueue(job)
+        else:
+            self._local_calls[task_id] = (func, args, kwargs)
+            await self._local.enqueue(job)
 
-        task = asyncio.create_task(run_task())
-        self._running_tasks[task_id] = task
+        if delay > 0:
+            asyncio.get_running_loop().call_later(delay, self._kick)
+        self._kick()
 
-        task.add_done_callback(lambda t: self._cleanup_task(task_id))
-
-        logger.info(f"提交后台任务: {task_name} (ID: {task_id})")
+        logger.info(f"提交后台任务: {task_name} (ID: {task_id}, 优先级: {priority})")
         return task_id
 
-    async def _execute_task(
-        self,
-        task_id: str,
-        func: Callable[..., Coroutine[Any, Any, T]],
-        *args: Any,
-        **kwargs: Any,
-    ) -> None:
+    def _kick(self) -> None:
+        """唤醒调度：有常驻调度循环时通知它，否则就地启动领取直到队列空闲"""
+        if self._stopping:
+            return
+        if self._dispatcher is not None and not self._dispatcher.done():
+            self._wakeup.set()
+            return
+        self._kicked = True
+        loop = asyncio.get_running_loop()
+        task = self._pump_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._pump_task = loop.create_task(self._pump_until_idle())
+
+    async def _pump_until_idle(self) -> None:
+        while self._kicked:
+            self._kicked = False
+            await self._pump()
+
+    async def _claim(self) -> tuple[QueuedJob, QueueBackend] | None:
+        """先领取本地任务，再领取持久化任务"""
+        job = await self._local.claim(self.worker_id, self.visibility_timeout)
+        if job is not None:
+            return job, self._local
+        if self._backend is not self._local:
+            job = await self._backend.claim(self.worker_id, self.visibility_timeout)
+            if job is not None:
+                return job, self._backend
+        return None
+
+    async def _pump(self) -> None:
+        """在并发上限内持续领取并启动任务"""
+        while not self._stopping and len(self._running_tasks) < self.max_concurrent_tasks:
+            try:
+                claimed = await self._claim()
+            except Exception as e:
+                logger.warning(f"领取后台任务失败: {e}")
+                return
+            if claimed is None:
+                return
+            job, backend = claimed
+            self._running_tasks[job.id] = asyncio.create_task(self._execute_task(job, backend))
+
+    async def _heartbeat(self, job: QueuedJob, backend: QueueBackend) -> None:
+        """持久化任务执行期间定期延长可见性超时，防止被其他 worker 重复领取"""
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 2)
+            try:
+                await backend.extend(job, self.visibility_timeout)
+            except Exception as e:
+                logger.warning(f"延长任务可见性失败: {job.name} (ID: {job.id}): {e}")
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.retry_delay * 2 ** (attempt - 1), self.max_retry_delay)
+
+    async def _execute_task(self, job: QueuedJob, backend: QueueBackend) -> None:
         """
         执行任务（内部方法）
 
         Args:
-            task_id: 任务 ID
-            func: 要执行的函数
-            *args: 位置参数
-            **kwargs: 关键字参数
+            job: 已领取的任务
+            backend: 任务所在的队列后端
         """
+        task_id = job.id
         task_result = self._tasks.get(task_id)
-        if not task_result:
-            return
+        if task_result is None:
+            # 由其他进程提交、被本进程领取的持久化任务
+            task_result = TaskResult(
+                task_id=task_id,
+                name=job.name,
+                max_retries=job.max_retries,
+                timeout=job.timeout,
+                metadata=job.metadata,
+            )
+            self._tasks[task_id] = task_result
+        task_result.retries = job.attempts
 
-        task_result.status = TaskStatus.RUNNING
-        task_result.started_at = datetime.now()
+        if task_id in self._local_calls:
+            func, args, kwargs = self._local_calls[task_id]
+        else:
+            func = self._registered_functions.get(job.name)
+            args, kwargs = tuple(job.args), job.kwargs
 
-        while task_result.retries <= task_result.max_retries:
-            try:
-                if task_result.timeout:
-                    result = await asyncio.wait_for(
-                        func(*args, **kwargs),
-                        timeout=task_result.timeout,
-                    )
-                else:
-                    result = await func(*args, **kwargs)
-
-                task_result.result = result
-                task_result.status = TaskStatus.COMPLETED
-                task_result.completed_at = datetime.now()
-                logger.info(
-                    f"任务执行成功: {task_result.name} (ID: {task_id}, "
-                    f"耗时: {task_result.duration:.2f}s)"
-                )
-                return
+        heartbeat = None
+        try:
+            if func is None:
+                raise LookupError(f"未注册的任务函数: {job.name}")
+            if job.attempts > job.max_retries:
+                raise RuntimeError(job.last_error or "重试次数已耗尽")
+
+            task_result.status = TaskStatus.RUNNING
+            task_result.started_at = task_result.started_at or datetime.now()
+            if backend.durable:
+                heartbeat = asyncio.create_task(self._heartbeat(job, backend))
+
+            if job.timeout:
+                result = await asyncio.wait_for(func(*args, **kwargs), timeout=job.timeout)
+            else:
+                result = await func(*args, **kwargs)
+
+            task_result.result = result
+            task_result.status = TaskStatus.COMPLETED
+            task_result.completed_at = datetime.now()
+            await backend.ack(job)
+            self._local_calls.pop(task_id, None)
+            logger.info(
+                f"任务执行成功: {task_result.name} (ID: {task_id}, "
+                f"耗时: {task_result.duration:.2f}s)"
+            )
 
-            except TimeoutError:
-                task_result.status = TaskStatus.TIMEOUT
-                task_result.error = f"任务执行超时（{task_result.timeout}秒）"
-                task_result.completed_at = datetime.now()
-                logger.warning(f"任务执行超时: {task_result.name} (ID: {task_id})")
-                return
+        except TimeoutError:
+            task_result.status = TaskStatus.TIMEOUT
+            task_result.error = f"任务执行超时（{job.timeout}秒）"
+            task_result.completed_at = datetime.now()
+            job.last_error = task_result.error
+            await backend.dead_letter(job)
+            self._local_calls.pop(task_id, None)
+            logger.warning(f"任务执行超时: {task_result.name} (ID: {task_id})")
 
-            except asyncio.CancelledError:
+        except asyncio.CancelledError:
+            if self._stopping and backend.durable:
+                # 进程关闭：持久化任务立即放回队列，由下一个 worker 接手
+                await backend.retry(job, 0)
+                task_result.status = TaskStatus.PENDING
+                logger.info(f"任务已放回队列: {task_result.name} (ID: {task_id})")
+            else:
+                await backend.ack(job)
+                self._local_calls.pop(task_id, None)
                 task_result.status = TaskStatus.CANCELLED
                 task_result.error = "任务被取消"
                 task_result.completed_at = datetime.now()
                 logger.info(f"任务被取消: {task_result.name} (ID: {task_id})")
-                return
 
-            except Exception as e:
-                task_result.retries += 1
-                task_result.error = str(e)
-
-                if task_result.retries <= task_result.max_retries:
-                    logger.warning(
-                        f"任务执行失败，准备重试: {task_result.name} "
-                        f"(ID: {task_id}, 重试: {task_result.retries}/{task_result.max_retries}), "
-                        f"错误: {e}"
-                    )
-                    await asyncio.sleep(self.retry_delay * task_result.retries)
-                else:
-                    task_result.status = TaskStatus.FAILED
-                    task_result.completed_at = datetime.now()
-                    logger.error(
-                        f"任务执行失败（已重试{task_result.max_retries}次）: "
-                        f"{task_result.name} (ID: {task_id}), 错误: {e}"
-                    )
-                    return
+        except Exception as e:
+            job.attempts += 1
+            job.last_error = str(e)
+            task_result.retries = job.attempts
+            task_result.error = str(e)
+
+            if job.attempts <= job.max_retries and func is not None:
+                delay = self._backoff(job.attempts)
+                task_result.status = TaskStatus.PENDING
+                await backend.retry(job, delay)
+                asyncio.get_running_loop().call_later(delay, self._kick)
+                logger.warning(
+                    f"任务执行失败，{delay:.1f}s 后重试: {task_result.name} "
+                    f"(ID: {task_id}, 重试: {job.attempts}/{job.max_retries}), "
+                    f"错误: {e}"
+                )
+            else:
+                task_result.status = TaskStatus.FAILED
+                task_result.completed_at = datetime.now()
+                await backend.dead_letter(job)
+                self._local_calls.pop(task_id, None)
+                logger.error(
+                    f"任务执行失败（已重试{job.max_retries}次），移入死信: "
+                    f"{task_result.name} (ID: {task_id}), 错误: {e}"
+                )
 
-    def _cleanup_task(self, task_id: str) -> None:
-        """
-        清理已完成的任务
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+            self._running_tasks.pop(task_id, None)
+            self._kick()
+
+    async def _dispatch_loop(self) -> None:
+        """常驻调度循环：定期领取持久化队列中的任务（含其他进程提交和到期重试）"""
+        while not self._stopping:
+            self._wakeup.clear()
+            await self._pump()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except TimeoutError:
+                pass
 
-        Args:
-            task_id: 任务 ID
-        """
-        if task_id in self._running_tasks:
-            del self._running_tasks[task_id]
+    async def start(self) -> None:
+        """启动常驻调度循环（应用启动时调用）"""
+        if self._dispatcher is not None and not self._dispatcher.done():
+            return
+        self._stopping = False
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+        logger.info(
+            f"后台任务 worker 已启动: {self.worker_id} "
+            f"(并发: {self.max_concurrent_tasks}, 后端: {type(self._backend).__name__})"
+        )
 
     def get_task_status(self, task_id: str) -> TaskResult | None:
         """
@@ -381,6 +553,8 @@ class BackgroundTaskManager:
         """
         取消任务
 
+        排队中的任务直接出队；运行中的任务被取消。
+
         Args:
             task_id: 任务 ID
 
@@ -388,7 +562,17 @@ class BackgroundTaskManager:
             bool: 是否成功取消
         """
         if task_id not in self._running_tasks:
-            return False
+            removed = await self._local.remove(task_id)
+            if not removed and self._backend is not self._local:
+                removed = await self._backend.remove(task_id)
+            if removed:
+                self._local_calls.pop(task_id, None)
+                task_result = self._tasks.get(task_id)
+                if task_result is not None:
+                    task_result.status = TaskStatus.CANCELLED
+                    task_result.error = "任务被取消"
+                    task_result.completed_at = datetime.now()
+            return removed
 
         task = self._running_tasks[task_id]
         task.cancel()
@@ -400,6 +584,33 @@ class BackgroundTaskManager:
 
         return True
 
+    async def dead_letters(self, limit: int = 100) -> list[dict[str, Any]]:
+        """
+        获取死信任务（本地与持久化后端）
+
+        Args:
+            limit: 返回数量限制
+
+        Returns:
+            list[dict]: 死信任务
+        """
+        jobs = await self._local.dead_letters(limit)
+        if self._backend is not self._local:
+            jobs += await self._backend.dead_letters(limit)
+        return [asdict(job) for job in jobs[:limit]]
+
+    async def queue_stats(self) -> dict[str, Any]:
+        """
+        获取队列统计（本地与持久化后端）
+
+        Returns:
+            dict: 各后端的 queued / running / dead 计数
+        """
+        stats = {"local": await self._local.stats()}
+        if self._backend is not self._local:
+            stats[type(self._backend).__name__] = await self._backend.stats()
+        return stats
+
     def clear_completed_tasks(self, max_age_hours: int = 24) -> int:
         """
         清理已完成的任务
@@ -480,13 +691,23 @@ class BackgroundTaskManager:
         """
         关闭任务管理器
 
-        取消所有正在运行的任务并等待它们完成。
+        停止调度循环，取消所有正在运行的任务并等待它们完成；
+        被中断的持久化任务放回队列，由下一个 worker 接手。
 
         Args:
             timeout: 等待任务完成的最长时间（秒）
         """
         logger.info(f"正在关闭后台任务管理器，{len(self._running_tasks)} 个任务正在运行")
 
+        self._stopping = True
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+
         for task_id, task in list(self._running_tasks.items()):
             task.cancel()
 
@@ -501,10 +722,15 @@ class BackgroundTaskManager:
 
         self._tasks.clear()
         self._running_tasks.clear()
+        self._local_calls.clear()
+        self._stopping = False
         logger.info("后台任务管理器已关闭")
 
 
-task_manager = BackgroundTaskManager()
+task_manager = BackgroundTaskManager(
+    max_concurrent_tasks=settings.task_worker_concurrency,
+    visibility_timeout=settings.task_visibility_timeout,
+)
 
 
 def background_task(
@@ -1,24 +1,43 @@
 """
 XSS 输入过滤（bleach 依赖不存在，手写正则 allowlist 清洗）
 
-策略：
-1. 粗过滤（正则剔除）：<script>...</script> / <iframe>... / onxxx="..." / onxxx='...' / javascript:
-2. allowlist 二次清洗：
+策略（sanitize_html，单遍）：
+1. 一个正则把文本切成 文本 / 注释 / 标签 三类 token，边切分边按 allowlist 输出
+2. 危险标签（script/iframe/object/embed/link/meta）转义成可见文本，保留原文便于审计
+3. allowlist：
    允许 tags：a, abbr, b, blockquote, code, em, h1, h2, h3, h4, h5, h6, i, li, ol, p, pre,
                strong, ul, br, img
    属性白名单：
      全局：class, id, alt, title
      a：href (必须 http(s)/mailto)、target="_blank"（强制 rel="noopener noreferrer"）
      img：src (http(s)/data:)、alt、title
+   其余标签与注释丢弃（保留其中文本），未闭合的标签在末尾补齐
+4. 服务端渲染的文章 HTML 使用 sanitize_post_html，allowlist 额外允许表格、分隔线、
+   删除线等 Markdown 产物
+5. 结果按内容的 SHA-256 摘要缓存（最多 SANITIZE_CACHE_SIZE 条、结果合计不超过
+   SANITIZE_CACHE_MAX_BYTES 字符，超过 SANITIZE_CACHE_MAX_LENGTH 的文本不缓存）；
+   sanitize_many 供批量清洗调用，同批内重复文本只清洗一次
+
+旧的多遍实现（正则粗过滤 + HTMLParser 二次清洗）保留为 sanitize_html_multipass，
+供基准对比（python -m backend.scripts.bench_sanitizer）。
 """
 
 from __future__ import annotations
 
+import hashlib
 import re
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
 from html import escape as _html_escape
+from html import unescape as _html_unescape
 from html.parser import HTMLParser
 from urllib.parse import urlparse
 
+SANITIZE_CACHE_SIZE = 4096
+SANITIZE_CACHE_MAX_LENGTH = 32 * 1024
+SANITIZE_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
 
 def _escape_dangerous_tag_names(text: str) -> str:
     """把危险标签（script/iframe/object/embed/link/meta）的尖括号转义成实体，
@@ -244,8 +263,8 @@ class _AllowlistParser(HTMLParser):
         return out
 
 
-def sanitize_html(text: str) -> str:
-    """清除 XSS payload，返回安全 HTML 文本（allowlist 二次清洗）。"""
+def sanitize_html_multipass(text: str) -> str:
+    """旧的多遍实现：正则粗过滤后再经 HTMLParser 二次清洗（仅用于基准对比）"""
     if text is None:
         return ""
     if not isinstance(text, str):
@@ -259,3 +278,208 @@ def sanitize_html(text: str) -> str:
     except Exception:
         cleaned = stripped
     return cleaned
+
+
+# --- 单遍清洗 ---
+_DANGEROUS_TAGS = frozenset({"script", "iframe", "object", "embed", "link", "meta"})
+_VOID_TAGS = frozenset({"br", "img", "hr"})
+
+# 文章正文（服务端渲染的 Markdown）在评论 allowlist 基础上允许表格、分隔线、删除线等
+_POST_ALLOWED_TAGS = frozenset(
+    _ALLOWED_TAGS
+    | {"hr", "table", "thead", "tbody", "tr", "th", "td", "del", "s", "sup", "sub", "kbd"}
+)
+_POST_ATTRS_BY_TAG = {**_ATTRS_BY_TAG, "th": {"style"}, "td": {"style"}, "ol": {"start"}}
+_SAFE_STYLE_RE = re.compile(r"(?i)^\s*text-align\s*:\s*(left|right|center)\s*;?\s*$")
+
+# 注释 / 声明 / 处理指令 / 标签（属性值中的引号内允许出现 >）
+_TOKEN_RE = re.compile(
+    r"<!--.*?(?:-->|\Z)"
+    r"|<[!?][^>]*>?"
+    r"|<(/?)([a-zA-Z][\w:-]*)((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>",
+    re.S,
+)
+_ATTR_RE = re.compile(r"([^\s\"'>/=]+)(?:\s*=\s*(\"[^\"]*\"|'[^']*'|[^\s\"'>]+))?")
+
+
+def _clean_attrs(tag: str, chunk: str, attrs_by_tag: dict[str, set[str]]) -> str:
+    """按 allowlist 重建属性；属性值先反转义再校验，避免实体编码绕过"""
+    allowed = _GLOBAL_ATTRS | attrs_by_tag.get(tag, set())
+    rebuilt = []
+    add_rel = False
+    for m in _ATTR_RE.finditer(chunk):
+        name = m.group(1).lower()
+        if name not in allowed or (tag == "a" and name == "rel"):
+            continue
+        raw = m.group(2)
+        if raw is None:
+            rebuilt.append(name)
+            continue
+        if raw[:1] in ("'", '"'):
+            raw = raw[1:-1]
+        value = _html_unescape(raw)
+        if tag == "a" and name == "href" and not _is_safe_href(value):
+            continue
+        if tag == "img" and name == "src" and not _is_safe_src(value):
+            continue
+        if name == "style" and not _SAFE_STYLE_RE.match(value):
+            continue
+        if tag == "a" and name == "target":
+            if value.lower() != "_blank":
+                continue
+            add_rel = True
+        rebuilt.append(f'{name}="{_html_escape(value, quote=True)}"')
+    if add_rel:
+        rebuilt.append('rel="noopener noreferrer"')
+    return (" " + " ".join(rebuilt)) if rebuilt else ""
+
+
+def _sanitize(
+    text: str,
+    allowed_tags: frozenset[str] | set[str] = _ALLOWED_TAGS,
+    attrs_by_tag: dict[str, set[str]] = _ATTRS_BY_TAG,
+) -> str:
+    out: list[str] = []
+    stack: list[str] = []
+    pos = 0
+    for m in _TOKEN_RE.finditer(text):
+        start = m.start()
+        if start > pos:
+            out.append(text[pos:start].replace("<", "&lt;"))
+        pos = m.end()
+
+        name = m.group(2)
+        if name is None:
+            # 注释、<!DOCTYPE>、<?...?> 丢弃
+            continue
+        tag = name.lower()
+        closing = bool(m.group(1))
+        chunk = m.group(3)
+
+        if tag in _DANGEROUS_TAGS:
+            out.append(f"&lt;{'/' if closing else ''}{name}{_escape_attrs(chunk)}&gt;")
+            continue
+        if tag not in allowed_tags:
+            continue
+        if closing:
+            if tag not in _VOID_TAGS and stack and stack[-1] == tag:
+                stack.pop()
+                out.append(f"</{tag}>")
+            continue
+
+        self_closing = chunk.rstrip().endswith("/")
+        out.append(f"<{tag}{_clean_attrs(tag, chunk, attrs_by_tag)}>")
+        if tag in _VOID_TAGS:
+            continue
+        if self_closing:
+            out.append(f"</{tag}>")
+        else:
+            stack.append(tag)
+
+    if pos < len(text):
+        out.append(text[pos:].replace("<", "&lt;"))
+    while stack:
+        out.append(f"</{stack.pop()}>")
+    return "".join(out)
+
+
+class _SanitizeCache:
+    """
+    清洗结果 LRU 缓存
+
+    键为原文的 SHA-256 摘要（不长期持有原文），同时限制条目数与结果总长度。
+    """
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[bytes, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """缓存结果的总字符数"""
+        return self._size
+
+    def get_or_compute(self, text: str) -> str:
+        key = hashlib.sha256(text.encode("utf-8", "surrogatepass")).digest()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        cleaned = _sanitize(text)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = cleaned
+                self._size += len(cleaned)
+                while self._entries and (
+                    len(self._entries) > SANITIZE_CACHE_SIZE
+                    or self._size > SANITIZE_CACHE_MAX_BYTES
+                ):
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return cleaned
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+
+_sanitize_cache = _SanitizeCache()
+
+
+def sanitize_html(text: str) -> str:
+    """清除 XSS payload，返回安全 HTML 文本（单遍 allowlist 清洗，结果按内容缓存）。"""
+    if text is None:
+        return ""
+    if not isinstance(text, str):
+        text = str(text)
+    try:
+        if len(text) > SANITIZE_CACHE_MAX_LENGTH:
+            return _sanitize(text)
+        return _sanitize_cache.get_or_compute(text)
+    except Exception:
+        return _rough_strip(text)
+
+
+def sanitize_post_html(html: str) -> str:
+    """清洗服务端渲染的文章 HTML（文章 allowlist，不缓存：结果已随渲染产物持久化）"""
+    if not html:
+        return ""
+    return _sanitize(html, _POST_ALLOWED_TAGS, _POST_ATTRS_BY_TAG)
+
+
+def sanitize_many(texts: Iterable[str | None]) -> list[str]:
+    """
+    批量清洗，同批内重复的文本只清洗一次
+
+    Args:
+        texts: 待清洗文本，None 视为空串
+
+    Returns:
+        list[str]: 与输入一一对应的清洗结果
+    """
+    seen: dict[str, str] = {}
+    results = []
+    for text in texts:
+        if text is None:
+            results.append("")
+            continue
+        if not isinstance(text, str):
+            text = str(text)
+        cleaned = seen.get(text)
+        if cleaned is None:
+            cleaned = seen[text] = sanitize_html(text)
+        results.append(cleaned)
+    return results
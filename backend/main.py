@@ -16,10 +16,8 @@ Example:
 """
 
 import logging
-import time
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
-from datetime import datetime
 from pathlib import Path
 
 from fastapi import FastAPI, Request, status
@@ -72,67 +70,25 @@ from backend.api import (
 from backend.core.config import settings
 from backend.core.database import check_db_connection, close_db, get_db_info, init_db
 from backend.core.exceptions import AppException
-from backend.core.i18n import I18nContext, parse_accept_language, t
-from backend.core.maintenance import MaintenanceMiddleware
+from backend.core.i18n import t
+from backend.core.moderation import word_lists
 from backend.core.security_middleware import SecurityHeadersMiddleware
-from backend.middleware.performance import performance_middleware
+from backend.core.site_gate import site_gate
+from backend.core.startup import readiness, startup_profiler
+from backend.core.task_queue import create_queue_backend
+from backend.core.tasks import task_manager
+from backend.middleware.pipeline import RequestPipelineMiddleware
+from backend.services.email_service import close_smtp_pools
+from backend.services.notification_hub import notification_hub
+from backend.services.post_scheduler import post_scheduler
+from backend.services.site_config_service import site_config_store
+from backend.services.stats_rollup import stats_rollup_job
+from backend.services.translation_service import translator
+from backend.services.webhook_service import webhook_dispatcher
 
 logger = logging.getLogger(__name__)
 
 
-async def _scheduled_publish_loop(db_session_factory):
-    """
-    定时发布扫描器（每分钟扫描一次）
-
-    Task 7: 后台循环将 status=scheduled 或 scheduled_at<=now 的文章发布。
-    同时兼容旧实现：status=published 且 scheduled_at<=now 的也真正生效。
-    """
-    import asyncio as _asyncio
-
-    from sqlalchemy import select
-
-    from backend.models.blog import Post
-    from backend.utils.compat import UTC as _UTC
-
-    def _now():
-        return datetime.now(_UTC)
-
-    while True:
-        try:
-            async with db_session_factory() as session:
-                query = select(Post).where(
-                    (
-                        (Post.status == "scheduled")
-                        & (Post.scheduled_at.is_not(None))
-                        & (Post.scheduled_at <= _now())
-                    )
-                    | (
-                        (Post.status == "published")
-                        & (Post.scheduled_at.is_not(None))
-                        & (Post.scheduled_at <= _now())
-                    )
-                )
-                result = await session.execute(query)
-                posts = result.scalars().all()
-                published_count = 0
-                for p in posts:
-                    if p.published_at is None:
-                        p.published_at = p.scheduled_at
-                    p.status = "published"
-                    p.scheduled_at = None
-                    published_count += 1
-                if published_count:
-                    await session.commit()
-                    logger.info(f"[scheduler] 定时发布 {published_count} 篇文章")
-        except Exception as exc:
-            logger.exception(f"[scheduler] 扫描失败: {exc}")
-        try:
-            await _asyncio.sleep(60)
-        except _asyncio.CancelledError:
-            logger.info("[scheduler] 定时发布循环已取消")
-            break
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
     """
@@ -142,77 +98,102 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
     - 检查 OOBE 是否完成
     - 初始化数据库连接
     - 检查数据库连接状态
-    - 启动定时发布循环
+    - 启动定时发布调度器
+    - 标记就绪（/health/ready），随后在后台预热缓存
 
     关闭时：
+    - 撤销就绪，取消未完成的预热
     - 关闭数据库连接池
     - 清理缓存连接
-    """
-    import asyncio as _asyncio
-
-    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
+    各启动步骤耗时记录在 startup_profiler 中（python -m backend.scripts.profile_startup）。
+    """
     BASE_DIR = Path(__file__).resolve().parent.parent
     CONFIG_FILE = BASE_DIR / "rosetta.json"
     OOBE_LOCK_FILE = BASE_DIR / ".oobe_complete"
 
+    startup_profiler.reset()
     logger.info(f"正在启动 {settings.app_name}...")
     logger.info(f"运行环境: {settings.environment}")
     logger.info(f"调试模式: {settings.debug}")
 
     oobe_complete = OOBE_LOCK_FILE.exists() and CONFIG_FILE.exists()
 
-    scheduler_task = None
-
     if not oobe_complete:
-        logger.info("OOBE 未完成，跳过数据库初始化与定时发布循环")
+        logger.info("OOBE 未完成，跳过数据库初始化与定时发布调度")
+        readiness.mark_ready()
         yield
-        if scheduler_task and not scheduler_task.done():
-            scheduler_task.cancel()
-            try:
-                await scheduler_task
-            except Exception:
-                pass
+        await readiness.stop()
         return
 
-    await init_db()
+    profile = startup_profiler.phase
+    with profile("init_db"):
+        await init_db()
 
-    db_connected = await check_db_connection()
-    if db_connected:
-        db_info = await get_db_info()
-        logger.info(f"数据库连接成功: {db_info}")
-    else:
-        logger.error("数据库连接失败")
+    with profile("check_db"):
+        db_connected = await check_db_connection()
+        if db_connected:
+            db_info = await get_db_info()
+            logger.info(f"数据库连接成功: {db_info}")
+        else:
+            logger.error("数据库连接失败")
 
-    try:
-        from backend.core.database import engine
+    with profile("post_scheduler"):
+        try:
+            await post_scheduler.start()
+        except Exception as exc:
+            logger.exception(f"[scheduler] 启动失败: {exc}")
+
+    with profile("stats_rollup"):
+        await stats_rollup_job.start()
+    with profile("site_config"):
+        await site_config_store.start()
+        # 维护模式状态在启动时加载，之后由站点配置变更推送
+        await site_gate.get_maintenance()
+    with profile("moderation_word_lists"):
+        await word_lists.start()
+
+    with profile("webhooks"):
+        try:
+            await webhook_dispatcher.resume()
+        except Exception as exc:
+            logger.exception(f"[webhook] 恢复未完成的投递失败: {exc}")
 
-        if engine is None:
-            engine = create_async_engine(settings.database_url)
-        from sqlalchemy.ext.asyncio import AsyncSession as _AsyncSession
+    with profile("task_manager"):
+        try:
+            task_manager.configure(create_queue_backend())
+            await task_manager.start()
+        except Exception as exc:
+            logger.exception(f"[tasks] 后台任务 worker 启动失败: {exc}")
 
-        db_session_factory = async_sessionmaker(
-            engine, class_=_AsyncSession, expire_on_commit=False
-        )
-        scheduler_task = _asyncio.create_task(_scheduled_publish_loop(db_session_factory))
-    except Exception as exc:
-        logger.exception(f"[scheduler] 启动失败: {exc}")
-        scheduler_task = None
+    # 就绪后再预热缓存：预热期间的请求直接查库，不推迟开始接收流量
+    from backend.core.cache_warmer import warmup_cache
 
-    logger.info(f"{settings.app_name} 启动完成")
+    readiness.mark_ready()
+    readiness.start_warmup(warmup_cache)
+
+    report = startup_profiler.report()
+    logger.info(f"{settings.app_name} 启动完成（{report['total_ms']:.0f} ms）")
+    logger.debug(f"[startup] 启动步骤耗时: {report['phases']}")
 
     yield
 
-    if scheduler_task and not scheduler_task.done():
-        scheduler_task.cancel()
-        try:
-            await scheduler_task
-        except _asyncio.CancelledError:
-            pass
-        except Exception:
-            logger.exception("[scheduler] 关闭时出现异常")
+    await readiness.stop()
+
+    try:
+        await post_scheduler.stop()
+    except Exception:
+        logger.exception("[scheduler] 关闭时出现异常")
+    await stats_rollup_job.stop()
+    await site_config_store.stop()
+    await word_lists.stop()
 
     logger.info(f"正在关闭 {settings.app_name}...")
+    await task_manager.shutdown()
+    await webhook_dispatcher.shutdown()
+    await translator.shutdown()
+    await notification_hub.shutdown()
+    close_smtp_pools()
     await close_db()
 
     from backend.core.cache import cache
@@ -280,8 +261,6 @@ Authorization: Bearer <access_token>
 
     app.add_middleware(SecurityHeadersMiddleware)
 
-    app.add_middleware(MaintenanceMiddleware)
-
     # 生产环境受信任主机保护：OOBE 未完成前不限制（站点 URL 尚未写入，默认 localhost 过于狭窄）
     if settings.is_production:
         from backend.core.deps import is_oobe_complete
@@ -302,100 +281,10 @@ Authorization: Bearer <access_token>
             # OOBE 期间不做 host 限制；安装完成后 .oobe_complete 文件写入，重启后生效
             logger.info("OOBE incomplete: skipping TrustedHostMiddleware until install completes")
 
-    @app.middleware("http")
-    async def i18n_middleware(request: Request, call_next):
-        """国际化中间件"""
-        accept_language = request.headers.get("Accept-Language")
-        language = parse_accept_language(accept_language)
-        I18nContext.set_language(language)
-        try:
-            response = await call_next(request)
-        finally:
-            I18nContext.reset()
-        return response
-
-    @app.middleware("http")
-    async def oobe_middleware(request: Request, call_next):
-        """OOBE 安装状态中间件
-
-        - 若 .oobe_complete 不存在：
-          - 放行 /api/oobe/*、/api/captcha/*、/health、/docs、/openapi.json、/redoc、/favicon.ico
-          - 其余 /api/* 返回 503 + {success: false, error_code: OOBE_REQUIRED, message: 请先完成安装向导}
-          - 非 /api/*（Astro 静态/页面）放行，由前端自行判断跳转
-        - 若 .oobe_complete 存在：访问 /oobe 路径时重定向 /
-        """
-        from backend.core.deps import is_oobe_complete
-        from backend.core.exceptions import OOBE_REQUIRED
-
-        path = request.url.path
-        oobe_done = is_oobe_complete()
-
-        if not oobe_done:
-            allowed_prefixes = (
-                "/api/oobe/",
-                "/api/captcha/",
-                "/api/media/bing-wallpaper",
-            )
-            allowed_exact = (
-                "/health",
-                "/health/",
-                "/api/health",
-                "/api/health/",
-                "/docs",
-                "/openapi.json",
-                "/redoc",
-                "/favicon.ico",
-            )
-            if path.startswith(allowed_prefixes) or path in allowed_exact:
-                return await call_next(request)
-            if path.startswith("/api/"):
-                return JSONResponse(
-                    status_code=503,
-                    content={
-                        "success": False,
-                        "error_code": OOBE_REQUIRED,
-                        "message": "请先完成安装向导",
-                    },
-                )
-            return await call_next(request)
-
-        if path.startswith("/oobe"):
-            from fastapi.responses import RedirectResponse
-
-            return RedirectResponse(url="/", status_code=302)
-
-        return await call_next(request)
-
-    @app.middleware("http")
-    async def request_logging_middleware(request: Request, call_next):
-        """请求日志中间件"""
-        start_time = time.time()
-
-        response = await call_next(request)
-
-        process_time = (time.time() - start_time) * 1000
-
-        logger.info(
-            f"{request.method} {request.url.path} - {response.status_code} - {process_time:.2f}ms"
-        )
-
-        response.headers["X-Process-Time"] = f"{process_time:.2f}ms"
-
-        # 记录访问日志（不记录API文档和静态资源）
-        if not request.url.path.startswith(
-            ("/docs", "/openapi.json", "/redoc", "/media", "/health")
-        ):
-            try:
-                from backend.api.monitoring import record_visit
-
-                await record_visit(request, response.status_code, process_time)
-            except Exception:
-                pass
-
-        return response
-
-    # 性能监控中间件：采样记录请求响应时间到数据库
-    app.middleware("http")(performance_middleware)
+    # 请求管线（最外层）：国际化、OOBE / 维护模式闸门、请求与访问日志、查询统计、性能采样
+    # 新应用实例重新读取闸门状态
+    site_gate.reset()
+    app.add_middleware(RequestPipelineMiddleware)
 
     @app.exception_handler(StarletteHTTPException)
     async def http_exception_handler(request: Request, exc: StarletteHTTPException):
@@ -490,6 +379,31 @@ Authorization: Bearer <access_token>
             },
         )
 
+    @app.get(
+        "/health/live",
+        tags=["系统"],
+        summary="存活检查",
+        description="进程存活即返回 200，不检查依赖（存活探针）",
+    )
+    async def liveness_check():
+        """存活检查端点"""
+        return {"status": "alive"}
+
+    @app.get(
+        "/health/ready",
+        tags=["系统"],
+        summary="就绪检查",
+        description="启动步骤完成且数据库可用时返回 200，否则 503（就绪探针 / 负载均衡）",
+    )
+    async def readiness_check():
+        """就绪检查端点（后台预热不影响就绪）"""
+        status_info = readiness.status()
+        ready = status_info["ready"] and await check_db_connection()
+        return JSONResponse(
+            status_code=200 if ready else 503,
+            content={"status": "ready" if ready else "not_ready", **status_info},
+        )
+
     app.include_router(users.router, prefix="/api/users", tags=["用户"])
     app.include_router(blog.router, prefix="/api/blog", tags=["博客"])
     app.include_router(core.router, prefix="/api", tags=["核心"])
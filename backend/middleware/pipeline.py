@@ -0,0 +1,145 @@
+"""
+请求管线中间件（纯 ASGI）
+
+取代原先逐层叠加的五个 BaseHTTPMiddleware（国际化、OOBE、维护模式、请求日志、
+查询统计 / 性能监控）。BaseHTTPMiddleware 每层都要为下游另起任务并经内存流转发
+响应，这里只包装一次 send，按顺序完成：
+
+1. 语言：解析 Accept-Language 写入 I18nContext
+2. OOBE 闸门：未完成安装时只放行安装相关接口；完成后 /oobe 重定向到首页
+3. 维护模式闸门：见 core.maintenance
+4. 响应头：X-Process-Time；调试模式下的查询统计头（见 middleware.query_stats）
+5. 收尾：请求日志、访问日志、按路由汇总查询统计、性能采样
+
+OOBE 与维护模式状态来自 core.site_gate 的进程内状态，判断过程不访问文件或数据库。
+"""
+
+import logging
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import JSONResponse, RedirectResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.core.config import settings
+from backend.core.db_metrics import begin_request
+from backend.core.exceptions import OOBE_REQUIRED
+from backend.core.i18n import I18nContext, parse_accept_language
+from backend.core.maintenance import check_maintenance
+from backend.core.site_gate import site_gate
+from backend.middleware import query_stats
+from backend.middleware.performance import record_performance
+
+logger = logging.getLogger(__name__)
+
+# OOBE 未完成时放行的路径
+OOBE_ALLOWED_PREFIXES = (
+    "/api/oobe/",
+    "/api/captcha/",
+    "/api/media/bing-wallpaper",
+)
+OOBE_ALLOWED_EXACT = frozenset(
+    {
+        "/health",
+        "/health/",
+        "/api/health",
+        "/api/health/",
+        "/docs",
+        "/openapi.json",
+        "/redoc",
+        "/favicon.ico",
+    }
+)
+
+# 不记录访问日志的路径（API 文档和静态资源）
+VISIT_LOG_EXCLUDED = ("/docs", "/openapi.json", "/redoc", "/media", "/health")
+
+
+def oobe_gate(path: str) -> Response | None:
+    """
+    OOBE 安装状态检查
+
+    - 未完成安装：
+      - 放行 /api/oobe/*、/api/captcha/*、/health、/docs、/openapi.json、/redoc、/favicon.ico
+      - 其余 /api/* 返回 503 + {success: false, error_code: OOBE_REQUIRED, message: 请先完成安装向导}
+      - 非 /api/*（前端静态/页面）放行，由前端自行判断跳转
+    - 已完成安装：访问 /oobe 路径时重定向 /
+
+    Returns:
+        Response | None: 需要拦截时返回响应，否则 None
+    """
+    if site_gate.oobe_complete:
+        if path.startswith("/oobe"):
+            return RedirectResponse(url="/", status_code=302)
+        return None
+
+    if path.startswith(OOBE_ALLOWED_PREFIXES) or path in OOBE_ALLOWED_EXACT:
+        return None
+    if path.startswith("/api/"):
+        return JSONResponse(
+            status_code=503,
+            content={
+                "success": False,
+                "error_code": OOBE_REQUIRED,
+                "message": "请先完成安装向导",
+            },
+        )
+    return None
+
+
+class RequestPipelineMiddleware:
+    """请求管线中间件"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.time()
+        stats = begin_request()
+        path = scope["path"]
+        headers = Headers(scope=scope)
+        status_code = 500
+        process_time = 0.0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, process_time
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = (time.time() - start_time) * 1000
+                response_headers = MutableHeaders(scope=message)
+                response_headers["X-Process-Time"] = f"{process_time:.2f}ms"
+                if settings.debug:
+                    for name, value in query_stats.debug_headers(stats):
+                        response_headers.append(name, value)
+            await send(message)
+
+        I18nContext.set_language(parse_accept_language(headers.get("accept-language")))
+        try:
+            response = oobe_gate(path)
+            # OOBE 未完成时数据库表尚未创建，跳过维护模式检查
+            if response is None and site_gate.oobe_complete:
+                response = await check_maintenance(path, headers.get("authorization"))
+            if response is not None:
+                await response(scope, receive, send_wrapper)
+            else:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            I18nContext.reset()
+
+        logger.info(f"{scope['method']} {path} - {status_code} - {process_time:.2f}ms")
+
+        if not path.startswith(VISIT_LOG_EXCLUDED):
+            try:
+                from backend.api.monitoring import record_visit
+
+                await record_visit(Request(scope), status_code, process_time)
+            except Exception:
+                pass
+
+        query_stats.record_route(scope, stats)
+        await record_performance(scope, status_code, int((time.time() - start_time) * 1000))
@@ -0,0 +1,50 @@
+"""
+查询统计
+
+请求管线（backend.middleware.pipeline）为每个请求开启数据库查询统计（见
+backend.core.db_metrics），请求结束后按路由模板汇总到 query_metrics；调试模式下在
+响应头中返回本次请求的查询数与数据库耗时：
+
+- X-DB-Query-Count: SQL 语句数
+- X-DB-Time: 数据库耗时（毫秒）
+- Server-Timing: db;dur=<毫秒>;desc="<语句数> queries"（浏览器开发者工具可直接查看）
+"""
+
+from starlette.types import Scope
+
+from backend.core.db_metrics import RequestQueryStats, query_metrics
+
+
+def _route_template(scope: Scope) -> str:
+    """
+    匹配到的路由模板（/api/blog/posts/hello → /api/blog/posts/{slug}）
+
+    新版 FastAPI 中 include_router 的路由模板不含前缀，前缀取请求路径里
+    路由正则匹配部分之前的一段（旧版模板已含前缀，从路径开头即匹配）。
+    """
+    path = scope["path"]
+    route = scope["route"]
+    template = getattr(route, "path_format", None)
+    regex = getattr(route, "path_regex", None)
+    if template is None or regex is None:
+        return path
+    for start, char in enumerate(path):
+        if char == "/" and regex.match(path[start:]):
+            return path[:start] + template
+    return template
+
+
+def debug_headers(stats: RequestQueryStats) -> list[tuple[str, str]]:
+    """调试模式下附加到响应的查询统计头"""
+    db_ms = stats.db_time * 1000
+    return [
+        ("X-DB-Query-Count", str(stats.queries)),
+        ("X-DB-Time", f"{db_ms:.2f}ms"),
+        ("Server-Timing", f'db;dur={db_ms:.2f};desc="{stats.queries} queries"'),
+    ]
+
+
+def record_route(scope: Scope, stats: RequestQueryStats) -> None:
+    """按路由模板汇总本次请求的查询统计（未匹配到路由的请求不记录）"""
+    if scope.get("route") is not None:
+        query_metrics.record_request(f"{scope['method']} {_route_template(scope)}", stats)
@@ -0,0 +1,56 @@
+"""create task_queue_jobs table for the durable background task queue
+
+Revision ID: 20261019_000001
+Revises: 20260806_000003
+Create Date: 2026-10-19 00:00:01.000000
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261019_000001"
+down_revision: str | None = "20260806_000003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "task_queue_jobs",
+        sa.Column("id", sa.String(length=36), primary_key=True, nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("args", sa.JSON(), nullable=False),
+        sa.Column("kwargs", sa.JSON(), nullable=False),
+        sa.Column("meta", sa.JSON(), nullable=False),
+        sa.Column("priority", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="queued"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_retries", sa.Integer(), nullable=False, server_default="3"),
+        sa.Column("timeout", sa.Float(), nullable=True),
+        sa.Column("available_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("locked_by", sa.String(length=64), nullable=True),
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+    )
+
+    with op.batch_alter_table("task_queue_jobs", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_task_queue_claim", ["status", "priority", "available_at"], unique=False
+        )
+        batch_op.create_index("ix_task_queue_locked_until", ["locked_until"], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("task_queue_jobs", schema=None) as batch_op:
+        batch_op.drop_index("ix_task_queue_locked_until")
+        batch_op.drop_index("ix_task_queue_claim")
+
+    op.drop_table("task_queue_jobs")
@@ -0,0 +1,32 @@
+"""add attempts and latency_ms to webhook_deliveries
+
+Revision ID: 20261019_000002
+Revises: 20261019_000001
+Create Date: 2026-10-19 00:00:02.000000
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261019_000002"
+down_revision: str | None = "20261019_000001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("webhook_deliveries", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"))
+        batch_op.add_column(sa.Column("latency_ms", sa.Float(), nullable=True))
+        batch_op.create_index(
+            "ix_webhook_deliveries_endpoint_created", ["endpoint_id", "created_at"], unique=False
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("webhook_deliveries", schema=None) as batch_op:
+        batch_op.drop_index("ix_webhook_deliveries_endpoint_created")
+        batch_op.drop_column("latency_ms")
+        batch_op.drop_column("attempts")
@@ -0,0 +1,49 @@
+"""create stats_daily / stats_hourly rollup tables and stats_rollup_state watermark
+
+Revision ID: 20261019_000003
+Revises: 20261019_000002
+Create Date: 2026-10-19 00:00:03.000000
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261019_000003"
+down_revision: str | None = "20261019_000002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_COUNTERS = ("pv", "uv", "visits", "unique_ips", "comments", "posts", "users")
+
+
+def _counter_columns() -> list[sa.Column]:
+    return [sa.Column(name, sa.Integer(), nullable=False, server_default="0") for name in _COUNTERS]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stats_daily",
+        sa.Column("day", sa.Date(), primary_key=True, nullable=False),
+        *_counter_columns(),
+    )
+    op.create_table(
+        "stats_hourly",
+        sa.Column("hour", sa.DateTime(timezone=True), primary_key=True, nullable=False),
+        *_counter_columns(),
+    )
+    op.create_table(
+        "stats_rollup_state",
+        sa.Column("name", sa.String(length=16), primary_key=True, nullable=False),
+        sa.Column("watermark", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stats_rollup_state")
+    op.drop_table("stats_hourly")
+    op.drop_table("stats_daily")
@@ -0,0 +1,78 @@
+"""add posts.word_count / reading_time / archive_month and backfill them
+
+Revision ID: 20261019_000004
+Revises: 20261019_000003
+Create Date: 2026-10-19 00:00:04.000000
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+from backend.utils import post_metrics
+
+revision: str = "20261019_000004"
+down_revision: str | None = "20261019_000003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_BATCH = 500
+
+posts = sa.table(
+    "posts",
+    sa.column("id", sa.Integer),
+    sa.column("content", sa.JSON),
+    sa.column("published_at", sa.DateTime(timezone=True)),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+    sa.column("word_count", sa.Integer),
+    sa.column("reading_time", sa.Integer),
+    sa.column("archive_month", sa.String),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("posts", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("word_count", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column("reading_time", sa.Integer(), nullable=False, server_default="1")
+        )
+        batch_op.add_column(sa.Column("archive_month", sa.String(length=7), nullable=True))
+        batch_op.create_index(
+            "ix_posts_status_archive_month", ["status", "archive_month"], unique=False
+        )
+
+    # 回填已有文章（之后由 ORM before_insert / before_update 在写入时维护）
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(posts.c.id, posts.c.content, posts.c.published_at, posts.c.created_at)
+            .where(posts.c.id > last_id)
+            .order_by(posts.c.id)
+            .limit(_BATCH)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            text = post_metrics.primary_text(row.content)
+            bind.execute(
+                posts.update()
+                .where(posts.c.id == row.id)
+                .values(
+                    word_count=post_metrics.count_words(text),
+                    reading_time=post_metrics.calculate_reading_time(text),
+                    archive_month=post_metrics.archive_month(row.published_at, row.created_at),
+                )
+            )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("posts", schema=None) as batch_op:
+        batch_op.drop_index("ix_posts_status_archive_month")
+        batch_op.drop_column("archive_month")
+        batch_op.drop_column("reading_time")
+        batch_op.drop_column("word_count")
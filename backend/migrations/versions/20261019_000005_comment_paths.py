@@ -0,0 +1,68 @@
+"""add comments.path / reply_count / reply_seq / last_reply_at and backfill them
+
+Revision ID: 20261019_000005
+Revises: 20261019_000004
+Create Date: 2026-10-19 00:00:05.000000
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+from backend.utils import comment_paths
+
+revision: str = "20261019_000005"
+down_revision: str | None = "20261019_000004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+comments = sa.table(
+    "comments",
+    sa.column("id", sa.Integer),
+    sa.column("post_id", sa.Integer),
+    sa.column("parent_id", sa.Integer),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+    sa.column("path", sa.String),
+    sa.column("reply_count", sa.Integer),
+    sa.column("reply_seq", sa.Integer),
+    sa.column("last_reply_at", sa.DateTime(timezone=True)),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("comments", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("path", sa.String(length=255), nullable=True))
+        batch_op.add_column(
+            sa.Column("reply_count", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column("reply_seq", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.add_column(sa.Column("last_reply_at", sa.DateTime(timezone=True), nullable=True))
+
+    # 按文章回填（评论树不跨文章），之后由 ORM 监听在写入时维护
+    bind = op.get_bind()
+    post_ids = bind.execute(sa.select(comments.c.post_id).distinct()).scalars().all()
+    for post_id in post_ids:
+        rows = bind.execute(
+            sa.select(comments.c.id, comments.c.parent_id, comments.c.created_at).where(
+                comments.c.post_id == post_id
+            )
+        ).all()
+        for comment_id, fields in comment_paths.encode_threads(rows).items():
+            bind.execute(
+                comments.update().where(comments.c.id == comment_id).values(**fields._asdict())
+            )
+
+    with op.batch_alter_table("comments", schema=None) as batch_op:
+        batch_op.create_index("ix_comments_path", ["path"], unique=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("comments", schema=None) as batch_op:
+        batch_op.drop_index("ix_comments_path")
+        batch_op.drop_column("last_reply_at")
+        batch_op.drop_column("reply_seq")
+        batch_op.drop_column("reply_count")
+        batch_op.drop_column("path")
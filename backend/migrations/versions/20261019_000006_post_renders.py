@@ -0,0 +1,39 @@
+"""add post_renders and posts.render_hash
+
+Revision ID: 20261019_000006
+Revises: 20261019_000005
+Create Date: 2026-10-19 00:00:06.000000
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261019_000006"
+down_revision: str | None = "20261019_000005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "post_renders",
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("renderer_version", sa.Integer(), nullable=False),
+        sa.Column("artifact", sa.JSON(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("content_hash"),
+    )
+
+    # 已有文章不在迁移中编译，阅读端首次读取时补编译（见 services.post_render_service）
+    with op.batch_alter_table("posts", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("render_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("posts", schema=None) as batch_op:
+        batch_op.drop_column("render_hash")
+    op.drop_table("post_renders")
@@ -0,0 +1,35 @@
+"""add translation_memory
+
+Revision ID: 20261019_000007
+Revises: 20261019_000006
+Create Date: 2026-10-19 00:00:07.000000
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261019_000007"
+down_revision: str | None = "20261019_000006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "translation_memory",
+        sa.Column("source_hash", sa.String(length=64), nullable=False),
+        sa.Column("source_lang", sa.String(length=16), nullable=False),
+        sa.Column("target_lang", sa.String(length=16), nullable=False),
+        sa.Column("translated", sa.Text(), nullable=False),
+        sa.Column("provider", sa.String(length=32), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("source_hash", "source_lang", "target_lang"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("translation_memory")
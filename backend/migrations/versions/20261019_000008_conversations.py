@@ -0,0 +1,75 @@
+"""add conversations summary table
+
+Revision ID: 20261019_000008
+Revises: 20261019_000007
+Create Date: 2026-10-19 00:00:08.000000
+"""
+
+from collections.abc import Sequence
+from datetime import datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261019_000008"
+down_revision: str | None = "20261019_000007"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    conversations = op.create_table(
+        "conversations",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_low_id", sa.Integer(), nullable=False),
+        sa.Column("user_high_id", sa.Integer(), nullable=False),
+        sa.Column("last_message_id", sa.Integer(), nullable=True),
+        sa.Column("unread_low", sa.Integer(), nullable=False),
+        sa.Column("unread_high", sa.Integer(), nullable=False),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+        sa.ForeignKeyConstraint(["user_low_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_high_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["last_message_id"], ["private_messages.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_conversations_pair", "conversations", ["user_low_id", "user_high_id"], unique=True
+    )
+    op.create_index("ix_conversations_low_updated", "conversations", ["user_low_id", "updated_at"])
+    op.create_index(
+        "ix_conversations_high_updated", "conversations", ["user_high_id", "updated_at"]
+    )
+
+    # 按已有私信回填：逐行扫描一次，每对用户取最后一条私信并统计双方未读数
+    summaries: dict[tuple[int, int], dict] = {}
+    rows = op.get_bind().execute(
+        sa.text(
+            "SELECT id, sender_id, recipient_id, is_read, created_at "
+            "FROM private_messages ORDER BY id"
+        )
+    )
+    for message_id, sender_id, recipient_id, is_read, created_at in rows:
+        low, high = sorted((sender_id, recipient_id))
+        summary = summaries.setdefault(
+            (low, high),
+            {"user_low_id": low, "user_high_id": high, "unread_low": 0, "unread_high": 0},
+        )
+        summary["last_message_id"] = message_id
+        # SQLite 的文本查询返回字符串时间
+        summary["updated_at"] = (
+            datetime.fromisoformat(created_at) if isinstance(created_at, str) else created_at
+        )
+        if not is_read:
+            summary["unread_low" if recipient_id == low else "unread_high"] += 1
+
+    if summaries:
+        op.bulk_insert(conversations, list(summaries.values()))
+
+
+def downgrade() -> None:
+    op.drop_index("ix_conversations_high_updated", table_name="conversations")
+    op.drop_index("ix_conversations_low_updated", table_name="conversations")
+    op.drop_index("ix_conversations_pair", table_name="conversations")
+    op.drop_table("conversations")
@@ -4,7 +4,16 @@ Rosetta FastAPI 后端 - 数据模型
 
 from backend.models.activity import Activity
 from backend.models.announcement import Announcement
-from backend.models.blog import Category, Comment, Post, PostViewHistory, Tag, post_likes, post_tags
+from backend.models.blog import (
+    Category,
+    Comment,
+    Post,
+    PostRender,
+    PostViewHistory,
+    Tag,
+    post_likes,
+    post_tags,
+)
 from backend.models.comment_reaction import CommentReaction
 from backend.models.core import (
     FriendLink,
@@ -18,12 +27,15 @@ from backend.models.core import (
 from backend.models.gallery import Album, Photo
 from backend.models.guestbook import GuestbookEntry
 from backend.models.hero import HeroSlide
-from backend.models.message import PrivateMessage
-from backend.models.monitoring import VisitLog
+from backend.models.message import Conversation, PrivateMessage
+from backend.models.monitoring import DailyStats, HourlyStats, StatsRollupState, VisitLog
 from backend.models.performance_metric import PerformanceMetric
 from backend.models.post_series import PostSeries
+from backend.models.task_queue import TaskQueueJob
+from backend.models.translation import TranslationMemory
 from backend.models.user import RefreshToken, User, UserPreference, UserTitle
 from backend.models.voting import Choice, Poll, Vote
+from backend.models.webhook import WebhookDelivery, WebhookEndpoint
 
 __all__ = [
     "User",
@@ -35,6 +47,7 @@ __all__ = [
     "Post",
     "Comment",
     "PostViewHistory",
+    "PostRender",
     "post_tags",
     "post_likes",
     "Page",
@@ -49,6 +62,7 @@ __all__ = [
     "Vote",
     "GuestbookEntry",
     "PrivateMessage",
+    "Conversation",
     "Announcement",
     "HeroSlide",
     "CommentReaction",
@@ -56,6 +70,13 @@ __all__ = [
     "PostSeries",
     "Activity",
     "VisitLog",
+    "DailyStats",
+    "HourlyStats",
+    "StatsRollupState",
     "Album",
     "Photo",
+    "TaskQueueJob",
+    "WebhookEndpoint",
+    "WebhookDelivery",
+    "TranslationMemory",
 ]
@@ -22,15 +22,21 @@ from sqlalchemy import (
     String,
     Table,
     Text,
+    event,
     false,
     func,
+    inspect,
+    select,
     true,
 )
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, object_session, relationship
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 
 from backend.core.config import settings
 from backend.core.database import Base
+from backend.utils import comment_paths, post_metrics, post_render
 
 JSON_TYPE = JSONB if settings.is_postgresql else JSON
 
@@ -220,6 +226,15 @@ class Post(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
+    # 写入时计算的派生指标（见 backend.utils.post_metrics）
+    word_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    reading_time: Mapped[int] = mapped_column(
+        Integer, default=1, server_default="1", nullable=False
+    )
+    archive_month: Mapped[str | None] = mapped_column(String(7), nullable=True)
+    # 正文渲染产物的内容哈希（见 PostRender）
+    render_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
     comments: Mapped[list["Comment"]] = relationship(
         "Comment", back_populates="post", cascade="all, delete-orphan"
     )
@@ -228,6 +243,7 @@ class Post(Base):
         Index("ix_posts_status_created", "status", "created_at"),
         Index("ix_posts_status_published", "status", "published_at"),
         Index("ix_posts_status_pinned_published", "status", "is_pinned", "published_at"),
+        Index("ix_posts_status_archive_month", "status", "archive_month"),
         Index("ix_posts_title_gin", "title", postgresql_using="gin"),
         Index("ix_posts_content_gin", "content", postgresql_using="gin"),
     )
@@ -237,6 +253,103 @@ class Post(Base):
         return f"<Post(id={self.id}, title='{title}')>"
 
 
+def _archive_month(post: Post) -> str:
+    # created_at 由数据库生成，flush 时可能未加载：只读已加载的值，避免在 flush 中查询
+    state = inspect(post)
+    return post_metrics.archive_month(state.dict.get("published_at"), state.dict.get("created_at"))
+
+
+@event.listens_for(Post, "before_insert")
+def _compute_metrics_on_insert(mapper, connection, post: Post) -> None:
+    """新建文章时计算字数、阅读时间与归档月份，并编译正文"""
+    text = post_metrics.primary_text(post.content)
+    post.word_count = post_metrics.count_words(text)
+    post.reading_time = post_metrics.calculate_reading_time(text)
+    post.archive_month = _archive_month(post)
+    post.render_hash, _ = save_post_render(connection, post.content)
+
+
+@event.listens_for(Post, "before_update")
+def _compute_metrics_on_update(mapper, connection, post: Post) -> None:
+    """内容或发布时间变化时重新计算（其余更新不重复解析正文）"""
+    state = inspect(post)
+    if state.attrs.content.history.has_changes():
+        text = post_metrics.primary_text(post.content)
+        post.word_count = post_metrics.count_words(text)
+        post.reading_time = post_metrics.calculate_reading_time(text)
+    if state.attrs.published_at.history.has_changes() or state.dict.get("archive_month") is None:
+        post.archive_month = _archive_month(post)
+    if state.attrs.content.history.has_changes() or state.dict.get("render_hash", "") is None:
+        post.render_hash, _ = save_post_render(connection, post.content)
+
+
+class PostRender(Base):
+    """
+    文章正文渲染产物
+
+    以正文内容哈希为键，保存各语言预编译的 HTML、标题、目录、字数、阅读时间与摘要
+    （见 backend.utils.post_render）。内容相同的文章 / 修订版本共用同一条记录。
+    """
+
+    __tablename__ = "post_renders"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    renderer_version: Mapped[int] = mapped_column(Integer, nullable=False)
+    artifact: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<PostRender(hash='{self.content_hash[:12]}', v={self.renderer_version})>"
+
+
+def _render_insert(connection):
+    """渲染产物插入语句（PostgreSQL / SQLite 上 ON CONFLICT DO NOTHING）"""
+    table = PostRender.__table__
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        return pg_insert(table).on_conflict_do_nothing(index_elements=["content_hash"])
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        return sqlite_insert(table).on_conflict_do_nothing(index_elements=["content_hash"])
+    return table.insert()
+
+
+def save_post_render(connection, content) -> tuple[str, dict]:
+    """
+    按内容哈希保存正文渲染产物；已有当前版本的产物时不重新编译
+
+    Args:
+        connection: 同步连接（mapper 事件中的 connection，或 session.connection()）
+        content: 多语言正文
+
+    Returns:
+        tuple[str, dict]: (内容哈希, 渲染产物)
+    """
+    table = PostRender.__table__
+    digest = post_render.content_hash(content)
+    row = connection.execute(
+        select(table.c.renderer_version, table.c.artifact).where(table.c.content_hash == digest)
+    ).first()
+    if row is not None and row.renderer_version == post_render.RENDERER_VERSION:
+        return digest, row.artifact
+
+    values = {
+        "renderer_version": post_render.RENDERER_VERSION,
+        "artifact": post_render.compile_content(content),
+    }
+    if row is None:
+        # 并发保存同一正文时以先写入者为准（内容相同，产物一致）
+        connection.execute(_render_insert(connection).values(content_hash=digest, **values))
+    else:
+        connection.execute(table.update().where(table.c.content_hash == digest).values(**values))
+    return digest, values["artifact"]
+
+
 class Comment(Base):
     """
     评论模型
@@ -297,6 +410,21 @@ class Comment(Base):
     )
     reported_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
+    # 物化路径与回复统计（写入时维护，见 utils.comment_paths）
+    path: Mapped[str | None] = mapped_column(
+        String(255), nullable=True, comment="物化路径：根 ID / 回复序号 / ..."
+    )
+    reply_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0", comment="直接回复数"
+    )
+    reply_seq: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0",
+        comment="已分配的回复序号（只增不减，生成回复的路径段）",
+    )
+    last_reply_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, comment="最近一条直接回复的时间"
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
     )
@@ -306,6 +434,7 @@ class Comment(Base):
 
     __table_args__ = (
         Index("ix_comments_post_status_created", "post_id", "status", "created_at"),
+        Index("ix_comments_path", "path", unique=True),
         Index("ix_comments_parent", "parent_id"),
         Index("ix_comments_author_ip_created", "author_ip", "created_at"),
         Index("ix_comments_post_active", "post_id", "active"),
@@ -315,6 +444,73 @@ class Comment(Base):
         return f"<Comment(id={self.id}, post_id={self.post_id}, status={self.status})>"
 
 
+@event.listens_for(Comment, "before_insert")
+def _assign_reply_path(mapper, connection, comment: Comment) -> None:
+    """回复：原子地递增父评论的回复计数并取得序号，生成路径"""
+    if comment.parent_id is None:
+        return
+    table = Comment.__table__
+    row = connection.execute(
+        table.update()
+        .where(table.c.id == comment.parent_id)
+        .values(
+            reply_count=table.c.reply_count + 1,
+            reply_seq=table.c.reply_seq + 1,
+            last_reply_at=func.now(),
+        )
+        .returning(table.c.path, table.c.reply_count, table.c.reply_seq, table.c.last_reply_at)
+    ).first()
+    if row is None:
+        return
+    if row.path is not None:
+        comment.path = comment_paths.child_path(row.path, row.reply_seq)
+    _refresh_loaded_parent(comment, row)
+
+
+@event.listens_for(Comment, "after_insert")
+def _assign_root_path(mapper, connection, comment: Comment) -> None:
+    """根评论：路径依赖自增 ID，插入后补写"""
+    if comment.parent_id is not None:
+        return
+    table = Comment.__table__
+    path = comment_paths.root_path(comment.id)
+    connection.execute(table.update().where(table.c.id == comment.id).values(path=path))
+    set_committed_value(comment, "path", path)
+
+
+@event.listens_for(Comment, "before_update")
+def _reroot_orphan(mapper, connection, comment: Comment) -> None:
+    """父评论删除后子评论提升为根评论，路径随之改为根路径"""
+    history = inspect(comment).attrs.parent_id.history
+    if history.has_changes() and comment.parent_id is None:
+        comment.path = comment_paths.root_path(comment.id)
+
+
+@event.listens_for(Comment, "after_delete")
+def _decrement_reply_count(mapper, connection, comment: Comment) -> None:
+    """删除回复时递减父评论的回复数（reply_seq 不回退，路径不复用）"""
+    if comment.parent_id is None:
+        return
+    table = Comment.__table__
+    connection.execute(
+        table.update()
+        .where(table.c.id == comment.parent_id, table.c.reply_count > 0)
+        .values(reply_count=table.c.reply_count - 1)
+    )
+
+
+def _refresh_loaded_parent(comment: Comment, row) -> None:
+    # 同一会话中已加载的父评论同步新的计数，避免读到旧值
+    session = object_session(comment)
+    if session is None:
+        return
+    parent = session.identity_map.get(identity_key(Comment, comment.parent_id))
+    if parent is not None:
+        set_committed_value(parent, "reply_count", row.reply_count)
+        set_committed_value(parent, "reply_seq", row.reply_seq)
+        set_committed_value(parent, "last_reply_at", row.last_reply_at)
+
+
 class PostViewHistory(Base):
     """
     文章阅读历史
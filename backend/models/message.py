@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, Text, func
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.core.database import Base
@@ -51,3 +51,47 @@ class PrivateMessage(Base):
 
     def __repr__(self) -> str:
         return f"<PrivateMessage(id={self.id}, sender_id={self.sender_id}, recipient_id={self.recipient_id})>"
+
+
+class Conversation(Base):
+    """
+    私信会话汇总
+
+    每对用户一行（user_low_id < user_high_id），由发送、已读接口维护，
+    收件箱列表只需按 updated_at 分页读取本表，无需聚合 private_messages。
+
+    Attributes:
+        user_low_id: 两位参与者中 ID 较小的一位
+        user_high_id: 两位参与者中 ID 较大的一位
+        last_message_id: 最后一条私信
+        unread_low: user_low 的未读数
+        unread_high: user_high 的未读数
+        updated_at: 最后一条私信的时间
+    """
+
+    __tablename__ = "conversations"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_low_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    user_high_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    last_message_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("private_messages.id", ondelete="SET NULL"), nullable=True
+    )
+    unread_low: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    unread_high: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    __table_args__ = (
+        Index("ix_conversations_pair", "user_low_id", "user_high_id", unique=True),
+        Index("ix_conversations_low_updated", "user_low_id", "updated_at"),
+        Index("ix_conversations_high_updated", "user_high_id", "updated_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<Conversation(id={self.id}, users=({self.user_low_id}, {self.user_high_id}))>"
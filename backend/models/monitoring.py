@@ -2,9 +2,9 @@
 监控数据模型
 """
 
-from datetime import datetime
+from datetime import date, datetime
 
-from sqlalchemy import DateTime, Integer, String, func
+from sqlalchemy import Date, DateTime, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from backend.core.database import Base
@@ -27,3 +27,43 @@ class VisitLog(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
     )
+
+
+class _StatsCounters:
+    """统计汇总表的公共计数列"""
+
+    pv: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    uv: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    visits: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    unique_ips: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    comments: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    posts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    users: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class DailyStats(_StatsCounters, Base):
+    """按天汇总的统计（由 services.stats_rollup 增量维护）"""
+
+    __tablename__ = "stats_daily"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+
+class HourlyStats(_StatsCounters, Base):
+    """按小时汇总的统计（可选，仅保留最近若干天）"""
+
+    __tablename__ = "stats_hourly"
+
+    hour: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+
+
+class StatsRollupState(Base):
+    """统计汇总水位：watermark 之前的时间桶已汇总完成"""
+
+    __tablename__ = "stats_rollup_state"
+
+    name: Mapped[str] = mapped_column(String(16), primary_key=True)
+    watermark: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
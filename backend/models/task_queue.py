@@ -0,0 +1,56 @@
+"""
+持久化任务队列模型
+
+无 Redis 部署时 BackgroundTaskManager 使用该表作为队列后端。
+"""
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, DateTime, Float, Index, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.core.database import Base
+
+
+class TaskQueueJob(Base):
+    """
+    队列中的任务
+
+    status 取值：
+        queued  - 等待执行（available_at 之后可被领取）
+        running - 已被 locked_by 领取，locked_until 之前对其他 worker 不可见
+        dead    - 重试耗尽，进入死信
+    执行成功的任务直接删除。
+    """
+
+    __tablename__ = "task_queue_jobs"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    args: Mapped[list[Any]] = mapped_column(JSON, nullable=False, default=list)
+    kwargs: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False, default=dict)
+    meta: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False, default=dict)
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="queued")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_retries: Mapped[int] = mapped_column(Integer, nullable=False, default=3)
+    timeout: Mapped[float | None] = mapped_column(Float, nullable=True)
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    locked_by: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    __table_args__ = (
+        Index("ix_task_queue_claim", "status", "priority", "available_at"),
+        Index("ix_task_queue_locked_until", "locked_until"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<TaskQueueJob {self.name} {self.id} {self.status}>"
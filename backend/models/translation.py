@@ -0,0 +1,44 @@
+"""
+翻译记忆模型
+
+按段落缓存机器翻译结果，键为（原文哈希, 源语言, 目标语言），
+未改动的段落再次翻译时直接复用，不再调用外部翻译服务。
+"""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.core.database import Base
+
+
+class TranslationMemory(Base):
+    """
+    翻译记忆
+
+    Attributes:
+        source_hash: 原文段落的 SHA-256
+        source_lang: 源语言
+        target_lang: 目标语言
+        translated: 译文
+        provider: 产生译文的翻译服务
+        created_at: 写入时间
+    """
+
+    __tablename__ = "translation_memory"
+
+    source_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    source_lang: Mapped[str] = mapped_column(String(16), primary_key=True)
+    target_lang: Mapped[str] = mapped_column(String(16), primary_key=True)
+    translated: Mapped[str] = mapped_column(Text, nullable=False)
+    provider: Mapped[str] = mapped_column(String(32), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<TranslationMemory(hash='{self.source_hash[:12]}', "
+            f"{self.source_lang}->{self.target_lang})>"
+        )
@@ -693,79 +693,87 @@ class PostRepository(BaseRepository[Post]):
             limit_per_month: 每月最多返回的文章数
 
         Returns:
-            归档数据列表，按年月分组
+            归档数据列表，按年月降序分组（count 为该月已发布文章总数）
         """
 
-        # 获取所有已发布文章，按发布时间降序
-        query = (
-            select(Post)
-            .where(Post.status == "published")
-            .options(joinedload(Post.category))
-            .order_by(Post.published_at.desc())
-        )
+        published = (Post.status == "published", Post.archive_month.is_not(None))
 
-        result = await self.session.execute(query)
-        posts = result.unique().scalars().all()
-
-        # 按年月分组
-        archive_map: dict[tuple[int, int], list[dict]] = {}
-
-        for post in posts:
-            date_field = post.published_at or post.created_at
-            if not date_field:
-                continue
-
-            year = date_field.year
-            month = date_field.month
-            key = (year, month)
-
-            if key not in archive_map:
-                archive_map[key] = []
-
-            if len(archive_map[key]) < limit_per_month:
-                # 获取标题
-                title = post.title.get(lang, post.title.get("zh", "")) if post.title else ""
-
-                # 获取分类信息
-                category_data = None
-                if post.category:
-                    category_name = (
-                        post.category.name.get(lang, post.category.name.get("zh", ""))
-                        if post.category.name
-                        else ""
-                    )
-                    category_data = {
-                        "id": post.category.id,
-                        "name": category_name,
-                        "color": post.category.color,
-                    }
-
-                archive_map[key].append(
-                    {
-                        "id": post.id,
-                        "title": title,
-                        "slug": post.slug,
-                        "created_at": post.created_at.isoformat() if post.created_at else None,
-                        "category": category_data,
-                        "views": post.views,
-                    }
+        # 每月文章数：对写入时算好的归档月份 GROUP BY
+        month_counts = dict(
+            (
+                await self.session.execute(
+                    select(Post.archive_month, func.count())
+                    .where(*published)
+                    .group_by(Post.archive_month)
                 )
+            ).all()
+        )
+
+        # 每月按发布时间取前 limit_per_month 篇，只查询归档页用到的列
+        rank = (
+            func.row_number()
+            .over(partition_by=Post.archive_month, order_by=Post.published_at.desc())
+            .label("rank")
+        )
+        ranked = (
+            select(
+                Post.id,
+                Post.title,
+                Post.slug,
+                Post.created_at,
+                Post.views,
+                Post.category_id,
+                Post.archive_month,
+                rank,
+            )
+            .where(*published)
+            .subquery()
+        )
+        result = await self.session.execute(
+            select(
+                ranked,
+                Category.id.label("joined_category_id"),
+                Category.name.label("category_name"),
+                Category.color.label("category_color"),
+            )
+            .outerjoin(Category, Category.id == ranked.c.category_id)
+            .where(ranked.c.rank <= limit_per_month)
+            .order_by(ranked.c.archive_month.desc(), ranked.c.rank)
+        )
+
+        archive_map: dict[str, list[dict]] = {}
+        for row in result:
+            title = row.title.get(lang, row.title.get("zh", "")) if row.title else ""
+
+            category_data = None
+            if row.joined_category_id is not None:
+                name = row.category_name
+                category_data = {
+                    "id": row.joined_category_id,
+                    "name": name.get(lang, name.get("zh", "")) if name else "",
+                    "color": row.category_color,
+                }
 
-        # 转换为列表格式
-        archive_list = []
-        for (year, month), posts_list in sorted(
-            archive_map.items(), key=lambda x: (x[0][0], x[0][1]), reverse=True
-        ):
-            archive_list.append(
+            archive_map.setdefault(row.archive_month, []).append(
                 {
-                    "year": year,
-                    "month": month,
-                    "count": len(posts_list),
-                    "posts": posts_list,
+                    "id": row.id,
+                    "title": title,
+                    "slug": row.slug,
+                    "created_at": row.created_at.isoformat() if row.created_at else None,
+                    "category": category_data,
+                    "views": row.views,
                 }
             )
 
-        return archive_list
+        return [
+            {
+                "year": int(month[:4]),
+                "month": int(month[5:]),
+                "count": month_counts.get(month, len(posts_list)),
+                "posts": posts_list,
+            }
+            for month, posts_list in archive_map.items()
+        ]
 
     async def get_archive_stats(self) -> dict:
         """
@@ -774,37 +782,22 @@ class PostRepository(BaseRepository[Post]):
         Returns:
             包含总文章数、总年份数等统计信息
         """
-        from sqlalchemy import extract
-
-        # 使用coalesce处理published_at为null的情况，fallback到created_at
-        date_expr = func.coalesce(Post.published_at, Post.created_at)
-
-        # 统计总数
-        total_result = await self.session.execute(
-            select(func.count()).select_from(Post).where(Post.status == "published")
-        )
-        total_posts = total_result.scalar_one()
-
-        # 统计年份数
-        years_result = await self.session.execute(
-            select(func.distinct(extract("year", date_expr)))
+        # 归档月份在写入时已算好（发布时间，未发布时为创建时间），一次 GROUP BY 得到全部统计
+        result = await self.session.execute(
+            select(Post.archive_month, func.count())
             .where(Post.status == "published")
-            .order_by(extract("year", date_expr).desc())
+            .group_by(Post.archive_month)
         )
-        years = [int(y) for y in years_result.scalars().all() if y]
 
-        # 按年份统计文章数
-        year_stats = {}
-        for year in years:
-            count_result = await self.session.execute(
-                select(func.count())
-                .select_from(Post)
-                .where(
-                    Post.status == "published",
-                    extract("year", date_expr) == year,
-                )
-            )
-            year_stats[year] = count_result.scalar_one()
+        total_posts = 0
+        year_stats: dict[int, int] = {}
+        for month, count in result.all():
+            total_posts += count
+            if month:
+                year = int(month[:4])
+                year_stats[year] = year_stats.get(year, 0) + count
+        years = sorted(year_stats, reverse=True)
+        year_stats = {year: year_stats[year] for year in years}
 
         return {
             "total_posts": total_posts,
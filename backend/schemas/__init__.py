@@ -857,6 +857,10 @@ class PostLocalizedResponse(BaseModel):
     published_at: datetime | None = None
     updated_at: datetime
     reading_time: int = 1
+    # 服务端预编译的正文（见 backend.utils.post_render），无权访问正文时为空
+    content_html: str | None = None
+    toc: list[dict[str, Any]] | None = None
+    word_count: int | None = None
 
     @classmethod
     def from_post(
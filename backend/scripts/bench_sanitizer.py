@@ -0,0 +1,100 @@
+"""HTML 清洗吞吐基准：单遍实现 sanitize_html 对比旧的多遍实现 sanitize_html_multipass。
+
+语料为 XSS 测试向量加上若干段普通评论，分别测量：
+- multipass：旧实现（正则粗过滤 + HTMLParser 二次清洗）
+- single-pass：新实现，每次清空缓存（冷启动）
+- cached：新实现，缓存命中（重复文本，如导入时的模板评论）
+- sanitize_many：批量接口
+
+用法：uv run python -m backend.scripts.bench_sanitizer [--rounds 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Callable
+
+from backend.core.xss_filter import (
+    _sanitize_cache,
+    sanitize_html,
+    sanitize_html_multipass,
+    sanitize_many,
+)
+
+XSS_VECTORS = [
+    "<script>alert(1)</script> hello <img src=x onerror=alert(2)>",
+    '<script>alert("XSS")</script> 正常文本 <iframe src="evil"></iframe>',
+    '<a href="#" onclick="alert(1)">click</a>',
+    '<a href="javascript:alert(1)">x</a>',
+    '<a href="&#106;avascript:alert(1)">x</a>',
+    '<p><img src="javascript:alert(1)" alt="bad"/></p>',
+    '<p><img src="https://a.com/x.png" alt="图" width="100" height="100" onclick="x"/></p>',
+    "<p><video src='x.mp4'/><b>hi</b></p>",
+    '<a href="ftp://evil.com" target="_blank">x</a>',
+    '<a href="/x" target="_self">x</a>',
+    "<svg onload=alert(1)>",
+    '<scRipt src="//evil.example/x.js"></SCRIPT>',
+    "<object data=x></object><embed src=x><link rel=import href=x><meta http-equiv=refresh>",
+    "<p>A&amp;B &#65;</p><!-- comment --><style>body{}</style>",
+]
+
+PLAIN_TEXTS = [
+    "这是一个普通的评论，今天天气不错。Hello World!",
+    '<p>Hello <a href="https://example.com" target="_blank">link</a> <strong>bold</strong></p>',
+    "<blockquote>引用一段话</blockquote><p>然后说点别的，<code>print(1)</code></p>" * 4,
+    "感谢分享！" * 40,
+]
+
+
+def _throughput(func: Callable[[], None], corpus_size: int, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    elapsed = time.perf_counter() - start
+    return corpus_size * rounds / elapsed if elapsed else float("inf")
+
+
+def run_benchmark(rounds: int = 200) -> dict[str, float]:
+    """运行基准，返回各实现每秒处理的文本数"""
+    corpus = XSS_VECTORS + PLAIN_TEXTS
+
+    def _multipass() -> None:
+        for text in corpus:
+            sanitize_html_multipass(text)
+
+    def _cold() -> None:
+        _sanitize_cache.clear()
+        for text in corpus:
+            sanitize_html(text)
+
+    def _cached() -> None:
+        for text in corpus:
+            sanitize_html(text)
+
+    def _many() -> None:
+        sanitize_many(corpus)
+
+    results = {
+        "multipass": _throughput(_multipass, len(corpus), rounds),
+        "single-pass": _throughput(_cold, len(corpus), rounds),
+    }
+    _cached()
+    results["cached"] = _throughput(_cached, len(corpus), rounds)
+    results["sanitize_many"] = _throughput(_many, len(corpus), rounds)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rosetta HTML sanitizer benchmark")
+    parser.add_argument("--rounds", type=int, default=200, help="每种实现处理语料的轮数")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.rounds)
+    baseline = results["multipass"]
+    for name, rate in results.items():
+        print(f"[bench] {name:<14} {rate:>12,.0f} texts/s  x{rate / baseline:.1f}")
+
+
+if __name__ == "__main__":
+    main()
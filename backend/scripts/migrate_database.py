@@ -15,6 +15,9 @@
   # 仅校验计数
   python -m backend.scripts.migrate_database ... --dry-run
 
+  # 同层 8 张表并发；中断后重跑同一命令会从断点续拷，--restart 从头开始
+  python -m backend.scripts.migrate_database ... --jobs 8
+
   # Python API:
   from backend.scripts.migrate_database import run_migration
   async for progress in run_migration(src, dst):
@@ -25,28 +28,37 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import hashlib
+import json
 import logging
 import sys
 import time
-from collections.abc import AsyncGenerator, Callable, Iterable
+from collections.abc import AsyncGenerator, Iterable
 from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Any
 
 from sqlalchemy import (
+    JSON,
     MetaData,
     Table,
     create_engine,
     event,
+    func,
     select,
     text,
+    tuple_,
 )
 from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 
+from backend.core.paths import MIGRATION_CHECKPOINT_DIR
+
 logger = logging.getLogger("rosetta.migrate_database")
 logging.basicConfig(
     level=logging.INFO,
@@ -257,96 +269,245 @@ def _is_autoincrement_pk(table: Table) -> bool:
     return True
 
 
+# =========================================================================
+# 断点
+# =========================================================================
+
+
+@dataclass
+class MigrationCheckpoint:
+    """按表记录迁移进度，中断后重跑同一对源/目标可续跑。
+
+    - done: 已完整拷贝（含序列同步）的表
+    - cursors: 未完成表最后一个已提交分块的主键游标（单列为标量，复合主键为列表）
+    """
+
+    path: Path
+    done: list[str] = field(default_factory=list)
+    cursors: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def for_urls(cls, source_url: str, target_url: str) -> MigrationCheckpoint:
+        key = hashlib.sha256(f"{source_url}\n{target_url}".encode()).hexdigest()[:16]
+        return cls(path=MIGRATION_CHECKPOINT_DIR / f"{key}.json")
+
+    def load(self) -> MigrationCheckpoint:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return self
+        self.done = list(data.get("done", []))
+        self.cursors = dict(data.get("cursors", {}))
+        return self
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"done": self.done, "cursors": self.cursors}), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+    def advance(self, table_name: str, cursor: Any) -> None:
+        # 只持久化可 JSON 往返的游标；其他类型（如时间主键）中断后整表重拷，冲突行被忽略
+        values = cursor if isinstance(cursor, list) else [cursor]
+        if all(isinstance(v, int | str) for v in values):
+            self.cursors[table_name] = cursor
+            self.save()
+
+    def finish(self, table_name: str) -> None:
+        self.cursors.pop(table_name, None)
+        if table_name not in self.done:
+            self.done.append(table_name)
+        self.save()
+
+
 # =========================================================================
 # 核心：数据拷贝
 # =========================================================================
 
 _CHUNK_SIZE = 5000
+# 同一 FK 层内并发拷贝的表数（SQLite 目标单写者，固定为 1）
+_DEFAULT_JOBS = 4
+
+
+def _dependency_levels(tables: list[Table]) -> list[list[Table]]:
+    """按外键依赖把 _sort_tables 的结果分层：同层表互不依赖，可并发拷贝。"""
+    names = {t.name for t in tables}
+    deps: dict[str, set[str]] = {}
+    for t in tables:
+        refs: set[str] = set()
+        for fk in t.foreign_keys:
+            try:
+                ref = fk.column.table.name
+            except Exception:  # noqa: BLE001 - 引用表未反射
+                continue
+            if ref in names and ref != t.name:
+                refs.add(ref)
+        deps[t.name] = refs
+
+    levels: list[list[Table]] = []
+    placed: set[str] = set()
+    remaining = list(tables)
+    while remaining:
+        ready = [t for t in remaining if deps[t.name] <= placed]
+        if not ready:
+            # 循环依赖：剩余表按原顺序逐张拷贝
+            levels.extend([t] for t in remaining)
+            break
+        levels.append(ready)
+        placed.update(t.name for t in ready)
+        remaining = [t for t in remaining if t.name not in placed]
+    return levels
+
+
+def _json_columns(table: Table) -> set[str]:
+    return {c.name for c in table.columns if isinstance(c.type, JSON)}
+
+
+async def _disable_fk_for_connection(conn: AsyncConnection) -> None:
+    """PG 目标：在拷贝连接上跳过 FK 触发器（需要超级用户，失败则依赖 FK 分层顺序）。"""
+    if conn.dialect.name != "postgresql":
+        return
+    try:
+        await conn.execute(text("SET session_replication_role = replica"))
+        await conn.commit()
+    except Exception as exc:  # noqa: BLE001
+        await conn.rollback()
+        logger.debug(f"[COPY] session_replication_role 设置失败，按 FK 顺序写入: {exc}")
+
+
+async def _insert_chunk(conn: AsyncConnection, table: Table, rows: list[dict[str, Any]]) -> int:
+    """INSERT ... ON CONFLICT DO NOTHING（SQLite: INSERT OR IGNORE）。"""
+    if conn.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        ins = pg_insert(table).on_conflict_do_nothing()
+    else:
+        ins = table.insert().prefix_with("OR IGNORE")
+    r = await conn.execute(ins, rows)
+    return max(r.rowcount or 0, 0)
+
+
+async def _copy_chunk(
+    conn: AsyncConnection,
+    table: Table,
+    columns: list[str],
+    rows: list[tuple[Any, ...]],
+    json_cols: set[str],
+) -> int:
+    """asyncpg COPY 写入一个分块；失败（如续跑时的重复主键）退回 INSERT ON CONFLICT。"""
+    if conn.dialect.driver == "asyncpg":
+        json_idx = [i for i, name in enumerate(columns) if name in json_cols]
+        records = rows
+        if json_idx:
+            records = [
+                tuple(
+                    json.dumps(v) if i in json_idx and v is not None and not isinstance(v, str) else v
+                    for i, v in enumerate(row)
+                )
+                for row in rows
+            ]
+        try:
+            raw = await conn.get_raw_connection()
+            async with raw.driver_connection.transaction():
+                await raw.driver_connection.copy_records_to_table(
+                    table.name, records=records, columns=columns
+                )
+            return len(rows)
+        except Exception as exc:  # noqa: BLE001
+            logger.debug(f"[COPY] {table.name}: COPY 失败，改用 INSERT: {exc}")
+    return await _insert_chunk(conn, table, [dict(zip(columns, row)) for row in rows])
+
+
+async def _sync_sequence(conn: AsyncConnection, table: Table, stats: MigrationStats) -> None:
+    """PG 目标：把自增主键序列推进到 MAX(pk)+1。"""
+    if conn.dialect.name != "postgresql" or not _is_autoincrement_pk(table):
+        return
+    pk_name = list(table.primary_key.columns)[0].name
+    sql = text(
+        "SELECT setval(pg_get_serial_sequence(:t,:c), "
+        f'coalesce((SELECT MAX("{pk_name}") FROM "{table.name}"), 0) + 1, false)'
+    )
+    try:
+        await conn.execute(sql, {"t": table.name, "c": pk_name})
+        await conn.commit()
+    except Exception as exc:
+        await conn.rollback()
+        stats.warnings.append(f"{table.name}: setval 失败 {exc}")
 
 
 async def _copy_table(
-    src_session: AsyncSession,
-    dst_session: AsyncSession,
+    src_engine: AsyncEngine,
+    dst_engine: AsyncEngine,
     table: Table,
+    dst_table: Table,
     stats: MigrationStats,
-    progress_cb: Callable[[dict[str, Any]], None] | None = None,
+    checkpoint: MigrationCheckpoint,
+    chunk_size: int = _CHUNK_SIZE,
 ) -> tuple[int, int]:
     """拷贝单表，返回 (src_count, inserted)。
     策略：
-      - 不带 WHERE，全表 SELECT。
-      - 用 server-side 游标分块读取。
-      - 目标端直接 bulk_insert，冲突忽略（INSERT ON CONFLICT DO NOTHING，PG 支持；SQLite 用 INSERT OR IGNORE）。
+      - 有主键：按主键 keyset 分块（WHERE pk > :last ORDER BY pk LIMIT n），每块提交后
+        把游标写入断点，中断后从游标续拷。
+      - 无主键：流式整表拷贝；续跑时先清空目标表再重拷。
+      - 目标为 PG + asyncpg 时用 COPY（copy_records_to_table），否则批量 INSERT，冲突忽略。
       - 如果表有单列自增 PK，结束后同步序列。
     """
     table_name = table.name
-    src_count = await _count_rows(src_session, table)
-    stats.rows_total += src_count
-
-    if src_count == 0:
-        logger.info(f"[COPY] {table_name}: 空表跳过")
-        return 0, 0
-
-    cols = [c for c in table.columns]
-    stmt = select(*cols)
-    if is_postgres(str(dst_session.bind.engine.url)) if False else True:
-        pass
-    # stream 分块
+    cols = [c for c in table.columns if c.name in dst_table.columns]
+    col_names = [c.name for c in cols]
+    json_cols = _json_columns(dst_table)
+    pk_cols = [c for c in table.primary_key.columns if c.name in dst_table.columns]
+    pk_idx = [col_names.index(c.name) for c in pk_cols]
     inserted = 0
-    insert_values_list: list[dict[str, Any]] = []
-
-    async def _flush_chunk(chunk: list[dict[str, Any]]) -> int:
-        if not chunk:
-            return 0
-        # 用 dialect 特化的 INSERT
-        if is_postgres(str(dst_session.bind.engine.url)):
-            from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-            ins = pg_insert(table).values(chunk).on_conflict_do_nothing()
+    async with src_engine.connect() as src, dst_engine.connect() as dst:
+        src_count = int((await src.execute(select(func.count()).select_from(table))).scalar_one())
+        stats.rows_total += src_count
+        if src_count == 0:
+            logger.info(f"[COPY] {table_name}: 空表跳过")
+            checkpoint.finish(table_name)
+            return 0, 0
+
+        await _disable_fk_for_connection(dst)
+
+        if pk_cols:
+            cursor = checkpoint.cursors.get(table_name)
+            while True:
+                stmt = select(*cols).order_by(*pk_cols).limit(chunk_size)
+                if cursor is not None:
+                    if len(pk_cols) == 1:
+                        stmt = stmt.where(pk_cols[0] > cursor)
+                    else:
+                        stmt = stmt.where(tuple_(*pk_cols) > tuple_(*cursor))
+                rows = [tuple(r) for r in (await src.execute(stmt)).all()]
+                if not rows:
+                    break
+                inserted += await _copy_chunk(dst, table, col_names, rows, json_cols)
+                await dst.commit()
+                stats.rows_done += len(rows)
+                last = rows[-1]
+                cursor = last[pk_idx[0]] if len(pk_idx) == 1 else [last[i] for i in pk_idx]
+                checkpoint.advance(table_name, cursor)
         else:
-            # SQLite 等：INSERT OR IGNORE
-            ins = table.insert().prefix_with("OR IGNORE").values(chunk)
-        r = await dst_session.execute(ins)
-        await dst_session.commit()
-        # rowcount 不一定可靠，直接返回 len(chunk) 作为近似（有冲突时会小）
-        return r.rowcount or 0
-
-    progress_cb and progress_cb(stats.to_progress("copy", table=table_name, rows_src=src_count, rows_done=0))
-
-    streamed = 0
-    async for row in await src_session.stream(stmt.execution_options(yield_per=_CHUNK_SIZE)):
-        # row 是 Row，键是列名
-        insert_values_list.append(dict(zip((c.name for c in cols), row)))
-        streamed += 1
-        if len(insert_values_list) >= _CHUNK_SIZE:
-            inserted += await _flush_chunk(insert_values_list)
-            stats.rows_done += len(insert_values_list)
-            insert_values_list.clear()
-            progress_cb and progress_cb(stats.to_progress("copy", table=table_name, rows_src=src_count, rows_done=streamed))
-
-    if insert_values_list:
-        inserted += await _flush_chunk(insert_values_list)
-        stats.rows_done += len(insert_values_list)
-
+            if table_name in checkpoint.cursors:
+                await dst.execute(dst_table.delete())
+                await dst.commit()
+            checkpoint.cursors[table_name] = None
+            checkpoint.save()
+            result = await src.stream(select(*cols).execution_options(yield_per=chunk_size))
+            async for partition in result.partitions(chunk_size):
+                rows = [tuple(r) for r in partition]
+                inserted += await _copy_chunk(dst, table, col_names, rows, json_cols)
+                await dst.commit()
+                stats.rows_done += len(rows)
+
+        await _sync_sequence(dst, table, stats)
+
+    checkpoint.finish(table_name)
     logger.info(f"[COPY] {table_name}: src={src_count} approx_inserted={inserted}")
-
-    # 同步 PG 序列
-    if is_postgres(str(dst_session.bind.engine.url)) and _is_autoincrement_pk(table):
-        pk_name = list(table.primary_key.columns)[0].name
-        # SELECT setval(pg_get_serial_sequence('table','col'), coalesce(MAX(col),1) + 1, false)
-        sql = text(
-            "SELECT setval(pg_get_serial_sequence(:t,:c), "
-            "coalesce((SELECT MAX(\""
-            + pk_name
-            + "\") FROM \""
-            + table_name
-            + "\"), 0) + 1, false)"
-        )
-        try:
-            await dst_session.execute(sql, {"t": table_name, "c": pk_name})
-            await dst_session.commit()
-        except Exception as exc:
-            stats.warnings.append(f"{table_name}: setval 失败 {exc}")
-
     return src_count, inserted
 
 
@@ -361,10 +522,16 @@ async def run_migration(
     *,
     dry_run: bool = False,
     skip_schema: bool = False,
+    jobs: int = _DEFAULT_JOBS,
+    chunk_size: int = _CHUNK_SIZE,
+    resume: bool = True,
 ) -> AsyncGenerator[dict[str, Any], None]:
     """
     跨库迁移异步生成器，持续 yield 进度事件。
 
+    同一 FK 层内的表最多 jobs 张并发拷贝；每张表按主键分块并写入断点，
+    resume=True 时从上次中断处继续，全部成功后清除断点。
+
     Yields:
       {"stage": "init|schema|pre_copy|copy|verify|done|error", ...}
     """
@@ -372,9 +539,6 @@ async def run_migration(
     src_engine: AsyncEngine | None = None
     dst_engine: AsyncEngine | None = None
 
-    def _emit(**extra):
-        yield stats.to_progress(stats.to_progress.__self__.__class__.__name__, **extra) if False else stats.to_progress(stats.to_progress.__self__.__class__.__name__ if False else "noop", **extra)
-
     try:
         yield stats.to_progress("init", message="解析源/目标连接")
         # 0. PG target DB 自动创建
@@ -455,31 +619,57 @@ async def run_migration(
         yield stats.to_progress("pre_copy", message="关闭目标外键校验")
         await _with_fk_disabled(dst_engine, "target", False)
 
-        # 5. 逐表复制
-        src_session_cls = async_sessionmaker(src_engine, expire_on_commit=False, class_=AsyncSession)
-        dst_session_cls = async_sessionmaker(dst_engine, expire_on_commit=False, class_=AsyncSession)
-
-        def _cb(p: dict[str, Any]):
-            pass
-
-        for table in ordered_src:
-            src_s = src_session_cls()
-            dst_s = dst_session_cls()
-            try:
-                src_count, inserted = await _copy_table(src_s, dst_s, table, stats, progress_cb=lambda p: None)
-                stats.tables_done += 1
-                yield stats.to_progress(
-                    "copy",
-                    table=table.name,
-                    rows_src=src_count,
-                    rows_inserted_approx=inserted,
+        # 5. 按 FK 分层并发复制；断点中已完成的表直接跳过
+        checkpoint = MigrationCheckpoint.for_urls(source_url, target_url)
+        if resume:
+            checkpoint.load()
+        else:
+            checkpoint.clear()
+        if checkpoint.done:
+            yield stats.to_progress(
+                "pre_copy", message=f"从断点续跑，已完成 {len(checkpoint.done)} 张表"
+            )
+        if is_sqlite(target_url):
+            jobs = 1
+        semaphore = asyncio.Semaphore(max(1, jobs))
+
+        async def _copy_one(table: Table) -> tuple[int, int]:
+            async with semaphore:
+                return await _copy_table(
+                    src_engine,
+                    dst_engine,
+                    table,
+                    dst_tables_map[table.name],
+                    stats,
+                    checkpoint,
+                    chunk_size=chunk_size,
                 )
-            except Exception as exc:
-                stats.errors.append(f"{table.name}: {exc}")
-                yield stats.to_progress("error", table=table.name, message=str(exc))
-            finally:
-                await src_s.close()
-                await dst_s.close()
+
+        for level in _dependency_levels(ordered_src):
+            pending: dict[asyncio.Task, Table] = {}
+            for table in level:
+                if table.name in checkpoint.done:
+                    stats.tables_done += 1
+                    yield stats.to_progress("copy", table=table.name, message="断点中已完成，跳过")
+                    continue
+                pending[asyncio.create_task(_copy_one(table))] = table
+            while pending:
+                finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    table = pending.pop(task)
+                    exc = task.exception()
+                    if exc is not None:
+                        stats.errors.append(f"{table.name}: {exc}")
+                        yield stats.to_progress("error", table=table.name, message=str(exc))
+                        continue
+                    src_count, inserted = task.result()
+                    stats.tables_done += 1
+                    yield stats.to_progress(
+                        "copy",
+                        table=table.name,
+                        rows_src=src_count,
+                        rows_inserted_approx=inserted,
+                    )
 
         # 6. 开启 FK
         yield stats.to_progress("verify", message="开启目标外键校验并做计数校验")
@@ -489,6 +679,8 @@ async def run_migration(
             stats.warnings.append(f"重新启用 FK 失败: {exc}")
 
         # 7. 校验行数
+        src_session_cls = async_sessionmaker(src_engine, expire_on_commit=False, class_=AsyncSession)
+        dst_session_cls = async_sessionmaker(dst_engine, expire_on_commit=False, class_=AsyncSession)
         src_s = src_session_cls()
         dst_s = dst_session_cls()
         mismatches: list[dict[str, Any]] = []
@@ -506,6 +698,9 @@ async def run_migration(
             stats.warnings.append(f"行数不匹配: {len(mismatches)} 张表")
             yield stats.to_progress("verify", mismatches=mismatches)
 
+        if not stats.errors:
+            checkpoint.clear()
+
         stats.finished_at = time.time()
         yield stats.to_progress(
             "done",
@@ -537,6 +732,9 @@ def _build_argparser() -> argparse.ArgumentParser:
     p.add_argument("--to", dest="to_", required=True, help="目标库 SQLAlchemy URL")
     p.add_argument("--dry-run", action="store_true", help="仅列出并计数，不实际写入")
     p.add_argument("--skip-schema", action="store_true", help="不对目标执行 Alembic schema 升级")
+    p.add_argument("--jobs", type=int, default=_DEFAULT_JOBS, help="同层并发拷贝的表数")
+    p.add_argument("--chunk-size", type=int, default=_CHUNK_SIZE, help="每个分块的行数")
+    p.add_argument("--restart", action="store_true", help="忽略断点，从头迁移")
     p.add_argument("-v", "--verbose", action="store_true")
     return p
 
@@ -546,7 +744,15 @@ async def _main_async(args: argparse.Namespace) -> int:
         logging.getLogger().setLevel(logging.DEBUG)
     start = time.time()
     final_stage = "init"
-    async for progress in run_migration(args.from_, args.to_, dry_run=args.dry_run, skip_schema=args.skip_schema):
+    async for progress in run_migration(
+        args.from_,
+        args.to_,
+        dry_run=args.dry_run,
+        skip_schema=args.skip_schema,
+        jobs=args.jobs,
+        chunk_size=args.chunk_size,
+        resume=not args.restart,
+    ):
         final_stage = progress.get("stage", final_stage)
         elapsed = progress.get("elapsed", 0.0)
         msg = progress.get("message", "")
@@ -0,0 +1,148 @@
+"""启动耗时报告：模块导入、lifespan 各步骤与冷启动到首个请求的时间。
+
+- --imports：在新解释器中用 -X importtime 统计导入耗时，列出单模块耗时最高的 --top 个
+- --lifespan：导入 backend.main 并执行一次 lifespan（启动 + 关闭），列出各启动步骤耗时
+- --first-request：启动 --runs 个全新进程，测量从进程创建到 /health/live 返回的时间
+  （time-to-first-request），输出中位数与各阶段拆分
+
+不带参数时三项全部执行；--json 输出机器可读结果，便于记录历史数据对比。
+
+用法：uv run python -m backend.scripts.profile_startup [--imports] [--lifespan]
+      [--first-request] [--top 25] [--runs 3] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any
+
+from backend.core.startup import profile_imports
+
+_CHILD_FLAG = "--child-first-request"
+
+
+async def _lifespan_report() -> dict[str, Any]:
+    start = time.perf_counter()
+    from backend.main import app
+
+    import_ms = (time.perf_counter() - start) * 1000
+    from backend.core.startup import startup_profiler
+
+    async with app.router.lifespan_context(app):
+        report = startup_profiler.report()
+    return {"import_ms": round(import_ms, 1), **report}
+
+
+async def _first_request_child(start: float) -> dict[str, Any]:
+    """子进程：导入、启动、发出首个请求，各阶段时间相对解释器开始执行本脚本"""
+    import httpx
+
+    from backend.main import app
+
+    imported = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/health/live")
+        answered = time.perf_counter()
+    return {
+        "status": response.status_code,
+        "import_ms": round((imported - start) * 1000, 1),
+        "startup_ms": round((started - imported) * 1000, 1),
+        "request_ms": round((answered - started) * 1000, 1),
+    }
+
+
+def measure_first_request(runs: int = 3) -> dict[str, Any]:
+    """启动 runs 个全新进程测量冷启动到首个请求的时间（毫秒，含解释器启动）"""
+    samples: list[dict[str, Any]] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-m", "backend.scripts.profile_startup", _CHILD_FLAG],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            raise RuntimeError(f"子进程启动失败:\n{result.stderr[-2000:]}")
+        sample = json.loads(result.stdout.strip().splitlines()[-1])
+        sample["wall_ms"] = round(elapsed, 1)
+        samples.append(sample)
+    return {
+        "runs": runs,
+        "median_wall_ms": round(statistics.median(s["wall_ms"] for s in samples), 1),
+        "samples": samples,
+    }
+
+
+def main() -> None:
+    if _CHILD_FLAG in sys.argv:
+        start = time.perf_counter()
+        print(json.dumps(asyncio.run(_first_request_child(start))))
+        return
+
+    parser = argparse.ArgumentParser(description="Rosetta startup profiler")
+    parser.add_argument("--imports", action="store_true", help="模块导入耗时")
+    parser.add_argument("--lifespan", action="store_true", help="lifespan 启动步骤耗时")
+    parser.add_argument("--first-request", action="store_true", help="冷启动到首个请求的时间")
+    parser.add_argument("--top", type=int, default=25, help="列出导入耗时最高的模块数")
+    parser.add_argument("--runs", type=int, default=3, help="冷启动测量的进程数")
+    parser.add_argument("--json", action="store_true", help="输出 JSON")
+    args = parser.parse_args()
+    run_all = not (args.imports or args.lifespan or args.first_request)
+
+    results: dict[str, Any] = {}
+    if run_all or args.imports:
+        timings = profile_imports()
+        results["imports"] = {
+            "total_ms": round(max((t.cumulative_us for t in timings), default=0) / 1000, 1),
+            "top": [
+                {
+                    "module": t.module,
+                    "self_ms": t.self_us / 1000,
+                    "cumulative_ms": t.cumulative_us / 1000,
+                }
+                for t in timings[: args.top]
+            ],
+        }
+    if run_all or args.lifespan:
+        results["lifespan"] = asyncio.run(_lifespan_report())
+    if run_all or args.first_request:
+        results["first_request"] = measure_first_request(args.runs)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    if "imports" in results:
+        print(f"[imports] backend.main 共 {results['imports']['total_ms']:.0f} ms")
+        for item in results["imports"]["top"]:
+            print(
+                f"  {item['self_ms']:>8.1f} ms  {item['cumulative_ms']:>8.1f} ms  {item['module']}"
+            )
+    if "lifespan" in results:
+        lifespan = results["lifespan"]
+        print(f"[lifespan] 导入 {lifespan['import_ms']:.0f} ms，启动 {lifespan['total_ms']:.0f} ms")
+        for phase in lifespan["phases"]:
+            print(f"  {phase['ms']:>8.1f} ms  {phase['name']}")
+    if "first_request" in results:
+        first = results["first_request"]
+        print(f"[first-request] 中位数 {first['median_wall_ms']:.0f} ms（{first['runs']} 次）")
+        for sample in first["samples"]:
+            print(
+                f"  wall {sample['wall_ms']:>8.1f} ms  import {sample['import_ms']:>8.1f} ms  "
+                f"startup {sample['startup_ms']:>7.1f} ms  request {sample['request_ms']:>6.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,11 @@ import asyncio
 import hashlib
 import logging
 import re
+from collections import defaultdict
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import and_, desc, func, or_, select
+from sqlalchemy import and_, desc, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
@@ -25,6 +26,8 @@ from backend.models.core import Notification
 from backend.models.user import User
 from backend.schemas import CommentCreate, CommentResponse
 from backend.services._avatar_helpers import resolved_for_comment
+from backend.services.notification_hub import notification_hub
+from backend.utils import comment_paths
 
 if TYPE_CHECKING:
     pass
@@ -34,6 +37,8 @@ logger = logging.getLogger(__name__)
 HTTP_URL_RE = re.compile(r"^https?://", re.IGNORECASE)
 GRAVATAR_BASE = "https://www.gravatar.com/avatar"
 AUTO_REJECT_ON_SENSITIVE_DEFAULT = True
+# 根评论列表中每条根评论附带的回复数
+TOP_REPLIES = 3
 
 
 # ================= 静态辅助工具 =================
@@ -139,7 +144,8 @@ class CommentService:
     ) -> tuple[list[CommentResponse], int]:
         """
         分页取某文章的根评论（parent_id is null）。
-        - 每条根评论预取前 3 条最新回复并计算 reply_total。
+        - 每条根评论附带前 TOP_REPLIES 条回复（按物化路径，即回复先后），reply_total 取自
+          冗余列 reply_count；删除过的回复序号不复用，此时附带的回复可能少于 TOP_REPLIES 条。
         - include_unapproved=True：仅作者/管理员可见"自己提交"的 pending/rejected，其他用户不可见他人的非 approved。
         """
         post_id = post.id
@@ -184,96 +190,59 @@ class CommentService:
         total_res = await db.execute(count_stmt)
         total = int(total_res.scalar_one() or 0)
 
+        # 一次有界查询取回本页根评论及各自的前 TOP_REPLIES 条回复：
+        # 根评论分页为子查询，回复按物化路径做索引范围匹配，不扫描整棵线程
         offset = max(0, (page - 1) * page_size)
-        list_stmt = (
-            select(Comment)
-            .options(
-                joinedload(Comment.user),
-                joinedload(Comment.post),
-                joinedload(Comment.parent),
-            )
+        page_roots = (
+            select(Comment.id, Comment.path)
             .where(where_stmt)
-            .order_by(desc(Comment.is_pinned), desc(Comment.created_at))
+            .order_by(desc(Comment.is_pinned), desc(Comment.created_at), desc(Comment.id))
             .limit(page_size)
             .offset(offset)
+            .subquery("page_roots")
         )
-        list_res = await db.execute(list_stmt)
-        roots: list[Comment] = list(list_res.scalars().all())
-
-        # 批量求 reply_total + 取前 3 条最新回复（一次性批查询以减少 round-trip）
-        response_items: list[CommentResponse] = []
-        if roots:
-            root_ids = [r.id for r in roots]
+        top_replies = and_(
+            Comment.parent_id == page_roots.c.id,
+            Comment.path > page_roots.c.path + comment_paths.SEPARATOR,
+            Comment.path
+            <= page_roots.c.path + comment_paths.SEPARATOR + comment_paths.segment(TOP_REPLIES),
+        )
+        thread_stmt = (
+            select(Comment)
+            .options(joinedload(Comment.user))
+            .join(page_roots, or_(Comment.id == page_roots.c.id, top_replies))
+        )
+        rows: list[Comment] = list((await db.execute(thread_stmt)).scalars().all())
 
-            total_subq = (
-                select(Comment.parent_id, func.count(Comment.id).label("c"))
-                .where(Comment.parent_id.in_(root_ids))
-                .group_by(Comment.parent_id)
+        roots = sorted(
+            (c for c in rows if c.parent_id is None),
+            key=lambda c: (c.is_pinned, c.created_at, c.id),
+            reverse=True,
+        )
+        replies_by_root: dict[int, list[Comment]] = defaultdict(list)
+        for c in sorted((c for c in rows if c.parent_id is not None), key=lambda c: c.path):
+            replies_by_root[c.parent_id].append(c)
+
+        # 非 approved 回复的可见性过滤（和根一样规则）
+        def reply_visible(reply: Comment) -> bool:
+            if reply.status == "approved":
+                return True
+            if not include_unapproved:
+                return False
+            if current_user is None:
+                return False
+            staff = bool(
+                getattr(current_user, "is_staff", False)
+                or getattr(current_user, "is_superuser", False)
             )
-            total_res2 = await db.execute(total_subq)
-            totals_map: dict[int, int] = {pid: int(c) for pid, c in total_res2.all()}
-
-            # 取每个根评论前 3 条最新回复：用窗口函数 row_number 因 SQLite/PG 都支持
-            from sqlalchemy import func as sa_func
+            if staff or (post_author_id is not None and current_user.id == post_author_id):
+                return True
+            return bool(reply.user_id == current_user.id)
 
-            rn = (
-                sa_func.row_number()
-                .over(partition_by=Comment.parent_id, order_by=Comment.created_at.asc())
-                .label("rn")
-            )
-            replies_stmt = (
-                select(Comment, rn)
-                .options(
-                    joinedload(Comment.user),
-                    joinedload(Comment.post),
-                    joinedload(Comment.parent),
-                )
-                .where(Comment.parent_id.in_(root_ids))
-            )
-            # 兼容：无窗口函数时退化为每个根查 3 条
-            try:
-                rr = await db.execute(replies_stmt)
-                flat: list[tuple[Comment, int]] = list(rr.all())
-                replies_by_root: dict[int, list[Comment]] = {rid: [] for rid in root_ids}
-                for c, rnum in flat:
-                    if rnum <= 3:
-                        replies_by_root.setdefault(c.parent_id, []).append(c)
-            except Exception:
-                replies_by_root = {rid: [] for rid in root_ids}
-                for rid in root_ids:
-                    per = await db.execute(
-                        select(Comment)
-                        .options(
-                            joinedload(Comment.user),
-                            joinedload(Comment.post),
-                            joinedload(Comment.parent),
-                        )
-                        .where(Comment.parent_id == rid)
-                        .order_by(Comment.created_at.asc())
-                        .limit(3)
-                    )
-                    replies_by_root[rid] = list(per.scalars().all())
-
-            # 非 approved 回复的可见性过滤（和根一样规则）
-            def reply_visible(reply: Comment) -> bool:
-                if reply.status == "approved":
-                    return True
-                if not include_unapproved:
-                    return False
-                if current_user is None:
-                    return False
-                staff = bool(
-                    getattr(current_user, "is_staff", False)
-                    or getattr(current_user, "is_superuser", False)
-                )
-                if staff or (post_author_id is not None and current_user.id == post_author_id):
-                    return True
-                return bool(reply.user_id == current_user.id)
-
-            for r in roots:
-                reply_total = totals_map.get(r.id, 0)
-                raw_replies = [rep for rep in replies_by_root.get(r.id, []) if reply_visible(rep)]
-                response_items.append(_comment_to_response(r, raw_replies, reply_total))
+        response_items: list[CommentResponse] = []
+        for r in roots:
+            raw_replies = [rep for rep in replies_by_root.get(r.id, []) if reply_visible(rep)]
+            response_items.append(_comment_to_response(r, raw_replies, r.reply_count))
 
         return response_items, total
 
@@ -357,6 +326,67 @@ class CommentService:
         items = [_comment_to_response(c) for c in res.scalars().all()]
         return items, total, post
 
+    @staticmethod
+    async def list_comment_tree(db: AsyncSession, post_id: int) -> list[CommentResponse]:
+        """
+        整篇文章的已通过评论树（不分页）
+
+        按物化路径一次查询，父评论总排在子评论之前，单遍组装，无递归预加载。
+        父评论未通过时其回复一并隐藏；根评论按时间倒序。
+        """
+        rows = (
+            await db.execute(
+                select(Comment)
+                .options(joinedload(Comment.user))
+                .where(Comment.post_id == post_id, Comment.active.is_(True))
+                .order_by(Comment.path)
+            )
+        ).scalars().all()
+
+        nodes: dict[int, CommentResponse] = {}
+        roots: list[tuple[Comment, CommentResponse]] = []
+        for c in rows:
+            node = _comment_to_response(c, reply_total=c.reply_count)
+            if c.parent_id is None:
+                roots.append((c, node))
+            elif c.parent_id in nodes:
+                nodes[c.parent_id].replies.append(node)
+            else:
+                continue
+            nodes[c.id] = node
+        roots.sort(key=lambda item: (item[0].created_at, item[0].id), reverse=True)
+        return [node for _, node in roots]
+
+    @staticmethod
+    async def rebuild_threads(db: AsyncSession, post_ids: list[int]) -> int:
+        """
+        重新计算若干文章下全部评论的物化路径与回复统计
+
+        用于绕过 ORM 写入评论的场景（批量导入等）。
+
+        Returns:
+            int: 更新的评论数
+        """
+        updated = 0
+        for post_id in post_ids:
+            rows = await db.execute(
+                select(Comment.id, Comment.parent_id, Comment.created_at).where(
+                    Comment.post_id == post_id
+                )
+            )
+            encoded = comment_paths.encode_threads(rows.all())
+            if encoded:
+                # 先清空再写入，避免重排过程中与旧路径撞唯一索引
+                await db.execute(
+                    update(Comment).where(Comment.post_id == post_id).values(path=None)
+                )
+                await db.execute(
+                    update(Comment),
+                    [{"id": cid, **fields._asdict()} for cid, fields in encoded.items()],
+                )
+                updated += len(encoded)
+        return updated
+
     # ---------- 创建评论 ----------
 
     @staticmethod
@@ -561,7 +591,7 @@ class CommentService:
 
                 # actor_id fallback：游客评论没有 actor_user_id 时，用站点管理员 ID=1 兜底
                 resolved_actor = actor_user_id or 1
-                written_notif_ids: list[int] = []
+                written_notifs: list[Notification] = []
                 for rid, verb, msg_zh in recipients:
                     try:
                         notif = Notification(
@@ -576,16 +606,18 @@ class CommentService:
                         )
                         adb.add(notif)
                         await adb.flush()
-                        written_notif_ids.append(notif.id)
+                        written_notifs.append(notif)
                     except Exception:
                         logger.exception("write notification failed, rid=%s", rid)
 
-                if written_notif_ids:
+                if written_notifs:
                     try:
                         await adb.commit()
                     except Exception:
                         logger.exception("commit notifications failed")
                         await adb.rollback()
+                    else:
+                        await notification_hub.publish_notifications(written_notifs)
 
                 # 邮件发送
                 try:
@@ -0,0 +1,129 @@
+"""
+私信会话汇总维护
+
+conversations 表每对用户一行，保存最后一条私信、双方各自的未读数与更新时间，
+收件箱只需分页读取本表（见 inbox_query），不再对全部私信分组聚合、逐会话统计未读。
+
+写入方（api/messages）在同一事务内调用：
+
+- record_message: 发送私信后，更新最后一条私信并给接收方未读数 +1（首条私信时创建会话）
+- decrement_unread: 接收方标记已读，未读数减去实际标记的条数
+
+Example:
+    >>> db.add(message)
+    >>> await db.flush()
+    >>> await record_message(db, message)
+"""
+
+from sqlalchemy import Select, case, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.message import Conversation, PrivateMessage
+from backend.models.user import User
+
+
+def conversation_pair(user_a: int, user_b: int) -> tuple[int, int]:
+    """会话键：(较小 ID, 较大 ID)"""
+    return (user_a, user_b) if user_a < user_b else (user_b, user_a)
+
+
+def _unread_column(user_id: int, pair: tuple[int, int]) -> str:
+    return "unread_low" if user_id == pair[0] else "unread_high"
+
+
+def _pair_filter(pair: tuple[int, int]):
+    return (Conversation.user_low_id == pair[0]) & (Conversation.user_high_id == pair[1])
+
+
+async def record_message(db: AsyncSession, message: PrivateMessage) -> None:
+    """
+    把新私信计入会话汇总
+
+    Args:
+        db: 数据库会话
+        message: 已 flush（有 id）的私信
+    """
+    pair = conversation_pair(message.sender_id, message.recipient_id)
+    unread = _unread_column(message.recipient_id, pair)
+    stmt = (
+        update(Conversation)
+        .where(_pair_filter(pair))
+        .values(
+            {
+                "last_message_id": message.id,
+                "updated_at": func.now(),
+                unread: getattr(Conversation, unread) + 1,
+            }
+        )
+    )
+    if (await db.execute(stmt)).rowcount:
+        return
+    try:
+        async with db.begin_nested():
+            db.add(
+                Conversation(
+                    user_low_id=pair[0],
+                    user_high_id=pair[1],
+                    last_message_id=message.id,
+                    **{unread: 1},
+                )
+            )
+    except IntegrityError:
+        # 双方同时发出首条私信，另一方已创建会话
+        await db.execute(stmt)
+
+
+async def decrement_unread(db: AsyncSession, user_id: int, other_id: int, count: int = 1) -> None:
+    """
+    user_id 一侧的未读数减去 count（不小于 0）
+
+    count 取标记已读的 UPDATE 实际影响的行数：并发写入的新私信不会被一并清零。
+    """
+    pair = conversation_pair(user_id, other_id)
+    column = getattr(Conversation, _unread_column(user_id, pair))
+    await db.execute(
+        update(Conversation)
+        .where(_pair_filter(pair))
+        .values({column.key: case((column > count, column - count), else_=0)})
+    )
+
+
+def _involving(user_id: int):
+    return or_(Conversation.user_low_id == user_id, Conversation.user_high_id == user_id)
+
+
+def _unread_for(user_id: int):
+    return case(
+        (Conversation.user_low_id == user_id, Conversation.unread_low),
+        else_=Conversation.unread_high,
+    )
+
+
+def inbox_query(user_id: int) -> Select:
+    """
+    收件箱查询：会话、对方用户、最后一条私信与本人未读数，按最近更新排序
+
+    调用方追加 offset / limit 分页。
+    """
+    other_id = case(
+        (Conversation.user_low_id == user_id, Conversation.user_high_id),
+        else_=Conversation.user_low_id,
+    )
+    return (
+        select(Conversation, User, PrivateMessage, _unread_for(user_id).label("unread_count"))
+        .join(User, User.id == other_id)
+        .outerjoin(PrivateMessage, PrivateMessage.id == Conversation.last_message_id)
+        .where(_involving(user_id))
+        .order_by(Conversation.updated_at.desc(), Conversation.last_message_id.desc())
+    )
+
+
+def inbox_count_query(user_id: int) -> Select:
+    """收件箱会话总数"""
+    return select(func.count()).select_from(Conversation).where(_involving(user_id))
+
+
+def unread_total_query(user_id: int) -> Select:
+    """全部会话的未读数之和"""
+    return select(func.coalesce(func.sum(_unread_for(user_id)), 0)).where(_involving(user_id))
@@ -3,7 +3,8 @@ Rosetta FastAPI 后端 - 邮件服务模块
 
 提供异步邮件发送功能，包括：
 - 异步邮件发送
-- 邮件模板支持
+- 邮件模板支持（编译结果进程内缓存，内置默认模板）
+- SMTP 长连接池（连接复用、断线重连、按域名限速）
 - 邮件队列管理
 - 多种邮件类型支持
 
@@ -17,19 +18,25 @@ Example:
 import asyncio
 import logging
 import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.utils import formataddr
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
-
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from typing import TYPE_CHECKING, Any
 
 from backend.core.config import settings
 from backend.core.tasks import BackgroundTaskManager, background_task
 
+if TYPE_CHECKING:
+    # jinja2 在首次渲染邮件时才导入，不计入应用启动时间
+    from jinja2 import BaseLoader, Environment, Template
+
 logger = logging.getLogger(__name__)
 
 
@@ -85,11 +92,100 @@ class EmailResult:
     sent_at: datetime = field(default_factory=datetime.now)
 
 
+# 内置邮件模板：模板目录中同名文件优先，缺失时使用这里的版本
+BUILTIN_TEMPLATES: dict[str, str] = {
+    "welcome.html": """<html>
+<body>
+    <h2>欢迎加入 {{ site_name }}！</h2>
+    <p>亲爱的 {{ username }}，</p>
+    <p>感谢您注册 {{ site_name }}。我们很高兴您的加入！</p>
+    <p>请访问 <a href="{{ site_url }}">{{ site_url }}</a> 开始您的旅程。</p>
+    <br>
+    <p>祝好，</p>
+    <p>{{ site_name }} 团队</p>
+</body>
+</html>
+""",
+    "notification.html": """<html>
+<body>
+    <h2>{{ title }}</h2>
+    <p>{{ content }}</p>
+    {% if link %}<p><a href="{{ link }}">点击查看详情</a></p>{% endif %}
+    <br>
+    <p>{{ site_name }}</p>
+</body>
+</html>
+""",
+    "password_reset.html": """<html>
+<body>
+    <h2>密码重置</h2>
+    <p>亲爱的 {{ username }}，</p>
+    <p>您收到这封邮件是因为您请求重置密码。</p>
+    <p>请点击以下链接重置密码：</p>
+    <p><a href="{{ reset_link }}">{{ reset_link }}</a></p>
+    <p>此链接将在 {{ expire_hours }} 小时后过期。</p>
+    <p>如果您没有请求重置密码，请忽略此邮件。</p>
+    <br>
+    <p>{{ site_name }}</p>
+</body>
+</html>
+""",
+    "email_verification.html": """<html>
+<body>
+    <h2>邮箱验证</h2>
+    <p>亲爱的 {{ username }}，</p>
+    <p>请点击以下链接验证您的邮箱地址：</p>
+    <p><a href="{{ verification_link }}">{{ verification_link }}</a></p>
+    <br>
+    <p>{{ site_name }}</p>
+</body>
+</html>
+""",
+    "comment_notification.html": """<html>
+<body>
+    <h2>新评论通知</h2>
+    <p>您的文章《{{ post_title }}》收到了新评论：</p>
+    <blockquote>{{ comment_content }}</blockquote>
+    <p>—— {{ commenter_name }}</p>
+    <p><a href="{{ post_link }}">点击查看详情</a></p>
+    <br>
+    <p>{{ site_name }}</p>
+</body>
+</html>
+""",
+}
+
+
+@lru_cache(maxsize=8)
+def _template_environment(template_dir: str, auto_reload: bool) -> "Environment":
+    """
+    获取模板目录对应的 Jinja2 环境（进程内共享）
+
+    同一目录的所有 EmailTemplateEngine 共用一个环境，编译后的模板保存在环境的
+    缓存中；非调试模式下关闭 auto_reload，命中缓存时不再 stat 模板文件。
+    """
+    from jinja2 import ChoiceLoader, DictLoader, Environment, FileSystemLoader, select_autoescape
+
+    loaders: list[BaseLoader] = []
+    if Path(template_dir).exists():
+        loaders.append(FileSystemLoader(template_dir))
+    else:
+        logger.warning(f"邮件模板目录不存在，使用内置模板: {template_dir}")
+    loaders.append(DictLoader(BUILTIN_TEMPLATES))
+    return Environment(
+        loader=ChoiceLoader(loaders),
+        autoescape=select_autoescape(["html", "xml"]),
+        auto_reload=auto_reload,
+        cache_size=200,
+    )
+
+
 class EmailTemplateEngine:
     """
     邮件模板引擎
 
-    使用 Jinja2 渲染邮件模板。
+    使用 Jinja2 渲染邮件模板。模板目录中的文件优先，缺失时回退到 BUILTIN_TEMPLATES；
+    编译结果按目录在进程内缓存。
 
     Attributes:
         template_dir: 模板目录
@@ -106,15 +202,15 @@ class EmailTemplateEngine:
         if template_dir is None:
             template_dir = Path(__file__).parent.parent / "templates" / "email"
         self.template_dir = Path(template_dir)
+        self.environment = _template_environment(str(self.template_dir), settings.debug)
 
-        if self.template_dir.exists():
-            self.environment = Environment(
-                loader=FileSystemLoader(str(self.template_dir)),
-                autoescape=select_autoescape(["html", "xml"]),
-            )
-        else:
-            self.environment = None
-            logger.warning(f"邮件模板目录不存在: {self.template_dir}")
+    def _get_template(self, template_name: str) -> "Template":
+        from jinja2 import TemplateNotFound
+
+        try:
+            return self.environment.get_template(template_name)
+        except TemplateNotFound as e:
+            raise FileNotFoundError(f"邮件模板不存在: {template_name}") from e
 
     def render(self, template_name: str, context: dict[str, Any]) -> str:
         """
@@ -130,11 +226,7 @@ class EmailTemplateEngine:
         Raises:
             FileNotFoundError: 模板文件不存在
         """
-        if self.environment is None:
-            raise FileNotFoundError("邮件模板目录不存在")
-
-        template = self.environment.get_template(template_name)
-        return template.render(**context)
+        return self._get_template(template_name).render(**context)
 
     def render_text(self, template_name: str, context: dict[str, Any]) -> str:
         """
@@ -147,11 +239,236 @@ class EmailTemplateEngine:
         Returns:
             str: 渲染后的文本
         """
-        if self.environment is None:
-            raise FileNotFoundError("邮件模板目录不存在")
+        return self._get_template(template_name).render(**context)
+
+
+class _DomainRateLimiter:
+    """按收件人域名的令牌桶（每分钟 per_minute 封，允许同等数量的突发）"""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    async def acquire(self, domain: str) -> None:
+        if self.per_minute <= 0:
+            return
+        rate = self.per_minute / 60
+        while True:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(domain, (float(self.per_minute), now))
+            tokens = min(float(self.per_minute), tokens + (now - updated) * rate)
+            if tokens >= 1:
+                self._buckets[domain] = (tokens - 1, now)
+                return
+            self._buckets[domain] = (tokens, now)
+            await asyncio.sleep((1 - tokens) / rate)
+
+
+@dataclass
+class _PooledConnection:
+    smtp: smtplib.SMTP
+    sent: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class SMTPConnectionPool:
+    """
+    长连接 SMTP 连接池
+
+    - 固定大小的线程池执行阻塞的 smtplib 调用，同时进行的 SMTP 会话不超过 size
+    - 连接登录后保留复用，一个连接连续发送最多 max_messages 封后才重建，
+      空闲超过 idle_timeout 秒的连接在下次取用时关闭
+    - 复用的连接已被服务器断开时自动重连并重发一次
+    - 可选按收件人域名限速，避免突发通知触发对方的频率限制
+
+    Example:
+        >>> pool = get_smtp_pool("smtp.example.com", 465, "user", "password", True)
+        >>> await pool.send("from@example.com", ["to@example.com"], message_string)
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        use_tls: bool,
+        *,
+        size: int | None = None,
+        max_messages: int | None = None,
+        idle_timeout: float | None = None,
+        domain_rate_limit: int | None = None,
+        timeout: float = 30.0,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size or settings.smtp_pool_size
+        self.max_messages = max_messages or settings.smtp_max_messages_per_connection
+        self.idle_timeout = settings.smtp_idle_timeout if idle_timeout is None else idle_timeout
+        self.timeout = timeout
+        self._rate_limiter = _DomainRateLimiter(
+            settings.smtp_domain_rate_limit if domain_rate_limit is None else domain_rate_limit
+        )
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="smtp")
+        self._idle: list[_PooledConnection] = []
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.messages = 0
+
+    def _connect(self) -> _PooledConnection:
+        if self.use_tls:
+            smtp: smtplib.SMTP = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            smtp.starttls()
+        try:
+            smtp.login(self.user, self.password)
+        except Exception:
+            self._quit(smtp)
+            raise
+        with self._lock:
+            self.connects += 1
+        return _PooledConnection(smtp=smtp)
+
+    @staticmethod
+    def _quit(smtp: smtplib.SMTP) -> None:
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    def _checkout(self) -> tuple[_PooledConnection, bool]:
+        now = time.monotonic()
+        stale: list[_PooledConnection] = []
+        conn = None
+        with self._lock:
+            while self._idle:
+                candidate = self._idle.pop()
+                if now - candidate.last_used > self.idle_timeout:
+                    stale.append(candidate)
+                    continue
+                conn = candidate
+                break
+        for old in stale:
+            self._quit(old.smtp)
+        if conn is not None:
+            return conn, True
+        return self._connect(), False
+
+    def _checkin(self, conn: _PooledConnection) -> None:
+        if conn.sent >= self.max_messages:
+            self._quit(conn.smtp)
+            return
+        conn.last_used = time.monotonic()
+        with self._lock:
+            self._idle.append(conn)
+
+    def _send_blocking(self, from_addr: str, recipients: list[str], message: str) -> None:
+        conn, reused = self._checkout()
+        try:
+            conn.smtp.sendmail(from_addr, recipients, message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+            self._quit(conn.smtp)
+            if not reused:
+                raise
+            # 复用的连接已被服务器关闭：换一条新连接重发
+            logger.debug(f"SMTP 连接已断开，重新连接: {e}")
+            conn = self._connect()
+            try:
+                conn.smtp.sendmail(from_addr, recipients, message)
+            except Exception:
+                self._quit(conn.smtp)
+                raise
+        except smtplib.SMTPRecipientsRefused:
+            self._checkin(conn)
+            raise
+        except smtplib.SMTPResponseException as e:
+            # 421 表示服务器将关闭连接，其余响应错误（拒收等）连接仍可用
+            if e.smtp_code == 421:
+                self._quit(conn.smtp)
+            else:
+                self._checkin(conn)
+            raise
+        except Exception:
+            self._quit(conn.smtp)
+            raise
+        conn.sent += 1
+        with self._lock:
+            self.messages += 1
+        self._checkin(conn)
+
+    async def send(self, from_addr: str, recipients: list[str], message: str) -> None:
+        """
+        发送一封邮件
+
+        Args:
+            from_addr: 信封发件人
+            recipients: 信封收件人
+            message: 完整的 MIME 消息文本
+        """
+        for domain in sorted({r.rpartition("@")[2].lower() for r in recipients}):
+            await self._rate_limiter.acquire(domain)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            self._executor, self._send_blocking, from_addr, recipients, message
+        )
+
+    def stats(self) -> dict[str, int]:
+        """连接池统计"""
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "connects": self.connects,
+            "messages": self.messages,
+        }
+
+    def close(self) -> None:
+        """关闭所有空闲连接并停止线程池"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._quit(conn.smtp)
+        self._executor.shutdown(wait=False)
+
+
+_smtp_pools: dict[tuple[str, int, str, str, bool], SMTPConnectionPool] = {}
+_smtp_pools_lock = threading.Lock()
+
+
+def get_smtp_pool(
+    host: str, port: int, user: str, password: str, use_tls: bool
+) -> SMTPConnectionPool:
+    """
+    获取（或创建）指定 SMTP 账户的共享连接池
 
-        template = self.environment.get_template(template_name)
-        return template.render(**context)
+    Args:
+        host: SMTP 服务器地址
+        port: SMTP 服务器端口
+        user: SMTP 用户名
+        password: SMTP 密码
+        use_tls: 是否使用 SSL 直连
+
+    Returns:
+        SMTPConnectionPool: 连接池
+    """
+    key = (host, port, user, password, use_tls)
+    with _smtp_pools_lock:
+        pool = _smtp_pools.get(key)
+        if pool is None:
+            pool = _smtp_pools[key] = SMTPConnectionPool(host, port, user, password, use_tls)
+        return pool
+
+
+def close_smtp_pools() -> None:
+    """关闭所有 SMTP 连接池（应用关闭时调用）"""
+    with _smtp_pools_lock:
+        pools = list(_smtp_pools.values())
+        _smtp_pools.clear()
+    for pool in pools:
+        pool.close()
 
 
 class EmailService:
@@ -263,7 +580,9 @@ class EmailService:
 
     async def _send_sync(self, email: EmailMessage) -> EmailResult:
         """
-        同步发送邮件（内部方法）
+        发送邮件（内部方法）
+
+        通过共享的 SMTP 连接池发送，复用已登录的长连接。
 
         Args:
             email: 邮件消息
@@ -287,20 +606,14 @@ class EmailService:
             if email.bcc:
                 recipients.extend(email.bcc)
 
-            loop = asyncio.get_event_loop()
-
-            def send() -> None:
-                if self.smtp_use_tls:
-                    smtp = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port)
-                else:
-                    smtp = smtplib.SMTP(self.smtp_host, self.smtp_port)
-                    smtp.starttls()
-
-                smtp.login(self.smtp_user, self.smtp_password)
-                smtp.sendmail(self.from_email, recipients, msg.as_string())
-                smtp.quit()
-
-            await loop.run_in_executor(None, send)
+            pool = get_smtp_pool(
+                self.smtp_host,
+                self.smtp_port,
+                self.smtp_user,
+                self.smtp_password,
+                self.smtp_use_tls,
+            )
+            await pool.send(self.from_email, recipients, msg.as_string())
 
             logger.info(f"邮件发送成功: {email.to} - {email.subject}")
             return EmailResult(success=True)
@@ -364,6 +677,20 @@ class EmailService:
 
         return await self._send_sync(email)
 
+    async def send_bulk(self, emails: list[EmailMessage]) -> list[EmailResult]:
+        """
+        立即并发发送一批邮件
+
+        并发度由 SMTP 连接池大小限制，同一连接上连续发送多封，适合通知类突发。
+
+        Args:
+            emails: 邮件消息列表
+
+        Returns:
+            list[EmailResult]: 与输入顺序一致的发送结果
+        """
+        return list(await asyncio.gather(*(self._send_sync(email) for email in emails)))
+
     async def send_template_email(
         self,
         to: str,
@@ -424,34 +751,13 @@ class EmailService:
             "site_url": settings.site_url,
         }
 
-        try:
-            return await self.send_template_email(
-                to=to,
-                subject=f"欢迎加入 {settings.site_name}",
-                template_name="welcome.html",
-                context=context,
-                background=background,
-            )
-        except FileNotFoundError:
-            html_body = f"""
-            <html>
-            <body>
-                <h2>欢迎加入 {settings.site_name}！</h2>
-                <p>亲爱的 {username}，</p>
-                <p>感谢您注册 {settings.site_name}。我们很高兴您的加入！</p>
-                <p>请访问 <a href="{settings.site_url}">{settings.site_url}</a> 开始您的旅程。</p>
-                <br>
-                <p>祝好，</p>
-                <p>{settings.site_name} 团队</p>
-            </body>
-            </html>
-            """
-            return await self.send_email(
-                to=to,
-                subject=f"欢迎加入 {settings.site_name}",
-                html_body=html_body,
-                background=background,
-            )
+        return await self.send_template_email(
+            to=to,
+            subject=f"欢迎加入 {settings.site_name}",
+            template_name="welcome.html",
+            context=context,
+            background=background,
+        )
 
     async def send_notification_email(
         self,
@@ -482,33 +788,13 @@ class EmailService:
             "site_url": settings.site_url,
         }
 
-        try:
-            return await self.send_template_email(
-                to=to,
-                subject=f"[{settings.site_name}] {title}",
-                template_name="notification.html",
-                context=context,
-                background=background,
-            )
-        except FileNotFoundError:
-            link_html = f'<p><a href="{link}">点击查看详情</a></p>' if link else ""
-            html_body = f"""
-            <html>
-            <body>
-                <h2>{title}</h2>
-                <p>{content}</p>
-                {link_html}
-                <br>
-                <p>{settings.site_name}</p>
-            </body>
-            </html>
-            """
-            return await self.send_email(
-                to=to,
-                subject=f"[{settings.site_name}] {title}",
-                html_body=html_body,
-                background=background,
-            )
+        return await self.send_template_email(
+            to=to,
+            subject=f"[{settings.site_name}] {title}",
+            template_name="notification.html",
+            context=context,
+            background=background,
+        )
 
     async def send_password_reset_email(
         self,
@@ -539,36 +825,13 @@ class EmailService:
             "site_url": settings.site_url,
         }
 
-        try:
-            return await self.send_template_email(
-                to=to,
-                subject=f"[{settings.site_name}] 密码重置",
-                template_name="password_reset.html",
-                context=context,
-                background=background,
-            )
-        except FileNotFoundError:
-            html_body = f"""
-            <html>
-            <body>
-                <h2>密码重置</h2>
-                <p>亲爱的 {username}，</p>
-                <p>您收到这封邮件是因为您请求重置密码。</p>
-                <p>请点击以下链接重置密码：</p>
-                <p><a href="{reset_link}">{reset_link}</a></p>
-                <p>此链接将在 {expire_hours} 小时后过期。</p>
-                <p>如果您没有请求重置密码，请忽略此邮件。</p>
-                <br>
-                <p>{settings.site_name}</p>
-            </body>
-            </html>
-            """
-            return await self.send_email(
-                to=to,
-                subject=f"[{settings.site_name}] 密码重置",
-                html_body=html_body,
-                background=background,
-            )
+        return await self.send_template_email(
+            to=to,
+            subject=f"[{settings.site_name}] 密码重置",
+            template_name="password_reset.html",
+            context=context,
+            background=background,
+        )
 
     async def send_verification_email(
         self,
@@ -596,33 +859,13 @@ class EmailService:
             "site_url": settings.site_url,
         }
 
-        try:
-            return await self.send_template_email(
-                to=to,
-                subject=f"[{settings.site_name}] 邮箱验证",
-                template_name="email_verification.html",
-                context=context,
-                background=background,
-            )
-        except FileNotFoundError:
-            html_body = f"""
-            <html>
-            <body>
-                <h2>邮箱验证</h2>
-                <p>亲爱的 {username}，</p>
-                <p>请点击以下链接验证您的邮箱地址：</p>
-                <p><a href="{verification_link}">{verification_link}</a></p>
-                <br>
-                <p>{settings.site_name}</p>
-            </body>
-            </html>
-            """
-            return await self.send_email(
-                to=to,
-                subject=f"[{settings.site_name}] 邮箱验证",
-                html_body=html_body,
-                background=background,
-            )
+        return await self.send_template_email(
+            to=to,
+            subject=f"[{settings.site_name}] 邮箱验证",
+            template_name="email_verification.html",
+            context=context,
+            background=background,
+        )
 
     async def send_comment_notification(
         self,
@@ -656,34 +899,13 @@ class EmailService:
             "site_url": settings.site_url,
         }
 
-        try:
-            return await self.send_template_email(
-                to=to,
-                subject=f"[{settings.site_name}] 您的文章收到了新评论",
-                template_name="comment_notification.html",
-                context=context,
-                background=background,
-            )
-        except FileNotFoundError:
-            html_body = f"""
-            <html>
-            <body>
-                <h2>新评论通知</h2>
-                <p>您的文章《{post_title}》收到了新评论：</p>
-                <blockquote>{comment_content}</blockquote>
-                <p>—— {commenter_name}</p>
-                <p><a href="{post_link}">点击查看详情</a></p>
-                <br>
-                <p>{settings.site_name}</p>
-            </body>
-            </html>
-            """
-            return await self.send_email(
-                to=to,
-                subject=f"[{settings.site_name}] 您的文章收到了新评论",
-                html_body=html_body,
-                background=background,
-            )
+        return await self.send_template_email(
+            to=to,
+            subject=f"[{settings.site_name}] 您的文章收到了新评论",
+            template_name="comment_notification.html",
+            context=context,
+            background=background,
+        )
 
     def get_task_status(self, task_id: str) -> dict[str, Any] | None:
         """
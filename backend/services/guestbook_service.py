@@ -24,6 +24,7 @@ from backend.models.guestbook import GuestbookEntry
 from backend.models.user import User
 from backend.schemas import GuestbookEntryCreate, GuestbookEntryResponse
 from backend.services._avatar_helpers import resolved_for_guestbook
+from backend.services.notification_hub import notification_hub
 
 logger = logging.getLogger(__name__)
 
@@ -308,6 +309,7 @@ class GuestbookService:
 
                 resolved_actor = actor_user_id or 1
 
+                notifs: list[Notification] = []
                 for admin in admins:
                     try:
                         notif = Notification(
@@ -324,6 +326,7 @@ class GuestbookService:
                             level="info",
                         )
                         adb.add(notif)
+                        notifs.append(notif)
                     except Exception:
                         logger.exception("write guestbook notification failed, rid=%s", admin.id)
 
@@ -332,6 +335,8 @@ class GuestbookService:
                 except Exception:
                     logger.exception("commit guestbook notifications failed")
                     await adb.rollback()
+                else:
+                    await notification_hub.publish_notifications(notifs)
         except Exception:
             logger.exception("_fire_notifications failed (non-fatal)")
 
@@ -0,0 +1,1322 @@
+"""
+批量导入服务
+
+为 import_posts / import_markdown / backup_restore 提供集合式（set-based）导入引擎：
+- 上传文件分块落盘，不再整包读入内存，同时计算 SHA-256 作为断点键
+- 每张表按 key 一次性预取已存在记录（slug / username / key），消除逐行 SELECT
+- 分块批量 INSERT（PostgreSQL / SQLite 使用 ON CONFLICT DO NOTHING）
+- 分块失败时退化为逐行写入（SAVEPOINT 隔离），只丢弃真正出错的行
+- 进度写入共享 dict，可作为 BackgroundTaskManager 任务元数据对外暴露
+- 按阶段 / 分块写入断点文件，中断后重新上传同一文件可从断点续跑
+
+Example:
+    >>> importer = BulkImporter(db, actor_id=current_user.id, existing="update")
+    >>> await importer.restore_backup(bundle)
+    >>> importer.stats.created
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import zipfile
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Literal
+
+from fastapi import UploadFile
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from backend.core.paths import IMPORT_CHECKPOINT_DIR
+from backend.models.announcement import Announcement
+from backend.models.blog import Category, Comment, Post, Tag, post_tags, save_post_render
+from backend.models.core import FriendLink, Media, Navigation, Page, SiteConfig
+from backend.models.hero import HeroSlide
+from backend.models.post_series import PostSeries
+from backend.models.user import User
+from backend.services.comment_service import CommentService
+from backend.utils import post_metrics
+from backend.utils.compat import UTC
+
+logger = logging.getLogger(__name__)
+
+# 每批 INSERT 的行数
+IMPORT_CHUNK_SIZE = 500
+# IN (...) 预取的单批 key 数（低于 SQLite 旧版本 999 个绑定参数上限）
+PREFETCH_CHUNK_SIZE = 500
+# 上传落盘时每次读取的字节数
+SPOOL_READ_SIZE = 1024 * 1024
+
+# 已存在记录的处理策略：
+#   skip   - 跳过并计入 skipped
+#   update - 用导入数据覆盖并计入 created（与旧 overwrite 语义一致）
+#   error  - 计入 error
+#   ignore - 静默复用，不计数（import_posts 中分类 / 标签的旧语义）
+ExistingPolicy = Literal["skip", "update", "error", "ignore"]
+
+# backup_restore 的阶段顺序（按外键依赖排列）
+RESTORE_STAGES: tuple[str, ...] = (
+    "site_config",
+    "users",
+    "categories",
+    "tags",
+    "navigations",
+    "friend_links",
+    "pages",
+    "post_series",
+    "posts",
+    "comments",
+    "announcements",
+    "hero_slides",
+    "media",
+)
+
+
+# ==================== 上传落盘 ====================
+
+
+async def spool_upload(file: UploadFile, suffix: str = ".zip") -> tuple[Path, str]:
+    """
+    将上传文件分块写入临时文件
+
+    Args:
+        file: FastAPI 上传文件
+        suffix: 临时文件后缀
+
+    Returns:
+        (临时文件路径, 内容 SHA-256)，调用方负责删除临时文件
+    """
+    digest = hashlib.sha256()
+    fd, name = tempfile.mkstemp(prefix="rosetta_import_", suffix=suffix)
+    path = Path(name)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(SPOOL_READ_SIZE):
+                digest.update(chunk)
+                out.write(chunk)
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+    return path, digest.hexdigest()
+
+
+def read_zip_bundle(path: Path, names: Iterable[str]) -> dict[str, Any]:
+    """
+    从落盘的 ZIP 中按成员名流式解析 JSON
+
+    Args:
+        path: ZIP 文件路径
+        names: 成员名列表（不含 .json 后缀），缺失的成员返回 None
+
+    Returns:
+        成员名到解析结果的映射
+    """
+    bundle: dict[str, Any] = {}
+    with zipfile.ZipFile(path, "r") as zf:
+        members = set(zf.namelist())
+        for name in names:
+            member = f"{name}.json"
+            if member not in members:
+                bundle[name] = None
+                continue
+            with zf.open(member) as fp:
+                bundle[name] = json.load(fp)
+    return bundle
+
+
+def parse_markdown_document(text: str) -> tuple[str, str, str] | None:
+    """
+    解析带 frontmatter 的 Markdown 文本
+
+    Args:
+        text: Markdown 原文
+
+    Returns:
+        (title, slug, body)，无 frontmatter 时返回 None
+    """
+    if not text.startswith("---"):
+        return None
+    parts = text.split("---", 2)
+    if len(parts) < 3:
+        return None
+    frontmatter: dict[str, str] = {}
+    for line in parts[1].strip().split("\n"):
+        if ":" in line:
+            key, value = line.split(":", 1)
+            frontmatter[key.strip()] = value.strip()
+    title = frontmatter.get("title", "Untitled")
+    slug = frontmatter.get("slug", re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-"))
+    return title, slug, parts[2].strip()
+
+
+def _parse_dt(value: Any) -> datetime | None:
+    """将 ISO 字符串解析为带时区的 datetime，失败返回 None"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed
+
+
+def _post_metrics(content: dict[str, str], published_at: datetime | None) -> dict[str, Any]:
+    """批量 INSERT 不经过 ORM 事件，文章派生指标在插入行中计算（created_at 由数据库取当前时间）"""
+    text = post_metrics.primary_text(content)
+    return {
+        "word_count": post_metrics.count_words(text),
+        "reading_time": post_metrics.calculate_reading_time(text),
+        "archive_month": post_metrics.archive_month(published_at, None),
+    }
+
+
+def _chunks(items: list[Any], size: int) -> Iterable[list[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+# ==================== 断点与统计 ====================
+
+
+@dataclass
+class ImportCheckpoint:
+    """
+    导入断点
+
+    以「上传文件哈希 + 策略」为键持久化到 IMPORT_CHECKPOINT_DIR，记录：
+    - completed: 已完整提交的阶段
+    - offsets: 未完成阶段已提交的行偏移
+    - counters: 截至断点的累计统计，续跑时恢复
+    """
+
+    key: str
+    completed: list[str] = field(default_factory=list)
+    offsets: dict[str, int] = field(default_factory=dict)
+    counters: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def path(self) -> Path:
+        return IMPORT_CHECKPOINT_DIR / f"{self.key}.json"
+
+    @classmethod
+    def load(cls, key: str) -> "ImportCheckpoint":
+        """读取断点，不存在或损坏时返回空断点"""
+        checkpoint = cls(key=key)
+        try:
+            data = json.loads(checkpoint.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return checkpoint
+        checkpoint.completed = list(data.get("completed", []))
+        checkpoint.offsets = dict(data.get("offsets", {}))
+        checkpoint.counters = dict(data.get("counters", {}))
+        return checkpoint
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps(
+                {"completed": self.completed, "offsets": self.offsets, "counters": self.counters}
+            ),
+            encoding="utf-8",
+        )
+        tmp.replace(self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+    def is_done(self, stage: str) -> bool:
+        return stage in self.completed
+
+    def offset(self, stage: str) -> int:
+        return self.offsets.get(stage, 0)
+
+
+@dataclass
+class ImportStats:
+    """导入统计"""
+
+    created: int = 0
+    skipped: int = 0
+    error_count: int = 0
+    errors: list[str] = field(default_factory=list)
+
+    def error(self, message: str) -> None:
+        self.error_count += 1
+        self.errors.append(message)
+
+    def to_counters(self) -> dict[str, int]:
+        return {"created": self.created, "skipped": self.skipped, "error_count": self.error_count}
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**self.to_counters(), "errors": self.errors[:20]}
+
+
+# ==================== 行构建 / 覆盖 ====================
+
+
+def _category_row(item: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "name": item.get("name", {}),
+        "slug": item.get("slug"),
+        "description": item.get("description"),
+        "icon": item.get("icon"),
+        "color": item.get("color", "primary"),
+        "cover_image": item.get("cover_image"),
+    }
+
+
+def _apply_category(obj: Category, item: dict[str, Any]) -> None:
+    obj.name = item.get("name", obj.name)
+    obj.description = item.get("description", obj.description)
+    obj.icon = item.get("icon", obj.icon)
+    obj.color = item.get("color", obj.color)
+    obj.cover_image = item.get("cover_image", obj.cover_image)
+
+
+def _tag_row(item: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "name": item.get("name", {}),
+        "slug": item.get("slug"),
+        "color": item.get("color", "#64748B"),
+        "icon": item.get("icon"),
+        "is_active": item.get("is_active", True),
+    }
+
+
+def _apply_tag(obj: Tag, item: dict[str, Any]) -> None:
+    obj.name = item.get("name", obj.name)
+    obj.color = item.get("color", obj.color)
+    obj.icon = item.get("icon", obj.icon)
+    obj.is_active = item.get("is_active", obj.is_active)
+
+
+def _site_config_row(item: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "key": item.get("key"),
+        "value": item.get("value", ""),
+        "description": item.get("description"),
+    }
+
+
+def _apply_site_config(obj: SiteConfig, item: dict[str, Any]) -> None:
+    obj.value = item.get("value", obj.value)
+    obj.description = item.get("description", obj.description)
+
+
+def _navigation_row(item: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "title": item.get("title", {}),
+        "url": item.get("url"),
+        "location": item.get("location", "header"),
+        "order": item.get("order", 0),
+        "is_active": item.get("is_active", True),
+        "target_blank": item.get("target_blank", False),
+    }
+
+
+def _apply_navigation(obj: Navigation, item: dict[str, Any]) -> None:
+    obj.location = item.get("location", obj.location)
+    obj.order = item.get("order", obj.order)
+    obj.is_active = item.get("is_active", obj.is_active)
+    obj.target_blank = item.get("target_blank", obj.target_blank)
+
+
+def _navigation_key(url: Any, title: Any) -> str:
+    return f"{url}\x00{json.dumps(title, sort_keys=True, ensure_ascii=False)}"
+
+
+def _friend_link_row(item: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "name": item.get("name", {}),
+        "url": item.get("url"),
+        "description": item.get("description"),
+        "logo": item.get("logo"),
+        "order": item.get("order", 0),
+        "is_active": item.get("is_active", True),
+        "target_blank": item.get("target_blank", False),
+    }
+
+
+def _apply_friend_link(obj: FriendLink, item: dict[str, Any]) -> None:
+    obj.name = item.get("name", obj.name)
+    obj.description = item.get("description", obj.description)
+    obj.logo = item.get("logo", obj.logo)
+    obj.order = item.get("order", obj.order)
+    obj.is_active = item.get("is_active", obj.is_active)
+    obj.target_blank = item.get("target_blank", obj.target_blank)
+
+
+def _page_row(item: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "title": item.get("title", {}),
+        "slug": item.get("slug"),
+        "content": item.get("content", {}),
+        "status": item.get("status", "published"),
+    }
+
+
+def _apply_page(obj: Page, item: dict[str, Any]) -> None:
+    obj.title = item.get("title", obj.title)
+    obj.content = item.get("content", obj.content)
+    obj.status = item.get("status", obj.status)
+
+
+def _series_row(item: dict[str, Any]) -> dict[str, Any]:
+    row = {
+        col.name: item[col.name]
+        for col in PostSeries.__table__.columns
+        if col.name not in ("id", "created_at") and col.name in item
+    }
+    if "updated_at" in row:
+        row["updated_at"] = _parse_dt(row["updated_at"]) or datetime.now(UTC)
+    return row
+
+
+def _apply_series(obj: PostSeries, item: dict[str, Any]) -> None:
+    for key, value in item.items():
+        if key in ("id", "created_at") or value is None or not hasattr(obj, key):
+            continue
+        setattr(obj, key, _parse_dt(value) if key == "updated_at" else value)
+
+
+def _announcement_row(item: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "title": item.get("title"),
+        "content": item.get("content", ""),
+        "type": item.get("type", "info"),
+        "is_active": item.get("is_active", True),
+        "is_dismissible": item.get("is_dismissible", True),
+        "start_time": _parse_dt(item.get("start_time")),
+        "end_time": _parse_dt(item.get("end_time")),
+        "sort_order": item.get("sort_order", 0),
+    }
+
+
+def _apply_announcement(obj: Announcement, item: dict[str, Any]) -> None:
+    obj.content = item.get("content", obj.content)
+    obj.type = item.get("type", obj.type)
+    obj.is_active = item.get("is_active", obj.is_active)
+    obj.is_dismissible = item.get("is_dismissible", obj.is_dismissible)
+    obj.start_time = _parse_dt(item.get("start_time"))
+    obj.end_time = _parse_dt(item.get("end_time"))
+    obj.sort_order = item.get("sort_order", obj.sort_order)
+
+
+_HERO_FIELDS: dict[str, Any] = {
+    "title": None,
+    "subtitle": None,
+    "media_type": "image",
+    "poster_url": None,
+    "overlay_opacity": 40,
+    "overlay_color": "#000000",
+    "cta_text": None,
+    "cta_url": None,
+    "cta_secondary_text": None,
+    "cta_secondary_url": None,
+    "text_align": "center",
+    "text_color": "light",
+    "is_active": True,
+    "sort_order": 0,
+}
+
+
+def _hero_row(item: dict[str, Any]) -> dict[str, Any]:
+    row = {name: item.get(name, default) for name, default in _HERO_FIELDS.items()}
+    row["media_url"] = item.get("media_url")
+    row["start_time"] = _parse_dt(item.get("start_time"))
+    row["end_time"] = _parse_dt(item.get("end_time"))
+    return row
+
+
+def _apply_hero(obj: HeroSlide, item: dict[str, Any]) -> None:
+    for name in _HERO_FIELDS:
+        setattr(obj, name, item.get(name, getattr(obj, name)))
+    obj.start_time = _parse_dt(item.get("start_time"))
+    obj.end_time = _parse_dt(item.get("end_time"))
+
+
+def _media_row(item: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "file": item.get("file"),
+        "filename": item.get("filename"),
+        "file_type": item.get("file_type", "other"),
+        "file_size": item.get("file_size", 0),
+        "title": item.get("title"),
+        "alt_text": item.get("alt_text"),
+        "description": item.get("description"),
+    }
+
+
+def _apply_media(obj: Media, item: dict[str, Any]) -> None:
+    obj.filename = item.get("filename", obj.filename)
+    obj.file_type = item.get("file_type", obj.file_type)
+    obj.file_size = item.get("file_size", obj.file_size)
+    obj.title = item.get("title", obj.title)
+    obj.alt_text = item.get("alt_text", obj.alt_text)
+    obj.description = item.get("description", obj.description)
+
+
+_POST_UPDATE_FIELDS = (
+    "title",
+    "subtitle",
+    "source",
+    "source_url",
+    "audio",
+    "video",
+    "video_url",
+    "content",
+    "excerpt",
+    "cover_image",
+    "status",
+    "visibility",
+    "views",
+    "is_pinned",
+    "allow_comments",
+    "meta_title",
+    "meta_description",
+    "meta_keywords",
+    "encrypted_content",
+    "encryption_enabled",
+    "encryption_hint",
+)
+
+
+def _normalize_export_post(item: dict[str, Any]) -> dict[str, Any]:
+    """将 /export/posts 的文章结构转换为备份结构（category_slug / tag_slugs）"""
+    normalized = dict(item)
+    category = item.get("category") or {}
+    normalized["category_slug"] = category.get("slug")
+    normalized["tag_slugs"] = [t.get("slug") for t in item.get("tags", []) if t.get("slug")]
+    normalized.pop("author_username", None)
+    normalized.pop("series_id", None)
+    return normalized
+
+
+# ==================== 导入引擎 ====================
+
+
+class BulkImporter:
+    """
+    集合式导入引擎
+
+    所有阶段共享同一模式：预取已存在 key → 按策略处理已存在记录 →
+    新记录分块批量插入 → 回填 key→id 映射供后续阶段解析外键。
+
+    Attributes:
+        stats: 导入统计
+        progress: 进度 dict（stage / processed / total / completed_stages），可直接
+            作为 BackgroundTaskManager 任务 metadata 的一部分被轮询
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        actor_id: int,
+        *,
+        existing: ExistingPolicy = "skip",
+        checkpoint: ImportCheckpoint | None = None,
+        progress: dict[str, Any] | None = None,
+        commit_each_chunk: bool = False,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+    ):
+        """
+        初始化导入引擎
+
+        Args:
+            db: 数据库会话
+            actor_id: 执行导入的用户 ID（作者 / 评论者缺失时的回退）
+            existing: 已存在记录的处理策略
+            checkpoint: 断点（仅 commit_each_chunk=True 时有意义）
+            progress: 外部传入的进度 dict，就地更新
+            commit_each_chunk: 是否每个分块提交一次（后台任务模式），
+                False 时整个导入处于调用方的单个事务内
+            chunk_size: 每批插入行数
+        """
+        self._db = db
+        self._actor_id = actor_id
+        self._existing = existing
+        self._checkpoint = checkpoint
+        self._commit_each_chunk = commit_each_chunk
+        self._chunk_size = chunk_size
+        self._dialect = db.get_bind().dialect.name
+
+        self.stats = ImportStats()
+        self.progress: dict[str, Any] = progress if progress is not None else {}
+        self.progress.setdefault("completed_stages", [])
+
+        if checkpoint is not None and checkpoint.counters:
+            self.stats.created = checkpoint.counters.get("created", 0)
+            self.stats.skipped = checkpoint.counters.get("skipped", 0)
+            self.stats.error_count = checkpoint.counters.get("error_count", 0)
+
+        self.user_ids: dict[str, int] = {}
+        self.category_ids: dict[str, int] = {}
+        self.tag_ids: dict[str, int] = {}
+        self.series_ids: dict[Any, int] = {}
+        self.post_ids: dict[str, int] = {}
+
+    # ---------- 底层原语 ----------
+
+    def _insert_stmt(self, model: type, conflict: list[str] | None = None):
+        """构建 INSERT 语句，PostgreSQL / SQLite 上附加 ON CONFLICT DO NOTHING"""
+        if conflict and self._dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+            return pg_insert(model).on_conflict_do_nothing(index_elements=conflict)
+        if conflict and self._dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+            return sqlite_insert(model).on_conflict_do_nothing(index_elements=conflict)
+        return insert(model)
+
+    async def prefetch_ids(
+        self, column: InstrumentedAttribute, keys: Iterable[Any]
+    ) -> dict[Any, int]:
+        """
+        按 key 批量预取已存在记录的 ID
+
+        Args:
+            column: key 列（如 Post.slug）
+            keys: key 列表
+
+        Returns:
+            key 到 ID 的映射（只包含已存在的 key）
+        """
+        model = column.class_
+        unique_keys = list({k for k in keys if k is not None})
+        found: dict[Any, int] = {}
+        for chunk in _chunks(unique_keys, PREFETCH_CHUNK_SIZE):
+            result = await self._db.execute(select(column, model.id).where(column.in_(chunk)))
+            found.update({key: pk for key, pk in result.all()})
+        return found
+
+    async def prefetch_objects(
+        self, column: InstrumentedAttribute, keys: Iterable[Any]
+    ) -> dict[Any, Any]:
+        """
+        按 key 批量预取已存在的 ORM 对象（覆盖策略下使用）
+
+        Args:
+            column: key 列
+            keys: key 列表
+
+        Returns:
+            key 到 ORM 对象的映射
+        """
+        model = column.class_
+        unique_keys = list({k for k in keys if k is not None})
+        found: dict[Any, Any] = {}
+        for chunk in _chunks(unique_keys, PREFETCH_CHUNK_SIZE):
+            result = await self._db.execute(select(model).where(column.in_(chunk)))
+            for obj in result.scalars().all():
+                found[getattr(obj, column.key)] = obj
+        return found
+
+    async def bulk_insert(
+        self,
+        model: type,
+        rows: list[dict[str, Any]],
+        *,
+        conflict: list[str] | None = None,
+        returning: bool = False,
+        describe: Callable[[dict[str, Any]], str] = lambda row: "",
+    ) -> list[int | None]:
+        """
+        分块批量插入
+
+        每个分块在独立 SAVEPOINT 中执行；分块失败时逐行重试以定位坏行，
+        坏行记入 stats.errors，其余行照常写入。
+
+        Args:
+            model: ORM 模型
+            rows: 行字典列表
+            conflict: ON CONFLICT 目标列（仅 PostgreSQL / SQLite 生效）
+            returning: 是否返回新行 ID（与 rows 顺序一致，失败行为 None）
+            describe: 生成错误信息中行描述的函数
+
+        Returns:
+            returning=True 时为 ID 列表，否则为空列表
+        """
+        stmt = self._insert_stmt(model, conflict)
+        if returning:
+            stmt = stmt.returning(model.id, sort_by_parameter_order=True)
+
+        ids: list[int | None] = []
+        for chunk in _chunks(rows, self._chunk_size):
+            try:
+                async with self._db.begin_nested():
+                    result = await self._db.execute(stmt, chunk)
+                    if returning:
+                        ids.extend(result.scalars().all())
+                continue
+            except Exception as e:
+                logger.warning(f"批量插入 {model.__name__} 失败，逐行重试: {e}")
+
+            for row in chunk:
+                try:
+                    async with self._db.begin_nested():
+                        result = await self._db.execute(stmt, [row])
+                        if returning:
+                            ids.append(result.scalar_one())
+                except Exception as e:
+                    self.stats.error(f"{describe(row)} 导入失败: {e}")
+                    if returning:
+                        ids.append(None)
+        return ids
+
+    async def _upsert_keyed(
+        self,
+        items: list[dict[str, Any]],
+        *,
+        column: InstrumentedAttribute,
+        item_key: Callable[[dict[str, Any]], Any],
+        build_row: Callable[[dict[str, Any]], dict[str, Any]],
+        apply_update: Callable[[Any, dict[str, Any]], None],
+        label: str,
+        existing: ExistingPolicy | None = None,
+        want_ids: bool = False,
+        inserted: set[Any] | None = None,
+    ) -> dict[Any, int]:
+        """
+        按唯一 key 合并一批记录
+
+        Args:
+            items: 待导入条目
+            column: 唯一 key 列
+            item_key: 从条目中取 key 的函数
+            build_row: 条目 → 插入行
+            apply_update: 覆盖策略下更新已存在对象
+            label: 错误信息中的记录类型名称
+            existing: 已存在记录策略，None 使用引擎默认值
+            want_ids: 是否返回本批所有 key 的 ID 映射
+            inserted: 传入集合时写入本批尝试新插入的 key（不含已存在记录）
+
+        Returns:
+            want_ids=True 时为 key → ID 映射
+        """
+        policy = existing or self._existing
+        keys = [item_key(item) for item in items]
+        if policy == "update":
+            objects = await self.prefetch_objects(column, keys)
+            found = {key: obj.id for key, obj in objects.items()}
+        else:
+            objects = {}
+            found = await self.prefetch_ids(column, keys)
+
+        new_rows: list[dict[str, Any]] = []
+        pending: set[Any] = set()
+        for item, key in zip(items, keys, strict=True):
+            if key is None:
+                self.stats.error(f"{label} 缺少唯一标识字段，已跳过")
+                continue
+            if key in found:
+                if policy == "update":
+                    apply_update(objects[key], item)
+                    self.stats.created += 1
+                elif policy == "skip":
+                    self.stats.skipped += 1
+                elif policy == "error":
+                    self.stats.error(f"{label}已存在: {key}")
+                continue
+            if key in pending:
+                self.stats.skipped += 1
+                continue
+            pending.add(key)
+            new_rows.append(build_row(item))
+
+        if new_rows:
+            before = self.stats.error_count
+            await self.bulk_insert(
+                column.class_,
+                new_rows,
+                conflict=[column.key],
+                describe=lambda row: f"{label} {row.get(column.key, 'unknown')}",
+            )
+            self.stats.created += len(new_rows) - (self.stats.error_count - before)
+        if inserted is not None:
+            inserted.update(pending)
+
+        if not want_ids:
+            return {}
+        if pending:
+            found.update(await self.prefetch_ids(column, pending))
+        return found
+
+    # ---------- 阶段调度 ----------
+
+    def _report(self, stage: str, processed: int, total: int) -> None:
+        self.progress.update(
+            stage=stage, processed=processed, total=total, **self.stats.to_counters()
+        )
+
+    async def _commit_point(self, stage: str, offset: int | None) -> None:
+        """分块提交点：提交事务并推进断点"""
+        if not self._commit_each_chunk:
+            return
+        await self._db.commit()
+        if self._checkpoint is None:
+            return
+        if offset is None:
+            self._checkpoint.offsets.pop(stage, None)
+            self._checkpoint.completed.append(stage)
+        else:
+            self._checkpoint.offsets[stage] = offset
+        self._checkpoint.counters = self.stats.to_counters()
+        self._checkpoint.save()
+
+    async def run_stage(
+        self,
+        stage: str,
+        items: list[dict[str, Any]],
+        handler: Callable[[list[dict[str, Any]]], Awaitable[None]],
+        *,
+        resumable: bool = True,
+    ) -> None:
+        """
+        执行单个导入阶段
+
+        Args:
+            stage: 阶段名
+            items: 该阶段全部条目
+            handler: 处理一个分块的协程函数
+            resumable: 是否支持分块级续跑；False 时整阶段作为一个单元提交
+        """
+        total = len(items)
+        if self._checkpoint is not None and self._checkpoint.is_done(stage):
+            self._report(stage, total, total)
+            self.progress["completed_stages"].append(stage)
+            return
+
+        if resumable:
+            start = self._checkpoint.offset(stage) if self._checkpoint is not None else 0
+            for offset in range(start, total, self._chunk_size):
+                chunk = items[offset : offset + self._chunk_size]
+                await handler(chunk)
+                self._report(stage, offset + len(chunk), total)
+                await self._commit_point(stage, offset + len(chunk))
+        elif items:
+            await handler(items)
+
+        self._report(stage, total, total)
+        await self._commit_point(stage, None)
+        self.progress["completed_stages"].append(stage)
+
+    # ---------- 各阶段处理器 ----------
+
+    async def _import_site_config(self, chunk: list[dict[str, Any]]) -> None:
+        await self._upsert_keyed(
+            chunk,
+            column=SiteConfig.key,
+            item_key=lambda item: item.get("key"),
+            build_row=_site_config_row,
+            apply_update=_apply_site_config,
+            label="站点配置",
+        )
+
+    async def _import_users(self, chunk: list[dict[str, Any]]) -> None:
+        """用户：脱敏恢复，新用户使用占位邮箱与不可登录的密码哈希"""
+        usernames = [item.get("username") for item in chunk]
+        if self._existing == "update":
+            objects = await self.prefetch_objects(User.username, usernames)
+            found = {name: obj.id for name, obj in objects.items()}
+        else:
+            objects = {}
+            found = await self.prefetch_ids(User.username, usernames)
+        self.user_ids.update(found)
+
+        new_items: list[dict[str, Any]] = []
+        pending: set[str] = set()
+        for item in chunk:
+            username = item.get("username")
+            if not username:
+                self.stats.error("用户缺少 username 字段，已跳过")
+                continue
+            if username in found:
+                if self._existing == "update":
+                    obj = objects[username]
+                    obj.nickname = item.get("nickname", obj.nickname)
+                    obj.avatar = item.get("avatar", obj.avatar)
+                    obj.bio = item.get("bio", obj.bio)
+                    self.stats.created += 1
+                else:
+                    self.stats.skipped += 1
+                continue
+            if username in pending:
+                self.stats.skipped += 1
+                continue
+            pending.add(username)
+            new_items.append(item)
+
+        if not new_items:
+            return
+
+        # 占位邮箱冲突一次性检查
+        taken = await self.prefetch_ids(
+            User.email, [f"{item['username']}@restored.local" for item in new_items]
+        )
+        rows = []
+        for item in new_items:
+            email = f"{item['username']}@restored.local"
+            if email in taken:
+                email = f"{item['username']}_{item.get('id', '')}@restored.local"
+            rows.append(
+                {
+                    "username": item["username"],
+                    "email": email,
+                    "password_hash": "!restored-no-login",
+                    "nickname": item.get("nickname"),
+                    "avatar": item.get("avatar"),
+                    "bio": item.get("bio"),
+                    "created_at": _parse_dt(item.get("created_at")) or datetime.now(UTC),
+                }
+            )
+        before = self.stats.error_count
+        await self.bulk_insert(
+            User,
+            rows,
+            conflict=["username"],
+            describe=lambda row: f"用户 {row['username']}",
+        )
+        self.stats.created += len(rows) - (self.stats.error_count - before)
+        self.user_ids.update(await self.prefetch_ids(User.username, pending))
+
+    async def _import_categories(
+        self, chunk: list[dict[str, Any]], existing: ExistingPolicy | None = None
+    ) -> None:
+        self.category_ids.update(
+            await self._upsert_keyed(
+                chunk,
+                column=Category.slug,
+                item_key=lambda item: item.get("slug"),
+                build_row=_category_row,
+                apply_update=_apply_category,
+                label="分类",
+                existing=existing,
+                want_ids=True,
+            )
+        )
+
+    async def _import_tags(
+        self, chunk: list[dict[str, Any]], existing: ExistingPolicy | None = None
+    ) -> None:
+        self.tag_ids.update(
+            await self._upsert_keyed(
+                chunk,
+                column=Tag.slug,
+                item_key=lambda item: item.get("slug"),
+                build_row=_tag_row,
+                apply_update=_apply_tag,
+                label="标签",
+                existing=existing,
+                want_ids=True,
+            )
+        )
+
+    async def _import_navigations(self, chunk: list[dict[str, Any]]) -> None:
+        """导航：以 (url, title) 组合去重，表规模小，整表一次预取"""
+        urls = [item.get("url") for item in chunk]
+        result = await self._db.execute(
+            select(Navigation).where(Navigation.url.in_([u for u in set(urls) if u]))
+        )
+        objects = {_navigation_key(n.url, n.title): n for n in result.scalars().all()}
+
+        rows = []
+        for item in chunk:
+            key = _navigation_key(item.get("url"), item.get("title", {}))
+            if key in objects:
+                if self._existing == "update":
+                    _apply_navigation(objects[key], item)
+                    self.stats.created += 1
+                else:
+                    self.stats.skipped += 1
+                continue
+            rows.append(_navigation_row(item))
+        before = self.stats.error_count
+        await self.bulk_insert(
+            Navigation, rows, describe=lambda row: f"导航 {row.get('url', 'unknown')}"
+        )
+        self.stats.created += len(rows) - (self.stats.error_count - before)
+
+    async def _import_friend_links(self, chunk: list[dict[str, Any]]) -> None:
+        await self._upsert_keyed(
+            chunk,
+            column=FriendLink.url,
+            item_key=lambda item: item.get("url"),
+            build_row=_friend_link_row,
+            apply_update=_apply_friend_link,
+            label="友链",
+        )
+
+    async def _import_pages(self, chunk: list[dict[str, Any]]) -> None:
+        await self._upsert_keyed(
+            chunk,
+            column=Page.slug,
+            item_key=lambda item: item.get("slug"),
+            build_row=_page_row,
+            apply_update=_apply_page,
+            label="页面",
+        )
+
+    async def _import_post_series(self, chunk: list[dict[str, Any]]) -> None:
+        found = await self._upsert_keyed(
+            chunk,
+            column=PostSeries.slug,
+            item_key=lambda item: item.get("slug"),
+            build_row=_series_row,
+            apply_update=_apply_series,
+            label="文章系列",
+            want_ids=True,
+        )
+        for item in chunk:
+            slug = item.get("slug")
+            if item.get("id") is not None and slug in found:
+                self.series_ids[item["id"]] = found[slug]
+
+    def _post_row(self, item: dict[str, Any]) -> dict[str, Any]:
+        cat_slug = item.get("category_slug")
+        content = item.get("content", {})
+        published_at = _parse_dt(item.get("published_at"))
+        return {
+            "title": item.get("title", {}),
+            "subtitle": item.get("subtitle"),
+            "slug": item.get("slug"),
+            "source": item.get("source", "原创"),
+            "source_url": item.get("source_url"),
+            "audio": item.get("audio"),
+            "video": item.get("video"),
+            "video_url": item.get("video_url"),
+            "content": content,
+            "excerpt": item.get("excerpt"),
+            "cover_image": item.get("cover_image"),
+            "author_id": self.user_ids.get(item.get("author_username") or "", self._actor_id),
+            "category_id": self.category_ids.get(cat_slug) if cat_slug else None,
+            "status": item.get("status", "draft"),
+            "visibility": item.get("visibility", "public"),
+            # 不信任备份中的密码 hash，新文章不写入
+            "password": None,
+            "views": item.get("views", 0),
+            "is_pinned": item.get("is_pinned", False),
+            "allow_comments": item.get("allow_comments", True),
+            "meta_title": item.get("meta_title"),
+            "meta_description": item.get("meta_description"),
+            "meta_keywords": item.get("meta_keywords"),
+            "series_id": self.series_ids.get(item.get("series_id")),
+            "series_order": item.get("series_order", 0),
+            "encrypted_content": item.get("encrypted_content"),
+            "encryption_enabled": item.get("encryption_enabled", False),
+            "encryption_hint": item.get("encryption_hint"),
+            "scheduled_at": _parse_dt(item.get("scheduled_at")),
+            "published_at": published_at,
+            **_post_metrics(content, published_at),
+        }
+
+    def _apply_post(self, obj: Post, item: dict[str, Any]) -> None:
+        # 不信任备份中的 password hash：已存在文章保留库中原值
+        for name in _POST_UPDATE_FIELDS:
+            setattr(obj, name, item.get(name, getattr(obj, name)))
+        obj.scheduled_at = _parse_dt(item.get("scheduled_at"))
+        obj.published_at = _parse_dt(item.get("published_at"))
+        cat_slug = item.get("category_slug")
+        if cat_slug and cat_slug in self.category_ids:
+            obj.category_id = self.category_ids[cat_slug]
+
+    async def _resolve_references(self, chunk: list[dict[str, Any]]) -> None:
+        """补齐本批文章引用、但不在导入数据中的分类 / 标签 / 作者（库中已存在）"""
+        cat_slugs = {i.get("category_slug") for i in chunk} - self.category_ids.keys()
+        if cat_slugs - {None}:
+            self.category_ids.update(await self.prefetch_ids(Category.slug, cat_slugs))
+        tag_slugs = {s for i in chunk for s in i.get("tag_slugs", [])} - self.tag_ids.keys()
+        if tag_slugs:
+            self.tag_ids.update(await self.prefetch_ids(Tag.slug, tag_slugs))
+        usernames = {i.get("author_username") for i in chunk} - self.user_ids.keys()
+        if usernames - {None}:
+            self.user_ids.update(await self.prefetch_ids(User.username, usernames))
+
+    async def _import_posts(
+        self, chunk: list[dict[str, Any]], existing: ExistingPolicy | None = None
+    ) -> None:
+        """文章：批量插入后统一写入 post_tags 关联"""
+        policy = existing or self._existing
+        await self._resolve_references(chunk)
+        inserted: set[str] = set()
+        found = await self._upsert_keyed(
+            chunk,
+            column=Post.slug,
+            item_key=lambda item: item.get("slug"),
+            build_row=self._post_row,
+            apply_update=self._apply_post,
+            label="文章",
+            existing=policy,
+            want_ids=True,
+            inserted=inserted,
+        )
+        self.post_ids.update(found)
+        await self._render_posts(found.values())
+
+        # 新文章追加标签；覆盖策略下已存在文章的标签整体替换，其余策略不改动已存在文章
+        relink: list[int] = []
+        links: list[dict[str, int]] = []
+        seen_posts: set[int] = set()
+        for item in chunk:
+            slug = item.get("slug")
+            post_id = found.get(slug)
+            if post_id is None or post_id in seen_posts:
+                continue
+            if slug not in inserted and policy != "update":
+                continue
+            seen_posts.add(post_id)
+            links.extend(
+                {"post_id": post_id, "tag_id": self.tag_ids[slug]}
+                for slug in dict.fromkeys(item.get("tag_slugs", []))
+                if slug in self.tag_ids
+            )
+            relink.append(post_id)
+        if policy == "update" and relink:
+            await self._db.execute(delete(post_tags).where(post_tags.c.post_id.in_(relink)))
+        if links:
+            await self._insert_links(links)
+
+    async def _render_posts(self, post_ids: Iterable[int]) -> None:
+        """为本批尚未编译正文的文章生成渲染产物（批量 INSERT 不经过 ORM 事件）"""
+        ids = list(post_ids)
+        if not ids:
+            return
+        pending: dict[int, Any] = {}
+        for chunk in _chunks(ids, PREFETCH_CHUNK_SIZE):
+            result = await self._db.execute(
+                select(Post.id, Post.content).where(Post.id.in_(chunk), Post.render_hash.is_(None))
+            )
+            pending.update((row.id, row.content) for row in result)
+
+        # 相同正文只编译一次
+        by_digest: dict[str, list[int]] = {}
+        for post_id, content in pending.items():
+            digest, _ = await self._db.run_sync(
+                lambda session, content=content: save_post_render(session.connection(), content)
+            )
+            by_digest.setdefault(digest, []).append(post_id)
+        for digest, same in by_digest.items():
+            await self._db.execute(update(Post).where(Post.id.in_(same)).values(render_hash=digest))
+
+    async def _insert_links(self, links: list[dict[str, int]]) -> None:
+        if self._dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+            stmt = pg_insert(post_tags).on_conflict_do_nothing()
+        elif self._dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+            stmt = sqlite_insert(post_tags).on_conflict_do_nothing()
+        else:
+            stmt = insert(post_tags)
+        for chunk in _chunks(links, self._chunk_size):
+            await self._db.execute(stmt, chunk)
+
+    async def _import_comments(self, items: list[dict[str, Any]]) -> None:
+        """
+        评论：按嵌套层级逐层批量插入
+
+        每层插入时 RETURNING 新 ID，建立旧 ID → 新 ID 映射后再处理下一层，
+        旧实现中逐条 flush 的多轮循环被合并为「每层若干批」。
+        """
+        post_slugs = {item.get("post_slug") for item in items} - self.post_ids.keys()
+        if post_slugs - {None}:
+            self.post_ids.update(await self.prefetch_ids(Post.slug, post_slugs))
+        usernames = {item.get("user_username") for item in items} - self.user_ids.keys()
+        if usernames - {None}:
+            self.user_ids.update(await self.prefetch_ids(User.username, usernames))
+
+        old_to_new: dict[Any, int] = {}
+        level = [item for item in items if not item.get("parent_id")]
+        remaining = [item for item in items if item.get("parent_id")]
+        while level:
+            rows: list[dict[str, Any]] = []
+            olds: list[Any] = []
+            for item in level:
+                post_id = self.post_ids.get(item.get("post_slug") or "")
+                if post_id is None:
+                    self.stats.error(f"评论 id={item.get('id')} 找不到文章 {item.get('post_slug')}")
+                    continue
+                username = item.get("user_username")
+                active = item.get("active", True)
+                rows.append(
+                    {
+                        "post_id": post_id,
+                        "user_id": self.user_ids.get(username or "", self._actor_id),
+                        "parent_id": old_to_new.get(item.get("parent_id")),
+                        "author_name": (item.get("author_name") or username or "匿名")[:30],
+                        "content": item.get("content", ""),
+                        "active": active,
+                        "status": item.get("status") or ("approved" if active else "pending"),
+                        "created_at": _parse_dt(item.get("created_at")) or datetime.now(UTC),
+                    }
+                )
+                olds.append(item.get("id"))
+
+            new_ids = await self.bulk_insert(
+                Comment, rows, returning=True, describe=lambda row: "评论"
+            )
+            for old_id, new_id in zip(olds, new_ids, strict=True):
+                if new_id is None:
+                    continue
+                self.stats.created += 1
+                if old_id is not None:
+                    old_to_new[old_id] = new_id
+
+            level = [item for item in remaining if item.get("parent_id") in old_to_new]
+            remaining = [item for item in remaining if item.get("parent_id") not in old_to_new]
+
+        for item in remaining:
+            self.stats.error(
+                f"评论 id={item.get('id')} 父评论 {item.get('parent_id')} 缺失，已跳过"
+            )
+
+        # 批量 INSERT 不经过 ORM 监听：为涉及的文章重建评论物化路径与回复统计
+        touched = {self.post_ids.get(item.get("post_slug") or "") for item in items}
+        await CommentService.rebuild_threads(self._db, sorted(touched - {None}))
+
+    async def _import_announcements(self, chunk: list[dict[str, Any]]) -> None:
+        await self._upsert_keyed(
+            chunk,
+            column=Announcement.title,
+            item_key=lambda item: item.get("title"),
+            build_row=_announcement_row,
+            apply_update=_apply_announcement,
+            label="公告",
+        )
+
+    async def _import_hero_slides(self, chunk: list[dict[str, Any]]) -> None:
+        await self._upsert_keyed(
+            chunk,
+            column=HeroSlide.media_url,
+            item_key=lambda item: item.get("media_url"),
+            build_row=_hero_row,
+            apply_update=_apply_hero,
+            label="Hero 幻灯片",
+        )
+
+    async def _import_media(self, chunk: list[dict[str, Any]]) -> None:
+        await self._upsert_keyed(
+            chunk,
+            column=Media.file,
+            item_key=lambda item: item.get("file"),
+            build_row=_media_row,
+            apply_update=_apply_media,
+            label="媒体",
+        )
+
+    # ---------- 入口 ----------
+
+    async def restore_backup(self, bundle: dict[str, Any]) -> ImportStats:
+        """
+        全站恢复
+
+        Args:
+            bundle: read_zip_bundle 的结果（键为 RESTORE_STAGES 中的阶段名）
+
+        Returns:
+            导入统计
+        """
+        handlers: dict[str, Callable[[list[dict[str, Any]]], Awaitable[None]]] = {
+            "site_config": self._import_site_config,
+            "users": self._import_users,
+            "categories": self._import_categories,
+            "tags": self._import_tags,
+            "navigations": self._import_navigations,
+            "friend_links": self._import_friend_links,
+            "pages": self._import_pages,
+            "post_series": self._import_post_series,
+            "posts": self._import_posts,
+            "comments": self._import_comments,
+            "announcements": self._import_announcements,
+            "hero_slides": self._import_hero_slides,
+            "media": self._import_media,
+        }
+        for stage in RESTORE_STAGES:
+            items = bundle.get(stage) or []
+            # 评论依赖旧 ID → 新 ID 映射，只能整阶段提交
+            await self.run_stage(stage, items, handlers[stage], resumable=stage != "comments")
+        return self.stats
+
+    async def import_post_bundle(
+        self,
+        categories: list[dict[str, Any]],
+        tags: list[dict[str, Any]],
+        posts: list[dict[str, Any]],
+        *,
+        skip_existing: bool = True,
+    ) -> ImportStats:
+        """
+        导入 /export/posts 产生的文章包
+
+        分类、标签已存在时静默复用且不计数；文章已存在时按 skip_existing
+        计入 skipped 或 error。
+
+        Args:
+            categories: categories.json 内容
+            tags: tags.json 内容
+            posts: posts.json 内容
+            skip_existing: 已存在文章是否跳过
+
+        Returns:
+            导入统计（created / skipped 只统计文章）
+        """
+        created_before = self.stats.created
+
+        async def categories_handler(chunk: list[dict[str, Any]]) -> None:
+            await self._import_categories(chunk, existing="ignore")
+
+        async def tags_handler(chunk: list[dict[str, Any]]) -> None:
+            await self._import_tags(chunk, existing="ignore")
+
+        async def posts_handler(chunk: list[dict[str, Any]]) -> None:
+            await self._import_posts(chunk, existing="skip" if skip_existing else "error")
+
+        await self.run_stage("categories", categories, categories_handler)
+        await self.run_stage("tags", tags, tags_handler)
+        # 分类 / 标签不计入 created，旧接口只统计文章
+        self.stats.created = created_before
+        await self.run_stage("posts", [_normalize_export_post(p) for p in posts], posts_handler)
+        return self.stats
+
+    async def import_markdown_documents(self, documents: list[tuple[str, str, str]]) -> ImportStats:
+        """
+        批量导入 Markdown 文档为草稿
+
+        Args:
+            documents: (title, slug, body) 列表
+
+        Returns:
+            导入统计（已存在 slug 计入 skipped）
+        """
+        rows = [
+            {"title": {"zh": title}, "slug": slug, "content": {"zh": body}, "status": "draft"}
+            for title, slug, body in documents
+        ]
+
+        async def handler(chunk: list[dict[str, Any]]) -> None:
+            await self._upsert_keyed(
+                chunk,
+                column=Post.slug,
+                item_key=lambda item: item.get("slug"),
+                build_row=lambda item: {
+                    **item,
+                    "author_id": self._actor_id,
+                    **_post_metrics(item["content"], None),
+                },
+                apply_update=lambda obj, item: None,
+                label="文章",
+                existing="skip",
+            )
+
+        await self.run_stage("markdown", rows, handler)
+        return self.stats
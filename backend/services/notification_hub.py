@@ -0,0 +1,318 @@
+"""
+Rosetta FastAPI 后端 - 实时通知推送中心
+
+- 写通知的进程只负责 publish 到用户频道（notify:user:{id}），由消息代理分发到
+  所有持有该用户连接的 worker / 节点（见 backend.core.pubsub）
+- 每个 WebSocket 连接有独立的有界发送队列和发送任务：慢客户端只会积压自己的队列，
+  不会阻塞同一用户的其他连接或其他用户；队列满时丢弃最旧的消息，累计丢弃过多或
+  单条发送超时则断开，由客户端重连后从通知列表补齐
+- 空闲连接定期发送心跳，穿过反向代理的空闲超时并及时发现死连接
+
+Example:
+    >>> from backend.services.notification_hub import notification_hub
+    >>> conn = await notification_hub.connect(websocket, user_id)
+    >>> await notification_hub.send_to_user(user_id, {"type": "notification", "id": 1})
+    >>> await notification_hub.disconnect(conn)
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from backend.core.config import settings
+from backend.core.pubsub import Broker, create_broker
+
+logger = logging.getLogger(__name__)
+
+USER_CHANNEL_PREFIX = "notify:user:"
+BROADCAST_CHANNEL = "notify:broadcast"
+
+# WebSocket 关闭码：1001 服务端关闭，1013 稍后重试（慢客户端）
+_CLOSE_GOING_AWAY = 1001
+_CLOSE_TRY_AGAIN_LATER = 1013
+
+
+def user_channel(user_id: int) -> str:
+    """用户通知频道名"""
+    return f"{USER_CHANNEL_PREFIX}{user_id}"
+
+
+def notification_message(notification) -> dict[str, Any]:
+    """
+    生成推送给客户端的通知消息
+
+    Args:
+        notification: Notification 实例（需已 flush 拿到 id）
+
+    Returns:
+        dict: WebSocket 消息
+    """
+    return {
+        "type": "notification",
+        "id": notification.id,
+        "verb": notification.verb,
+        "title": notification.title,
+        "message": notification.message,
+        "link": notification.link,
+        "level": notification.level,
+        "created_at": notification.created_at.isoformat() if notification.created_at else None,
+    }
+
+
+@dataclass(eq=False)
+class _Connection:
+    """单个 WebSocket 连接的发送状态"""
+
+    websocket: Any
+    user_id: int
+    queue: deque = field(default_factory=deque)
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    sender: asyncio.Task | None = None
+    sent: int = 0
+    dropped: int = 0
+    evicting: bool = False
+    closed: bool = False
+
+
+class NotificationHub:
+    """
+    WebSocket 通知推送中心
+
+    Args:
+        broker_factory: 消息代理工厂，默认按 settings.realtime_broker 创建
+        queue_size: 每个连接的待发送队列上限
+        send_timeout: 单条消息发送超时（秒）
+        max_dropped: 连接累计丢弃消息数上限
+        heartbeat_interval: 空闲心跳间隔（秒）
+    """
+
+    def __init__(
+        self,
+        broker_factory: Callable[[], Broker] = create_broker,
+        queue_size: int | None = None,
+        send_timeout: float | None = None,
+        max_dropped: int | None = None,
+        heartbeat_interval: float | None = None,
+    ) -> None:
+        self._broker_factory = broker_factory
+        self.queue_size = queue_size or settings.ws_send_queue_size
+        self.send_timeout = send_timeout or settings.ws_send_timeout
+        self.max_dropped = max_dropped or settings.ws_max_dropped
+        self.heartbeat_interval = heartbeat_interval or settings.ws_heartbeat_interval
+        self._reset()
+
+    def _reset(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._broker: Broker | None = None
+        self._connections: dict[int, set[_Connection]] = {}
+        self._published = 0
+        self._delivered = 0
+        self._dropped = 0
+        self._evicted = 0
+
+    async def _ensure_started(self) -> Broker:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 首次使用，或上一个事件循环已结束（测试中每个用例一个循环）
+            self._reset()
+            self._loop = loop
+            self._broker = self._broker_factory()
+            await self._broker.start(self._on_message)
+            await self._broker.subscribe(BROADCAST_CHANNEL)
+        return self._broker
+
+    # ==================== 连接管理 ====================
+
+    async def connect(self, websocket, user_id: int) -> _Connection:
+        """
+        注册已 accept 的连接并开始为其推送
+
+        Args:
+            websocket: 已完成握手的 WebSocket
+            user_id: 连接所属用户
+
+        Returns:
+            _Connection: 连接句柄，断开时传给 disconnect()
+        """
+        broker = await self._ensure_started()
+        conn = _Connection(websocket=websocket, user_id=user_id, queue=deque())
+        conns = self._connections.setdefault(user_id, set())
+        first = not conns
+        conns.add(conn)
+        if first:
+            await broker.subscribe(user_channel(user_id))
+        conn.sender = asyncio.create_task(self._send_loop(conn), name=f"ws-sender-{user_id}")
+        return conn
+
+    async def disconnect(self, conn: _Connection) -> None:
+        """注销连接（可重复调用）"""
+        if conn.closed:
+            return
+        conn.closed = True
+        conn.wakeup.set()
+        if conn.sender is not None and conn.sender is not asyncio.current_task():
+            conn.sender.cancel()
+        conns = self._connections.get(conn.user_id)
+        if conns is None:
+            return
+        conns.discard(conn)
+        if not conns:
+            del self._connections[conn.user_id]
+            if self._broker is not None and self._loop is asyncio.get_running_loop():
+                await self._broker.unsubscribe(user_channel(conn.user_id))
+
+    def push(self, conn: _Connection, message: dict[str, Any]) -> bool:
+        """
+        把消息放入连接的发送队列（不等待发送）
+
+        Args:
+            conn: 连接句柄
+            message: 消息
+
+        Returns:
+            bool: 是否未发生丢弃
+        """
+        if conn.closed:
+            return False
+        ok = True
+        if len(conn.queue) >= self.queue_size:
+            conn.queue.popleft()
+            conn.dropped += 1
+            self._dropped += 1
+            ok = False
+        conn.queue.append(message)
+        conn.wakeup.set()
+        if conn.dropped >= self.max_dropped and not conn.evicting:
+            self._evict(conn, "too many dropped messages")
+        return ok
+
+    def _evict(self, conn: _Connection, reason: str) -> None:
+        conn.evicting = True
+        self._evicted += 1
+        logger.info(f"[ws] 断开慢客户端 user={conn.user_id}: {reason}")
+        asyncio.get_running_loop().create_task(self._close(conn, _CLOSE_TRY_AGAIN_LATER))
+
+    async def _close(self, conn: _Connection, code: int) -> None:
+        await self.disconnect(conn)
+        try:
+            await asyncio.wait_for(conn.websocket.close(code=code), timeout=self.send_timeout)
+        except Exception:
+            pass
+
+    async def _send_loop(self, conn: _Connection) -> None:
+        websocket = conn.websocket
+        try:
+            while not conn.closed:
+                if not conn.queue:
+                    conn.wakeup.clear()
+                    try:
+                        await asyncio.wait_for(conn.wakeup.wait(), timeout=self.heartbeat_interval)
+                    except asyncio.TimeoutError:
+                        conn.queue.append({"type": "heartbeat", "ts": int(time.time())})
+                    continue
+                message = conn.queue.popleft()
+                await asyncio.wait_for(websocket.send_json(message), timeout=self.send_timeout)
+                conn.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self._evicted += 1
+            logger.info(f"[ws] 发送超时，断开 user={conn.user_id}")
+            await self._close(conn, _CLOSE_TRY_AGAIN_LATER)
+        except Exception:
+            # 对端已断开；接收端会收到 WebSocketDisconnect 并调用 disconnect()
+            await self.disconnect(conn)
+
+    # ==================== 发布 ====================
+
+    async def send_to_user(self, user_id: int, message: dict[str, Any]) -> None:
+        """
+        向用户的所有连接推送消息（跨 worker）
+
+        Args:
+            user_id: 接收者
+            message: 可 JSON 序列化的消息
+        """
+        await self._publish(user_channel(user_id), message)
+
+    async def broadcast(self, message: dict[str, Any]) -> None:
+        """向所有在线连接推送消息（跨 worker）"""
+        await self._publish(BROADCAST_CHANNEL, message)
+
+    async def publish_notifications(self, notifications: Iterable) -> None:
+        """
+        推送已提交的通知，失败只记录日志
+
+        Args:
+            notifications: Notification 实例
+        """
+        for notification in notifications:
+            try:
+                await self.send_to_user(
+                    notification.recipient_id, notification_message(notification)
+                )
+            except Exception:
+                logger.exception(f"[ws] 推送通知失败 id={notification.id}")
+
+    async def _publish(self, channel: str, message: dict[str, Any]) -> None:
+        broker = await self._ensure_started()
+        self._published += 1
+        try:
+            await broker.publish(channel, message)
+        except Exception as exc:
+            # 代理不可用时至少送达本进程的连接
+            logger.warning(f"[ws] 发布到 {channel} 失败，仅本地投递: {exc}")
+            self._on_message(channel, message)
+
+    def _on_message(self, channel: str, message: dict[str, Any]) -> None:
+        if channel == BROADCAST_CHANNEL:
+            targets = [c for conns in self._connections.values() for c in conns]
+        elif channel.startswith(USER_CHANNEL_PREFIX):
+            try:
+                user_id = int(channel[len(USER_CHANNEL_PREFIX) :])
+            except ValueError:
+                return
+            targets = list(self._connections.get(user_id, ()))
+        else:
+            return
+        for conn in targets:
+            self.push(conn, message)
+            self._delivered += 1
+
+    # ==================== 运维 ====================
+
+    def stats(self) -> dict[str, Any]:
+        """推送中心运行状态（本进程）"""
+        conns = [c for cs in self._connections.values() for c in cs]
+        return {
+            "broker": type(self._broker).__name__ if self._broker else None,
+            "users": len(self._connections),
+            "connections": len(conns),
+            "queued": sum(len(c.queue) for c in conns),
+            "published": self._published,
+            "delivered": self._delivered,
+            "dropped": self._dropped,
+            "evicted": self._evicted,
+        }
+
+    async def shutdown(self) -> None:
+        """关闭所有连接并释放代理"""
+        if self._loop is not asyncio.get_running_loop():
+            self._reset()
+            return
+        conns = [c for cs in self._connections.values() for c in cs]
+        await asyncio.gather(
+            *(self._close(c, _CLOSE_GOING_AWAY) for c in conns), return_exceptions=True
+        )
+        senders = [c.sender for c in conns if c.sender is not None]
+        await asyncio.gather(*senders, return_exceptions=True)
+        if self._broker is not None:
+            await self._broker.close()
+        self._reset()
+
+
+notification_hub = NotificationHub()
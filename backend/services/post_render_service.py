@@ -0,0 +1,72 @@
+"""
+文章渲染产物读取
+
+文章写入时由 models.blog 的 before_insert / before_update 编译正文并保存产物
+（PostRender，以内容哈希为键）。阅读端按 posts.render_hash 直接读取预编译结果；
+以下情况在首次读取时补编译一次并回写 posts.render_hash：
+
+- 批量导入（批量 INSERT 不经过 ORM 事件）
+- 该功能上线前已有的文章
+- RENDERER_VERSION 升级后的旧产物
+
+Example:
+    >>> artifact = await load_post_render(db, post.id, post.render_hash, post.content)
+    >>> get_i18n_value(artifact, "en")["html"]
+"""
+
+from typing import Any
+
+from sqlalchemy import Select, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.blog import Post, PostRender, save_post_render
+from backend.utils.post_render import RENDERER_VERSION
+
+
+def render_query(render_hash: str | None) -> Select:
+    """按内容哈希读取当前版本产物的查询（可交给 fan_out 并行执行）"""
+    return select(PostRender.artifact).where(
+        PostRender.content_hash == (render_hash or ""),
+        PostRender.renderer_version == RENDERER_VERSION,
+    )
+
+
+async def rebuild_post_render(db: AsyncSession, post_id: int, content: Any) -> dict[str, Any]:
+    """
+    编译并保存文章的渲染产物，回写 posts.render_hash
+
+    Args:
+        db: 数据库会话
+        post_id: 文章 ID
+        content: 多语言正文
+
+    Returns:
+        dict: 语言代码 → 渲染结果
+    """
+    digest, artifact = await db.run_sync(
+        lambda session: save_post_render(session.connection(), content)
+    )
+    await db.execute(update(Post).where(Post.id == post_id).values(render_hash=digest))
+    return artifact
+
+
+async def load_post_render(
+    db: AsyncSession, post_id: int, render_hash: str | None, content: Any
+) -> dict[str, Any]:
+    """
+    读取文章的渲染产物，缺失或版本过旧时补编译
+
+    Args:
+        db: 数据库会话
+        post_id: 文章 ID
+        render_hash: posts.render_hash
+        content: 多语言正文（补编译时使用）
+
+    Returns:
+        dict: 语言代码 → 渲染结果
+    """
+    if render_hash:
+        artifact = await db.scalar(render_query(render_hash))
+        if artifact is not None:
+            return artifact
+    return await rebuild_post_render(db, post_id, content)
@@ -0,0 +1,396 @@
+"""
+Rosetta FastAPI 后端 - 定时发布调度器
+
+取代每个 worker 每分钟全表扫描一次的做法：
+- 选主：启用 Redis 时通过 core.distributed_lock 选出唯一的调度进程（锁到期前续期，
+  续期失败即让位）；未启用 Redis 时为单机部署，本进程直接担任
+- 最小堆：leader 只在当选和定期兜底时查询一次待发布文章，之后按 scheduled_at 维护
+  进程内最小堆，精确睡到下一篇到期的时间点
+- 变更通知：任意会话提交了 Post.scheduled_at 的变更后，经发布/订阅代理通知 leader
+  更新堆（见 core.pubsub），多 worker 下也能及时生效
+- 发布：条件 UPDATE（scheduled_at <= now 且未被清空）保证同一篇文章只发布一次，
+  之后使文章/列表/归档/sitemap/订阅源缓存失效并触发 post.published Webhook
+
+Example:
+    >>> await post_scheduler.start()
+    >>> published = await publish_due_posts(db)
+    >>> await announce_published(published)
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import event, func, select, update
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.core.cache import invalidate_cache
+from backend.core.config import settings
+from backend.core.db_events import on_commit
+from backend.core.distributed_lock import DistributedLock
+from backend.core.pubsub import Broker, create_broker
+from backend.models.blog import Post
+from backend.services.sitemap_service import invalidate_content
+from backend.utils import post_metrics
+from backend.utils.compat import UTC
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_LOCK_KEY = "post_scheduler"
+SCHEDULE_CHANNEL = "scheduler:posts"
+
+# 调度中（等待 scheduled_at 到达）的文章状态；published + 未来 scheduled_at 为旧模型
+_SCHEDULABLE_STATUSES = ("scheduled", "published")
+
+
+@dataclass(frozen=True)
+class PublishedPost:
+    """本次定时发布的文章"""
+
+    id: int
+    slug: str
+
+
+def _timestamp(value: datetime) -> float:
+    # SQLite 读回的是 naive datetime，按 UTC 处理
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value.timestamp()
+
+
+async def publish_due_posts(
+    db: AsyncSession, post_ids: list[int] | None = None
+) -> list[PublishedPost]:
+    """
+    发布到期的定时文章
+
+    单条条件 UPDATE：只有 scheduled_at 仍然非空且已到期的文章会被发布，并发执行时
+    每篇文章也只会被一个调用方返回。published_at 已存在时保留原值。
+
+    Args:
+        db: 数据库会话（调用方负责提交）
+        post_ids: 只检查这些文章，None 表示全部
+
+    Returns:
+        list[PublishedPost]: 本次发布的文章
+    """
+    stmt = update(Post).where(
+        Post.scheduled_at.is_not(None),
+        Post.scheduled_at <= datetime.now(UTC),
+        Post.status.in_(_SCHEDULABLE_STATUSES),
+    )
+    if post_ids is not None:
+        if not post_ids:
+            return []
+        stmt = stmt.where(Post.id.in_(post_ids))
+    stmt = stmt.values(
+        status="published",
+        published_at=func.coalesce(Post.published_at, Post.scheduled_at),
+        scheduled_at=None,
+    ).returning(Post.id, Post.slug, Post.published_at)
+    result = await db.execute(stmt, execution_options={"synchronize_session": "fetch"})
+    rows = result.all()
+
+    # 批量 UPDATE 不经过 ORM 监听，归档月份按实际发布时间单独更新
+    by_month: dict[str, list[int]] = {}
+    for row in rows:
+        by_month.setdefault(post_metrics.archive_month(row.published_at, None), []).append(row.id)
+    for month, ids in by_month.items():
+        await db.execute(update(Post).where(Post.id.in_(ids)).values(archive_month=month))
+
+    return [PublishedPost(id=row.id, slug=row.slug) for row in rows]
+
+
+async def announce_published(published: list[PublishedPost]) -> None:
+    """
+    定时发布提交后的副作用：缓存失效 + post.published Webhook
+
+    Args:
+        published: publish_due_posts 的返回值
+    """
+    if not published:
+        return
+    from backend.services.webhook_service import webhook_dispatcher
+
+    try:
+        for post in published:
+            await invalidate_cache(f"post:{post.slug}")
+        await invalidate_cache("posts")
+        await invalidate_cache("archive")
+        await invalidate_content([post.id for post in published])
+    except Exception:
+        logger.exception("[scheduler] 定时发布后清除缓存失败")
+
+    for post in published:
+        try:
+            await webhook_dispatcher.publish("post.published", {"id": post.id, "slug": post.slug})
+        except Exception:
+            logger.exception(f"[scheduler] 触发 post.published Webhook 失败: {post.id}")
+
+
+class PostScheduler:
+    """
+    定时发布调度器
+
+    Args:
+        session_factory: 会话工厂，默认运行时读取 database.async_session_maker
+        resync_interval: 兜底全量同步间隔（秒），覆盖批量 UPDATE 等绕过 ORM 的修改
+        lock_ttl: leader 锁有效期（秒），每 1/3 有效期续期一次
+    """
+
+    def __init__(
+        self,
+        session_factory=None,
+        resync_interval: float | None = None,
+        lock_ttl: int | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self.resync_interval = resync_interval or settings.scheduler_resync_interval
+        self.lock_ttl = lock_ttl or settings.scheduler_lock_ttl
+        self._task: asyncio.Task | None = None
+        self._broker: Broker | None = None
+        self._lock: DistributedLock | None = None
+        self._leader = False
+        self._heap: list[tuple[float, int]] = []
+        self._due_at: dict[int, float] = {}
+        self._wakeup = asyncio.Event()
+        self._resync_at = 0.0
+        self._renew_at = 0.0
+        self.published = 0
+
+    def _session(self):
+        if self._session_factory is not None:
+            return self._session_factory()
+        from backend.core import database
+
+        return database.async_session_maker()
+
+    @property
+    def is_leader(self) -> bool:
+        """本进程是否为当前调度 leader"""
+        return self._leader
+
+    # ==================== 生命周期 ====================
+
+    async def start(self) -> None:
+        """启动调度循环并订阅变更通知"""
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        try:
+            self._broker = create_broker()
+            await self._broker.start(self._on_message)
+            await self._broker.subscribe(SCHEDULE_CHANNEL)
+        except Exception as exc:
+            logger.warning(f"[scheduler] 变更通知订阅失败，仅依赖定期同步: {exc}")
+            self._broker = None
+        self._task = asyncio.create_task(self._run(), name="post-scheduler")
+
+    async def stop(self) -> None:
+        """停止调度循环并让出 leader"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        await self._step_down()
+        if self._broker is not None:
+            await self._broker.close()
+            self._broker = None
+
+    # ==================== 变更通知 ====================
+
+    async def notify(self, changes: dict[int, datetime | None]) -> None:
+        """
+        通知文章的 scheduled_at 已变更（提交之后调用）
+
+        Args:
+            changes: 文章 ID → 新的 scheduled_at（None 表示取消）
+        """
+        message = {
+            "changes": {
+                str(post_id): _timestamp(at) if at is not None else None
+                for post_id, at in changes.items()
+            }
+        }
+        if self._broker is None:
+            self._on_message(SCHEDULE_CHANNEL, message)
+            return
+        try:
+            await self._broker.publish(SCHEDULE_CHANNEL, message)
+        except Exception as exc:
+            logger.warning(f"[scheduler] 发布变更通知失败: {exc}")
+            self._on_message(SCHEDULE_CHANNEL, message)
+
+    def _on_message(self, channel: str, message: dict[str, Any]) -> None:
+        if not self._leader:
+            # 非 leader 不维护堆；当选时会全量加载
+            return
+        for post_id, ts in (message.get("changes") or {}).items():
+            self._set(int(post_id), ts)
+        self._wakeup.set()
+
+    def _set(self, post_id: int, ts: float | None) -> None:
+        if ts is None:
+            self._due_at.pop(post_id, None)
+            return
+        if self._due_at.get(post_id) == ts:
+            return
+        # 旧条目留在堆里，出堆时与 _due_at 比对后丢弃（惰性删除）
+        self._due_at[post_id] = ts
+        heapq.heappush(self._heap, (ts, post_id))
+
+    # ==================== 调度循环 ====================
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if not await self._ensure_leader():
+                    await asyncio.sleep(self.lock_ttl / 3)
+                    continue
+                if time.time() >= self._resync_at:
+                    await self._resync()
+                await self._publish_due()
+                await self._sleep_until_next()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.exception(f"[scheduler] 调度失败: {exc}")
+                await asyncio.sleep(5)
+
+    async def _ensure_leader(self) -> bool:
+        if not settings.redis_enabled:
+            if not self._leader:
+                self._become_leader()
+            return True
+
+        now = time.time()
+        if self._leader:
+            if now < self._renew_at:
+                return True
+            if await self._lock.renew():
+                self._renew_at = now + self.lock_ttl / 3
+                return True
+            logger.warning("[scheduler] leader 锁续期失败，让出调度")
+            await self._step_down()
+            return False
+
+        lock = DistributedLock(SCHEDULER_LOCK_KEY, timeout=self.lock_ttl, auto_renewal=False)
+        if await lock.acquire(wait_timeout=0):
+            self._lock = lock
+            self._renew_at = now + self.lock_ttl / 3
+            self._become_leader()
+            return True
+        await lock.close()
+        return False
+
+    def _become_leader(self) -> None:
+        self._leader = True
+        self._resync_at = 0.0
+        logger.info("[scheduler] 本进程成为定时发布 leader")
+
+    async def _step_down(self) -> None:
+        self._leader = False
+        self._heap.clear()
+        self._due_at.clear()
+        if self._lock is not None:
+            try:
+                await self._lock.release()
+                await self._lock.close()
+            except Exception:
+                pass
+            self._lock = None
+
+    async def _resync(self) -> None:
+        async with self._session() as session:
+            rows = (
+                await session.execute(
+                    select(Post.id, Post.scheduled_at).where(
+                        Post.scheduled_at.is_not(None),
+                        Post.status.in_(_SCHEDULABLE_STATUSES),
+                    )
+                )
+            ).all()
+        self._due_at = {row.id: _timestamp(row.scheduled_at) for row in rows}
+        self._heap = [(ts, post_id) for post_id, ts in self._due_at.items()]
+        heapq.heapify(self._heap)
+        self._resync_at = time.time() + self.resync_interval
+
+    async def _publish_due(self) -> None:
+        now = time.time()
+        due: list[int] = []
+        while self._heap and self._heap[0][0] <= now:
+            ts, post_id = heapq.heappop(self._heap)
+            if self._due_at.get(post_id) == ts:
+                del self._due_at[post_id]
+                due.append(post_id)
+        if not due:
+            return
+        async with self._session() as session:
+            published = await publish_due_posts(session, due)
+            await session.commit()
+        if published:
+            self.published += len(published)
+            logger.info(f"[scheduler] 定时发布 {len(published)} 篇文章")
+            await announce_published(published)
+
+    async def _sleep_until_next(self) -> None:
+        now = time.time()
+        deadline = self._resync_at
+        if self._heap:
+            deadline = min(deadline, self._heap[0][0])
+        if settings.redis_enabled:
+            deadline = min(deadline, self._renew_at)
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, deadline - now))
+        except asyncio.TimeoutError:
+            pass
+
+    def stats(self) -> dict[str, Any]:
+        """调度器状态"""
+        next_due = min(self._due_at.values()) if self._due_at else None
+        return {
+            "leader": self._leader,
+            "pending": len(self._due_at),
+            "next_due_at": datetime.fromtimestamp(next_due, UTC).isoformat() if next_due else None,
+            "published": self.published,
+        }
+
+
+post_scheduler = PostScheduler()
+
+
+# ==================== 提交后自动通知 ====================
+
+
+_schedule_changes = on_commit(
+    "post_schedule_changes",
+    lambda changes: post_scheduler.notify(changes),
+    label="[scheduler] 变更通知",
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_schedule_changes(session: Session, flush_context) -> None:
+    """记录本次事务中 scheduled_at 发生变化的文章，提交后通知调度器"""
+    for obj in (*session.new, *session.dirty):
+        if not isinstance(obj, Post) or obj.id is None:
+            continue
+        if obj in session.new:
+            if obj.scheduled_at is None:
+                continue
+        elif not sa_inspect(obj).attrs.scheduled_at.history.has_changes():
+            continue
+        _schedule_changes.pending(session)[obj.id] = obj.scheduled_at
+    for obj in session.deleted:
+        if isinstance(obj, Post) and obj.id is not None:
+            _schedule_changes.pending(session)[obj.id] = None
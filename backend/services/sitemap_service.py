@@ -0,0 +1,243 @@
+"""
+Rosetta FastAPI 后端 - Sitemap 分片与订阅源缓存
+
+- 分片：文章按 ID 区间分片（每片 settings.sitemap_shard_size 个 ID，协议上限 5 万），
+  文章只会落在固定的分片里，修改后只需重建所在分片；分类 / 标签单独一片（taxonomy）
+- 索引：/sitemap.xml 在文章只有一片时直接返回 urlset（小站与旧行为一致），
+  否则返回 sitemapindex，指向 {site_url}/sitemaps/<分片>.xml
+- 生成：只查询 slug / updated_at，逐行流式读取并拼接 XML 片段，不构建整棵 ElementTree
+- 缓存：索引与各分片分别缓存；会话提交后根据变更的文章 / 分类 / 标签失效对应分片、
+  索引与 RSS 订阅源（定时发布的批量 UPDATE 由 post_scheduler 显式调用失效）
+
+Example:
+    >>> xml = await render_sitemap(db)
+    >>> shard = await render_shard(db, "posts-0")
+    >>> await invalidate_content(post_ids=[1, 2])
+"""
+
+import logging
+from collections.abc import AsyncIterator, Iterable
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.core.cache import CACHE_TTL, cache, make_cache_key
+from backend.core.config import settings
+from backend.core.db_events import on_commit
+from backend.models.blog import Category, Post, Tag
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+MAX_URLS_PER_SITEMAP = 50000
+TAXONOMY_SHARD = "taxonomy"
+
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+# 影响 sitemap / 订阅源输出的文章字段；阅读数等其它字段的更新不触发失效
+_TRACKED_POST_FIELDS = (
+    "slug",
+    "status",
+    "visibility",
+    "published_at",
+    "title",
+    "content",
+    "excerpt",
+    "is_pinned",
+)
+
+
+def shard_size() -> int:
+    """每个文章分片覆盖的 ID 数"""
+    return min(settings.sitemap_shard_size, MAX_URLS_PER_SITEMAP)
+
+
+def post_shard(post_id: int) -> str:
+    """文章所在的分片名"""
+    return f"posts-{(post_id - 1) // shard_size()}"
+
+
+def _cache_key(name: str) -> str:
+    return make_cache_key("sitemap", name)
+
+
+def feed_cache_key(language: str, limit: int) -> str:
+    """RSS 订阅源缓存键"""
+    return make_cache_key("feed", "rss", language, str(limit))
+
+
+def _lastmod(value: datetime | None) -> str:
+    return f"<lastmod>{value.strftime('%Y-%m-%d')}</lastmod>" if value else ""
+
+
+def _url(loc: str, changefreq: str, priority: str, lastmod: datetime | None = None) -> str:
+    return (
+        f"<url><loc>{escape(loc)}</loc>{_lastmod(lastmod)}"
+        f"<changefreq>{changefreq}</changefreq><priority>{priority}</priority></url>"
+    )
+
+
+_PUBLISHED = Post.status == "published"
+
+
+async def _post_shards(db: AsyncSession) -> list[tuple[int, datetime | None]]:
+    """有已发布文章的分片序号及其最后修改时间"""
+    shard = ((Post.id - 1) // shard_size()).label("shard")
+    result = await db.execute(
+        select(shard, func.max(Post.updated_at)).where(_PUBLISHED).group_by(shard).order_by(shard)
+    )
+    return [(int(index), lastmod) for index, lastmod in result.all()]
+
+
+async def _post_urls(db: AsyncSession, index: int) -> AsyncIterator[str]:
+    site_url = settings.site_url
+    low = index * shard_size() + 1
+    result = await db.stream(
+        select(Post.slug, Post.updated_at)
+        .where(_PUBLISHED, Post.id.between(low, low + shard_size() - 1))
+        .order_by(Post.id)
+    )
+    async for slug, updated_at in result:
+        yield _url(f"{site_url}/posts/{slug}", "weekly", "0.8", updated_at)
+
+
+async def _taxonomy_urls(db: AsyncSession) -> AsyncIterator[str]:
+    # 仅为前端真实存在的路由生成 loc：单分类 / 单标签筛选 /posts?category=slug
+    site_url = settings.site_url
+    for slug in (await db.execute(select(Category.slug).order_by(Category.id))).scalars():
+        yield _url(f"{site_url}/posts?category={slug}", "weekly", "0.6")
+    tags = await db.execute(select(Tag.slug).where(Tag.is_active.is_(True)).order_by(Tag.id))
+    for slug in tags.scalars():
+        yield _url(f"{site_url}/posts?tag={slug}", "monthly", "0.5")
+
+
+async def _urlset(*sources: AsyncIterator[str]) -> str:
+    parts = [_XML_HEADER, f'<urlset xmlns="{SITEMAP_NS}">']
+    for source in sources:
+        async for chunk in source:
+            parts.append(chunk)
+    parts.append("</urlset>")
+    return "".join(parts)
+
+
+async def _cached(name: str, build) -> str:
+    key = _cache_key(name)
+    cached = await cache.get(key)
+    if cached:
+        return cached
+    content = await build()
+    await cache.set(key, content, CACHE_TTL["sitemap"])
+    return content
+
+
+async def render_sitemap(db: AsyncSession) -> str:
+    """
+    /sitemap.xml 内容
+
+    Args:
+        db: 数据库会话
+
+    Returns:
+        str: 文章只有一片时为完整 urlset，否则为 sitemapindex
+    """
+
+    async def build() -> str:
+        shards = await _post_shards(db)
+        if len(shards) <= 1:
+            index = shards[0][0] if shards else 0
+            return await _urlset(_post_urls(db, index), _taxonomy_urls(db))
+
+        site_url = settings.site_url
+        parts = [_XML_HEADER, f'<sitemapindex xmlns="{SITEMAP_NS}">']
+        for index, lastmod in shards:
+            parts.append(
+                f"<sitemap><loc>{escape(site_url)}/sitemaps/posts-{index}.xml</loc>"
+                f"{_lastmod(lastmod)}</sitemap>"
+            )
+        parts.append(
+            f"<sitemap><loc>{escape(site_url)}/sitemaps/{TAXONOMY_SHARD}.xml</loc></sitemap>"
+        )
+        parts.append("</sitemapindex>")
+        return "".join(parts)
+
+    return await _cached("index", build)
+
+
+async def render_shard(db: AsyncSession, name: str) -> str | None:
+    """
+    单个分片内容
+
+    Args:
+        db: 数据库会话
+        name: posts-<序号> 或 taxonomy
+
+    Returns:
+        str | None: urlset；分片名不合法时为 None
+    """
+    if name == TAXONOMY_SHARD:
+        return await _cached(name, lambda: _urlset(_taxonomy_urls(db)))
+    prefix, _, index = name.partition("-")
+    if prefix != "posts" or not index.isdigit():
+        return None
+    return await _cached(name, lambda: _urlset(_post_urls(db, int(index))))
+
+
+async def invalidate_content(post_ids: Iterable[int] = (), taxonomy: bool = False) -> None:
+    """
+    内容变更后失效相关 sitemap 分片、索引与 RSS 订阅源
+
+    Args:
+        post_ids: 变更的文章 ID（重建其所在分片，并失效订阅源）
+        taxonomy: 分类 / 标签是否变更
+    """
+    names = {post_shard(post_id) for post_id in post_ids}
+    if taxonomy:
+        names.add(TAXONOMY_SHARD)
+    if not names:
+        return
+    names.add("index")
+    for name in names:
+        await cache.delete(_cache_key(name))
+    if post_ids:
+        await cache.delete_pattern(make_cache_key("feed", "*"))
+
+
+async def invalidate_all() -> None:
+    """清除所有 sitemap 与订阅源缓存"""
+    await cache.delete_pattern(make_cache_key("sitemap", "*"))
+    await cache.delete_pattern(make_cache_key("feed", "*"))
+
+
+# ==================== 提交后自动失效 ====================
+
+
+def _new_changes() -> dict:
+    return {"posts": set(), "taxonomy": False}
+
+
+_changes = on_commit(
+    "sitemap_changes",
+    lambda changes: invalidate_content(changes["posts"], changes["taxonomy"]),
+    factory=_new_changes,
+    label="[sitemap] 缓存失效",
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context) -> None:
+    """记录本次事务中变更的文章与分类 / 标签"""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Post) and obj.id is not None:
+            if obj in session.dirty and not _post_output_changed(obj):
+                continue
+            _changes.pending(session)["posts"].add(obj.id)
+        elif isinstance(obj, (Category, Tag)):
+            _changes.pending(session)["taxonomy"] = True
+
+
+def _post_output_changed(post: Post) -> bool:
+    """更新的文章是否改动了 sitemap / 订阅源用到的字段"""
+    attrs = inspect(post).attrs
+    return any(attrs[name].history.has_changes() for name in _TRACKED_POST_FIELDS)
@@ -0,0 +1,351 @@
+"""
+Rosetta FastAPI 后端 - 统计汇总
+
+仪表盘（api/stats、监控趋势与访问汇总）不再在每次加载时对原始表做按天 GROUP BY：
+- stats_daily / stats_hourly: 每个时间桶一行，记录 PV/UV、访问数/独立 IP、新增评论/文章/用户
+- stats_rollup_state: 每种粒度一个水位，水位之前的时间桶已汇总完成
+- run_rollups: 后台任务每 stats_rollup_interval 秒执行一次，只重算水位所在的桶及之后的数据
+  （额外回看几分钟，容纳异步写入的访问日志），然后把水位推进到当前桶的起点；
+  首次运行从最早的数据开始回填
+- read_series: 水位之前读汇总行，水位之后（通常只有今天）实时聚合，结果与直接查原始表一致
+
+按小时汇总默认关闭（stats_rollup_hourly），开启后只保留最近
+stats_rollup_hourly_retention_days 天。
+
+Example:
+    >>> await run_rollups(db)
+    >>> series = await read_series(db, "day", week_ago, today)
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.config import settings
+from backend.core.distributed_lock import DistributedLock
+from backend.models.blog import Comment, Post, PostViewHistory
+from backend.models.monitoring import DailyStats, HourlyStats, StatsRollupState, VisitLog
+from backend.models.user import User
+from backend.utils.compat import UTC
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("pv", "uv", "visits", "unique_ips", "comments", "posts", "users")
+
+# 重算时向水位之前回看的时间，覆盖提交晚于 created_at 的行（如异步写入的访问日志）
+_LATE_ARRIVAL = timedelta(minutes=5)
+
+# 数据源：时间列 + 该表贡献的指标
+_SOURCES = (
+    (
+        PostViewHistory.viewed_at,
+        {"pv": func.count(), "uv": func.count(func.distinct(PostViewHistory.user_id))},
+    ),
+    (
+        VisitLog.created_at,
+        {"visits": func.count(), "unique_ips": func.count(func.distinct(VisitLog.ip))},
+    ),
+    (Comment.created_at, {"comments": func.count()}),
+    (Post.created_at, {"posts": func.count()}),
+    (User.created_at, {"users": func.count()}),
+)
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite 读回的是 naive datetime，按 UTC 处理
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
+
+
+def _zeros() -> dict[str, int]:
+    return dict.fromkeys(METRICS, 0)
+
+
+@dataclass(frozen=True)
+class _Granularity:
+    """汇总粒度：汇总表、主键列名（day / hour）与时间桶长度"""
+
+    name: str
+    model: type
+    step: timedelta
+
+    @property
+    def column(self):
+        return getattr(self.model, self.name)
+
+    def floor(self, value: datetime) -> datetime:
+        value = _aware(value)
+        if self.name == "day":
+            return value.replace(hour=0, minute=0, second=0, microsecond=0)
+        return value.replace(minute=0, second=0, microsecond=0)
+
+    def key(self, bucket: datetime) -> date | datetime:
+        return bucket.date() if self.name == "day" else bucket
+
+    def bucket_expr(self, column, dialect: str):
+        if self.name == "day":
+            return func.date(column)
+        if dialect == "postgresql":
+            return func.date_trunc("hour", column)
+        if dialect == "mysql":
+            return func.date_format(column, "%Y-%m-%d %H:00:00")
+        return func.strftime("%Y-%m-%d %H:00:00", column)
+
+    def parse(self, value: Any) -> datetime:
+        """把数据库返回的桶值（date / datetime / 字符串）还原为桶起点"""
+        if isinstance(value, datetime):
+            return self.floor(value)
+        if isinstance(value, date):
+            return datetime(value.year, value.month, value.day, tzinfo=UTC)
+        return self.floor(datetime.fromisoformat(str(value)))
+
+
+DAILY = _Granularity("day", DailyStats, timedelta(days=1))
+HOURLY = _Granularity("hour", HourlyStats, timedelta(hours=1))
+GRANULARITIES = {"day": DAILY, "hour": HOURLY}
+
+
+async def _aggregate(
+    db: AsyncSession, granularity: _Granularity, start: datetime, end: datetime
+) -> dict[datetime, dict[str, int]]:
+    """从原始表按时间桶聚合 [start, end) 的各项指标（每个数据源一条 GROUP BY）"""
+    dialect = db.get_bind().dialect.name
+    buckets: dict[datetime, dict[str, int]] = {}
+    for column, aggregates in _SOURCES:
+        bucket = granularity.bucket_expr(column, dialect)
+        result = await db.execute(
+            select(bucket.label("bucket"), *(agg.label(name) for name, agg in aggregates.items()))
+            .where(column >= start, column < end)
+            .group_by(bucket)
+        )
+        for row in result.mappings():
+            counters = buckets.setdefault(granularity.parse(row["bucket"]), _zeros())
+            for name in aggregates:
+                counters[name] = int(row[name] or 0)
+    return buckets
+
+
+async def _earliest(db: AsyncSession) -> datetime | None:
+    values = [await db.scalar(select(func.min(column))) for column, _ in _SOURCES]
+    values = [_aware(value) for value in values if value is not None]
+    return min(values) if values else None
+
+
+async def rollup(
+    db: AsyncSession, granularity: str = "day", now: datetime | None = None, rebuild: bool = False
+) -> int:
+    """
+    增量汇总一种粒度
+
+    重算从水位（回看 _LATE_ARRIVAL）所在桶到当前桶的所有行（无数据的桶写 0），
+    然后把水位推进到当前桶的起点。调用方负责提交。
+
+    Args:
+        db: 数据库会话
+        granularity: day / hour
+        now: 当前时间，默认 UTC 当前时间
+        rebuild: 忽略水位，从最早的数据开始重建
+
+    Returns:
+        int: 写入的汇总行数
+    """
+    g = GRANULARITIES[granularity]
+    current = g.floor(now or datetime.now(UTC))
+    state = await db.get(StatsRollupState, g.name)
+
+    if state is None or rebuild:
+        earliest = await _earliest(db)
+        start = g.floor(earliest) if earliest is not None else current
+    else:
+        start = g.floor(_aware(state.watermark) - _LATE_ARRIVAL)
+    if g is HOURLY:
+        retention = current - timedelta(days=settings.stats_rollup_hourly_retention_days)
+        start = max(start, retention)
+        await db.execute(delete(g.model).where(g.column < retention))
+    start = min(start, current)
+
+    end = current + g.step
+    counters = await _aggregate(db, g, start, end)
+    rows = []
+    bucket = start
+    while bucket < end:
+        rows.append({g.name: g.key(bucket), **counters.get(bucket, _zeros())})
+        bucket += g.step
+
+    await db.execute(delete(g.model).where(g.column >= g.key(start)))
+    await db.execute(insert(g.model), rows)
+
+    if state is None:
+        db.add(StatsRollupState(name=g.name, watermark=current))
+    else:
+        state.watermark = current
+    return len(rows)
+
+
+async def run_rollups(
+    db: AsyncSession, now: datetime | None = None, rebuild: bool = False
+) -> dict[str, int]:
+    """
+    执行所有启用的汇总（按天，及可选的按小时）
+
+    Args:
+        db: 数据库会话（调用方负责提交）
+        now: 当前时间
+        rebuild: 忽略水位全部重建
+
+    Returns:
+        dict[str, int]: 粒度 → 写入行数
+    """
+    result = {"day": await rollup(db, "day", now, rebuild)}
+    if settings.stats_rollup_hourly:
+        result["hour"] = await rollup(db, "hour", now, rebuild)
+    return result
+
+
+async def read_series(
+    db: AsyncSession, granularity: str, start: datetime, end: datetime
+) -> list[dict[str, Any]]:
+    """
+    读取 [start, end) 内每个时间桶的统计
+
+    水位之前的桶读汇总表，之后的桶实时聚合；从未汇总过时全部实时聚合。
+
+    Args:
+        db: 数据库会话
+        granularity: day / hour
+        start: 起始时间（向下取整到桶）
+        end: 结束时间（不含，向下取整到桶）
+
+    Returns:
+        list[dict]: 按时间升序，每项包含 bucket（桶起点）与各项指标，无数据的桶为 0
+    """
+    g = GRANULARITIES[granularity]
+    start, end = g.floor(start), g.floor(end)
+    state = await db.get(StatsRollupState, g.name)
+    live_from = start
+    if state is not None:
+        live_from = min(max(g.floor(_aware(state.watermark)), start), end)
+
+    counters: dict[datetime, dict[str, int]] = {}
+    if live_from > start:
+        result = await db.execute(
+            select(g.column, *(getattr(g.model, name) for name in METRICS)).where(
+                g.column >= g.key(start), g.column < g.key(live_from)
+            )
+        )
+        for row in result.mappings():
+            counters[g.parse(row[g.name])] = {name: row[name] for name in METRICS}
+    if live_from < end:
+        counters.update(await _aggregate(db, g, live_from, end))
+
+    series = []
+    bucket = start
+    while bucket < end:
+        series.append({"bucket": bucket, **counters.get(bucket, _zeros())})
+        bucket += g.step
+    return series
+
+
+async def read_days(db: AsyncSession, days: int, now: datetime | None = None) -> list[dict]:
+    """
+    最近 days 天（含今天）的按天统计
+
+    Args:
+        db: 数据库会话
+        days: 天数
+        now: 当前时间
+
+    Returns:
+        list[dict]: 见 read_series
+    """
+    today = DAILY.floor(now or datetime.now(UTC))
+    return await read_series(db, "day", today - timedelta(days=days - 1), today + DAILY.step)
+
+
+class StatsRollupJob:
+    """
+    统计汇总后台任务
+
+    启用 Redis 时每轮先尝试获取分布式锁，多个 worker 中只有一个执行汇总；
+    汇总本身幂等，锁只用于避免重复计算。
+
+    Args:
+        session_factory: 会话工厂，默认运行时读取 database.async_session_maker
+        interval: 运行间隔（秒），默认 settings.stats_rollup_interval
+    """
+
+    def __init__(self, session_factory=None, interval: float | None = None) -> None:
+        self._session_factory = session_factory
+        self.interval = interval or settings.stats_rollup_interval
+        self._task: asyncio.Task | None = None
+        self.runs = 0
+        self.last_run: datetime | None = None
+
+    def _session(self):
+        if self._session_factory is not None:
+            return self._session_factory()
+        from backend.core import database
+
+        return database.async_session_maker()
+
+    async def start(self) -> None:
+        """启动后台循环"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="stats-rollup")
+
+    async def stop(self) -> None:
+        """停止后台循环"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    async def run_once(self, rebuild: bool = False) -> dict[str, int] | None:
+        """
+        执行一轮汇总
+
+        Args:
+            rebuild: 忽略水位全部重建
+
+        Returns:
+            dict | None: 各粒度写入行数；其他 worker 持有锁时为 None
+        """
+        lock = None
+        if settings.redis_enabled:
+            lock = DistributedLock("stats_rollup", timeout=max(int(self.interval), 30))
+            if not await lock.acquire(wait_timeout=0):
+                await lock.close()
+                return None
+        try:
+            async with self._session() as session:
+                result = await run_rollups(session, rebuild=rebuild)
+                await session.commit()
+            self.runs += 1
+            self.last_run = datetime.now(UTC)
+            return result
+        finally:
+            if lock is not None:
+                await lock.release()
+                await lock.close()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.exception(f"[stats] 统计汇总失败: {exc}")
+            await asyncio.sleep(self.interval)
+
+
+stats_rollup_job = StatsRollupJob()
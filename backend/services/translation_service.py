@@ -0,0 +1,578 @@
+"""
+翻译服务
+
+文本先按空行切成段落，每个段落以（原文哈希, 源语言, 目标语言）为键查翻译记忆：
+
+1. 进程内 LRU（MEMORY_CACHE_SIZE 条）
+2. translation_memory 表（所有目标语言的未命中段落一次查询）
+3. 仍未命中的段落交给翻译服务，各目标语言并行，HTTP 请求数受
+   translate_concurrency 限制，共用一个连接池（httpx.AsyncClient）
+
+外部翻译服务的结果写回两级记忆，修改文章后只有改动过的段落会重新翻译。
+翻译失败（或原样返回）的段落用本地词典兜底，兜底结果不写入记忆。
+
+翻译服务由 settings.translate_provider 选择（mymemory / libretranslate / mock），
+留空时开发环境用 mock，其余环境用 mymemory。
+
+Example:
+    >>> translations = await translator.translate(db, text, "zh", ["en", "zh_Hant"])
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import re
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any
+
+import httpx
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.config import settings
+from backend.models.translation import TranslationMemory
+from backend.utils.phrase_trie import PhraseConverter
+
+logger = logging.getLogger(__name__)
+
+MEMORY_CACHE_SIZE = 4096
+
+# 段落分隔：含空白的空行，分隔符本身原样保留
+_SEGMENT_SEPARATOR = re.compile(r"(\n[ \t\r]*\n\s*)")
+
+# 本地词典（mock 翻译与兜底）
+SIMPLIFIED_TO_TRADITIONAL = {
+    "博客": "部落格",
+    "文章": "文章",
+    "分类": "分類",
+    "标签": "標籤",
+    "评论": "評論",
+    "用户": "使用者",
+    "设置": "設定",
+    "搜索": "搜尋",
+    "发布": "發布",
+    "编辑": "編輯",
+    "删除": "刪除",
+    "保存": "儲存",
+    "取消": "取消",
+    "确认": "確認",
+    "返回": "返回",
+    "首页": "首頁",
+    "管理": "管理",
+    "登录": "登入",
+    "注册": "註冊",
+    "密码": "密碼",
+    "邮箱": "電子郵件",
+    "昵称": "暱稱",
+    "头像": "頭像",
+    "简介": "簡介",
+    "网站": "網站",
+    "链接": "連結",
+    "图片": "圖片",
+    "视频": "影片",
+    "音频": "音訊",
+    "文件": "檔案",
+    "上传": "上傳",
+    "下载": "下載",
+    "导出": "匯出",
+    "导入": "匯入",
+    "数据": "資料",
+    "系统": "系統",
+    "配置": "配置",
+    "状态": "狀態",
+    "时间": "時間",
+    "日期": "日期",
+    "信息": "資訊",
+    "消息": "訊息",
+    "通知": "通知",
+    "成功": "成功",
+    "失败": "失敗",
+    "错误": "錯誤",
+    "警告": "警告",
+    "提示": "提示",
+    "帮助": "說明",
+    "关于": "關於",
+    "联系": "聯絡",
+    "服务": "服務",
+    "条款": "條款",
+    "隐私": "隱私",
+    "政策": "政策",
+    "版权": "版權",
+    "所有": "所有",
+    " rights": " 權利",
+    " reserved": " 保留",
+}
+
+
+MOCK_TRANSLATIONS: dict[str, dict[str, str]] = {
+    "en": {
+        "博客": "Blog",
+        "文章": "Article",
+        "分类": "Category",
+        "标签": "Tag",
+        "评论": "Comment",
+        "用户": "User",
+        "设置": "Settings",
+        "搜索": "Search",
+        "发布": "Publish",
+        "编辑": "Edit",
+        "删除": "Delete",
+        "保存": "Save",
+        "取消": "Cancel",
+        "确认": "Confirm",
+        "返回": "Back",
+        "首页": "Home",
+        "管理": "Admin",
+        "登录": "Login",
+        "注册": "Register",
+        "密码": "Password",
+        "邮箱": "Email",
+        "昵称": "Nickname",
+        "头像": "Avatar",
+        "简介": "Bio",
+        "网站": "Website",
+        "链接": "Link",
+        "图片": "Image",
+        "视频": "Video",
+        "音频": "Audio",
+        "文件": "File",
+        "上传": "Upload",
+        "下载": "Download",
+        "导出": "Export",
+        "导入": "Import",
+        "数据": "Data",
+        "系统": "System",
+        "配置": "Configuration",
+        "状态": "Status",
+        "时间": "Time",
+        "日期": "Date",
+        "信息": "Information",
+        "消息": "Message",
+        "通知": "Notification",
+        "成功": "Success",
+        "失败": "Failed",
+        "错误": "Error",
+        "警告": "Warning",
+        "提示": "Tip",
+        "帮助": "Help",
+        "关于": "About",
+        "联系": "Contact",
+        "服务": "Service",
+        "条款": "Terms",
+        "隐私": "Privacy",
+        "政策": "Policy",
+        "版权": "Copyright",
+        "所有": "All",
+    },
+    "ja": {
+        "博客": "ブログ",
+        "文章": "記事",
+        "分类": "カテゴリ",
+        "标签": "タグ",
+        "评论": "コメント",
+        "用户": "ユーザー",
+        "设置": "設定",
+        "搜索": "検索",
+        "发布": "公開",
+        "编辑": "編集",
+        "删除": "削除",
+        "保存": "保存",
+        "取消": "キャンセル",
+        "确认": "確認",
+        "返回": "戻る",
+        "首页": "ホーム",
+        "管理": "管理",
+        "登录": "ログイン",
+        "注册": "登録",
+        "密码": "パスワード",
+        "邮箱": "メール",
+        "昵称": "ニックネーム",
+        "头像": "アバター",
+        "简介": "自己紹介",
+        "网站": "ウェブサイト",
+        "链接": "リンク",
+        "图片": "画像",
+        "视频": "動画",
+        "音频": "音声",
+        "文件": "ファイル",
+        "上传": "アップロード",
+        "下载": "ダウンロード",
+        "导出": "エクスポート",
+        "导入": "インポート",
+        "数据": "データ",
+        "系统": "システム",
+        "配置": "設定",
+        "状态": "ステータス",
+        "时间": "時間",
+        "日期": "日付",
+        "信息": "情報",
+        "消息": "メッセージ",
+        "通知": "通知",
+        "成功": "成功",
+        "失败": "失敗",
+        "错误": "エラー",
+        "警告": "警告",
+        "提示": "ヒント",
+        "帮助": "ヘルプ",
+        "关于": "について",
+        "联系": "連絡",
+        "服务": "サービス",
+        "条款": "利用規約",
+        "隐私": "プライバシー",
+        "政策": "ポリシー",
+        "版权": "著作権",
+        "所有": "すべて",
+    },
+}
+
+
+class TranslationProvider(ABC):
+    """
+    翻译服务基类
+
+    子类实现 translate_one；支持一次请求翻译多段的服务可覆盖 translate_batch。
+    返回 None 表示该段翻译失败。
+    """
+
+    name = "base"
+    # 结果是否写入翻译记忆（本地词典的结果不写入，换成真实服务后可重新翻译）
+    cacheable = True
+
+    @abstractmethod
+    async def translate_one(
+        self, client: httpx.AsyncClient, text: str, source: str, target: str
+    ) -> str | None:
+        """翻译一段文本，失败时返回 None"""
+
+    async def translate_batch(
+        self,
+        client: httpx.AsyncClient,
+        limit: asyncio.Semaphore,
+        texts: list[str],
+        source: str,
+        target: str,
+    ) -> list[str | None]:
+        async def one(text: str) -> str | None:
+            async with limit:
+                return await self.translate_one(client, text, source, target)
+
+        return list(await asyncio.gather(*(one(text) for text in texts)))
+
+
+class MyMemoryProvider(TranslationProvider):
+    """MyMemory（每段一个请求）"""
+
+    name = "mymemory"
+    url = "https://api.mymemory.translated.net/get"
+    lang_map = {"zh": "zh-CN", "en": "en-GB", "ja": "ja-JP", "zh_Hant": "zh-TW"}
+
+    async def translate_one(
+        self, client: httpx.AsyncClient, text: str, source: str, target: str
+    ) -> str | None:
+        langpair = f"{self.lang_map.get(source, source)}|{self.lang_map.get(target, target)}"
+        try:
+            response = await client.get(self.url, params={"q": text, "langpair": langpair})
+            data = response.json() if response.status_code == 200 else {}
+        except Exception as e:
+            logger.warning(f"MyMemory translation failed: {e}")
+            return None
+        if data.get("responseStatus") != 200:
+            return None
+        return (data.get("responseData") or {}).get("translatedText") or None
+
+
+class LibreTranslateProvider(TranslationProvider):
+    """LibreTranslate（q 传数组，一个请求翻译全部段落）"""
+
+    name = "libretranslate"
+    url = "https://libretranslate.de/translate"
+    lang_map = {"zh": "zh", "en": "en", "ja": "ja", "zh_Hant": "zh"}
+
+    async def translate_one(
+        self, client: httpx.AsyncClient, text: str, source: str, target: str
+    ) -> str | None:
+        return (await self._request(client, [text], source, target))[0]
+
+    async def translate_batch(
+        self,
+        client: httpx.AsyncClient,
+        limit: asyncio.Semaphore,
+        texts: list[str],
+        source: str,
+        target: str,
+    ) -> list[str | None]:
+        async with limit:
+            return await self._request(client, texts, source, target)
+
+    async def _request(
+        self, client: httpx.AsyncClient, texts: list[str], source: str, target: str
+    ) -> list[str | None]:
+        payload = {
+            "q": texts,
+            "source": self.lang_map.get(source, source),
+            "target": self.lang_map.get(target, target),
+            "format": "text",
+        }
+        try:
+            response = await client.post(self.url, json=payload)
+            translated = response.json().get("translatedText") if response.is_success else None
+        except Exception as e:
+            logger.warning(f"LibreTranslate failed: {e}")
+            translated = None
+        if not isinstance(translated, list) or len(translated) != len(texts):
+            return [None] * len(texts)
+        return [item or None for item in translated]
+
+
+class MockProvider(TranslationProvider):
+    """本地词典翻译（开发环境、测试与外部服务失败时的兜底）"""
+
+    name = "mock"
+    cacheable = False
+
+    async def translate_one(
+        self, client: httpx.AsyncClient, text: str, source: str, target: str
+    ) -> str | None:
+        return mock_translate(text, target)
+
+
+PROVIDERS: dict[str, type[TranslationProvider]] = {
+    "mymemory": MyMemoryProvider,
+    "libretranslate": LibreTranslateProvider,
+    "mock": MockProvider,
+}
+
+_converters: dict[str, PhraseConverter] = {}
+
+
+def _converter(target: str) -> PhraseConverter:
+    converter = _converters.get(target)
+    if converter is None:
+        mapping = (
+            SIMPLIFIED_TO_TRADITIONAL if target == "zh_Hant" else MOCK_TRANSLATIONS.get(target, {})
+        )
+        converter = _converters[target] = PhraseConverter(mapping)
+    return converter
+
+
+def simple_zh_to_zh_hant(text: str) -> str:
+    """简体中文转繁体中文（词典最长匹配，单遍扫描）"""
+    return _converter("zh_Hant").convert(text)
+
+
+def mock_translate(text: str, target: str) -> str:
+    """本地词典翻译：按目标语言词典做短语替换"""
+    return _converter(target).convert(text)
+
+
+def split_segments(text: str) -> list[str]:
+    """
+    按空行切分段落
+
+    Returns:
+        list: 偶数下标为段落，奇数下标为分隔符；"".join 后与原文相同
+    """
+    return _SEGMENT_SEPARATOR.split(text)
+
+
+def segment_hash(segment: str) -> str:
+    return hashlib.sha256(segment.encode("utf-8")).hexdigest()
+
+
+class Translator:
+    """
+    带翻译记忆的分段翻译器
+
+    HTTP 连接池与并发信号量按事件循环懒创建（测试中每个用例一个循环），
+    应用关闭时由 shutdown 释放连接。
+    """
+
+    def __init__(
+        self,
+        *,
+        provider: TranslationProvider | None = None,
+        concurrency: int | None = None,
+        timeout: float | None = None,
+        memory_size: int = MEMORY_CACHE_SIZE,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.provider = provider
+        self.concurrency = concurrency or settings.translate_concurrency
+        self.timeout = timeout or settings.translate_timeout
+        self.memory_size = memory_size
+        self._transport = transport
+        self._memory: OrderedDict[tuple[str, str, str], str] = OrderedDict()
+        self._fallback = MockProvider()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._limit: asyncio.Semaphore | None = None
+
+    def resolve_provider(self) -> TranslationProvider:
+        if self.provider is None:
+            name = settings.translate_provider or (
+                "mock" if settings.is_development else "mymemory"
+            )
+            self.provider = PROVIDERS[name]()
+        return self.provider
+
+    async def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # 上一个事件循环中创建的连接池不能复用，先关闭再替换
+        if self._client is not None:
+            try:
+                await self._client.aclose()
+            except Exception as e:
+                logger.debug(f"Closing stale translation client failed: {e}")
+        self._loop = loop
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            transport=self._transport,
+            limits=httpx.Limits(
+                max_connections=self.concurrency, max_keepalive_connections=self.concurrency
+            ),
+        )
+        self._limit = asyncio.Semaphore(self.concurrency)
+
+    def _remember(self, key: tuple[str, str, str], translated: str) -> None:
+        self._memory[key] = translated
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    async def translate(
+        self, db: AsyncSession, text: str, source: str, targets: list[str]
+    ) -> dict[str, str]:
+        """
+        翻译文本到多个目标语言
+
+        Args:
+            db: 数据库会话（新译文随调用方的事务提交）
+            text: 原文
+            source: 源语言
+            targets: 目标语言列表（不含源语言）
+
+        Returns:
+            dict: 目标语言 → 译文
+        """
+        parts = split_segments(text)
+        # 去重后的待翻译段落（纯空白段落原样保留）
+        segments = list(dict.fromkeys(p for p in parts[::2] if p.strip()))
+        hashes = {segment: segment_hash(segment) for segment in segments}
+
+        found: dict[tuple[str, str, str], str] = {}
+        missing: dict[str, list[str]] = {}
+        for target in targets:
+            for segment in segments:
+                key = (hashes[segment], source, target)
+                cached = self._memory.get(key)
+                if cached is None:
+                    missing.setdefault(target, []).append(segment)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = cached
+
+        if missing:
+            rows = await db.execute(
+                select(
+                    TranslationMemory.source_hash,
+                    TranslationMemory.target_lang,
+                    TranslationMemory.translated,
+                ).where(
+                    TranslationMemory.source_lang == source,
+                    TranslationMemory.target_lang.in_(list(missing)),
+                    TranslationMemory.source_hash.in_(
+                        {hashes[s] for pending in missing.values() for s in pending}
+                    ),
+                )
+            )
+            for source_hash, target, translated in rows:
+                key = (source_hash, source, target)
+                found[key] = translated
+                self._remember(key, translated)
+            missing = {
+                target: pending
+                for target, pending in (
+                    (t, [s for s in p if (hashes[s], source, t) not in found])
+                    for t, p in missing.items()
+                )
+                if pending
+            }
+
+        if missing:
+            provider = self.resolve_provider()
+            await self._ensure_started()
+            targets_pending = list(missing)
+            results = await asyncio.gather(
+                *(
+                    provider.translate_batch(
+                        self._client, self._limit, missing[target], source, target
+                    )
+                    for target in targets_pending
+                )
+            )
+            new_rows: list[dict[str, Any]] = []
+            for target, pending, translated_list in zip(
+                targets_pending, missing.values(), results, strict=True
+            ):
+                for segment, translated in zip(pending, translated_list, strict=True):
+                    key = (hashes[segment], source, target)
+                    if translated is None or (translated == segment and provider.cacheable):
+                        found[key] = mock_translate(segment, target)
+                        continue
+                    found[key] = translated
+                    if provider.cacheable:
+                        self._remember(key, translated)
+                        new_rows.append(
+                            {
+                                "source_hash": key[0],
+                                "source_lang": source,
+                                "target_lang": target,
+                                "translated": translated,
+                                "provider": provider.name,
+                            }
+                        )
+            if new_rows:
+                await db.execute(self._insert_stmt(db), new_rows)
+
+        return {
+            target: "".join(
+                found[(hashes[part], source, target)] if i % 2 == 0 and part.strip() else part
+                for i, part in enumerate(parts)
+            )
+            for target in targets
+        }
+
+    @staticmethod
+    def _insert_stmt(db: AsyncSession):
+        """并发翻译同一段落时以先写入者为准（PostgreSQL / SQLite 上 ON CONFLICT DO NOTHING）"""
+        dialect = db.get_bind().dialect.name
+        conflict = ["source_hash", "source_lang", "target_lang"]
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+            return pg_insert(TranslationMemory).on_conflict_do_nothing(index_elements=conflict)
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+            return sqlite_insert(TranslationMemory).on_conflict_do_nothing(index_elements=conflict)
+        return insert(TranslationMemory)
+
+    def clear_memory(self) -> None:
+        """清空进程内 LRU（数据库中的翻译记忆不受影响）"""
+        self._memory.clear()
+
+    async def shutdown(self) -> None:
+        """关闭连接池"""
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._loop = None
+        self._client = None
+        self._limit = None
+
+
+translator = Translator()
@@ -17,6 +17,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.core.auth import (
     _add_jti_to_blacklist,
+    access_token_claims,
     create_access_token,
     create_refresh_token,
     decode_token,
@@ -25,6 +26,7 @@ from backend.core.auth import (
     verify_password_with_rehash,
 )
 from backend.core.config import settings
+from backend.core.principal import invalidate_principal
 from backend.models.user import User, UserPreference
 from backend.repositories.user import (
     RefreshTokenRepository,
@@ -121,7 +123,7 @@ class UserService:
 
         await self._preference_repo.get_or_create_for_user(user.id)
 
-        access_token = create_access_token({"sub": str(user.id)})
+        access_token = create_access_token(access_token_claims(user))
         refresh_token_str, _jti = create_refresh_token(
             {"sub": str(user.id)},
             user_token_version=getattr(user, "token_version", 0) or 0,
@@ -189,7 +191,7 @@ class UserService:
 
         await self._user_repo.update_last_login(user.id)
 
-        access_token = create_access_token({"sub": str(user.id)})
+        access_token = create_access_token(access_token_claims(user))
         refresh_token_str, _jti = create_refresh_token(
             {"sub": str(user.id)},
             user_token_version=getattr(user, "token_version", 0) or 0,
@@ -300,7 +302,7 @@ class UserService:
         user.token_version = current_version + 1
         await self._db.flush()
 
-        access_token = create_access_token({"sub": str(user.id)})
+        access_token = create_access_token(access_token_claims(user))
         new_refresh_token_str, _new_jti = create_refresh_token(
             {"sub": str(user.id)},
             user_token_version=user.token_version,
@@ -324,6 +326,7 @@ class UserService:
 
         await self._db.commit()
         await self._cache.invalidate_user_cache(user.id)
+        await invalidate_principal(user.id)
 
         logger.info(f"令牌刷新(rotate)成功: user_id={user.id}, new_version={user.token_version}")
 
@@ -448,6 +451,7 @@ class UserService:
         updated_user = await self._user_repo.update(user, update_data)
 
         await self._cache.invalidate_user_cache(user_id)
+        await invalidate_principal(user_id)
 
         logger.info(f"用户资料更新成功: id={user_id}")
 
@@ -525,6 +529,7 @@ class UserService:
         await self._token_repo.revoke_all_user_tokens(user_id)
 
         await self._cache.invalidate_user_cache(user_id)
+        await invalidate_principal(user_id)
 
         logger.info(f"用户密码修改成功: id={user_id}")
 
@@ -648,6 +653,7 @@ class UserService:
         if success:
             await self._token_repo.revoke_all_user_tokens(user_id)
             await self._cache.invalidate_user_cache(user_id)
+            await invalidate_principal(user_id)
             logger.info(f"用户已封禁: id={user_id}")
         return success
 
@@ -667,6 +673,7 @@ class UserService:
         success = await self._user_repo.unban_user(user_id)
         if success:
             await self._cache.invalidate_user_cache(user_id)
+            await invalidate_principal(user_id)
             logger.info(f"用户已解封: id={user_id}")
         return success
 
@@ -686,6 +693,7 @@ class UserService:
         success = await self._user_repo.activate_user(user_id)
         if success:
             await self._cache.invalidate_user_cache(user_id)
+            await invalidate_principal(user_id)
             logger.info(f"用户已激活: id={user_id}")
         return success
 
@@ -706,6 +714,7 @@ class UserService:
         if success:
             await self._token_repo.revoke_all_user_tokens(user_id)
             await self._cache.invalidate_user_cache(user_id)
+            await invalidate_principal(user_id)
             logger.info(f"用户已停用: id={user_id}")
         return success
 
@@ -727,6 +736,7 @@ class UserService:
         success = await self._user_repo.set_staff_status(user_id, is_staff)
         if success:
             await self._cache.invalidate_user_cache(user_id)
+            await invalidate_principal(user_id)
             logger.info(f"用户管理员状态更新: id={user_id}, is_staff={is_staff}")
         return success
 
@@ -0,0 +1,659 @@
+"""
+Rosetta FastAPI 后端 - Webhook 投递引擎
+
+- WebhookSubscriptionIndex: 事件 → 端点订阅索引，一次查询加载全部活跃端点并预解析
+  events，端点增删改时失效（多进程下依赖 TTL 兜底）
+- sign_payload / build_headers: 对实际发送的请求体字节计算 HMAC-SHA256 签名
+- WebhookDispatcher: 有界并发的异步投递器，共享连接池化的 httpx.AsyncClient；
+  失败按指数退避重试，记录每次请求耗时，投递结果在后台批量写回 webhook_deliveries，
+  不占用触发事件的请求事务
+- 持久化：入队前先写入投递记录（attempts=0）；stage() 在调用方事务中写入、提交后入队，
+  回滚则不投递；进程重启后 resume() 重新入队未完成的投递
+
+Example:
+    >>> from backend.services.webhook_service import webhook_dispatcher
+    >>> await webhook_dispatcher.publish("post.published", {"id": 1, "slug": "hello"})
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+import httpx
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.config import settings
+from backend.core.db_events import on_commit
+from backend.core.distributed_lock import DistributedLock
+from backend.models.webhook import WebhookDelivery, WebhookEndpoint
+from backend.utils.compat import UTC
+
+logger = logging.getLogger(__name__)
+
+# 响应体最多保留的字符数
+RESPONSE_BODY_LIMIT = 1000
+
+# 视为临时故障、值得重试的状态码
+RETRYABLE_STATUS = frozenset({408, 409, 425, 429})
+
+# 启动时恢复未完成投递的锁（多 worker 只有一个执行恢复）
+RESUME_LOCK_KEY = "webhook_resume"
+RESUME_LOCK_TTL = 300
+
+
+@dataclass(frozen=True)
+class WebhookTarget:
+    """索引中的端点快照（只保留投递所需字段）"""
+
+    endpoint_id: int
+    url: str
+    secret: str | None
+
+
+def _parse_events(raw: Any) -> list[str]:
+    if isinstance(raw, list):
+        return raw
+    try:
+        events = json.loads(raw or "[]")
+    except (TypeError, ValueError):
+        return []
+    return events if isinstance(events, list) else []
+
+
+class WebhookSubscriptionIndex:
+    """
+    事件 → 端点订阅索引
+
+    首次查询或失效后用一条 SELECT 加载全部活跃端点，按事件分组缓存。
+    本进程内的端点增删改通过 invalidate() 立即生效；其他进程在 ttl 秒后重新加载。
+    """
+
+    def __init__(self, ttl: float | None = None):
+        self.ttl = settings.webhook_index_ttl if ttl is None else ttl
+        self._by_event: dict[str, tuple[WebhookTarget, ...]] | None = None
+        self._loaded_at = 0.0
+        self._version = 0
+
+    def invalidate(self) -> None:
+        """丢弃已加载的索引，下次查询时重新加载"""
+        self._by_event = None
+        self._version += 1
+
+    async def targets(self, event_type: str) -> tuple[WebhookTarget, ...]:
+        """
+        获取订阅某事件的端点
+
+        Args:
+            event_type: 事件类型
+
+        Returns:
+            tuple[WebhookTarget, ...]: 订阅该事件的活跃端点
+        """
+        if self._by_event is None or time.monotonic() - self._loaded_at > self.ttl:
+            await self._load()
+        return (self._by_event or {}).get(event_type, ())
+
+    async def _load(self) -> None:
+        from backend.core import database
+
+        version = self._version
+        async with database.async_session_maker() as session:
+            rows = (
+                await session.execute(
+                    select(
+                        WebhookEndpoint.id,
+                        WebhookEndpoint.url,
+                        WebhookEndpoint.secret,
+                        WebhookEndpoint.events,
+                    ).where(WebhookEndpoint.is_active.is_(True))
+                )
+            ).all()
+
+        by_event: dict[str, list[WebhookTarget]] = {}
+        for endpoint_id, url, secret, events in rows:
+            target = WebhookTarget(endpoint_id=endpoint_id, url=url, secret=secret)
+            for event in dict.fromkeys(_parse_events(events)):
+                by_event.setdefault(event, []).append(target)
+
+        # 加载期间被失效：丢弃这份可能过期的结果，下次重新加载
+        if version != self._version:
+            return
+        self._by_event = {event: tuple(targets) for event, targets in by_event.items()}
+        self._loaded_at = time.monotonic()
+
+
+def encode_payload(event_type: str, data: Any, timestamp: datetime | None = None) -> bytes:
+    """
+    构建并序列化 Webhook 请求体
+
+    签名和发送使用同一份字节，接收方按原始请求体验签即可。
+
+    Args:
+        event_type: 事件类型
+        data: 事件数据
+        timestamp: 事件时间，默认当前时间
+
+    Returns:
+        bytes: 紧凑 JSON 编码的请求体
+    """
+    body = {
+        "event": event_type,
+        "timestamp": (timestamp or datetime.now(UTC)).isoformat(),
+        "data": data,
+    }
+    return json.dumps(body, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+
+
+def sign_payload(secret: str, body: bytes) -> str:
+    """
+    计算请求体签名
+
+    Args:
+        secret: 端点密钥
+        body: 请求体字节
+
+    Returns:
+        str: "sha256=<hex>" 形式的签名
+    """
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def build_headers(event_type: str, body: bytes, secret: str | None, delivery_key: str) -> dict:
+    """
+    构建投递请求头
+
+    Args:
+        event_type: 事件类型
+        body: 请求体字节
+        secret: 端点密钥，为空时不签名
+        delivery_key: 投递唯一标识，重试时保持不变，供接收方去重
+
+    Returns:
+        dict: 请求头
+    """
+    headers = {
+        "Content-Type": "application/json",
+        "User-Agent": f"Rosetta-Webhook/{settings.app_version}",
+        "X-Webhook-Event": event_type,
+        "X-Webhook-Delivery": delivery_key,
+    }
+    if secret:
+        headers["X-Webhook-Signature"] = sign_payload(secret, body)
+    return headers
+
+
+@dataclass(eq=False)
+class _Delivery:
+    """一次投递的内存状态，跨重试共享，由批量写入器落库"""
+
+    target: WebhookTarget
+    event_type: str
+    body: bytes
+    delivery_id: int | None = None
+    key: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+    status_code: int | None = None
+    response_body: str | None = None
+    error: str | None = None
+    latency_ms: float | None = None
+    delivered_at: datetime | None = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+
+    def persisted(self, delivery_id: int) -> None:
+        """记录已落库：投递标识改用记录 ID，重启后恢复的投递保持同一标识"""
+        self.delivery_id = delivery_id
+        self.key = _delivery_key(delivery_id)
+
+    def new_row(self) -> dict[str, Any]:
+        return {
+            "endpoint_id": self.target.endpoint_id,
+            "event_type": self.event_type,
+            "payload": self.body.decode(),
+            "created_at": self.created_at,
+            **self.row(),
+        }
+
+    def row(self) -> dict[str, Any]:
+        return {
+            "status_code": self.status_code,
+            "response_body": self.response_body,
+            "error": self.error,
+            "attempts": self.attempts,
+            "latency_ms": self.latency_ms,
+            "delivered_at": self.delivered_at,
+        }
+
+
+def _delivery_key(delivery_id: int) -> str:
+    return f"delivery-{delivery_id}"
+
+
+def _insert_deliveries():
+    return insert(WebhookDelivery).returning(WebhookDelivery.id, sort_by_parameter_order=True)
+
+
+class WebhookDispatcher:
+    """
+    Webhook 投递器
+
+    publish() 只查询订阅索引并把投递放入进程内队列，立即返回；固定数量的 worker
+    通过共享的 httpx.AsyncClient 发送请求，因此同时进行的请求数不超过 concurrency。
+
+    - 2xx 视为成功；网络错误、5xx 与 408/409/425/429 按指数退避重试，
+      其余 4xx 直接判定失败
+    - 退避等待期间不占用 worker
+    - 每次尝试后的状态合并进写缓冲，攒满 flush_size 条或每 flush_interval 秒
+      由后台任务用独立会话批量 INSERT/UPDATE
+    """
+
+    def __init__(
+        self,
+        *,
+        concurrency: int | None = None,
+        max_attempts: int | None = None,
+        timeout: float | None = None,
+        backoff_base: float | None = None,
+        backoff_max: float = 600.0,
+        flush_interval: float = 1.0,
+        flush_size: int = 100,
+        index: WebhookSubscriptionIndex | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.concurrency = concurrency or settings.webhook_concurrency
+        self.max_attempts = max_attempts or settings.webhook_max_attempts
+        self.timeout = timeout or settings.webhook_timeout
+        self.backoff_base = settings.webhook_retry_backoff if backoff_base is None else backoff_base
+        self.backoff_max = backoff_max
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.index = index or WebhookSubscriptionIndex()
+        self._transport = transport
+        self._reset()
+
+    def _reset(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._queue: asyncio.Queue[_Delivery] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._flusher: asyncio.Task | None = None
+        self._retry_handles: set[asyncio.TimerHandle] = set()
+        self._dirty: dict[int, _Delivery] = {}
+        self._dirty_event: asyncio.Event | None = None
+        self._flush_lock: asyncio.Lock | None = None
+        self._outstanding = 0
+        self._idle: asyncio.Event | None = None
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # 首次使用，或上一个事件循环已结束（测试中每个用例一个循环）
+        self._reset()
+        self._loop = loop
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            transport=self._transport,
+            limits=httpx.Limits(
+                max_connections=self.concurrency, max_keepalive_connections=self.concurrency
+            ),
+        )
+        self._queue = asyncio.Queue()
+        self._dirty_event = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"webhook-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        self._flusher = asyncio.create_task(self._flush_loop(), name="webhook-flusher")
+
+    def _enqueue(self, delivery: _Delivery) -> None:
+        self._outstanding += 1
+        self._idle.clear()
+        self._queue.put_nowait(delivery)
+
+    def _finish(self) -> None:
+        self._outstanding -= 1
+        if self._outstanding <= 0:
+            self._outstanding = 0
+            self._idle.set()
+
+    async def publish(self, event_type: str, data: Any) -> int:
+        """
+        向订阅该事件的所有端点投递
+
+        Args:
+            event_type: 事件类型
+            data: 事件数据（可 JSON 序列化）
+
+        Returns:
+            int: 加入队列的投递数
+        """
+        deliveries = await self._build(event_type, data)
+        if not deliveries:
+            return 0
+        self._ensure_started()
+        await self._persist(deliveries)
+        for delivery in deliveries:
+            self._enqueue(delivery)
+        return len(deliveries)
+
+    async def stage(self, db: AsyncSession, event_type: str, data: Any) -> int:
+        """
+        在调用方事务中写入投递记录，提交后入队（事务回滚则不投递）
+
+        Args:
+            db: 调用方会话
+            event_type: 事件类型
+            data: 事件数据（可 JSON 序列化）
+
+        Returns:
+            int: 待投递数
+        """
+        deliveries = await self._build(event_type, data)
+        if not deliveries:
+            return 0
+        result = await db.execute(_insert_deliveries(), [d.new_row() for d in deliveries])
+        for delivery, delivery_id in zip(deliveries, result.scalars().all(), strict=True):
+            delivery.persisted(delivery_id)
+        _staged_deliveries.pending(db.sync_session).extend(deliveries)
+        return len(deliveries)
+
+    async def enqueue(self, deliveries: list[_Delivery]) -> None:
+        """把已落库的投递放入队列（stage() 的提交后回调）"""
+        self._ensure_started()
+        for delivery in deliveries:
+            self._enqueue(delivery)
+
+    async def resume(self) -> int:
+        """
+        重新入队上次进程退出时未完成的投递
+
+        未成功、未达到最大尝试次数且最近一次失败可重试（含从未尝试）的记录重新入队，
+        所属端点已停用的跳过。启用 Redis 时多 worker 只有一个执行恢复。
+
+        Returns:
+            int: 重新入队的投递数
+        """
+        from backend.core import database
+
+        if settings.redis_enabled:
+            lock = DistributedLock(RESUME_LOCK_KEY, timeout=RESUME_LOCK_TTL, auto_renewal=False)
+            try:
+                # 不主动释放：有效期内启动的其他 worker 不再重复恢复
+                if not await lock.acquire(wait_timeout=0):
+                    return 0
+            finally:
+                await lock.close()
+
+        retryable = or_(
+            WebhookDelivery.status_code.is_(None),
+            WebhookDelivery.status_code >= 500,
+            WebhookDelivery.status_code.in_(RETRYABLE_STATUS),
+        )
+        async with database.async_session_maker() as session:
+            result = await session.execute(
+                select(WebhookDelivery, WebhookEndpoint)
+                .join(WebhookEndpoint, WebhookEndpoint.id == WebhookDelivery.endpoint_id)
+                .where(
+                    WebhookDelivery.delivered_at.is_(None),
+                    WebhookDelivery.attempts < self.max_attempts,
+                    retryable,
+                    WebhookEndpoint.is_active.is_(True),
+                )
+                .order_by(WebhookDelivery.id)
+            )
+            rows = result.all()
+        if not rows:
+            return 0
+        self._ensure_started()
+        for delivery, endpoint in rows:
+            self._enqueue(
+                _Delivery(
+                    target=WebhookTarget(endpoint.id, endpoint.url, endpoint.secret),
+                    event_type=delivery.event_type,
+                    body=delivery.payload.encode(),
+                    delivery_id=delivery.id,
+                    key=_delivery_key(delivery.id),
+                    attempts=delivery.attempts or 0,
+                    created_at=delivery.created_at,
+                )
+            )
+        logger.info(f"[webhook] 恢复未完成的投递 {len(rows)} 条")
+        return len(rows)
+
+    async def _build(self, event_type: str, data: Any) -> list[_Delivery]:
+        targets = await self.index.targets(event_type)
+        if not targets:
+            return []
+        body = encode_payload(event_type, data)
+        return [_Delivery(target=target, event_type=event_type, body=body) for target in targets]
+
+    async def _persist(self, deliveries: list[_Delivery]) -> None:
+        """入队前写入投递记录；失败时退回到首次尝试后由写缓冲插入（重启会丢失）"""
+        from backend.core import database
+
+        try:
+            async with database.async_session_maker() as session:
+                result = await session.execute(
+                    _insert_deliveries(), [d.new_row() for d in deliveries]
+                )
+                ids = result.scalars().all()
+                await session.commit()
+        except Exception as exc:
+            logger.warning(f"[webhook] 投递记录预写失败: {exc}")
+            return
+        for delivery, delivery_id in zip(deliveries, ids, strict=True):
+            delivery.persisted(delivery_id)
+
+    async def redeliver(self, delivery: WebhookDelivery, endpoint: WebhookEndpoint) -> None:
+        """
+        重新投递一条已有记录（沿用原请求体，结果更新到该记录）
+
+        Args:
+            delivery: 投递记录
+            endpoint: 所属端点
+        """
+        self._ensure_started()
+        self._enqueue(
+            _Delivery(
+                target=WebhookTarget(endpoint.id, endpoint.url, endpoint.secret),
+                event_type=delivery.event_type,
+                body=delivery.payload.encode(),
+                delivery_id=delivery.id,
+                attempts=delivery.attempts or 0,
+            )
+        )
+
+    async def send_test(self, endpoint: WebhookEndpoint) -> httpx.Response:
+        """
+        同步发送一次测试事件（不重试、不记录）
+
+        Args:
+            endpoint: 目标端点
+
+        Returns:
+            httpx.Response: 端点响应
+        """
+        self._ensure_started()
+        body = encode_payload("test", {"message": "This is a test webhook"})
+        headers = build_headers("test", body, endpoint.secret, uuid.uuid4().hex)
+        return await self._client.post(endpoint.url, content=body, headers=headers)
+
+    async def _worker(self) -> None:
+        while True:
+            delivery = await self._queue.get()
+            try:
+                await self._attempt(delivery)
+            except Exception:
+                logger.exception("[webhook] 投递处理异常")
+                self._finish()
+            finally:
+                self._queue.task_done()
+
+    async def _attempt(self, delivery: _Delivery) -> None:
+        target = delivery.target
+        delivery.attempts += 1
+        headers = build_headers(delivery.event_type, delivery.body, target.secret, delivery.key)
+        started = time.perf_counter()
+        retryable = True
+        try:
+            response = await self._client.post(target.url, content=delivery.body, headers=headers)
+        except httpx.HTTPError as exc:
+            delivery.status_code = None
+            delivery.response_body = None
+            delivery.error = f"{type(exc).__name__}: {exc}"[:RESPONSE_BODY_LIMIT]
+        else:
+            delivery.status_code = response.status_code
+            delivery.response_body = response.text[:RESPONSE_BODY_LIMIT]
+            if response.is_success:
+                delivery.error = None
+                delivery.delivered_at = datetime.now(UTC)
+                retryable = False
+            else:
+                delivery.error = f"HTTP {response.status_code}"
+                retryable = response.status_code >= 500 or response.status_code in RETRYABLE_STATUS
+        delivery.latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        self._mark_dirty(delivery)
+
+        if delivery.delivered_at is None and retryable and delivery.attempts < self.max_attempts:
+            self._schedule_retry(delivery)
+            return
+        if delivery.delivered_at is None:
+            logger.warning(
+                f"[webhook] 投递失败 endpoint={target.endpoint_id} event={delivery.event_type} "
+                f"attempts={delivery.attempts}: {delivery.error}"
+            )
+        self._finish()
+
+    def backoff(self, attempts: int) -> float:
+        """第 attempts 次失败后的等待秒数"""
+        return min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+
+    def _schedule_retry(self, delivery: _Delivery) -> None:
+        def requeue() -> None:
+            self._retry_handles.discard(handle)
+            self._queue.put_nowait(delivery)
+
+        handle = self._loop.call_later(self.backoff(delivery.attempts), requeue)
+        self._retry_handles.add(handle)
+
+    def _mark_dirty(self, delivery: _Delivery) -> None:
+        self._dirty[id(delivery)] = delivery
+        if len(self._dirty) >= self.flush_size:
+            self._dirty_event.set()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._dirty_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._dirty_event.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("[webhook] 投递记录写入失败")
+
+    async def flush(self) -> int:
+        """
+        把缓冲中的投递状态批量写回数据库
+
+        尚未落库的投递一次多行 INSERT 并回填 id；已有记录按 id 批量 UPDATE。
+        同一投递在两次写入之间的多次尝试只写最新状态。
+
+        Returns:
+            int: 写入的记录数
+        """
+        if not self._dirty or self._flush_lock is None:
+            return 0
+        from backend.core import database
+
+        async with self._flush_lock:
+            batch, self._dirty = list(self._dirty.values()), {}
+            new = [d for d in batch if d.delivery_id is None]
+            existing = [d for d in batch if d.delivery_id is not None]
+            ids: list[int] = []
+            try:
+                async with database.async_session_maker() as session:
+                    if new:
+                        result = await session.execute(
+                            _insert_deliveries(), [d.new_row() for d in new]
+                        )
+                        ids = result.scalars().all()
+                    if existing:
+                        await session.execute(
+                            update(WebhookDelivery),
+                            [{"id": d.delivery_id, **d.row()} for d in existing],
+                        )
+                    await session.commit()
+            except Exception:
+                # 放回缓冲，下次重试写入（期间更新的状态优先）
+                for d in batch:
+                    self._dirty.setdefault(id(d), d)
+                raise
+            for d, delivery_id in zip(new, ids, strict=True):
+                d.delivery_id = delivery_id
+            return len(batch)
+
+    async def drain(self, timeout: float | None = None) -> None:
+        """
+        等待所有已入队的投递（含退避中的重试）结束并写入数据库
+
+        Args:
+            timeout: 最长等待秒数，None 表示一直等待
+        """
+        if self._idle is None or self._loop is not asyncio.get_running_loop():
+            return
+        await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+        await self.flush()
+
+    def stats(self) -> dict[str, int]:
+        """投递器运行状态"""
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "outstanding": self._outstanding,
+            "retry_scheduled": len(self._retry_handles),
+            "unflushed": len(self._dirty),
+        }
+
+    async def shutdown(self) -> None:
+        """停止 worker，写入最后一批状态并关闭连接池；退避中的重试被放弃"""
+        if self._loop is not asyncio.get_running_loop():
+            self._reset()
+            return
+        for handle in self._retry_handles:
+            handle.cancel()
+        tasks = [*self._workers, *([self._flusher] if self._flusher else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("[webhook] 关闭时写入投递记录失败")
+        if self._client is not None:
+            await self._client.aclose()
+        self._reset()
+
+
+webhook_dispatcher = WebhookDispatcher()
+
+
+# stage() 写入的投递在调用方事务提交后入队
+_staged_deliveries = on_commit(
+    "webhook_staged_deliveries",
+    lambda deliveries: webhook_dispatcher.enqueue(deliveries),
+    factory=list,
+    label="[webhook] 投递入队",
+)
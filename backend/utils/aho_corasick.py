@@ -0,0 +1,86 @@
+"""
+Aho-Corasick 多模式匹配自动机
+
+一次构建、只读使用：构建耗时与全部模式的总长度成正比，匹配时每段文本只扫描一遍，
+耗时与文本长度（加命中数）成正比，与模式数量无关。实例不可变，可在线程 / 协程间共享。
+
+Example:
+    >>> automaton = AhoCorasick(["he", "she", "hers"])
+    >>> sorted(automaton.search("ushers"))
+    [0, 1, 2]
+"""
+
+from collections import deque
+from collections.abc import Iterable
+
+
+class AhoCorasick:
+    """
+    多模式匹配自动机
+
+    Args:
+        patterns: 模式串，按位置编号；空串忽略
+    """
+
+    __slots__ = ("_goto", "_fail", "_outputs", "size")
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        goto: list[dict[str, int]] = [{}]
+        outputs: list[tuple[int, ...]] = [()]
+        size = 0
+
+        # 构建字典树
+        for index, pattern in enumerate(patterns):
+            size += 1
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append(())
+                state = next_state
+            outputs[state] = (*outputs[state], index)
+
+        # 按层次计算失配指针，并把失配链上的输出合并到当前状态
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                if outputs[fail[next_state]]:
+                    outputs[next_state] = outputs[next_state] + outputs[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+        self.size = size
+
+    def search(self, text: str) -> set[int]:
+        """
+        扫描文本
+
+        Args:
+            text: 待匹配文本
+
+        Returns:
+            set[int]: 命中的模式编号
+        """
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found: set[int] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
@@ -0,0 +1,80 @@
+"""
+评论物化路径
+
+每条评论存储从根到自身的路径（comments.path）：
+- 根评论：补零到 10 位的自身 ID，如 "0000000012"
+- 回复：父路径 + "/" + 补零到 6 位的序号，如 "0000000012/000003"；
+  序号取自父评论的 reply_seq（只增不减，删除回复后不复用）
+
+段宽固定，字典序即线程内的先后顺序；某条评论的前 N 条回复是 path 上的一段
+连续区间 (parent_path + "/", parent_path + "/" + segment(N)]，可用索引范围扫描取回。
+新评论的路径由 models.blog 中 Comment 的 before_insert / after_insert 监听维护，
+迁移回填与批量导入后的重建使用 encode_threads。
+"""
+
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import datetime
+from typing import NamedTuple
+
+ROOT_WIDTH = 10
+SEQ_WIDTH = 6
+SEPARATOR = "/"
+
+
+class ThreadFields(NamedTuple):
+    """一条评论的路径与回复统计"""
+
+    path: str
+    reply_count: int
+    reply_seq: int
+    last_reply_at: datetime | None
+
+
+def root_path(comment_id: int) -> str:
+    """根评论的路径"""
+    return f"{comment_id:0{ROOT_WIDTH}d}"
+
+
+def segment(seq: int) -> str:
+    """回复序号对应的路径段"""
+    return f"{seq:0{SEQ_WIDTH}d}"
+
+
+def child_path(parent_path: str, seq: int) -> str:
+    """第 seq 条回复的路径"""
+    return f"{parent_path}{SEPARATOR}{segment(seq)}"
+
+
+def encode_threads(
+    rows: Iterable[tuple[int, int | None, datetime | None]],
+) -> dict[int, ThreadFields]:
+    """
+    为一批评论（通常是一篇文章的全部评论）重新计算路径与回复统计
+
+    Args:
+        rows: (id, parent_id, created_at)；父评论不在本批中的视为根评论
+
+    Returns:
+        dict[int, ThreadFields]: 评论 ID → 路径与统计
+    """
+    rows = list(rows)
+    ids = {comment_id for comment_id, _, _ in rows}
+    children: dict[int | None, list[tuple[int, datetime | None]]] = defaultdict(list)
+    for comment_id, parent_id, created_at in rows:
+        children[parent_id if parent_id in ids else None].append((comment_id, created_at))
+
+    def order(item: tuple[int, datetime | None]) -> tuple:
+        comment_id, created_at = item
+        return (created_at is None, created_at or datetime.min, comment_id)
+
+    result: dict[int, ThreadFields] = {}
+    stack = [(comment_id, root_path(comment_id)) for comment_id, _ in children[None]]
+    while stack:
+        comment_id, path = stack.pop()
+        replies = sorted(children.get(comment_id, ()), key=order)
+        last = max((at for _, at in replies if at is not None), default=None)
+        result[comment_id] = ThreadFields(path, len(replies), len(replies), last)
+        for seq, (reply_id, _) in enumerate(replies, start=1):
+            stack.append((reply_id, child_path(path, seq)))
+    return result
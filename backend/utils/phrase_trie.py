@@ -0,0 +1,74 @@
+"""
+字典树短语替换
+
+把 {原短语: 替换文本} 编译成字典树，单遍扫描文本：每个位置取最长匹配的短语替换，
+未匹配的字符原样输出。相比逐条 str.replace，耗时只与文本长度相关，与词条数量无关；
+且已替换的输出不会被后续词条再次匹配（逐条替换时 A→B、B→C 会串联成 A→C）。
+
+Example:
+    >>> converter = PhraseConverter({"博客": "部落格", "博客园": "部落格園"})
+    >>> converter.convert("博客园的博客")
+    '部落格園的部落格'
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+# 终止标记：字符键都是长度为 1 的字符串，空串不会与之冲突
+_END = ""
+
+
+class PhraseConverter:
+    """单遍最长匹配的短语替换器"""
+
+    __slots__ = ("_root", "size")
+
+    def __init__(self, mapping: Mapping[str, str]):
+        root: dict[str, Any] = {}
+        for phrase, replacement in mapping.items():
+            if not phrase:
+                continue
+            node = root
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[_END] = replacement
+        self._root = root
+        self.size = sum(1 for phrase in mapping if phrase)
+
+    def convert(self, text: str) -> str:
+        """替换文本中的所有短语"""
+        root = self._root
+        out: list[str] = []
+        length = len(text)
+        start = 0  # 尚未输出的原文起点
+        i = 0
+        while i < length:
+            node = root.get(text[i])
+            if node is None:
+                i += 1
+                continue
+            match: str | None = None
+            match_end = i
+            j = i + 1
+            while True:
+                if _END in node:
+                    match = node[_END]
+                    match_end = j
+                if j >= length:
+                    break
+                node = node.get(text[j])
+                if node is None:
+                    break
+                j += 1
+            if match is None:
+                i += 1
+                continue
+            out.append(text[start:i])
+            out.append(match)
+            i = start = match_end
+        if not out:
+            return text
+        out.append(text[start:])
+        return "".join(out)
@@ -0,0 +1,75 @@
+"""
+文章派生指标
+
+字数、阅读时间与归档月份在文章写入时计算一次并存入 posts 表
+（见 models.blog 中 Post 的 before_insert / before_update 监听），
+站点统计与归档页只需对这些小列做 SUM / GROUP BY。
+"""
+
+import math
+import re
+from datetime import datetime
+
+from backend.utils.compat import UTC
+
+_CODE_BLOCK = re.compile(r"```[\s\S]*?```")
+_INLINE_CODE = re.compile(r"`[^`]*`")
+_CHINESE_CHAR = re.compile(r"[\u4e00-\u9fa5]")
+_ENGLISH_CHAR = re.compile(r"[a-zA-Z]")
+_ENGLISH_WORD = re.compile(r"[a-zA-Z0-9]+")
+
+
+def primary_text(content) -> str:
+    """
+    多语言内容的主语言文本
+
+    Args:
+        content: 多语言 dict / 字符串 / None
+
+    Returns:
+        str: 优先 zh，否则第一个非空值，否则空串
+    """
+    if isinstance(content, dict):
+        return content.get("zh") or next((v for v in content.values() if v), "") or ""
+    if isinstance(content, str):
+        return content
+    return ""
+
+
+def count_words(content: str) -> int:
+    """
+    计算内容字数
+
+    算法与前端 SiteStats.astro 保持一致：
+    - 移除代码块和内联代码
+    - 统计中文字符数 + 英文字符数
+    """
+    if not content:
+        return 0
+
+    text = _CODE_BLOCK.sub("", content)
+    text = _INLINE_CODE.sub("", text)
+    return len(_CHINESE_CHAR.findall(text)) + len(_ENGLISH_CHAR.findall(text))
+
+
+def calculate_reading_time(content: str) -> int:
+    """计算阅读时间（分钟）"""
+    chinese_chars = len(_CHINESE_CHAR.findall(content))
+    english_words = len(_ENGLISH_WORD.findall(content))
+    minutes = (chinese_chars / 300) + (english_words / 150)
+    return max(1, math.ceil(minutes))
+
+
+def archive_month(published_at: datetime | None, created_at: datetime | None) -> str:
+    """
+    归档月份（YYYY-MM），取发布时间，未发布时取创建时间
+
+    Args:
+        published_at: 发布时间
+        created_at: 创建时间（None 表示尚未写入，取当前时间）
+
+    Returns:
+        str: 如 "2026-10"
+    """
+    value = published_at or created_at or datetime.now(UTC)
+    return f"{value.year:04d}-{value.month:02d}"
@@ -0,0 +1,150 @@
+"""
+文章正文编译
+
+把多语言 Markdown 正文一次性编译成阅读端直接使用的产物，每种语言包含：
+
+- html: 渲染并经 xss_filter.sanitize_post_html 清洗后的 HTML，标题带 id
+- headings: 扁平标题列表 [{id, text, level}]
+- toc: 默认深度（TOC_DEPTH）的目录树
+- word_count / reading_time: 与 post_metrics 相同的算法
+- excerpt: 正文纯文本的前 EXCERPT_LENGTH 个字符
+
+产物以正文内容哈希为键保存（models.blog.PostRender），文章写入时编译；正文未变时
+（包括回滚到内容相同的修订版本）直接复用。RENDERER_VERSION 变化后旧产物在读取时重新编译。
+"""
+
+import hashlib
+import json
+import re
+from typing import Any
+
+from markdown_it import MarkdownIt
+
+from backend.core.xss_filter import sanitize_post_html
+from backend.utils import post_metrics
+
+RENDERER_VERSION = 1
+TOC_DEPTH = 3
+EXCERPT_LENGTH = 200
+
+_HEADING_ID_INVALID = re.compile(r"[^\w\u4e00-\u9fff-]")
+_HEADING_ID_DASHES = re.compile(r"-+")
+_WHITESPACE = re.compile(r"\s+")
+
+_markdown = MarkdownIt("commonmark", {"html": True}).enable(["table", "strikethrough"])
+
+
+def content_hash(content: Any) -> str:
+    """正文内容哈希（多语言 dict 按键排序后序列化）"""
+    payload = json.dumps(content or {}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def heading_slug(text: str) -> str:
+    """标题锚点 ID，规则与 /api/toc 接口一致"""
+    slug = _HEADING_ID_INVALID.sub("-", text.lower())
+    return _HEADING_ID_DASHES.sub("-", slug).strip("-")
+
+
+def build_toc_tree(headings: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    构建目录树
+
+    将扁平的标题列表转换为嵌套的树结构。
+
+    Args:
+        headings: 标题列表
+
+    Returns:
+        目录树
+    """
+    root: list[dict[str, Any]] = []
+    stack: list[dict[str, Any]] = []
+
+    for heading in headings:
+        node = {
+            "id": heading["id"],
+            "text": heading["text"],
+            "level": heading["level"],
+            "children": [],
+        }
+
+        # 找到合适的父节点
+        while stack and stack[-1]["level"] >= node["level"]:
+            stack.pop()
+
+        if stack:
+            stack[-1]["children"].append(node)
+        else:
+            root.append(node)
+
+        stack.append(node)
+
+    return root
+
+
+def _inline_text(token) -> str:
+    return "".join(
+        child.content for child in token.children or () if child.type in ("text", "code_inline")
+    )
+
+
+def render_markdown(text: str) -> dict[str, Any]:
+    """
+    编译单一语言的 Markdown 正文
+
+    Args:
+        text: Markdown 文本
+
+    Returns:
+        dict: html / headings / toc / word_count / reading_time / excerpt
+    """
+    tokens = _markdown.parse(text)
+
+    headings: list[dict[str, Any]] = []
+    used: dict[str, int] = {}
+    plain: list[str] = []
+    for index, token in enumerate(tokens):
+        if token.type == "heading_open":
+            heading_text = _inline_text(tokens[index + 1]).strip()
+            slug = heading_slug(heading_text) or "section"
+            # 重复标题追加序号，保证锚点唯一
+            count = used.get(slug, 0)
+            used[slug] = count + 1
+            if count:
+                slug = f"{slug}-{count}"
+            token.attrSet("id", slug)
+            headings.append({"id": slug, "text": heading_text, "level": int(token.tag[1])})
+        elif token.type == "inline" and index and tokens[index - 1].type == "paragraph_open":
+            plain.append(_inline_text(token))
+
+    html = _markdown.renderer.render(tokens, _markdown.options, {})
+    excerpt = _WHITESPACE.sub(" ", " ".join(plain)).strip()[:EXCERPT_LENGTH]
+    return {
+        "html": sanitize_post_html(html),
+        "headings": headings,
+        "toc": build_toc_tree([h for h in headings if h["level"] <= TOC_DEPTH]),
+        "word_count": post_metrics.count_words(text),
+        "reading_time": post_metrics.calculate_reading_time(text),
+        "excerpt": excerpt,
+    }
+
+
+def compile_content(content: Any) -> dict[str, dict[str, Any]]:
+    """
+    编译多语言正文
+
+    Args:
+        content: 多语言 dict（纯字符串视为 zh）
+
+    Returns:
+        dict: 语言代码 → render_markdown 的结果；空正文的语言不出现，
+            可直接用 get_i18n_value 按请求语言回退取值
+    """
+    if isinstance(content, str):
+        content = {"zh": content}
+    return {
+        lang: render_markdown(text)
+        for lang, text in (content or {}).items()
+        if isinstance(text, str) and text
+    }
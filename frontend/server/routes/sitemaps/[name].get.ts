@@ -0,0 +1,37 @@
+/**
+ * Sitemap 分片 XML (Nitro BFF → FastAPI)，由 /sitemap.xml 索引引用。
+ *
+ * 后端连接单源：统一读 runtimeConfig，禁止本地默认 127.0.0.1。
+ */
+function resolveBackendEndpoint(runtime: ReturnType<typeof useRuntimeConfig>, path: string): string {
+  const priv = runtime as unknown as { apiBase?: string, backendHost?: string, backendPort?: string }
+  if (priv.apiBase) {
+    const base = String(priv.apiBase).replace(/\/$/, '')
+    return `${base}${path}`
+  }
+  if (priv.backendHost && priv.backendPort) {
+    return `http://${String(priv.backendHost)}:${String(priv.backendPort)}/api${path}`
+  }
+  throw createError({
+    statusCode: 503,
+    statusMessage: 'Server not configured: set SSR_API_BASE_URL or BACKEND_HOST + BACKEND_PORT'
+  })
+}
+
+export default defineEventHandler(async (event) => {
+  // 路由参数形如 posts-0.xml / taxonomy.xml
+  const name = String(getRouterParam(event, 'name') || '').replace(/\.xml$/, '')
+  if (!/^(posts-\d+|taxonomy)$/.test(name)) {
+    throw createError({ statusCode: 404, statusMessage: 'Sitemap not found' })
+  }
+  const runtime = useRuntimeConfig(event)
+  const target = resolveBackendEndpoint(runtime, `/blog/sitemaps/${name}.xml`)
+
+  const text = await $fetch<string>(target, {
+    headers: { accept: 'application/xml' },
+    responseType: 'text'
+  })
+  setHeader(event, 'content-type', 'application/xml; charset=utf-8')
+  setHeader(event, 'cache-control', 'public, max-age=3600, s-maxage=3600')
+  return text
+})
@@ -0,0 +1,377 @@
+"""
+接口基准测试工具（供 tests/test_benchmarks.py 使用）
+
+- bench_database: 独立的语料数据库（默认临时 SQLite 文件，可指定 PostgreSQL），引擎与生产环境
+  同样由 core.database.create_engine 创建（连接池、PRAGMA 与查询指标一致）
+- seed_corpus: 用种子数据生成器（scripts 中的 SeedContext）写入分类、标签、模板文章与评论，
+  再按模板批量复制到指定文章数（批量 INSERT 不经过 ORM 事件，正文截断后预编译渲染产物）
+- run_scenario: 以固定并发驱动同一进程内的 ASGI 应用，统计 p50/p95/p99、吞吐与单请求查询数
+- compare_with_baseline: 与保存的基线比较，p50 / p95 超出相对阈值或单请求查询数增加即视为退化
+
+Example:
+    >>> async with bench_database(url) as engine:
+    ...     corpus = await seed_corpus(async_sessionmaker(engine), 10_000)
+    ...     result = await run_scenario("list_posts", call, requests=200, concurrency=16)
+    >>> compare_with_baseline([result], load_baseline(BASELINE_PATH).get("10000", {}), 0.5)
+"""
+
+import asyncio
+import json
+import math
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import func, inspect, make_url, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from backend.core.auth import get_password_hash
+from backend.core.database import Base, create_engine
+from backend.core.db_metrics import query_metrics
+from backend.models.blog import Post, post_tags, save_post_render
+from backend.models.core import SiteConfig
+from backend.scripts._seed_shared import SeedContext, SeedResult
+from backend.utils import post_metrics
+from backend.utils.compat import UTC
+
+BASELINE_PATH = Path(__file__).with_name("benchmark_baseline.json")
+
+# 复制文章的每语言正文长度（控制 10 万篇语料的库大小）
+REPLICA_CONTENT_CHARS = 1200
+INSERT_BATCH = 1000
+# 判定退化时的绝对容差：避免亚毫秒级接口的噪声触发误报
+LATENCY_SLACK_MS = 2.0
+QUERY_SLACK = 0.5
+
+SITE_CONFIGS = {
+    "MAINTENANCE_MODE": "false",
+    "SITE_NAME": "Rosetta Bench",
+    "SITE_DESCRIPTION": "Benchmark Instance",
+}
+
+
+@dataclass
+class Corpus:
+    """已写入的语料"""
+
+    posts: int
+    post_ids: list[int] = field(default_factory=list)
+    slugs: list[str] = field(default_factory=list)
+    # 带评论的模板文章
+    commented_post_ids: list[int] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class ScenarioResult:
+    """单个场景的统计（耗时单位毫秒）"""
+
+    name: str
+    requests: int
+    concurrency: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    rps: float
+    queries_per_request: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _is_bench_database(url: str) -> bool:
+    """库名（SQLite 为文件名）含 bench 标记"""
+    database = make_url(url).database or ""
+    return "bench" in Path(database).name.lower()
+
+
+@asynccontextmanager
+async def bench_database(url: str, *, allow_drop: bool = False) -> AsyncIterator[AsyncEngine]:
+    """
+    创建空的语料库，结束时删除所有表
+
+    为避免误删真实数据，已有表的库只在库名含 bench 或 allow_drop 时才会被清空，
+    否则抛出 RuntimeError。
+    """
+    engine = create_engine(url)
+    # 调试模式下 create_engine 会打开 SQL 回显，逐条输出日志会拖慢请求、拉长写锁持有时间
+    engine.sync_engine.echo = False
+    async with engine.begin() as conn:
+        tables = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+        if tables and not allow_drop and not _is_bench_database(url):
+            await engine.dispose()
+            raise RuntimeError(
+                f"基准库 {make_url(url).render_as_string()} 已有 {len(tables)} 张表，"
+                "拒绝清空：请使用库名含 bench 的空库，或传入 --bench-allow-drop"
+            )
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield engine
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+def _truncate(content: dict[str, str]) -> dict[str, str]:
+    return {lang: text[:REPLICA_CONTENT_CHARS] for lang, text in content.items()}
+
+
+def _numbered(value: dict[str, str] | None, number: int) -> dict[str, str] | None:
+    if not value:
+        return value
+    return {lang: f"{text} #{number}" for lang, text in value.items()}
+
+
+async def seed_corpus(
+    session_factory: async_sessionmaker[AsyncSession],
+    posts: int,
+    *,
+    comments_per_post: tuple[int, int] = (20, 30),
+    seed: int = 20261019,
+) -> Corpus:
+    """
+    写入 posts 篇已发布文章及其分类、标签、评论
+
+    Args:
+        session_factory: 语料库的会话工厂
+        posts: 文章总数（不少于种子数据中的模板文章数）
+        comments_per_post: 每篇模板文章的根评论数范围
+        seed: 随机种子，同一参数生成相同的语料
+
+    Returns:
+        Corpus: 文章 ID / slug 与带评论的文章
+    """
+    now = datetime(2026, 10, 1, tzinfo=UTC)
+    rng = random.Random(seed)
+    corpus = Corpus(posts=posts)
+
+    async with session_factory() as db:
+        db.add_all(SiteConfig(key=key, value=value) for key, value in SITE_CONFIGS.items())
+        ctx = SeedContext(db, clock=lambda: now, seed=seed)
+        author, _ = await ctx.get_or_create_user(
+            username="bench_author",
+            email="bench@example.com",
+            password_hash=get_password_hash("Benchpass123"),
+            nickname="Bench",
+            is_staff=True,
+        )
+        result = SeedResult()
+        templates = await ctx.create_all_posts(result, author, rng=rng)
+        await ctx.create_comments_for_posts(
+            result, posts=templates, rng=rng, per_post_range=comments_per_post
+        )
+        await db.commit()
+
+        corpus.post_ids = [post.id for post in templates]
+        corpus.slugs = [post.slug for post in templates]
+        corpus.commented_post_ids = list(corpus.post_ids)
+
+        tag_rows = await db.execute(select(post_tags.c.post_id, post_tags.c.tag_id))
+        tags_by_post: dict[int, list[int]] = {}
+        for post_id, tag_id in tag_rows:
+            tags_by_post.setdefault(post_id, []).append(tag_id)
+
+        # 复制模板：每个模板的截断正文只编译一次渲染产物
+        replicas = []
+        for post in templates:
+            content = _truncate(post.content)
+            digest, _ = await db.run_sync(
+                lambda session, content=content: save_post_render(session.connection(), content)
+            )
+            text = post_metrics.primary_text(content)
+            words = post_metrics.count_words(text)
+            minutes = post_metrics.calculate_reading_time(text)
+            replicas.append((post, content, digest, words, minutes))
+        await db.commit()
+
+        next_id = (await db.scalar(select(func.max(Post.id)))) + 1
+        post_rows: list[dict[str, Any]] = []
+        tag_links: list[dict[str, int]] = []
+        for number in range(max(0, posts - len(templates))):
+            post, content, digest, word_count, reading_time = replicas[number % len(replicas)]
+            post_id = next_id + number
+            published_at = now - timedelta(minutes=number * 7 + rng.randint(0, 6))
+            post_rows.append(
+                {
+                    "id": post_id,
+                    "title": _numbered(post.title, number),
+                    "slug": f"{post.slug}-{number}",
+                    "source": post.source,
+                    "excerpt": post.excerpt,
+                    "content": content,
+                    "author_id": post.author_id,
+                    "category_id": post.category_id,
+                    "status": "published",
+                    "visibility": "public",
+                    "views": rng.randint(0, 5000),
+                    "is_pinned": False,
+                    "allow_comments": True,
+                    "published_at": published_at,
+                    "created_at": published_at,
+                    "updated_at": published_at,
+                    "word_count": word_count,
+                    "reading_time": reading_time,
+                    "archive_month": post_metrics.archive_month(published_at, published_at),
+                    "render_hash": digest,
+                }
+            )
+            tag_links.extend(
+                {"post_id": post_id, "tag_id": tag_id} for tag_id in tags_by_post.get(post.id, [])
+            )
+            corpus.post_ids.append(post_id)
+            corpus.slugs.append(f"{post.slug}-{number}")
+            if len(post_rows) >= INSERT_BATCH:
+                await _insert_batch(db, post_rows, tag_links)
+        await _insert_batch(db, post_rows, tag_links)
+        await db.commit()
+
+    return corpus
+
+
+async def _insert_batch(
+    db: AsyncSession, post_rows: list[dict[str, Any]], tag_links: list[dict[str, int]]
+) -> None:
+    if post_rows:
+        await db.execute(Post.__table__.insert(), post_rows)
+    if tag_links:
+        await db.execute(post_tags.insert(), tag_links)
+    post_rows.clear()
+    tag_links.clear()
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """最近秩百分位数（values 为空时返回 0）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+async def run_scenario(
+    name: str,
+    call: Callable[[int], Awaitable[Any]],
+    *,
+    requests: int,
+    concurrency: int,
+    warmup: int = 5,
+) -> ScenarioResult:
+    """
+    以 concurrency 个并发客户端共执行 requests 次 call(i)
+
+    call 失败（如状态码不符）应抛出异常。单请求查询数取自请求管线按路由汇总的
+    query_metrics（不经过 HTTP 的场景为 0）。
+
+    Args:
+        name: 场景名
+        call: 第 i 次请求
+        requests: 总请求数
+        concurrency: 并发数
+        warmup: 计时前串行执行的请求数
+
+    Returns:
+        ScenarioResult: 场景统计
+    """
+    for i in range(warmup):
+        await call(i)
+    query_metrics.reset()
+
+    latencies: list[float] = []
+    indexes = iter(range(requests))
+
+    async def client() -> None:
+        for i in indexes:
+            start = time.perf_counter()
+            await call(i)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    endpoints = list(query_metrics.endpoints.values())
+    served = sum(e.requests for e in endpoints)
+    return ScenarioResult(
+        name=name,
+        requests=requests,
+        concurrency=concurrency,
+        p50_ms=round(percentile(latencies, 50), 2),
+        p95_ms=round(percentile(latencies, 95), 2),
+        p99_ms=round(percentile(latencies, 99), 2),
+        rps=round(requests / elapsed, 1) if elapsed else 0.0,
+        queries_per_request=round(sum(e.queries for e in endpoints) / served, 2) if served else 0.0,
+    )
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict[str, dict[str, dict[str, Any]]]:
+    """读取基线：语料规模 → 场景名 → 统计"""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_baseline(results: dict[int, list[ScenarioResult]], path: Path = BASELINE_PATH) -> None:
+    """把各语料规模的结果写入基线（保留其他规模的已有基线）"""
+    baseline = load_baseline(path)
+    for posts, scenarios in results.items():
+        baseline[str(posts)] = {result.name: result.to_dict() for result in scenarios}
+    path.write_text(
+        json.dumps(baseline, ensure_ascii=False, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+
+
+def compare_with_baseline(
+    results: Sequence[ScenarioResult], baseline: dict[str, dict[str, Any]], threshold: float
+) -> list[str]:
+    """
+    与基线比较
+
+    Args:
+        results: 本次结果
+        baseline: 同一语料规模的基线（场景名 → 统计）
+        threshold: p50 / p95 允许的相对退化比例（0.5 即 50%）
+
+    Returns:
+        list: 退化说明，为空表示没有退化（基线中没有或并发数不同的场景不比较）
+    """
+    regressions: list[str] = []
+    for result in results:
+        base = baseline.get(result.name)
+        if base is None or base["concurrency"] != result.concurrency:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            limit = base[key] * (1 + threshold) + LATENCY_SLACK_MS
+            if getattr(result, key) > limit:
+                regressions.append(
+                    f"{result.name}: {key[:3]} {getattr(result, key):.2f} ms > {limit:.2f} ms "
+                    f"(基线 {base[key]:.2f} ms)"
+                )
+        # 查询数不受机器负载影响，只允许缓存命中率波动带来的小幅差异
+        limit = base["queries_per_request"] + QUERY_SLACK
+        if result.queries_per_request > limit:
+            regressions.append(
+                f"{result.name}: 单请求查询数 {result.queries_per_request:.2f} > {limit:.2f} "
+                f"(基线 {base['queries_per_request']:.2f})"
+            )
+    return regressions
+
+
+def format_results(posts: int, results: Sequence[ScenarioResult]) -> str:
+    """结果表格（pytest -s 时输出）"""
+    lines = [
+        f"[benchmark] {posts} posts",
+        f"  {'scenario':<16}{'p50':>9}{'p95':>9}{'p99':>9}{'rps':>9}{'queries':>9}",
+    ]
+    lines.extend(
+        f"  {r.name:<16}{r.p50_ms:>9.2f}{r.p95_ms:>9.2f}{r.p99_ms:>9.2f}"
+        f"{r.rps:>9.1f}{r.queries_per_request:>9.2f}"
+        for r in results
+    )
+    return "\n".join(lines)
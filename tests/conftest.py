@@ -6,14 +6,16 @@ Rosetta 测试配置
 
 import asyncio
 from collections.abc import AsyncGenerator, Generator
+from contextlib import asynccontextmanager
 
 import pytest
 import pytest_asyncio
+from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from backend.core.auth import get_password_hash
-from backend.core.database import Base, get_db
+from backend.core.database import Base, get_db, get_read_db
 from backend.main import create_application
 from backend.models.blog import Category, Comment, Post, Tag
 from backend.models.core import SiteConfig
@@ -64,6 +66,47 @@ def _apply_global_settings_patches() -> None:
 _apply_global_settings_patches()
 
 
+# ======================================================================
+# 接口基准测试（tests/test_benchmarks.py）：标记为 benchmark 的用例默认跳过，
+# 加 --benchmark 运行，例如：
+#   uv run pytest tests/test_benchmarks.py --benchmark --bench-posts 1000,10000 -o addopts=""
+# ======================================================================
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("benchmark", "接口基准测试")
+    group.addoption("--benchmark", action="store_true", help="运行 benchmark 标记的用例")
+    group.addoption(
+        "--bench-posts", default="1000", help="文章语料规模，逗号分隔（如 1000,10000,100000）"
+    )
+    group.addoption("--bench-requests", type=int, default=200, help="每个场景的请求数")
+    group.addoption("--bench-concurrency", type=int, default=8, help="并发客户端数")
+    group.addoption(
+        "--bench-threshold", type=float, default=0.5, help="延迟相对基线允许的退化比例"
+    )
+    group.addoption(
+        "--bench-database-url",
+        default=None,
+        help="语料数据库（默认临时 SQLite 文件）；运行前后会删除全部表，"
+        "已有表的库须库名含 bench 或同时传入 --bench-allow-drop",
+    )
+    group.addoption(
+        "--bench-allow-drop",
+        action="store_true",
+        help="允许清空 --bench-database-url 指向的非空且库名不含 bench 的数据库",
+    )
+    group.addoption(
+        "--bench-update-baseline", action="store_true", help="用本次结果覆盖基线"
+    )
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="基准测试需要 --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
 @pytest.fixture(scope="session")
 def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
     """创建事件循环"""
@@ -106,15 +149,13 @@ async def db_session(test_engine) -> AsyncGenerator[AsyncSession, None]:
 
 
 @pytest_asyncio.fixture(scope="function")
-async def client(
-    db_session: AsyncSession, monkeypatch
-) -> AsyncGenerator[AsyncClient, None]:
-    """创建测试客户端
+async def test_app(db_session: AsyncSession, monkeypatch) -> AsyncGenerator[FastAPI, None]:
+    """创建测试应用（client 与基准测试共用）
 
     关键修复：
     1. Monkey-patch oobe_middleware 使用的 is_oobe_complete() 返回 True，避免 OOBE_REQUIRED 503
-    2. Monkey-patch MaintenanceMiddleware._is_oobe_complete() 返回 False 直接放行
-       （因为它内部使用全局 async_session_maker 连接真实 rosetta.db，绕过了 get_db override）
+    2. 维护模式闸门（core.site_gate）改用测试库加载状态
+       （默认使用全局 async_session_maker 连接真实 rosetta.db，绕过了 get_db override）
     3. 确保内存库中的 MAINTENANCE_MODE=false 作为双重保险
     """
 
@@ -142,17 +183,14 @@ async def client(
 
     monkeypatch.setattr(_blog_api_mod, "is_oobe_complete", lambda: True)
 
-    # --- Patch 2: 让 MaintenanceMiddleware 直接放行，避免查真实 DB ---
-    import backend.core.maintenance as _maint_mod
+    # --- Patch 2: 维护模式闸门从测试库加载，避免查真实 DB ---
+    from backend.core.site_gate import site_gate as _site_gate
 
-    async def _bypass_maintenance_dispatch(self, request, call_next):
-        return await call_next(request)
+    @asynccontextmanager
+    async def _gate_session():
+        yield db_session
 
-    monkeypatch.setattr(
-        _maint_mod.MaintenanceMiddleware,
-        "dispatch",
-        _bypass_maintenance_dispatch,
-    )
+    monkeypatch.setattr(_site_gate, "_session_factory", _gate_session)
 
     # --- Patch 3: 禁用速率限制（测试并发触发 429 Too Many Requests） ---
     import backend.core.rate_limit as _rl_mod
@@ -227,15 +265,22 @@ async def client(
 
     app = create_application()
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+
+    yield app
+
+    app.dependency_overrides.clear()
+
 
+@pytest_asyncio.fixture(scope="function")
+async def client(test_app: FastAPI) -> AsyncGenerator[AsyncClient, None]:
+    """创建测试客户端"""
     async with AsyncClient(
-        transport=ASGITransport(app=app),
+        transport=ASGITransport(app=test_app),
         base_url="http://test",
     ) as ac:
         yield ac
 
-    app.dependency_overrides.clear()
-
 
 @pytest_asyncio.fixture
 async def test_user(db_session: AsyncSession) -> User:
@@ -0,0 +1,307 @@
+"""
+导入 / 全站恢复 API 测试（批量导入引擎）
+"""
+
+import io
+import json
+import zipfile
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.blog import Category, Comment, Post, Tag, post_tags
+from backend.models.user import User
+from backend.repositories.post import PostRepository
+from backend.services import import_service
+from backend.services.import_service import BulkImporter, ImportCheckpoint
+
+
+def _zip(files: dict[str, object]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, data in files.items():
+            zf.writestr(name, data if isinstance(data, str) else json.dumps(data))
+    return buffer.getvalue()
+
+
+def _backup_bundle(post_count: int = 3) -> dict[str, object]:
+    posts = [
+        {
+            "slug": f"restored-{i}",
+            "title": {"zh": f"恢复文章 {i}"},
+            "content": {"zh": "正文"},
+            "status": "published",
+            "author_username": "restored_author",
+            "category_slug": "restored-cat",
+            "tag_slugs": ["t1", "t2"],
+        }
+        for i in range(post_count)
+    ]
+    comments = [
+        {"id": 10, "post_slug": "restored-0", "parent_id": None, "content": "根", "active": True},
+        {"id": 11, "post_slug": "restored-0", "parent_id": 10, "content": "子", "active": True},
+        {"id": 12, "post_slug": "restored-0", "parent_id": 11, "content": "孙", "active": False},
+        {"id": 13, "post_slug": "missing-post", "parent_id": None, "content": "孤儿"},
+    ]
+    return {
+        "manifest.json": {"version": "1.0"},
+        "users.json": [{"id": 7, "username": "restored_author", "nickname": "作者"}],
+        "categories.json": [{"slug": "restored-cat", "name": {"zh": "恢复分类"}}],
+        "tags.json": [{"slug": "t1", "name": {"zh": "T1"}}, {"slug": "t2", "name": {"zh": "T2"}}],
+        "posts.json": posts,
+        "comments.json": comments,
+    }
+
+
+async def _count(db: AsyncSession, model) -> int:
+    return (await db.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+class TestBackupRestore:
+    """全站恢复测试"""
+
+    @pytest.mark.asyncio
+    async def test_restore_creates_records_and_comment_tree(
+        self, client: AsyncClient, admin_headers: dict, db_session: AsyncSession
+    ):
+        """恢复后文章、标签关联与多层评论树完整"""
+        files = {"file": ("backup.zip", _zip(_backup_bundle()), "application/zip")}
+        response = await client.post(
+            "/api/admin/backup/restore", headers=admin_headers, files=files
+        )
+        assert response.status_code == 200
+        data = response.json()
+        # 1 用户 + 1 分类 + 2 标签 + 3 文章 + 3 评论
+        assert data["created_count"] == 10
+        assert data["error_count"] == 1
+        assert "missing-post" in data["errors"][0]
+
+        post = (
+            await db_session.execute(select(Post).where(Post.slug == "restored-0"))
+        ).scalar_one()
+        author = (
+            await db_session.execute(select(User).where(User.username == "restored_author"))
+        ).scalar_one()
+        assert post.author_id == author.id
+        links = await db_session.execute(
+            select(func.count()).select_from(post_tags).where(post_tags.c.post_id == post.id)
+        )
+        assert links.scalar_one() == 2
+
+        comments = (
+            (await db_session.execute(select(Comment).where(Comment.post_id == post.id)))
+            .scalars()
+            .all()
+        )
+        by_content = {c.content: c for c in comments}
+        assert by_content["子"].parent_id == by_content["根"].id
+        assert by_content["孙"].parent_id == by_content["子"].id
+        assert by_content["孙"].status == "pending"
+        assert all(c.author_name for c in comments)
+
+    @pytest.mark.asyncio
+    async def test_restore_twice_skips_existing(
+        self, client: AsyncClient, admin_headers: dict, db_session: AsyncSession
+    ):
+        """重复恢复时已存在记录计入跳过，不产生重复数据"""
+        payload = _zip(_backup_bundle())
+        for _ in range(2):
+            response = await client.post(
+                "/api/admin/backup/restore",
+                headers=admin_headers,
+                files={"file": ("backup.zip", payload, "application/zip")},
+            )
+        data = response.json()
+        assert data["skipped_count"] == 7
+        assert await _count(db_session, Post) == 3
+        assert await _count(db_session, Tag) == 2
+
+    @pytest.mark.asyncio
+    async def test_restore_overwrite_updates_posts(
+        self, client: AsyncClient, admin_headers: dict, db_session: AsyncSession
+    ):
+        """overwrite 策略更新已存在文章并替换标签"""
+        bundle = _backup_bundle(post_count=1)
+        await client.post(
+            "/api/admin/backup/restore",
+            headers=admin_headers,
+            files={"file": ("backup.zip", _zip(bundle), "application/zip")},
+        )
+        bundle["posts.json"][0].update(title={"zh": "新标题"}, tag_slugs=["t2"])
+        bundle["comments.json"] = []
+        response = await client.post(
+            "/api/admin/backup/restore?strategy=overwrite",
+            headers=admin_headers,
+            files={"file": ("backup.zip", _zip(bundle), "application/zip")},
+        )
+        assert response.status_code == 200
+
+        post = (
+            await db_session.execute(select(Post).where(Post.slug == "restored-0"))
+        ).scalar_one()
+        await db_session.refresh(post)
+        assert post.title == {"zh": "新标题"}
+        tag_ids = (
+            (
+                await db_session.execute(
+                    select(post_tags.c.tag_id).where(post_tags.c.post_id == post.id)
+                )
+            )
+            .scalars()
+            .all()
+        )
+        t2 = (await db_session.execute(select(Tag.id).where(Tag.slug == "t2"))).scalar_one()
+        assert tag_ids == [t2]
+
+    @pytest.mark.asyncio
+    async def test_restore_computes_metrics_and_archive(
+        self, client: AsyncClient, admin_headers: dict, db_session: AsyncSession
+    ):
+        """批量插入的文章同样具备字数、归档月份与渲染产物，归档页可见"""
+        bundle = _backup_bundle(post_count=2)
+        for item in bundle["posts.json"]:
+            item.update(
+                content={"zh": "# 标题\n\n这是一段用于统计字数的正文内容。"},
+                published_at="2025-03-10T00:00:00+00:00",
+            )
+        response = await client.post(
+            "/api/admin/backup/restore",
+            headers=admin_headers,
+            files={"file": ("backup.zip", _zip(bundle), "application/zip")},
+        )
+        assert response.status_code == 200
+
+        posts = (await db_session.execute(select(Post).order_by(Post.slug))).scalars().all()
+        assert len(posts) == 2
+        for post in posts:
+            assert post.word_count > 0
+            assert post.reading_time >= 1
+            assert post.archive_month == "2025-03"
+            assert post.render_hash is not None
+        assert posts[0].render_hash == posts[1].render_hash
+
+        repo = PostRepository(db_session)
+        archive = await repo.get_archive_data()
+        assert [(m["year"], m["month"], m["count"]) for m in archive] == [(2025, 3, 2)]
+        stats = await repo.get_archive_stats()
+        assert stats["years"] == [2025]
+        assert stats["year_stats"] == {2025: 2}
+
+
+class TestImportPosts:
+    """文章包导入测试"""
+
+    @pytest.mark.asyncio
+    async def test_import_posts_existing_slug(
+        self, client: AsyncClient, admin_headers: dict, test_post: Post, test_category: Category
+    ):
+        """已存在 slug 按 skip_existing 计入跳过或失败"""
+        posts = [
+            {"slug": test_post.slug, "title": {"zh": "重复"}},
+            {"slug": "brand-new", "title": {"zh": "新"}, "category": {"slug": test_category.slug}},
+        ]
+        payload = _zip({"posts.json": posts, "categories.json": [], "tags.json": []})
+
+        response = await client.post(
+            "/api/admin/import/posts",
+            headers=admin_headers,
+            files={"file": ("posts.zip", payload, "application/zip")},
+        )
+        data = response.json()
+        assert (data["created_count"], data["skipped_count"], data["error_count"]) == (1, 1, 0)
+
+        response = await client.post(
+            "/api/admin/import/posts?skip_existing=false",
+            headers=admin_headers,
+            files={"file": ("posts.zip", payload, "application/zip")},
+        )
+        data = response.json()
+        # 两篇均已存在（brand-new 由上一次导入创建）
+        assert (data["created_count"], data["skipped_count"], data["error_count"]) == (0, 0, 2)
+
+    @pytest.mark.asyncio
+    async def test_import_skipped_post_keeps_tags(
+        self, client: AsyncClient, admin_headers: dict, db_session: AsyncSession, test_post: Post
+    ):
+        """skip 策略下已存在文章的标签不被追加"""
+        tags = [{"slug": "t1", "name": {"zh": "T1"}}]
+        posts = [
+            {"slug": test_post.slug, "title": {"zh": "重复"}, "tags": tags},
+            {"slug": "tagged-new", "title": {"zh": "新"}, "tags": tags},
+        ]
+        payload = _zip({"posts.json": posts, "categories.json": [], "tags.json": tags})
+        response = await client.post(
+            "/api/admin/import/posts",
+            headers=admin_headers,
+            files={"file": ("posts.zip", payload, "application/zip")},
+        )
+        assert response.json()["skipped_count"] == 1
+
+        links = await db_session.execute(
+            select(Post.slug).join(post_tags, post_tags.c.post_id == Post.id)
+        )
+        assert links.scalars().all() == ["tagged-new"]
+
+    @pytest.mark.asyncio
+    async def test_import_markdown_zip(
+        self, client: AsyncClient, admin_headers: dict, db_session: AsyncSession
+    ):
+        """ZIP 中的多个 Markdown 文件批量导入为草稿"""
+        docs = {
+            f"doc{i}.md": f"---\ntitle: Doc {i}\nslug: md-doc-{i}\n---\n正文 {i}" for i in range(3)
+        }
+        docs["broken.md"] = "没有 frontmatter"
+        response = await client.post(
+            "/api/admin/import/markdown",
+            headers=admin_headers,
+            files={"file": ("docs.zip", _zip(docs), "application/zip")},
+        )
+        data = response.json()
+        assert data["created_count"] == 3
+        assert data["error_count"] == 1
+        drafts = await db_session.execute(
+            select(func.count()).select_from(Post).where(Post.status == "draft")
+        )
+        assert drafts.scalar_one() == 3
+        posts = (await db_session.execute(select(Post))).scalars().all()
+        assert all(post.word_count > 0 and post.archive_month for post in posts)
+
+    @pytest.mark.asyncio
+    async def test_import_task_not_found(self, client: AsyncClient, admin_headers: dict):
+        """查询不存在的导入任务返回 404"""
+        response = await client.get("/api/admin/import/tasks/nope", headers=admin_headers)
+        assert response.status_code == 404
+
+
+class TestBulkImporter:
+    """导入引擎断点续跑测试"""
+
+    @pytest.mark.asyncio
+    async def test_resume_from_checkpoint(
+        self, db_session: AsyncSession, admin_user: User, tmp_path, monkeypatch
+    ):
+        """断点记录的已提交分块在续跑时不会重复处理"""
+        monkeypatch.setattr(import_service, "IMPORT_CHECKPOINT_DIR", tmp_path)
+        tags = [{"slug": f"tag-{i}", "name": {"zh": str(i)}} for i in range(5)]
+
+        checkpoint = ImportCheckpoint(key="resume")
+        checkpoint.offsets["tags"] = 2
+        checkpoint.save()
+
+        progress: dict = {}
+        importer = BulkImporter(
+            db_session,
+            admin_user.id,
+            checkpoint=ImportCheckpoint.load("resume"),
+            progress=progress,
+            commit_each_chunk=True,
+            chunk_size=2,
+        )
+        await importer.run_stage("tags", tags, importer._import_tags)
+
+        slugs = (await db_session.execute(select(Tag.slug))).scalars().all()
+        assert sorted(slugs) == ["tag-2", "tag-3", "tag-4"]
+        assert progress["processed"] == progress["total"] == 5
+        assert ImportCheckpoint.load("resume").is_done("tags")
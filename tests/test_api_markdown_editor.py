@@ -249,35 +249,12 @@ async def test_scheduled_publish_then_autolive(
     post_id = int(p.id)
     assert post_id > 0
 
-    # 2. 扫描一次 scheduler 逻辑
-    from sqlalchemy import select as _s
-
-    from backend.models.blog import Post as _P
-    from backend.utils.compat import UTC as _UTC
-
-    now_fn = lambda: datetime.now(_UTC)
-    q = _s(_P).where(
-        (
-            (_P.status == "scheduled")
-            & (_P.scheduled_at.is_not(None))
-            & (_P.scheduled_at <= now_fn())
-        )
-        | (
-            (_P.status == "published")
-            & (_P.scheduled_at.is_not(None))
-            & (_P.scheduled_at <= now_fn())
-        )
-    )
-    r = await db_session.execute(q)
-    posts = list(r.scalars().all())
-    n = len(posts)
-    for pp in posts:
-        if pp.published_at is None:
-            pp.published_at = pp.scheduled_at
-        pp.status = "published"
-        pp.scheduled_at = None
-    if posts:
-        await db_session.commit()
+    # 2. 执行一次调度器的发布逻辑
+    from backend.services.post_scheduler import publish_due_posts
+
+    published = await publish_due_posts(db_session)
+    await db_session.commit()
+    n = len(published)
     assert n >= 1, f"应至少发布 1 篇定时文章，实际={n}"
 
     # 3. DB poll 验证（API 可能有其他过滤/鉴权，DB 直接查最直接）
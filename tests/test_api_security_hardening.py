@@ -13,7 +13,7 @@ from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from backend.api.media import MAX_UPLOAD_BYTES, save_upload
-from backend.core.database import Base, get_db
+from backend.core.database import Base, get_db, get_read_db
 from backend.core.xss_filter import sanitize_html
 from backend.main import create_application
 from backend.models.blog import Category, Post
@@ -76,6 +76,7 @@ async def sec_client(
 
     app = create_application()
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
 
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
@@ -0,0 +1,65 @@
+"""
+进程内后台协作工具测试（跨事件循环的锁、后台任务、变更通知）
+"""
+
+import asyncio
+import logging
+
+import pytest
+
+from backend.core import background
+from backend.core.background import ChangeFeed, LoopLock, spawn
+from backend.core.pubsub import MemoryBroker
+
+
+def test_loop_lock_follows_event_loop():
+    lock = LoopLock()
+
+    async def hold() -> asyncio.Lock:
+        async with lock:
+            assert lock.get().locked()
+        return lock.get()
+
+    first = asyncio.run(hold())
+    second = asyncio.run(hold())
+    assert first is not second and not second.locked()
+
+
+@pytest.mark.asyncio
+async def test_spawn_logs_failure(caplog):
+    async def fail() -> None:
+        raise RuntimeError("boom")
+
+    task = spawn(fail(), "[test] 后台任务")
+    with caplog.at_level(logging.WARNING, logger=background.__name__):
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0)
+    assert "[test] 后台任务失败: boom" in caplog.text
+
+
+def test_spawn_without_loop_discards():
+    ran = []
+
+    async def work() -> None:
+        ran.append(True)
+
+    assert spawn(work(), "[test] 后台任务") is None
+    assert ran == []
+
+
+@pytest.mark.asyncio
+async def test_change_feed_ignores_own_messages(monkeypatch):
+    broker = MemoryBroker()
+    monkeypatch.setattr(background, "create_broker", lambda: broker)
+    changes = []
+    feed = ChangeFeed("test:changed", lambda: changes.append(True), label="[test]")
+
+    await feed.start()
+    await feed.publish()
+    assert changes == []
+    await broker.publish("test:changed", {"origin": "other-worker"})
+    assert changes == [True]
+
+    await feed.stop()
+    await feed.publish()
+    assert broker.channels == frozenset()
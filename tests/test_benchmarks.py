@@ -0,0 +1,190 @@
+"""
+接口基准测试（语料规模、并发延迟分位数、单请求查询数、基线比较）
+
+基准用例默认跳过，运行与更新基线：
+    uv run pytest tests/test_benchmarks.py --benchmark -s -o addopts=""
+    uv run pytest tests/test_benchmarks.py --benchmark --bench-posts 1000,10000,100000 -s -o addopts=""
+    uv run pytest tests/test_benchmarks.py --benchmark --bench-update-baseline -o addopts=""
+
+基线（tests/benchmark_baseline.json）与机器相关，换机器或调整语料后应重新记录。
+--bench-database-url 指向的库会被清空，非空且库名不含 bench 时须加 --bench-allow-drop。
+"""
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.core import database
+from backend.core.cache import cache
+from backend.core.database import get_db, get_read_db
+from backend.core.rate_limit import RateLimiter, RateLimitRule
+from backend.services.site_config_service import site_config_store
+from tests.benchmark_harness import (
+    Corpus,
+    ScenarioResult,
+    bench_database,
+    compare_with_baseline,
+    format_results,
+    load_baseline,
+    percentile,
+    run_scenario,
+    save_baseline,
+    seed_corpus,
+)
+
+
+def _scenarios(client: AsyncClient, corpus: Corpus):
+    """场景名 → 第 i 次请求"""
+    pages = max(1, min(50, corpus.posts // 12))
+    limiter = RateLimiter()
+    rule = RateLimitRule(requests=1_000_000, window_seconds=60)
+
+    async def get(url: str, **params) -> None:
+        response = await client.get(url, params=params)
+        assert response.status_code == 200, f"{url}: {response.status_code}"
+
+    async def list_posts(i: int) -> None:
+        await get("/api/blog/posts", page=i % pages + 1)
+
+    async def get_post(i: int) -> None:
+        await get(f"/api/blog/posts/{corpus.slugs[i * 7919 % len(corpus.slugs)]}")
+
+    async def get_site_config(i: int) -> None:
+        await get("/api/config")
+
+    async def list_comments(i: int) -> None:
+        post_id = corpus.commented_post_ids[i % len(corpus.commented_post_ids)]
+        await get(f"/api/posts/{post_id}/comments")
+
+    async def recommended(i: int) -> None:
+        await get("/api/blog/posts/recommended", page=i % 5 + 1)
+
+    async def similar(i: int) -> None:
+        await get(f"/api/blog/posts/{corpus.post_ids[i * 7919 % len(corpus.post_ids)]}/similar")
+
+    async def rate_limiter(i: int) -> None:
+        result = await limiter.check_rate_limit(f"bench:{i % 64}", rule)
+        assert result.allowed
+
+    return {
+        "list_posts": list_posts,
+        "get_post": get_post,
+        "get_site_config": get_site_config,
+        "list_comments": list_comments,
+        "recommended": recommended,
+        "similar": similar,
+        "rate_limiter": rate_limiter,
+    }
+
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_api_benchmarks(
+    test_app: FastAPI, request: pytest.FixtureRequest, monkeypatch, tmp_path
+):
+    config = request.config
+    sizes = [int(size) for size in config.getoption("--bench-posts").split(",")]
+    requests = config.getoption("--bench-requests")
+    concurrency = config.getoption("--bench-concurrency")
+    threshold = config.getoption("--bench-threshold")
+    baseline = load_baseline()
+
+    results: dict[int, list[ScenarioResult]] = {}
+    regressions: list[str] = []
+    for posts in sizes:
+        url = config.getoption("--bench-database-url") or (
+            f"sqlite+aiosqlite:///{tmp_path / f'bench_{posts}.db'}"
+        )
+        async with bench_database(url, allow_drop=config.getoption("--bench-allow-drop")) as engine:
+            session_factory = async_sessionmaker(engine, expire_on_commit=False)
+            corpus = await seed_corpus(session_factory, posts)
+
+            # 每个请求独立会话（client fixture 共用一个会话，无法并发）
+            async def override_get_db():
+                async with session_factory() as session:
+                    yield session
+                    await session.commit()
+
+            test_app.dependency_overrides[get_db] = override_get_db
+            test_app.dependency_overrides[get_read_db] = override_get_db
+            # 性能采样等用全局会话工厂写入的记录同样落到语料库（与生产环境同库）
+            monkeypatch.setattr(database, "async_session_maker", session_factory)
+            site_config_store.invalidate(broadcast=False)
+
+            transport = ASGITransport(app=test_app)
+            async with AsyncClient(transport=transport, base_url="http://bench") as client:
+                scenario_results = []
+                for name, call in _scenarios(client, corpus).items():
+                    await cache.clear()
+                    scenario_results.append(
+                        await run_scenario(name, call, requests=requests, concurrency=concurrency)
+                    )
+            site_config_store.invalidate(broadcast=False)
+
+        results[posts] = scenario_results
+        print("\n" + format_results(posts, scenario_results))
+        regressions.extend(
+            f"[{posts}] {line}"
+            for line in compare_with_baseline(
+                scenario_results, baseline.get(str(posts), {}), threshold
+            )
+        )
+
+    if config.getoption("--bench-update-baseline"):
+        save_baseline(results)
+        return
+    assert not regressions, "\n".join(regressions)
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 99) == 3.0
+    assert percentile([], 50) == 0.0
+
+
+def test_compare_with_baseline(tmp_path):
+    def result(name: str, p95: float, queries: float) -> ScenarioResult:
+        return ScenarioResult(name, 100, 8, p95 / 2, p95, p95 * 1.2, 500.0, queries)
+
+    path = tmp_path / "baseline.json"
+    save_baseline({1000: [result("list_posts", 10.0, 4.0), result("get_post", 2.0, 3.0)]}, path)
+    save_baseline({10000: [result("list_posts", 20.0, 4.0)]}, path)
+    baseline = load_baseline(path)
+    assert set(baseline) == {"1000", "10000"}
+
+    current = [
+        result("list_posts", 16.0, 4.4),  # p95 10 * 1.5 + 2 = 17 以内，查询数 +0.5 以内
+        result("get_post", 2.0, 4.0),  # 查询数 3 → 4
+        result("new_scenario", 999.0, 99.0),  # 基线中没有，不比较
+        ScenarioResult("list_posts", 100, 32, 99.0, 99.0, 99.0, 1.0, 9.0),  # 并发数不同
+    ]
+    regressions = compare_with_baseline(current, baseline["1000"], 0.5)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("get_post: 单请求查询数")
+
+    regressions = compare_with_baseline([result("list_posts", 18.0, 4.0)], baseline["1000"], 0.5)
+    assert regressions == ["list_posts: p95 18.00 ms > 17.00 ms (基线 10.00 ms)"]
+
+
+@pytest.mark.asyncio
+async def test_bench_database_refuses_to_drop_existing_data(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'corpus.db'}"
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE keep_me (id INTEGER PRIMARY KEY)"))
+    await engine.dispose()
+
+    with pytest.raises(RuntimeError, match="--bench-allow-drop"):
+        async with bench_database(url):
+            pass
+
+    async with bench_database(url, allow_drop=True) as engine:
+        async with engine.connect() as conn:
+            tables = await conn.run_sync(lambda c: inspect(c).get_table_names())
+    assert "posts" in tables
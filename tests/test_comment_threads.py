@@ -0,0 +1,138 @@
+"""
+评论物化路径测试（写入时维护路径 / 回复统计、根评论分页一次取回前几条回复、整树读取、重建）
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, insert, select
+
+from backend.models.blog import Comment
+from backend.services.comment_service import TOP_REPLIES, CommentService
+from backend.utils.comment_paths import encode_threads
+
+
+def _comment(post_id: int, content: str, parent: Comment | None = None, **kwargs) -> Comment:
+    return Comment(
+        post_id=post_id,
+        parent_id=parent.id if parent else None,
+        author_name="访客",
+        content=content,
+        status=kwargs.pop("status", "approved"),
+        active=kwargs.pop("active", True),
+        **kwargs,
+    )
+
+
+async def _thread(db_session, post_id: int, replies: int) -> tuple[Comment, list[Comment]]:
+    root = _comment(post_id, "root")
+    db_session.add(root)
+    await db_session.flush()
+    children = []
+    for i in range(replies):
+        child = _comment(post_id, f"reply-{i}", root)
+        db_session.add(child)
+        await db_session.flush()
+        children.append(child)
+    await db_session.commit()
+    return root, children
+
+
+def test_encode_threads_orders_replies_by_time():
+    t0 = datetime(2025, 1, 1)
+    encoded = encode_threads(
+        [(7, None, t0), (9, 7, t0 + timedelta(minutes=2)), (8, 7, t0 + timedelta(minutes=1))]
+    )
+    assert encoded[7].path == "0000000007"
+    assert (encoded[7].reply_count, encoded[7].last_reply_at) == (2, t0 + timedelta(minutes=2))
+    assert encoded[8].path == "0000000007/000001"
+    assert encoded[9].path == "0000000007/000002"
+
+
+@pytest.mark.asyncio
+async def test_paths_and_counters_maintained_on_write(db_session, test_post):
+    root, children = await _thread(db_session, test_post.id, 3)
+
+    assert root.path == f"{root.id:010d}"
+    assert [c.path for c in children] == [f"{root.path}/{seq:06d}" for seq in (1, 2, 3)]
+    assert (root.reply_count, root.reply_seq) == (3, 3)
+    assert root.last_reply_at is not None
+
+    # 删除回复：计数递减，序号不复用
+    await db_session.delete(children[1])
+    await db_session.commit()
+    newer = _comment(test_post.id, "late", root)
+    db_session.add(newer)
+    await db_session.commit()
+    await db_session.refresh(root)
+    assert newer.path.endswith("/000004")
+    assert (root.reply_count, root.reply_seq) == (3, 4)
+
+
+@pytest.mark.asyncio
+async def test_root_page_fetches_top_replies_in_one_query(db_session, test_engine, test_post):
+    busy, children = await _thread(db_session, test_post.id, TOP_REPLIES + 4)
+    quiet, _ = await _thread(db_session, test_post.id, 0)
+    children[0].status = "pending"
+    await db_session.commit()
+
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        items, total = await CommentService.list_root_comments(db_session, test_post, page_size=10)
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", _record)
+
+    # 一条 COUNT + 一条取线程页
+    assert len(statements) == 2
+    assert total == 2
+    assert [item.id for item in items] == [quiet.id, busy.id]
+    thread = items[1]
+    assert thread.reply_total == TOP_REPLIES + 4
+    # 前 TOP_REPLIES 条回复中未通过的被过滤
+    assert [r.content for r in thread.replies] == ["reply-1", "reply-2"]
+
+
+@pytest.mark.asyncio
+async def test_blog_comment_tree(client: AsyncClient, db_session, test_post):
+    root, children = await _thread(db_session, test_post.id, 2)
+    children[1].active = False
+    await db_session.commit()
+
+    response = await client.get(f"/api/blog/posts/{test_post.id}/comments")
+    assert response.status_code == 200
+    tree = response.json()
+    assert [node["id"] for node in tree] == [root.id]
+    assert [reply["id"] for reply in tree[0]["replies"]] == [children[0].id]
+
+
+@pytest.mark.asyncio
+async def test_rebuild_threads_after_bulk_insert(db_session, test_post):
+    ids = (
+        (
+            await db_session.execute(
+                insert(Comment).returning(Comment.id),
+                [
+                    {"post_id": test_post.id, "author_name": "导入", "content": "root"},
+                ],
+            )
+        )
+        .scalars()
+        .all()
+    )
+    await db_session.execute(
+        insert(Comment),
+        [{"post_id": test_post.id, "author_name": "导入", "content": "r", "parent_id": ids[0]}],
+    )
+    assert await CommentService.rebuild_threads(db_session, [test_post.id]) == 2
+    await db_session.commit()
+
+    rows = (
+        await db_session.execute(select(Comment.path, Comment.reply_count).order_by(Comment.id))
+    ).all()
+    assert rows == [(f"{ids[0]:010d}", 1), (f"{ids[0]:010d}/000001", 0)]
@@ -0,0 +1,150 @@
+"""
+私信会话汇总测试（收件箱分页、未读计数维护）
+"""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from backend.models.message import Conversation, PrivateMessage
+
+
+async def _send(client: AsyncClient, headers: dict, recipient_id: int, content: str) -> dict:
+    response = await client.post(
+        "/api/messages",
+        params={"recipient_id": recipient_id, "content": content},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_inbox_reads_summary(
+    client: AsyncClient,
+    db_session,
+    test_user,
+    subscriber_user,
+    staff_user,
+    auth_headers,
+    subscriber_headers,
+    staff_headers,
+):
+    await _send(client, subscriber_headers, test_user.id, "你好")
+    await _send(client, subscriber_headers, test_user.id, "在吗")
+    await _send(client, staff_headers, test_user.id, "x" * 150)
+    await _send(client, auth_headers, subscriber_user.id, "在的")
+
+    assert await db_session.scalar(select(Conversation.id).limit(1)) is not None
+
+    response = await client.get("/api/messages/conversations", headers=auth_headers)
+    data = response.json()
+    assert data["total"] == 2 and data["total_pages"] == 1
+    latest, older = data["items"]
+    assert latest["user"]["id"] == subscriber_user.id
+    assert latest["last_message"] == {
+        "content": "在的",
+        "created_at": latest["last_message"]["created_at"],
+        "is_mine": True,
+    }
+    assert latest["unread_count"] == 2
+    assert older["user"]["id"] == staff_user.id
+    assert older["last_message"]["content"] == "x" * 100 + "..."
+    assert older["unread_count"] == 1
+
+    # 真分页
+    response = await client.get(
+        "/api/messages/conversations", params={"page": 2, "page_size": 1}, headers=auth_headers
+    )
+    data = response.json()
+    assert data["total_pages"] == 2
+    assert [item["user"]["id"] for item in data["items"]] == [staff_user.id]
+
+    unread = await client.get("/api/messages/unread/count", headers=auth_headers)
+    assert unread.json() == {"count": 3}
+    unread = await client.get("/api/messages/unread/count", headers=subscriber_headers)
+    assert unread.json() == {"count": 1}
+
+
+@pytest.mark.asyncio
+async def test_read_endpoints_maintain_counters(
+    client: AsyncClient, db_session, test_user, subscriber_user, auth_headers, subscriber_headers
+):
+    first = await _send(client, subscriber_headers, test_user.id, "一")
+    await _send(client, subscriber_headers, test_user.id, "二")
+    await _send(client, subscriber_headers, test_user.id, "三")
+
+    async def unread() -> int:
+        response = await client.get("/api/messages/unread/count", headers=auth_headers)
+        return response.json()["count"]
+
+    assert await unread() == 3
+
+    # 单条已读；重复标记不重复扣减
+    for _ in range(2):
+        response = await client.put(f"/api/messages/{first['id']}/read", headers=auth_headers)
+        assert response.status_code == 200
+    assert await unread() == 2
+
+    response = await client.put(
+        f"/api/messages/read-all/{subscriber_user.id}", headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert await unread() == 0
+    unread_rows = await db_session.scalars(
+        select(PrivateMessage.id).where(PrivateMessage.is_read.is_(False))
+    )
+    assert unread_rows.all() == []
+
+    # 打开对话同样清零
+    await _send(client, subscriber_headers, test_user.id, "四")
+    assert await unread() == 1
+    response = await client.get(f"/api/messages/{subscriber_user.id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["total"] == 4
+    assert await unread() == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_mark_read_decrements_once(
+    client: AsyncClient, db_session, test_user, subscriber_user, auth_headers, subscriber_headers
+):
+    message = await _send(client, subscriber_headers, test_user.id, "一")
+    await _send(client, subscriber_headers, test_user.id, "二")
+
+    # 模拟并发：本请求读到的仍是未读，另一请求已先把它标记为已读（并已扣减）
+    loaded = await db_session.get(PrivateMessage, message["id"])
+    assert loaded.is_read is False
+    await db_session.execute(
+        update(PrivateMessage)
+        .where(PrivateMessage.id == message["id"])
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+
+    response = await client.put(f"/api/messages/{message['id']}/read", headers=auth_headers)
+    assert response.status_code == 200
+    response = await client.get("/api/messages/unread/count", headers=auth_headers)
+    assert response.json() == {"count": 2}
+
+
+@pytest.mark.asyncio
+async def test_read_all_keeps_concurrent_unread(
+    client: AsyncClient, db_session, test_user, subscriber_user, auth_headers, subscriber_headers
+):
+    await _send(client, subscriber_headers, test_user.id, "一")
+    await _send(client, subscriber_headers, test_user.id, "二")
+
+    # 模拟并发：另一条私信已计入未读数，但其行不在本次标记已读的 UPDATE 内
+    column = "unread_low" if test_user.id < subscriber_user.id else "unread_high"
+    await db_session.execute(
+        update(Conversation).values({column: getattr(Conversation, column) + 1})
+    )
+    await db_session.commit()
+
+    response = await client.put(
+        f"/api/messages/read-all/{subscriber_user.id}", headers=auth_headers
+    )
+    assert response.status_code == 200
+    response = await client.get("/api/messages/unread/count", headers=auth_headers)
+    assert response.json() == {"count": 1}
@@ -4,7 +4,7 @@ main.py 顶层入口 + 中间件 catch-all 覆盖：
 - 异常处理器：StarletteHTTPException(404) / RequestValidationError(422) / 通用 Exception
   通过真实 HTTP 请求实际抛出方式触发（避免依赖 main 内部闭包函数）
 - 安全头 nonce 分支 + force_hsts=True/https 场景下 HSTS 头写入
-- performance_middleware：正常/慢请求/except 兜底分支（通过拉长耗时 monkeypatch 触发 should_record=true，
+- 请求管线性能采样：正常/慢请求/except 兜底分支（通过拉长耗时 monkeypatch 触发 should_record=true，
   测试环境 async_session_maker 不同 → 自然走 except logger.warning 分支）
 """
 from __future__ import annotations
@@ -143,14 +143,14 @@ class TestSecurityMiddleware:
 
 
 # ================================================================
-# 4. PerformanceMiddleware：慢请求 → try/except 兜底分支（try 里 async_session_maker 失败）
+# 4. 性能采样：慢请求 → try/except 兜底分支（try 里 async_session_maker 失败）
 # ================================================================
 class TestPerformanceMiddleware:
     @pytest.mark.asyncio
     async def test_slow_request_triggers_should_record_with_except_fallback(
         self, client: AsyncClient, monkeypatch
     ):
-        import backend.middleware.performance as perf_mod
+        import backend.middleware.pipeline as pipeline_mod
 
         class _SlowClock:
             @staticmethod
@@ -162,6 +162,6 @@ class TestPerformanceMiddleware:
                     return _SlowClock._start
                 return _SlowClock._start + 0.7  # 秒单位，> slow_threshold_ms=500ms
 
-        monkeypatch.setattr(perf_mod, "time", _SlowClock)
+        monkeypatch.setattr(pipeline_mod, "time", _SlowClock)
         r = await client.get("/health")
         assert r.status_code == 200
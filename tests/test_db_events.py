@@ -0,0 +1,88 @@
+"""
+提交后回调测试（提交触发、回滚丢弃、SAVEPOINT、协程回调作为任务执行）
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from backend.core import db_events
+from backend.core.db_events import on_commit
+from backend.models.core import SiteConfig
+from backend.services.site_config_service import site_config_store
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    monkeypatch.setattr(db_events, "_hooks", [])
+    return []
+
+
+@pytest.mark.asyncio
+async def test_callback_runs_after_commit_only(db_session, calls):
+    hook = on_commit("test_sync_hook", calls.append, factory=set)
+
+    await db_session.execute(text("SELECT 1"))
+    hook.pending(db_session.sync_session).update({1, 2})
+    await db_session.rollback()
+    assert calls == []
+
+    hook.pending(db_session.sync_session).add(3)
+    await db_session.commit()
+    assert calls == [{3}]
+
+    # 未记录的事务不触发
+    await db_session.commit()
+    assert calls == [{3}]
+
+
+@pytest.mark.asyncio
+async def test_coroutine_callback_scheduled_and_errors_logged(db_session, calls, caplog):
+    async def record(value):
+        calls.append(value)
+
+    async def fail(value):
+        raise RuntimeError("boom")
+
+    record_hook = on_commit("test_async_hook", record)
+    fail_hook = on_commit("test_failing_hook", fail, label="测试回调")
+
+    record_hook.mark(db_session.sync_session, "flag")
+    fail_hook.mark(db_session.sync_session)
+    await db_session.commit()
+    await asyncio.sleep(0.01)
+    assert calls == ["flag"]
+    assert "测试回调失败: boom" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_savepoint_does_not_fire_or_discard(db_session, calls):
+    hook = on_commit("test_nested_hook", calls.append, factory=set)
+
+    await db_session.execute(text("SELECT 1"))
+    hook.pending(db_session.sync_session).add(1)
+    # 失败的 SAVEPOINT 不丢弃外层事务已记录的值
+    with pytest.raises(RuntimeError):
+        async with db_session.begin_nested():
+            hook.pending(db_session.sync_session).add(2)
+            raise RuntimeError("chunk failed")
+    # 释放 SAVEPOINT 时外层尚未提交，不触发
+    async with db_session.begin_nested():
+        hook.pending(db_session.sync_session).add(3)
+    assert calls == []
+
+    await db_session.commit()
+    assert calls == [{1, 2, 3}]
+
+
+@pytest.mark.asyncio
+async def test_site_config_invalidated_after_failed_savepoint(db_session):
+    version = site_config_store.version
+    db_session.add(SiteConfig(key="db_events_test", value="1"))
+    await db_session.flush()
+    with pytest.raises(RuntimeError):
+        async with db_session.begin_nested():
+            raise RuntimeError("chunk failed")
+    await db_session.commit()
+    assert site_config_store.version == version + 1
@@ -0,0 +1,150 @@
+"""
+邮件服务测试（SMTP 连接池 + 模板缓存）
+
+smtplib.SMTP_SSL 替换为进程内的 FakeSMTP，记录连接、登录与发送。
+"""
+
+import smtplib
+
+import pytest
+
+from backend.services import email_service
+from backend.services.email_service import (
+    EmailMessage,
+    EmailService,
+    EmailTemplateEngine,
+    SMTPConnectionPool,
+)
+
+
+class FakeSMTP:
+    """记录调用的 SMTP 替身；drop_after 条消息后模拟服务器断开"""
+
+    instances: list["FakeSMTP"] = []
+    drop_after: int | None = None
+
+    def __init__(self, host, port, timeout=None):
+        self.logins = 0
+        self.sent: list[tuple[str, list[str]]] = []
+        self.closed = False
+        FakeSMTP.instances.append(self)
+
+    def login(self, user, password):
+        self.logins += 1
+
+    def sendmail(self, from_addr, recipients, message):
+        if self.closed or (FakeSMTP.drop_after is not None and len(self.sent) >= self.drop_after):
+            self.closed = True
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        if recipients[0].startswith("reject"):
+            raise smtplib.SMTPRecipientsRefused({recipients[0]: (550, b"no such user")})
+        self.sent.append((from_addr, list(recipients)))
+        return {}
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    FakeSMTP.instances = []
+    FakeSMTP.drop_after = None
+    monkeypatch.setattr(email_service.smtplib, "SMTP_SSL", FakeSMTP)
+    yield FakeSMTP
+    email_service.close_smtp_pools()
+
+
+def _pool(**kwargs) -> SMTPConnectionPool:
+    kwargs.setdefault("size", 1)
+    kwargs.setdefault("domain_rate_limit", 0)
+    return SMTPConnectionPool("smtp.example.com", 465, "user", "pw", True, **kwargs)
+
+
+class TestSMTPConnectionPool:
+    """长连接复用、断线重连与连接轮换"""
+
+    @pytest.mark.asyncio
+    async def test_reuses_logged_in_connection(self, fake_smtp):
+        """多封邮件共用一个已登录连接"""
+        pool = _pool()
+        for i in range(5):
+            await pool.send("from@example.com", [f"u{i}@example.com"], "body")
+
+        assert len(fake_smtp.instances) == 1
+        assert fake_smtp.instances[0].logins == 1
+        assert len(fake_smtp.instances[0].sent) == 5
+        assert pool.stats()["messages"] == 5
+        pool.close()
+
+    @pytest.mark.asyncio
+    async def test_reconnects_when_server_drops_connection(self, fake_smtp):
+        """复用的连接被服务器断开后重连并重发"""
+        fake_smtp.drop_after = 2
+        pool = _pool()
+        for i in range(3):
+            await pool.send("from@example.com", [f"u{i}@example.com"], "body")
+
+        assert len(fake_smtp.instances) == 2
+        assert [len(c.sent) for c in fake_smtp.instances] == [2, 1]
+        pool.close()
+
+    @pytest.mark.asyncio
+    async def test_rotates_after_max_messages_and_keeps_connection_on_refusal(self, fake_smtp):
+        """达到单连接上限后换新连接；收件人被拒时连接保留"""
+        pool = _pool(max_messages=2)
+        with pytest.raises(smtplib.SMTPRecipientsRefused):
+            await pool.send("from@example.com", ["reject@example.com"], "body")
+        for i in range(3):
+            await pool.send("from@example.com", [f"u{i}@example.com"], "body")
+
+        assert [len(c.sent) for c in fake_smtp.instances] == [2, 1]
+        assert fake_smtp.instances[0].closed
+        pool.close()
+
+
+class TestEmailService:
+    """EmailService 经由共享连接池发送"""
+
+    @pytest.mark.asyncio
+    async def test_send_bulk_shares_pool_across_services(self, fake_smtp):
+        """不同 EmailService 实例共用同一账户的连接池"""
+        kwargs = {"smtp_host": "smtp.example.com", "smtp_user": "u", "smtp_password": "p"}
+        results = await EmailService(**kwargs).send_bulk(
+            [EmailMessage(to=f"u{i}@example.com", subject="s", body="b") for i in range(3)]
+        )
+        result = await EmailService(**kwargs).send_email(
+            to="x@example.com", subject="s", body="b", background=False
+        )
+
+        assert all(r.success for r in results) and result.success
+        assert sum(c.logins for c in fake_smtp.instances) <= email_service.settings.smtp_pool_size
+
+
+class TestTemplateEngine:
+    """模板缓存与内置模板"""
+
+    def test_builtin_templates_are_escaped_and_shared(self, tmp_path):
+        """模板目录缺失时使用内置模板，同一目录共享编译缓存"""
+        engine = EmailTemplateEngine(tmp_path / "missing")
+        html = engine.render(
+            "comment_notification.html",
+            {
+                "post_title": "T",
+                "comment_content": "<script>x</script>",
+                "commenter_name": "a",
+                "post_link": "https://example.com/p",
+                "site_name": "S",
+            },
+        )
+        assert "&lt;script&gt;" in html
+        assert EmailTemplateEngine(tmp_path / "missing").environment is engine.environment
+        with pytest.raises(FileNotFoundError):
+            engine.render("nope.html", {})
+
+    def test_directory_templates_override_builtin(self, tmp_path):
+        """模板目录中的同名文件优先"""
+        (tmp_path / "welcome.html").write_text("Hi {{ username }}", encoding="utf-8")
+        assert EmailTemplateEngine(tmp_path).render("welcome.html", {"username": "z"}) == "Hi z"
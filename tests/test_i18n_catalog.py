@@ -0,0 +1,73 @@
+"""
+国际化缓存与批量本地化测试（消息目录、Accept-Language 缓存、localize_many）
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+
+from backend.core import i18n
+from backend.core.i18n import (
+    MessageCatalog,
+    get_i18n_value,
+    localize_many,
+    parse_accept_language,
+    t,
+)
+
+
+def test_catalog_compiles_languages_lazily():
+    catalog = MessageCatalog(
+        {"hello": {"zh": "你好", "en": "Hello"}, "bye": {"zh": "再见"}, "empty": {}}
+    )
+    assert catalog.gettext("hello", "en") == "Hello"
+    assert list(catalog._tables) == ["en"]
+    # 缺失的翻译回退到默认语言，再缺失为键本身
+    assert catalog.table("en") == {"hello": "Hello", "bye": "再见", "empty": "empty"}
+    assert catalog.gettext("missing", "ja") == "missing"
+    assert set(catalog._tables) == {"en", "ja"}
+
+
+def test_t_uses_catalog():
+    assert t("internal_server_error", "en-US") == "Internal server error"
+    assert t("internal_server_error", "fr") == "服务器内部错误"
+    assert t("no_such_key", "en") == "no_such_key"
+
+
+def test_accept_language_parsing_cached():
+    parse_accept_language.cache_clear()
+    header = "ja;q=0.8, en-GB;q=0.9, zh;q=0.5"
+    assert parse_accept_language(header) == "en"
+    assert parse_accept_language(header) == "en"
+    assert parse_accept_language.cache_info().hits == 1
+    assert parse_accept_language("zh-TW,zh;q=0.9") == "zh_Hant"
+    assert parse_accept_language(None) == "zh"
+
+
+@pytest.mark.parametrize("lang", ["en", "ja", "zh_Hant", "fr"])
+@pytest.mark.parametrize("fallback", [True, False])
+def test_localize_many_matches_get_i18n_value(lang, fallback):
+    records = [
+        SimpleNamespace(title={"zh": "标题", "en": "Title"}, subtitle=None),
+        SimpleNamespace(title={"ja": "タイトル"}, subtitle={"en": ""}),
+        SimpleNamespace(title={}, subtitle={"zh_Hant": "副標題"}),
+    ]
+    results = localize_many(records, ("title", "subtitle"), lang, fallback)
+    for record, values in zip(records, results, strict=True):
+        for field, value in zip(("title", "subtitle"), values, strict=True):
+            data = getattr(record, field)
+            expected = get_i18n_value(data, lang, fallback) if data else None
+            assert value == expected
+
+
+@pytest.mark.asyncio
+async def test_post_list_localised(client: AsyncClient, test_post):
+    response = await client.get("/api/blog/posts?lang=en")
+    assert response.status_code == 200
+    item = response.json()["items"][0]
+    assert item["title"] == get_i18n_value(test_post.title, "en")
+    assert item["subtitle"] == (
+        get_i18n_value(test_post.subtitle, "en") if test_post.subtitle else None
+    )
+    assert i18n._lookup_order("en", True)[:2] == ("en", "zh")
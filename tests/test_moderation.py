@@ -0,0 +1,103 @@
+"""
+敏感词审核测试（Aho-Corasick 自动机、归一化、数据库 / 文件词表热重载）
+"""
+
+from contextlib import asynccontextmanager
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from backend.core.config import settings
+from backend.core.moderation import (
+    MODERATION_CHANNEL,
+    moderate_text,
+    normalize_text,
+    word_lists,
+)
+from backend.models.core import SiteConfig
+from backend.utils.aho_corasick import AhoCorasick
+
+
+@pytest.fixture
+def store(db_session, monkeypatch):
+    @asynccontextmanager
+    async def _session():
+        yield db_session
+
+    monkeypatch.setattr(word_lists, "_session_factory", _session)
+    yield word_lists
+    word_lists.reset()
+
+
+def test_automaton_overlapping_matches():
+    automaton = AhoCorasick(["he", "she", "his", "hers", ""])
+    assert automaton.search("ushers") == {0, 1, 3}
+    assert automaton.search("ahishe") == {0, 1, 2}
+    assert automaton.search("nothing") == set()
+
+
+def test_normalisation_defeats_obfuscation():
+    assert normalize_text("ＰＯＲＮ") == "porn"
+    assert normalize_text("p\u200bo\u200dr\ufeffn") == "porn"
+
+    assert moderate_text("buy ＰｏＲＮ now").level == "black"
+    assert moderate_text("cA\u200bSiNo tonight").matched_words == ["casino"]
+    assert moderate_text("快来加ＱＱ群").level == "gray"
+    # 黑名单优先，只返回黑名单命中的词
+    result = moderate_text("广告：线上赌场")
+    assert result.level == "black" and result.matched_words == ["线上赌场"]
+
+
+@pytest.mark.asyncio
+async def test_database_lists_hot_reload(store, db_session):
+    before = store.rules
+    assert moderate_text("这里有新违禁词").level == "ok"
+
+    db_session.add(SiteConfig(key="MODERATION_BLACKLIST", value="# 注释\n新违禁词\n\nＦｏｏBar\n"))
+    db_session.add(SiteConfig(key="MODERATION_GRAYLIST", value="待观察"))
+    await db_session.commit()
+    await store._reload_task
+
+    assert moderate_text("这里有新违禁词").level == "black"
+    assert moderate_text("FOOBAR!").matched_words == ["ＦｏｏBar"]
+    assert moderate_text("待观察一下").level == "gray"
+    assert store.rules.counts["black"] == before.counts["black"] + 2
+    # 旧词表不可变，替换前取得引用的调用不受影响
+    assert before.check("这里有新违禁词").level == "ok"
+
+    row = await db_session.scalar(
+        select(SiteConfig).where(SiteConfig.key == "MODERATION_BLACKLIST")
+    )
+    await db_session.delete(row)
+    await db_session.commit()
+    await store._reload_task
+    assert moderate_text("这里有新违禁词").level == "ok"
+
+    # 其他 worker 的变更通知同样触发重载；自己发出的通知忽略
+    reloads = store.reloads
+    store._changes.handle(MODERATION_CHANNEL, {"origin": store._changes.origin})
+    assert store.reloads == reloads
+    store._changes.handle(MODERATION_CHANNEL, {"origin": "other-worker"})
+    await store._reload_task
+    assert store.reloads == reloads + 1
+
+
+@pytest.mark.asyncio
+async def test_file_lists_reload_from_admin(
+    store, client: AsyncClient, staff_headers: dict, tmp_path, monkeypatch
+):
+    (tmp_path / "graylist.txt").write_text("低价代购\n# 注释\n", encoding="utf-8")
+    (tmp_path / "blacklist.txt").write_text(
+        "\n".join(f"违禁词{i}" for i in range(5000)), encoding="utf-8"
+    )
+    monkeypatch.setattr(settings, "moderation_wordlist_dir", str(tmp_path))
+
+    response = await client.post("/api/admin/tools/reload-moderation", headers=staff_headers)
+    assert response.status_code == 200
+    counts = response.json()["counts"]
+    assert counts["black"] >= 5000 and counts["gray"] >= 1
+
+    assert moderate_text("这件是低价代购").level == "gray"
+    assert moderate_text("包含违禁词4999的文本").level == "black"
+    assert moderate_text("包含违禁的文本").level == "ok"
@@ -0,0 +1,137 @@
+"""
+实时通知推送中心测试（按连接发送队列、丢弃策略、心跳、跨 worker 分发）
+"""
+
+import asyncio
+
+import pytest
+
+from backend.core.pubsub import MemoryBroker
+from backend.services.notification_hub import NotificationHub
+
+
+class FakeWebSocket:
+    """记录发送内容的 WebSocket 替身，可模拟慢客户端"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent: list[dict] = []
+        self.closed_with: int | None = None
+
+    async def send_json(self, message: dict) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed_with = code
+
+
+class SharedBus:
+    """模拟多个 worker 共享的 Redis：每个 hub 一个代理，publish 分发到所有代理"""
+
+    def __init__(self):
+        self.brokers: list[MemoryBroker] = []
+
+    def factory(self) -> MemoryBroker:
+        bus = self
+
+        class _Broker(MemoryBroker):
+            distributed = True
+
+            async def publish(self, channel, message):
+                for broker in bus.brokers:
+                    await MemoryBroker.publish(broker, channel, message)
+
+        broker = _Broker()
+        self.brokers.append(broker)
+        return broker
+
+
+async def _settle():
+    await asyncio.sleep(0.02)
+
+
+@pytest.mark.asyncio
+async def test_send_to_user_reaches_every_connection():
+    hub = NotificationHub(broker_factory=MemoryBroker)
+    a, b, other = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    conn_a = await hub.connect(a, 1)
+    await hub.connect(b, 1)
+    await hub.connect(other, 2)
+
+    await hub.send_to_user(1, {"type": "notification", "id": 7})
+    await _settle()
+    assert a.sent == b.sent == [{"type": "notification", "id": 7}]
+    assert other.sent == []
+
+    await hub.disconnect(conn_a)
+    await hub.send_to_user(1, {"type": "notification", "id": 8})
+    await _settle()
+    assert len(a.sent) == 1 and len(b.sent) == 2
+    assert hub.stats()["connections"] == 2
+    await hub.shutdown()
+    assert b.closed_with == 1001
+
+
+@pytest.mark.asyncio
+async def test_slow_client_drops_oldest_without_blocking_others():
+    hub = NotificationHub(broker_factory=MemoryBroker, queue_size=2, max_dropped=100)
+    slow, fast = FakeWebSocket(delay=0.3), FakeWebSocket()
+    slow_conn = await hub.connect(slow, 1)
+    await hub.connect(fast, 1)
+
+    for i in range(5):
+        await hub.send_to_user(1, {"id": i})
+        await _settle()
+    assert [m["id"] for m in fast.sent] == [0, 1, 2, 3, 4]
+
+    await asyncio.sleep(1.0)
+    # 第一条已在发送中，队列只保留最新的两条
+    assert [m["id"] for m in slow.sent] == [0, 3, 4]
+    assert slow_conn.dropped == 2
+    await hub.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_evicts_client_over_drop_limit_or_send_timeout():
+    hub = NotificationHub(
+        broker_factory=MemoryBroker, queue_size=1, max_dropped=2, send_timeout=0.05
+    )
+    stuck = FakeWebSocket(delay=10)
+    conn = await hub.connect(stuck, 1)
+    for i in range(4):
+        await hub.send_to_user(1, {"id": i})
+    await asyncio.sleep(0.1)
+    assert conn.closed and stuck.closed_with == 1013
+    assert hub.stats()["connections"] == 0
+    await hub.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_on_idle_connection():
+    hub = NotificationHub(broker_factory=MemoryBroker, heartbeat_interval=0.05)
+    ws = FakeWebSocket()
+    await hub.connect(ws, 1)
+    await asyncio.sleep(0.13)
+    assert [m["type"] for m in ws.sent][:2] == ["heartbeat", "heartbeat"]
+    await hub.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_fan_out_across_workers():
+    bus = SharedBus()
+    writer, holder = (
+        NotificationHub(broker_factory=bus.factory),
+        NotificationHub(broker_factory=bus.factory),
+    )
+    ws = FakeWebSocket()
+    await holder.connect(ws, 3)
+
+    # 写通知的 worker 上没有该用户的连接
+    await writer.send_to_user(3, {"type": "notification", "id": 1})
+    await writer.broadcast({"type": "announcement"})
+    await _settle()
+    assert ws.sent == [{"type": "notification", "id": 1}, {"type": "announcement"}]
+    await writer.shutdown()
+    await holder.shutdown()
@@ -0,0 +1,85 @@
+"""
+文章派生指标测试（写入时计算字数 / 阅读时间 / 归档月份，站点统计与归档聚合）
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+from backend.models.blog import Post
+from backend.services.post_scheduler import publish_due_posts
+from backend.utils.compat import UTC
+from backend.utils.post_metrics import count_words
+
+
+def _post(author_id: int, slug: str, content: str, published_at: datetime | None, **kwargs):
+    return Post(
+        title={"zh": slug},
+        slug=slug,
+        content={"zh": content, "en": "ignored"},
+        author_id=author_id,
+        status=kwargs.pop("status", "published"),
+        published_at=published_at,
+        **kwargs,
+    )
+
+
+def test_count_words_skips_code():
+    assert count_words("你好 world\n```python\nprint('x')\n```\n`inline` 再见") == 9
+
+
+@pytest.mark.asyncio
+async def test_metrics_computed_on_write(db_session, test_user):
+    published_at = datetime(2025, 3, 14, 8, 0, tzinfo=UTC)
+    post = _post(test_user.id, "metrics", "中" * 600, published_at)
+    db_session.add(post)
+    await db_session.commit()
+    assert (post.word_count, post.reading_time, post.archive_month) == (600, 2, "2025-03")
+
+    post.content = {"zh": "短文 short"}
+    post.published_at = datetime(2025, 4, 1, tzinfo=UTC)
+    await db_session.commit()
+    assert (post.word_count, post.reading_time, post.archive_month) == (7, 1, "2025-04")
+
+
+@pytest.mark.asyncio
+async def test_scheduled_publish_updates_archive_month(db_session, test_user):
+    scheduled_at = datetime.now(UTC) - timedelta(days=40)
+    post = _post(test_user.id, "late", "内容", None, status="scheduled", scheduled_at=scheduled_at)
+    db_session.add(post)
+    await db_session.commit()
+
+    await publish_due_posts(db_session)
+    await db_session.commit()
+    await db_session.refresh(post)
+    assert post.archive_month == f"{scheduled_at:%Y-%m}"
+
+
+@pytest.mark.asyncio
+async def test_site_stats_and_archive(client: AsyncClient, db_session, test_user):
+    march = datetime(2025, 3, 10, tzinfo=UTC)
+    db_session.add_all(
+        [
+            _post(test_user.id, "a", "一二三", march),
+            _post(test_user.id, "b", "四五", march + timedelta(days=1)),
+            _post(test_user.id, "c", "六", datetime(2024, 12, 31, tzinfo=UTC)),
+            _post(test_user.id, "draft", "草稿不计", None, status="draft"),
+        ]
+    )
+    await db_session.commit()
+
+    stats = (await client.get("/api/blog/site-stats")).json()
+    assert (stats["total_posts"], stats["total_words"]) == (3, 6)
+
+    archive = (await client.get("/api/blog/archive", params={"limit_per_month": 1})).json()
+    assert [(m["year"], m["month"], m["count"]) for m in archive] == [(2025, 3, 2), (2024, 12, 1)]
+    # 每月只返回最新的 limit_per_month 篇
+    assert [p["slug"] for p in archive[0]["posts"]] == ["b"]
+
+    archive_stats = (await client.get("/api/blog/archive/stats")).json()
+    assert archive_stats["years"] == [2025, 2024]
+    assert archive_stats["year_stats"] == {"2025": 2, "2024": 1}
+
+    by_month = (await client.get("/api/blog/archive/2025/3")).json()
+    assert by_month["count"] == 2
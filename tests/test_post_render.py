@@ -0,0 +1,132 @@
+"""
+文章正文预编译测试（渲染产物、按内容哈希复用、阅读端读取、补编译）
+"""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select, update
+
+from backend.models.blog import Post, PostRender, save_post_render
+from backend.utils import post_metrics, post_render
+
+CONTENT = {
+    "zh": "# 简介\n\n第一段 **正文** [链接](https://example.com)\n\n## 用法\n\n## 用法\n\n"
+    "<script>alert(1)</script>\n\n[坏链接](javascript:alert(1))\n\n#### 深层标题\n",
+    "en": "# Intro\n\nHello *world*.\n",
+    "ja": "",
+}
+
+
+def test_compile_content():
+    artifact = post_render.compile_content(CONTENT)
+    assert set(artifact) == {"zh", "en"}
+
+    zh = artifact["zh"]
+    assert '<h1 id="简介">' in zh["html"]
+    assert '<h2 id="用法-1">' in zh["html"]
+    assert "<script" not in zh["html"] and "&lt;script&gt;" in zh["html"]
+    assert 'href="javascript' not in zh["html"]
+    assert [h["id"] for h in zh["headings"]] == ["简介", "用法", "用法-1", "深层标题"]
+    # 目录树默认只收录到三级标题
+    assert [child["id"] for child in zh["toc"][0]["children"]] == ["用法", "用法-1"]
+    assert zh["excerpt"].startswith("第一段 正文 链接")
+    assert artifact["en"]["word_count"] == post_metrics.count_words(CONTENT["en"])
+
+
+@pytest.mark.asyncio
+async def test_render_compiled_on_write_and_reused(db_session, test_post, monkeypatch):
+    original_hash = test_post.render_hash
+    assert original_hash == post_render.content_hash(test_post.content)
+
+    compiled = []
+    real_compile = post_render.compile_content
+    monkeypatch.setattr(
+        post_render, "compile_content", lambda c: compiled.append(c) or real_compile(c)
+    )
+
+    # 非正文字段更新不重新编译
+    test_post.is_pinned = True
+    await db_session.commit()
+    assert compiled == []
+
+    test_post.content = CONTENT
+    await db_session.commit()
+    assert len(compiled) == 1
+    assert test_post.render_hash == post_render.content_hash(CONTENT)
+
+    # 回滚到旧正文：按内容哈希复用已有产物
+    test_post.content = {"zh": "这是测试内容", "en": "This is test content"}
+    await db_session.commit()
+    assert len(compiled) == 1
+    assert test_post.render_hash == original_hash
+    assert await db_session.scalar(select(func.count()).select_from(PostRender)) == 2
+
+
+@pytest.mark.asyncio
+async def test_save_render_tolerates_concurrent_insert(db_session, monkeypatch):
+    """查询与插入之间另一写入者已保存同一正文时不报主键冲突"""
+    real_compile = post_render.compile_content
+    digest = post_render.content_hash(CONTENT)
+
+    def save(session):
+        connection = session.connection()
+
+        def racing_compile(content):
+            artifact = real_compile(content)
+            connection.execute(
+                PostRender.__table__.insert().values(
+                    content_hash=digest,
+                    renderer_version=post_render.RENDERER_VERSION,
+                    artifact=artifact,
+                )
+            )
+            return artifact
+
+        monkeypatch.setattr(post_render, "compile_content", racing_compile)
+        return save_post_render(connection, CONTENT)
+
+    saved_hash, artifact = await db_session.run_sync(save)
+    assert saved_hash == digest
+    assert artifact == real_compile(CONTENT)
+    assert await db_session.scalar(select(func.count()).select_from(PostRender)) == 1
+
+
+@pytest.mark.asyncio
+async def test_detail_and_toc_read_precompiled(
+    client: AsyncClient, db_session, test_post, monkeypatch
+):
+    test_post.content = CONTENT
+    await db_session.commit()
+
+    monkeypatch.setattr(post_render, "compile_content", lambda c: pytest.fail("recompiled"))
+
+    response = await client.get(f"/api/blog/posts/{test_post.slug}?lang=zh")
+    assert response.status_code == 200
+    data = response.json()
+    assert '<h2 id="用法">' in data["content_html"]
+    assert data["toc"][0]["id"] == "简介"
+    assert data["reading_time"] == 1
+
+    toc = await client.get(f"/api/toc/posts/{test_post.id}?lang=en&max_depth=2")
+    assert toc.status_code == 200
+    assert [item["id"] for item in toc.json()["items"]] == ["intro"]
+
+    test_post.password = "secret"
+    await db_session.commit()
+    assert (await client.get(f"/api/toc/posts/{test_post.id}")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_missing_render_compiled_on_first_read(client: AsyncClient, db_session, test_post):
+    # 模拟批量导入：批量 UPDATE 不经过 ORM 事件，产物缺失
+    await db_session.execute(
+        update(Post).where(Post.id == test_post.id).values(content=CONTENT, render_hash=None)
+    )
+    await db_session.commit()
+
+    response = await client.get(f"/api/toc/posts/{test_post.id}")
+    assert response.status_code == 200
+    assert response.json()["items"][0]["id"] == "简介"
+
+    render_hash = await db_session.scalar(select(Post.render_hash).where(Post.id == test_post.id))
+    assert render_hash == post_render.content_hash(CONTENT)
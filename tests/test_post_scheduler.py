@@ -0,0 +1,98 @@
+"""
+定时发布调度器测试（条件发布、最小堆唤醒、提交后通知）
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.core.config import settings
+from backend.models.blog import Post
+from backend.services import post_scheduler as scheduler_module
+from backend.services.post_scheduler import PostScheduler, publish_due_posts
+from backend.utils.compat import UTC
+
+
+def _scheduled_post(author_id: int, slug: str, scheduled_at: datetime) -> Post:
+    return Post(
+        title={"zh": slug},
+        slug=slug,
+        content={"zh": "定时发布"},
+        author_id=author_id,
+        status="scheduled",
+        scheduled_at=scheduled_at,
+    )
+
+
+@pytest.fixture
+async def scheduler(monkeypatch, test_engine, test_user):
+    # 测试库为共享单连接的内存 SQLite，调度器须在测试数据就绪后再启动
+    monkeypatch.setattr(settings, "redis_enabled", False)
+    instance = PostScheduler(
+        session_factory=async_sessionmaker(
+            test_engine, class_=AsyncSession, expire_on_commit=False
+        ),
+        resync_interval=3600,
+    )
+    monkeypatch.setattr(scheduler_module, "post_scheduler", instance)
+    await instance.start()
+    await asyncio.sleep(0.05)
+    yield instance
+    await instance.stop()
+
+
+@pytest.mark.asyncio
+async def test_publish_due_posts_is_idempotent(db_session, test_user):
+    past = datetime.now(UTC) - timedelta(minutes=1)
+    db_session.add(_scheduled_post(test_user.id, "due-post", past))
+    db_session.add(_scheduled_post(test_user.id, "future-post", past + timedelta(days=1)))
+    await db_session.commit()
+
+    published = await publish_due_posts(db_session)
+    await db_session.commit()
+    assert [post.slug for post in published] == ["due-post"]
+    assert await publish_due_posts(db_session) == []
+
+    post = await db_session.get(Post, published[0].id)
+    await db_session.refresh(post)
+    assert post.status == "published"
+    assert post.scheduled_at is None
+    assert post.published_at is not None
+
+
+@pytest.mark.asyncio
+async def test_leader_wakes_up_at_scheduled_time(scheduler, db_session, test_user):
+    assert scheduler.is_leader
+
+    post = _scheduled_post(test_user.id, "wake-up", datetime.now(UTC) + timedelta(milliseconds=300))
+    db_session.add(post)
+    await db_session.commit()
+    await asyncio.sleep(0.05)
+    # 提交后经通知进入堆，无需等待兜底同步
+    assert scheduler.stats()["pending"] == 1
+
+    await asyncio.sleep(0.6)
+    await db_session.refresh(post)
+    assert post.status == "published"
+    assert scheduler.published == 1
+    assert scheduler.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_schedule_is_dropped_from_heap(scheduler, db_session, test_user):
+    post = _scheduled_post(test_user.id, "cancelled", datetime.now(UTC) + timedelta(seconds=2))
+    db_session.add(post)
+    await db_session.commit()
+    await asyncio.sleep(0.05)
+    assert scheduler.stats()["pending"] == 1
+
+    post.scheduled_at = None
+    await db_session.commit()
+    await asyncio.sleep(0.05)
+
+    await db_session.refresh(post)
+    assert post.status == "scheduled"
+    assert scheduler.published == 0
+    assert scheduler.stats()["pending"] == 0
@@ -0,0 +1,105 @@
+"""
+认证主体缓存测试（get_current_user 用户快照 + jti 黑名单）
+"""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.core.auth import revoke_access_token
+from backend.core.cache_v2 import two_level_cache
+from backend.core.principal import load_principal, principal_key
+from backend.models.user import User
+from backend.services.user_service import UserService
+
+
+@pytest.fixture
+def session_maker(test_engine):
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+def statements(test_engine):
+    """记录执行的 SQL"""
+    executed: list[str] = []
+
+    def record(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture(autouse=True)
+async def clean_principal(test_user):
+    await two_level_cache.delete(principal_key(test_user.id))
+    yield
+    await two_level_cache.delete(principal_key(test_user.id))
+
+
+class TestPrincipalCache:
+    """快照命中、失效与黑名单合并检查"""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_hit_skips_query(self, session_maker, statements, test_user):
+        """第二次在新会话中加载不再查询 users 表，且快照不含 password_hash"""
+        async with session_maker() as session:
+            user, revoked = await load_principal(session, test_user.id)
+            assert user.username == "testuser" and not revoked
+
+        statements.clear()
+        async with session_maker() as session:
+            user, _ = await load_principal(session, test_user.id)
+            assert statements == []
+            assert user in session
+            assert user.nickname == "测试用户"
+            assert user.created_at.replace(tzinfo=None) == test_user.created_at.replace(tzinfo=None)
+
+        assert "password_hash" not in await two_level_cache.get(principal_key(test_user.id))
+
+    @pytest.mark.asyncio
+    async def test_ban_invalidates_snapshot(self, session_maker, test_user):
+        """ban_user 之后新请求立即看到封禁状态"""
+        async with session_maker() as session:
+            await load_principal(session, test_user.id)
+
+        async with session_maker() as session:
+            await UserService(session).ban_user(test_user.id)
+            await session.commit()
+
+        async with session_maker() as session:
+            user, _ = await load_principal(session, test_user.id)
+            assert user.is_banned is True
+
+    @pytest.mark.asyncio
+    async def test_committed_orm_change_invalidates_snapshot(self, session_maker, test_user):
+        """任意会话提交 User 修改后快照自动失效"""
+        async with session_maker() as session:
+            await load_principal(session, test_user.id)
+
+        async with session_maker() as session:
+            user = await session.get(User, test_user.id)
+            user.is_active = False
+            await session.commit()
+
+        async with session_maker() as session:
+            user, _ = await load_principal(session, test_user.id)
+            assert user.is_active is False
+
+    @pytest.mark.asyncio
+    async def test_revoked_jti_is_rejected(self, session_maker, test_user):
+        """黑名单中的 jti 在同一次查找中被拒绝"""
+        await revoke_access_token({"jti": "revoked-jti", "exp": 4102444800})
+        async with session_maker() as session:
+            user, revoked = await load_principal(session, test_user.id, jti="revoked-jti")
+        assert user is None and revoked
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_access_token(client: AsyncClient, auth_headers: dict):
+    """登出后原访问令牌失效"""
+    assert (await client.get("/api/users/me", headers=auth_headers)).status_code == 200
+    assert (await client.post("/api/users/logout", headers=auth_headers)).status_code == 200
+    assert (await client.get("/api/users/me", headers=auth_headers)).status_code == 401
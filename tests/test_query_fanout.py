@@ -0,0 +1,85 @@
+"""
+只读子查询扇出测试（SQLite 顺序退化、独立会话并行、并发上限、仪表盘统计）
+"""
+
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from backend.core import concurrency
+from backend.core.concurrency import fan_out, read_scalar
+from backend.models.blog import Comment, Post
+
+
+@pytest.mark.asyncio
+async def test_sqlite_runs_sequentially_on_request_session(db_session, test_post):
+    seen = []
+
+    async def _read(session):
+        seen.append(session)
+        return await session.scalar(select(func.count()).select_from(Post))
+
+    results = await fan_out(db_session, _read, read_scalar(select(Post.slug)), _read)
+
+    assert results == [1, test_post.slug, 1]
+    assert seen == [db_session, db_session]
+
+
+@pytest.mark.asyncio
+async def test_independent_sessions_run_in_parallel(db_session, test_engine, monkeypatch):
+    monkeypatch.setattr(concurrency, "_fanout_engine", lambda db: test_engine)
+    running = 0
+    peak = 0
+    sessions = []
+
+    def _read(value: int):
+        async def _run(session):
+            nonlocal running, peak
+            sessions.append(session)
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return value
+
+        return _run
+
+    results = await fan_out(db_session, *(_read(i) for i in range(6)), max_concurrency=3)
+
+    assert results == list(range(6))
+    assert peak == 3
+    assert len({id(session) for session in sessions}) == 6
+    assert db_session not in sessions
+
+
+@pytest.mark.asyncio
+async def test_sub_sessions_read_committed_rows(db_session, test_engine, test_post, monkeypatch):
+    monkeypatch.setattr(concurrency, "_fanout_engine", lambda db: test_engine)
+
+    # 子会话只能看到已提交的数据
+    db_session.add(Comment(post_id=test_post.id, author_name="访客", content="c", active=False))
+    await db_session.commit()
+
+    posts, pending = await fan_out(
+        db_session,
+        read_scalar(select(func.count()).select_from(Post)),
+        read_scalar(select(func.count()).select_from(Comment).where(Comment.active.is_(False))),
+        max_concurrency=1,
+    )
+    assert (posts, pending) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_admin_stats_summary(client: AsyncClient, db_session, test_post, staff_headers: dict):
+    db_session.add(Comment(post_id=test_post.id, author_name="访客", content="c", active=False))
+    await db_session.commit()
+
+    response = await client.get("/api/admin/stats", headers=staff_headers)
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["summary"]["total_posts"] == 1
+    assert data["summary"]["total_pending_comments"] == 1
+    assert data["top_articles"][0]["id"] == test_post.id
+    assert data["top_articles"][0]["comments_count"] == 1
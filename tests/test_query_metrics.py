@@ -0,0 +1,83 @@
+"""
+数据库查询指标测试（SQL 指纹归一化、请求级查询统计、监控接口）
+"""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from backend.core.config import settings
+from backend.core.db_metrics import instrument_engine, normalize_sql, query_metrics
+
+
+@pytest.fixture
+def metrics(test_engine):
+    instrument_engine(test_engine)
+    query_metrics.reset()
+    yield query_metrics
+    query_metrics.reset()
+
+
+def test_normalize_sql_folds_literals_and_lists():
+    assert normalize_sql(
+        "SELECT * FROM posts WHERE id IN (1, 2, 3) AND slug = 'a''b'  AND views > 10"
+    ) == normalize_sql("SELECT * FROM posts WHERE id IN (?, ?) AND slug = $1 AND views > :v")
+    assert (
+        normalize_sql("INSERT INTO t (a, b) VALUES (?), (?), (?)")
+        == "INSERT INTO t (a, b) VALUES (?)"
+    )
+    assert normalize_sql("SELECT CAST(x AS t1) FROM users_2") == (
+        "SELECT CAST(x AS t1) FROM users_2"
+    )
+
+
+@pytest.mark.asyncio
+async def test_slow_statements_grouped_by_fingerprint(metrics, test_engine, monkeypatch):
+    monkeypatch.setattr(settings, "db_slow_query_ms", 0)
+    async with test_engine.connect() as conn:
+        await conn.execute(text("SELECT 1 WHERE 1 = 1"))
+        await conn.execute(text("SELECT 1 WHERE 2 = 2"))
+
+    snapshot = metrics.snapshot()
+    assert snapshot["queries"]["total"] == 2
+    assert snapshot["slow_statements"][0]["sql"] == "SELECT ? WHERE ? = ?"
+    assert snapshot["slow_statements"][0]["count"] == 2
+    assert snapshot["pool"]["checkouts"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_request_headers_and_endpoint_stats(metrics, client: AsyncClient, test_post):
+    response = await client.get("/api/blog/posts")
+    assert response.status_code == 200
+    count = int(response.headers["X-DB-Query-Count"])
+    assert count > 0
+    assert response.headers["X-DB-Time"].endswith("ms")
+    assert "db;dur=" in response.headers["Server-Timing"]
+
+    endpoints = {e["endpoint"]: e for e in metrics.snapshot()["endpoints"]}
+    assert endpoints["GET /api/blog/posts"]["max_queries"] == count
+
+
+@pytest.mark.asyncio
+async def test_endpoint_stats_use_route_template(metrics, client: AsyncClient):
+    # 参数值与前面的路径段相同时仍按路由模板归类
+    await client.get("/api/blog/posts/blog")
+    endpoints = [e["endpoint"] for e in metrics.snapshot()["endpoints"]]
+    assert endpoints == ["GET /api/blog/posts/{slug}"]
+
+
+@pytest.mark.asyncio
+async def test_monitoring_query_stats_api(metrics, client: AsyncClient, staff_headers: dict):
+    response = await client.get("/api/monitoring/database/queries", headers=staff_headers)
+    assert response.status_code == 200
+    assert set(response.json()) >= {"queries", "pool", "slow_statements", "endpoints"}
+
+    response = await client.get("/api/monitoring/database", headers=staff_headers)
+    assert response.status_code == 200
+    assert "peak_checked_out" in response.json()["pool"]
+
+    response = await client.delete("/api/monitoring/database/queries", headers=staff_headers)
+    assert response.status_code == 200
+    # 只剩重置请求本身
+    endpoints = [e["endpoint"] for e in metrics.snapshot()["endpoints"]]
+    assert endpoints == ["DELETE /api/monitoring/database/queries"]
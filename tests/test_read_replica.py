@@ -0,0 +1,107 @@
+"""
+只读副本路由测试（ReplicaRouter 选择 / 回退与 get_read_db）
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.core import database
+from backend.core.database import ReplicaRouter, get_read_db
+
+
+@pytest.fixture
+async def router(tmp_path):
+    replica_router = ReplicaRouter(
+        [
+            f"sqlite+aiosqlite:///{tmp_path / 'replica_a.db'}",
+            f"sqlite+aiosqlite:///{tmp_path / 'replica_b.db'}",
+        ],
+        max_lag=5,
+        check_interval=3600,
+    )
+    yield replica_router
+    await replica_router.dispose()
+
+
+async def _read_bind(monkeypatch, replica_router, primary_engine):
+    """通过 get_read_db 执行一次查询，返回会话绑定的引擎"""
+    monkeypatch.setattr(database, "replica_router", replica_router)
+    monkeypatch.setattr(
+        database,
+        "async_session_maker",
+        async_sessionmaker(primary_engine, class_=AsyncSession, expire_on_commit=False),
+    )
+    gen = get_read_db()
+    session = await gen.__anext__()
+    await session.execute(text("SELECT 1"))
+    await gen.aclose()
+    return session.bind
+
+
+class TestReplicaRouter:
+    """副本选择与回退"""
+
+    @pytest.mark.asyncio
+    async def test_round_robin_over_healthy_replicas(self, router):
+        first, second, third = router.pick(), router.pick(), router.pick()
+        assert first is not second
+        assert third is first
+
+    @pytest.mark.asyncio
+    async def test_skips_failed_and_lagging_replicas(self, router):
+        a, b = (replica.engine for replica in router.replicas)
+        router.mark_failed(a)
+        assert {router.pick(), router.pick()} == {b}
+
+        router.replicas[1].lag = 30
+        assert router.pick() is None
+        assert router.fallbacks == 1
+
+        # 检测成功后恢复
+        await router.refresh()
+        assert router.pick() is not None
+        assert all(item["healthy"] for item in router.stats())
+
+    @pytest.mark.asyncio
+    async def test_empty_router_uses_primary(self):
+        assert ReplicaRouter([]).pick() is None
+
+
+class TestGetReadDB:
+    """ReadDB 依赖"""
+
+    @pytest.mark.asyncio
+    async def test_routes_to_replica(self, monkeypatch, router, test_engine):
+        bind = await _read_bind(monkeypatch, router, test_engine)
+        assert bind in {replica.engine for replica in router.replicas}
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_primary_when_replica_unreachable(
+        self, monkeypatch, tmp_path, test_engine
+    ):
+        broken = ReplicaRouter(
+            [f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"], check_interval=3600
+        )
+        try:
+            assert await _read_bind(monkeypatch, broken, test_engine) is test_engine
+            assert broken.replicas[0].healthy is False
+        finally:
+            await broken.dispose()
+
+    @pytest.mark.asyncio
+    async def test_writes_are_rolled_back(self, monkeypatch, test_engine):
+        monkeypatch.setattr(database, "replica_router", ReplicaRouter([]))
+        monkeypatch.setattr(
+            database,
+            "async_session_maker",
+            async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False),
+        )
+        gen = get_read_db()
+        session = await gen.__anext__()
+        await session.execute(text("INSERT INTO site_configs (key, value) VALUES ('ro', 'x')"))
+        await gen.aclose()
+
+        async with test_engine.connect() as conn:
+            count = await conn.scalar(text("SELECT count(*) FROM site_configs WHERE key = 'ro'"))
+        assert count == 0
@@ -0,0 +1,85 @@
+"""
+站点配置快照测试（编译、版本失效、ETag、跨进程通知）
+"""
+
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import insert, select
+
+from backend.models.core import SiteConfig
+from backend.services.site_config_service import (
+    SITE_CONFIG_CHANNEL,
+    compile_site_config,
+    site_config_store,
+)
+
+
+def test_compile_merges_groups_and_sidebar():
+    data = compile_site_config(
+        {
+            "site_name": "小写键",
+            "basic": json.dumps({"subtitle": "副标题"}),
+            "sidebar": json.dumps({"show_music": False, "widget_order": ["tags"]}),
+        }
+    )
+    assert data["site_name"] == "小写键"
+    assert data["site_subtitle"] == "副标题"
+    assert data["sidebar_show_music"] is False
+    assert data["sidebar_widget_order"] == ["tags"]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_served_until_config_changes(client: AsyncClient, db_session):
+    first = await client.get("/api/config")
+    assert first.json()["site_name"] == "Rosetta Test"
+    builds = site_config_store.builds
+
+    second = await client.get("/api/config")
+    assert second.content == first.content
+    assert site_config_store.builds == builds
+
+    etag = first.headers["etag"]
+    cached = await client.get("/api/config", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    row = await db_session.scalar(select(SiteConfig).where(SiteConfig.key == "SITE_NAME"))
+    row.value = "改名"
+    await db_session.commit()
+    changed = await client.get("/api/config", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["site_name"] == "改名"
+    assert site_config_store.builds == builds + 1
+
+
+@pytest.mark.asyncio
+async def test_group_and_bulk_writes_invalidate(
+    client: AsyncClient, db_session, admin_headers: dict
+):
+    await client.get("/api/config")
+
+    response = await client.patch(
+        "/api/settings/footer", json={"slogan": "分组保存"}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert (await client.get("/api/config")).json()["footer_slogan"] == "分组保存"
+
+    # 批量 INSERT 不经过 flush，也要失效
+    await db_session.execute(insert(SiteConfig), [{"key": "SITE_AUTHOR", "value": "批量"}])
+    await db_session.commit()
+    assert (await client.get("/api/config")).json()["site_author"] == "批量"
+
+
+@pytest.mark.asyncio
+async def test_remote_notification_invalidates(client: AsyncClient):
+    await client.get("/api/config")
+    version = site_config_store.version
+
+    site_config_store._changes.handle(
+        SITE_CONFIG_CHANNEL, {"origin": site_config_store._changes.origin}
+    )
+    assert site_config_store.version == version
+
+    site_config_store._changes.handle(SITE_CONFIG_CHANNEL, {"origin": "other-worker"})
+    assert site_config_store.version == version + 1
@@ -0,0 +1,83 @@
+"""
+站点闸门与请求管线测试（维护模式推送、管理员声明放行、请求路径无 I/O、OOBE 闸门）
+"""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, select, text
+
+from backend.core.site_gate import site_gate
+from backend.models.core import SiteConfig
+from backend.services.site_config_service import SITE_CONFIG_CHANNEL, site_config_store
+
+
+async def _set_maintenance(db_session, value: str) -> None:
+    row = await db_session.scalar(select(SiteConfig).where(SiteConfig.key == "MAINTENANCE_MODE"))
+    row.value = value
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_maintenance_pushed_on_commit(
+    client: AsyncClient, db_session, test_engine, auth_headers: dict, staff_headers: dict
+):
+    assert (await client.get("/api/blog/posts")).status_code == 200
+
+    await _set_maintenance(db_session, "true")
+
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        blocked = await client.get("/api/blog/posts", headers=auth_headers)
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", _record)
+    assert blocked.status_code == 503
+    assert blocked.json()["maintenance_mode"] is True
+    # 闸门判断（包括普通用户令牌）不访问数据库
+    assert statements == []
+
+    # 管理员凭令牌声明放行；豁免路径不受影响
+    assert (await client.get("/api/blog/posts", headers=staff_headers)).status_code == 200
+    assert (await client.get("/health")).status_code == 200
+
+    await _set_maintenance(db_session, "false")
+    assert (await client.get("/api/blog/posts")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_remote_change_reloads_maintenance(client: AsyncClient, db_session):
+    await client.get("/api/blog/posts")
+    await _set_maintenance(db_session, "true")
+    assert (await site_gate.get_maintenance()).enabled
+
+    # 模拟其他 worker 关闭了维护模式：本进程的提交钩子看不到，收到通知后重新加载
+    await db_session.execute(
+        text("UPDATE site_configs SET value = 'false' WHERE key = 'MAINTENANCE_MODE'")
+    )
+    await db_session.commit()
+    assert (await site_gate.get_maintenance()).enabled
+
+    site_config_store._changes.handle(SITE_CONFIG_CHANNEL, {"origin": "other-worker"})
+    assert not (await site_gate.get_maintenance()).enabled
+    assert (await client.get("/api/blog/posts")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_oobe_gate(client: AsyncClient):
+    response = await client.get("/api/blog/posts")
+    assert "X-Process-Time" in response.headers
+
+    site_gate.set_oobe_complete(False)
+    blocked = await client.get("/api/blog/posts")
+    assert blocked.status_code == 503
+    assert blocked.json()["error_code"] == "OOBE_REQUIRED"
+    assert (await client.get("/health")).status_code == 200
+
+    site_gate.set_oobe_complete(True)
+    redirect = await client.get("/oobe")
+    assert redirect.status_code == 302
+    assert redirect.headers["location"] == "/"
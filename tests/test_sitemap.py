@@ -0,0 +1,103 @@
+"""
+Sitemap 分片与订阅源缓存测试（索引 / 分片、提交后按分片失效、RSS 缓存）
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient
+
+from backend.core.cache import cache
+from backend.core.config import settings
+from backend.models.blog import Post
+from backend.services.sitemap_service import post_shard
+from backend.utils.compat import UTC
+
+
+def _post(author_id: int, slug: str) -> Post:
+    return Post(
+        title={"zh": slug},
+        slug=slug,
+        content={"zh": "内容"},
+        author_id=author_id,
+        status="published",
+        published_at=datetime(2025, 3, 1, tzinfo=UTC),
+    )
+
+
+async def _settle() -> None:
+    # 提交后的缓存失效在 after_commit 创建的任务中执行
+    await asyncio.sleep(0.05)
+
+
+@pytest.mark.asyncio
+async def test_single_shard_returns_urlset(client: AsyncClient, test_post):
+    response = await client.get("/api/blog/sitemap.xml")
+    assert response.status_code == 200
+    assert "<urlset" in response.text
+    assert f"/posts/{test_post.slug}</loc>" in response.text
+
+
+@pytest.mark.asyncio
+async def test_sharded_index_and_invalidation(
+    client: AsyncClient, db_session, test_user, monkeypatch
+):
+    monkeypatch.setattr(settings, "sitemap_shard_size", 2)
+    posts = [_post(test_user.id, f"p{i}") for i in range(5)]
+    db_session.add_all(posts)
+    await db_session.commit()
+    await _settle()
+
+    index = (await client.get("/api/blog/sitemap.xml")).text
+    assert "<sitemapindex" in index
+    for name in ("posts-0", "posts-1", "posts-2", "taxonomy"):
+        assert f"/sitemaps/{name}.xml</loc>" in index
+    assert (await client.get("/api/seo/sitemap.xml")).text == index
+
+    first = (await client.get(f"/api/blog/sitemaps/{post_shard(posts[0].id)}.xml")).text
+    last = (await client.get(f"/api/blog/sitemaps/{post_shard(posts[4].id)}.xml")).text
+    assert "/posts/p0</loc>" in first and "/posts/p4</loc>" not in first
+
+    # 只失效被修改文章所在的分片与索引
+    posts[4].slug = "p4-renamed"
+    await db_session.commit()
+    await _settle()
+    assert await cache.get(f"sitemap:{post_shard(posts[0].id)}") == first
+    assert await cache.get(f"sitemap:{post_shard(posts[4].id)}") is None
+    assert await cache.get("sitemap:index") is None
+
+    last = (await client.get(f"/api/blog/sitemaps/{post_shard(posts[4].id)}.xml")).text
+    assert "/posts/p4-renamed</loc>" in last
+
+    assert (await client.get("/api/blog/sitemaps/posts-x.xml")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_rss_cached_until_post_changes(client: AsyncClient, db_session, test_post):
+    first = await client.get("/api/blog/rss", params={"lang": "zh"})
+    assert first.status_code == 200
+    assert await cache.get("feed:rss:zh:20") == first.text
+
+    test_post.title = {"zh": "新标题"}
+    await db_session.commit()
+    await _settle()
+    assert await cache.get("feed:rss:zh:20") is None
+    assert "新标题" in (await client.get("/api/blog/rss", params={"lang": "zh"})).text
+
+
+@pytest.mark.asyncio
+async def test_view_count_update_keeps_caches(client: AsyncClient, db_session, test_post):
+    """阅读数等无关字段的更新不失效 sitemap 与订阅源"""
+    feed = (await client.get("/api/blog/rss", params={"lang": "zh"})).text
+    sitemap = (await client.get("/api/blog/sitemap.xml")).text
+
+    test_post.views += 1
+    await db_session.commit()
+    await _settle()
+    assert await cache.get("feed:rss:zh:20") == feed
+    assert await cache.get("sitemap:index") == sitemap
+
+    assert (await client.get(f"/api/blog/posts/{test_post.slug}")).status_code == 200
+    await _settle()
+    assert await cache.get("feed:rss:zh:20") == feed
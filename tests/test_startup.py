@@ -0,0 +1,92 @@
+"""
+启动相关测试（存活 / 就绪探针、后台预热、导入耗时解析、重型模块延迟导入）
+"""
+
+import asyncio
+import json
+import subprocess
+import sys
+
+import pytest
+from httpx import AsyncClient
+
+from backend.core.startup import Readiness, parse_importtime, readiness
+
+# 只在对应功能首次使用时才导入的模块
+LAZY_MODULES = (
+    "numpy",
+    "PIL",
+    "jinja2",
+    "backend.core.setup_dependency",
+    "backend.core.setup_system",
+)
+
+
+@pytest.mark.asyncio
+async def test_liveness_and_readiness(client: AsyncClient):
+    response = await client.get("/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+
+    # 测试客户端不执行 lifespan，尚未就绪
+    response = await client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "not_ready"
+
+    readiness.mark_ready()
+    try:
+        response = await client.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json()["ready"] is True
+    finally:
+        await readiness.stop()
+
+
+@pytest.mark.asyncio
+async def test_warmup_runs_after_ready():
+    state = Readiness()
+    release = asyncio.Event()
+
+    async def slow_job():
+        await release.wait()
+
+    async def broken_job():
+        raise RuntimeError("boom")
+
+    state.mark_ready()
+    state.start_warmup(slow_job, broken_job)
+    await asyncio.sleep(0)
+    assert state.status() == {"ready": True, "warmup": "running"}
+
+    release.set()
+    await state._task
+    assert state.warmup == "failed"
+
+    state.start_warmup(slow_job)
+    await state.stop()
+    assert state.ready is False
+
+
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   json.decoder\n"
+        "import time:      3000 |       3120 | json\n"
+        "unrelated line\n"
+    )
+    timings = parse_importtime(output)
+    assert [(t.module, t.self_us, t.cumulative_us) for t in timings] == [
+        ("json.decoder", 120, 120),
+        ("json", 3000, 3120),
+    ]
+
+
+def test_heavy_modules_not_imported_at_startup():
+    code = (
+        "import json, sys, backend.main; "
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
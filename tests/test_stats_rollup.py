@@ -0,0 +1,128 @@
+"""
+统计汇总测试（增量水位、汇总 + 实时聚合读取、按小时汇总、仪表盘接口）
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from backend.core.config import settings
+from backend.models.monitoring import DailyStats, HourlyStats, StatsRollupState, VisitLog
+from backend.services.stats_rollup import read_days, rollup, run_rollups
+from backend.utils.compat import UTC
+
+
+def _visit(ip: str, at: datetime) -> VisitLog:
+    return VisitLog(path="/", method="GET", ip=ip, status_code=200, created_at=at)
+
+
+@pytest.fixture
+def now() -> datetime:
+    # 固定在当天中午，避免跨零点
+    return datetime.now(UTC).replace(hour=12, minute=0, second=0, microsecond=0)
+
+
+@pytest.mark.asyncio
+async def test_rollup_backfills_and_advances_watermark(db_session, now):
+    db_session.add_all(
+        [
+            _visit("1.1.1.1", now - timedelta(days=2)),
+            _visit("1.1.1.1", now - timedelta(days=2, hours=1)),
+            _visit("2.2.2.2", now - timedelta(days=2)),
+            _visit("1.1.1.1", now),
+        ]
+    )
+    await db_session.commit()
+
+    written = await run_rollups(db_session, now=now)
+    await db_session.commit()
+    assert written == {"day": 3}
+
+    rows = (await db_session.execute(select(DailyStats).order_by(DailyStats.day))).scalars().all()
+    assert [(row.visits, row.unique_ips) for row in rows] == [(3, 2), (0, 0), (1, 1)]
+    state = await db_session.get(StatsRollupState, "day")
+    assert state.watermark.replace(tzinfo=UTC) == now.replace(hour=0)
+
+
+@pytest.mark.asyncio
+async def test_incremental_rollup_keeps_closed_days(db_session, now):
+    db_session.add(_visit("1.1.1.1", now - timedelta(days=3)))
+    await db_session.commit()
+    await rollup(db_session, "day", now=now)
+    await db_session.commit()
+
+    # 已关闭的天不再重算：改写的汇总行保持不变，只有水位之后的桶被刷新
+    past_day = (now - timedelta(days=3)).date()
+    await db_session.execute(update(DailyStats).where(DailyStats.day == past_day).values(visits=99))
+    db_session.add(_visit("3.3.3.3", now))
+    await db_session.commit()
+    await rollup(db_session, "day", now=now + timedelta(hours=1))
+    await db_session.commit()
+
+    assert (await db_session.get(DailyStats, past_day)).visits == 99
+    assert (await db_session.get(DailyStats, now.date())).visits == 1
+
+    # rebuild 忽略水位
+    await rollup(db_session, "day", now=now, rebuild=True)
+    await db_session.commit()
+    row = await db_session.get(DailyStats, past_day, populate_existing=True)
+    assert row.visits == 1
+
+
+@pytest.mark.asyncio
+async def test_read_days_combines_rollup_with_live_tail(db_session, now):
+    db_session.add(_visit("1.1.1.1", now - timedelta(days=1)))
+    await db_session.commit()
+    await rollup(db_session, "day", now=now)
+    await db_session.commit()
+
+    # 水位之后写入的数据实时可见
+    db_session.add_all([_visit("1.1.1.1", now), _visit("2.2.2.2", now)])
+    await db_session.commit()
+
+    series = await read_days(db_session, 3, now=now)
+    assert [row["bucket"].date() for row in series] == [
+        (now - timedelta(days=d)).date() for d in (2, 1, 0)
+    ]
+    assert [row["visits"] for row in series] == [0, 1, 2]
+    assert series[-1]["unique_ips"] == 2
+
+
+@pytest.mark.asyncio
+async def test_hourly_rollup(db_session, now, monkeypatch):
+    monkeypatch.setattr(settings, "stats_rollup_hourly", True)
+    monkeypatch.setattr(settings, "stats_rollup_hourly_retention_days", 1)
+    db_session.add_all(
+        [
+            _visit("1.1.1.1", now - timedelta(hours=2, minutes=30)),
+            _visit("1.1.1.1", now - timedelta(days=3)),
+        ]
+    )
+    await db_session.commit()
+
+    written = await run_rollups(db_session, now=now)
+    await db_session.commit()
+    # 只回填保留期内的 24 小时 + 当前小时
+    assert written["hour"] == 25
+    row = await db_session.get(HourlyStats, now - timedelta(hours=3))
+    assert row.visits == 1
+
+
+@pytest.mark.asyncio
+async def test_trends_api_reads_rollups(client: AsyncClient, db_session, staff_headers: dict, now):
+    db_session.add(_visit("1.1.1.1", now - timedelta(days=1)))
+    await db_session.commit()
+    await run_rollups(db_session)
+    await db_session.commit()
+
+    response = await client.get("/api/monitoring/trends", params={"days": 3}, headers=staff_headers)
+    assert response.status_code == 200
+    visits = [item["count"] for item in response.json()["visits"]]
+    assert len(visits) == 3
+    assert visits[1] == 1
+
+    response = await client.get("/api/monitoring/visits/summary", headers=staff_headers)
+    assert response.status_code == 200
+    assert response.json()["yesterday"] == 1
@@ -0,0 +1,145 @@
+"""
+后台任务队列测试（BackgroundTaskManager + 队列后端）
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.core import database
+from backend.core.task_queue import DatabaseQueueBackend, QueuedJob
+from backend.core.tasks import BackgroundTaskManager, TaskStatus
+from backend.models.task_queue import TaskQueueJob
+
+
+class TestMemoryQueue:
+    """进程内队列：优先级、并发上限、重试与死信"""
+
+    @pytest.mark.asyncio
+    async def test_priority_and_concurrency_limit(self):
+        """并发上限为 1 时，排队任务按优先级执行"""
+        manager = BackgroundTaskManager(max_concurrent_tasks=1)
+        order: list[str] = []
+        gate = asyncio.Event()
+
+        async def job(label: str) -> None:
+            if label == "first":
+                await gate.wait()
+            order.append(label)
+
+        first = await manager.submit(job, "first")
+        await asyncio.sleep(0)
+        low = await manager.submit(job, "low", priority=1)
+        high = await manager.submit(job, "high", priority=9)
+        assert len(manager.get_running_tasks()) == 1
+
+        gate.set()
+        for task_id in (first, low, high):
+            await manager.wait_for_task(task_id, timeout=2)
+        assert order == ["first", "high", "low"]
+
+    @pytest.mark.asyncio
+    async def test_retry_then_dead_letter(self):
+        """重试耗尽后任务失败并进入死信"""
+        manager = BackgroundTaskManager(retry_delay=0.01)
+        calls = 0
+
+        async def flaky() -> None:
+            nonlocal calls
+            calls += 1
+            raise ValueError("boom")
+
+        task_id = await manager.submit(flaky, max_retries=2)
+        result = await manager.wait_for_task(task_id, timeout=2)
+
+        assert result.status == TaskStatus.FAILED
+        assert calls == 3
+        dead = await manager.dead_letters()
+        assert dead[0]["id"] == task_id
+        assert dead[0]["last_error"] == "boom"
+
+    @pytest.mark.asyncio
+    async def test_zero_retries_is_respected(self):
+        """max_retries=0 不再回退为默认值"""
+        manager = BackgroundTaskManager(retry_delay=0.01)
+        calls = 0
+
+        async def fail() -> None:
+            nonlocal calls
+            calls += 1
+            raise RuntimeError("no retry")
+
+        task_id = await manager.submit(fail, max_retries=0)
+        result = await manager.wait_for_task(task_id, timeout=2)
+        assert result.status == TaskStatus.FAILED
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_cancel_queued_task(self):
+        """排队中的任务可直接取消"""
+        manager = BackgroundTaskManager(max_concurrent_tasks=1)
+        gate = asyncio.Event()
+
+        async def blocker() -> None:
+            await gate.wait()
+
+        blocking = await manager.submit(blocker)
+        await asyncio.sleep(0)
+        queued = await manager.submit(blocker)
+
+        assert await manager.cancel_task(queued)
+        assert manager.get_task_status(queued).status == TaskStatus.CANCELLED
+        gate.set()
+        await manager.wait_for_task(blocking, timeout=2)
+
+
+class TestDatabaseQueue:
+    """数据库表队列后端"""
+
+    @pytest.fixture
+    def queue_backend(self, test_engine, monkeypatch) -> DatabaseQueueBackend:
+        monkeypatch.setattr(
+            database,
+            "async_session_maker",
+            async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False),
+        )
+        return DatabaseQueueBackend()
+
+    @pytest.mark.asyncio
+    async def test_registered_task_is_persisted(self, queue_backend, db_session: AsyncSession):
+        """已注册且参数可序列化的任务写入队列表，执行成功后删除"""
+        manager = BackgroundTaskManager(backend=queue_backend)
+        received: list[str] = []
+
+        async def send(to: str) -> str:
+            received.append(to)
+            return to
+
+        manager.register_function("send", send)
+        task_id = await manager.submit(send, "a@example.com", name="send")
+
+        result = await manager.wait_for_task(task_id, timeout=5)
+        assert result.status == TaskStatus.COMPLETED
+        assert received == ["a@example.com"]
+        assert (await db_session.execute(select(TaskQueueJob))).first() is None
+
+    @pytest.mark.asyncio
+    async def test_priority_and_visibility_timeout(self, queue_backend):
+        """高优先级先领取；可见性超时未确认的任务被重新领取并计一次尝试"""
+        await queue_backend.enqueue(QueuedJob(id="low", name="t", priority=0))
+        await queue_backend.enqueue(QueuedJob(id="high", name="t", priority=5))
+
+        first = await queue_backend.claim("w1", visibility_timeout=-1)
+        assert first.id == "high"
+
+        # w1 的可见性已过期：high 重新可领取
+        again = await queue_backend.claim("w2", visibility_timeout=60)
+        assert again.id == "high"
+        assert again.attempts == 1
+
+        await queue_backend.dead_letter(again)
+        dead = await queue_backend.dead_letters()
+        assert [job.id for job in dead] == ["high"]
+        assert await queue_backend.stats() == {"queued": 1, "running": 0, "dead": 1}
@@ -0,0 +1,182 @@
+"""
+翻译服务测试（字典树转换、分段翻译记忆、连接池 provider、翻译接口）
+"""
+
+import json
+
+import httpx
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from backend.models.translation import TranslationMemory
+from backend.services import translation_service
+from backend.services.translation_service import (
+    LibreTranslateProvider,
+    MockProvider,
+    MyMemoryProvider,
+    TranslationProvider,
+    Translator,
+    simple_zh_to_zh_hant,
+    split_segments,
+)
+from backend.utils.phrase_trie import PhraseConverter
+
+
+class CountingProvider(TranslationProvider):
+    """本地 provider：译文为 [target]原文，记录每次请求的段落"""
+
+    name = "counting"
+
+    def __init__(self):
+        self.calls: list[tuple[str, str]] = []
+
+    async def translate_one(self, client, text, source, target):
+        self.calls.append((target, text))
+        return f"[{target}]{text}"
+
+
+def test_phrase_converter_longest_match_single_pass():
+    converter = PhraseConverter({"博客": "部落格", "博客园": "部落格園", "部落": "X"})
+    assert converter.convert("博客园的博客") == "部落格園的部落格"
+    # 已替换的输出不会被再次匹配
+    assert converter.convert("博客") == "部落格"
+    assert converter.convert("博") == "博"
+    assert converter.convert("") == ""
+
+    assert (
+        simple_zh_to_zh_hant("用户登录失败，请联系网站管理员") == "使用者登入失敗，请聯絡網站管理员"
+    )
+
+
+def test_split_segments_round_trip():
+    text = "第一段\n\n第二段\n  \n\n第三段\n"
+    parts = split_segments(text)
+    assert parts[::2] == ["第一段", "第二段", "第三段\n"]
+    assert "".join(parts) == text
+
+
+@pytest.mark.asyncio
+async def test_unchanged_segments_never_retranslated(db_session):
+    provider = CountingProvider()
+    translator = Translator(provider=provider)
+
+    text = "第一段\n\n第二段\n\n第一段"
+    result = await translator.translate(db_session, text, "zh", ["en", "ja"])
+    assert result["en"] == "[en]第一段\n\n[en]第二段\n\n[en]第一段"
+    # 重复段落只翻译一次
+    assert sorted(provider.calls) == [
+        ("en", "第一段"),
+        ("en", "第二段"),
+        ("ja", "第一段"),
+        ("ja", "第二段"),
+    ]
+    await db_session.commit()
+    assert await db_session.scalar(select(func.count()).select_from(TranslationMemory)) == 4
+
+    # 修改一段：只翻译改动的段落
+    provider.calls.clear()
+    result = await translator.translate(db_session, "第一段\n\n第二段（改）", "zh", ["en"])
+    assert result["en"] == "[en]第一段\n\n[en]第二段（改）"
+    assert provider.calls == [("en", "第二段（改）")]
+
+    # 新进程（空 LRU）从数据库读取翻译记忆
+    provider.calls.clear()
+    fresh = Translator(provider=provider)
+    result = await fresh.translate(db_session, "第二段\n\n第一段", "zh", ["ja"])
+    assert result["ja"] == "[ja]第二段\n\n[ja]第一段"
+    assert provider.calls == []
+
+
+@pytest.mark.asyncio
+async def test_failed_segments_fall_back_without_memorising(db_session):
+    class FailingProvider(CountingProvider):
+        async def translate_one(self, client, text, source, target):
+            self.calls.append((target, text))
+            return None
+
+    provider = FailingProvider()
+    translator = Translator(provider=provider)
+    result = await translator.translate(db_session, "博客", "zh", ["en"])
+    assert result == {"en": "Blog"}
+    await db_session.commit()
+    assert await db_session.scalar(select(func.count()).select_from(TranslationMemory)) == 0
+
+    # mock 结果同样不写入记忆
+    mock = Translator(provider=MockProvider())
+    assert await mock.translate(db_session, "博客", "zh", ["zh_Hant"]) == {"zh_Hant": "部落格"}
+    await db_session.commit()
+    assert await db_session.scalar(select(func.count()).select_from(TranslationMemory)) == 0
+
+
+@pytest.mark.asyncio
+async def test_mymemory_uses_pooled_client(db_session):
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        text = request.url.params["q"]
+        body = {"responseStatus": 200, "responseData": {"translatedText": text.upper()}}
+        return httpx.Response(200, content=json.dumps(body))
+
+    translator = Translator(
+        provider=MyMemoryProvider(), concurrency=2, transport=httpx.MockTransport(handler)
+    )
+    result = await translator.translate(db_session, "a\n\nb\n\nc", "en", ["ja"])
+    assert result == {"ja": "A\n\nB\n\nC"}
+    assert len(requests) == 3
+    assert requests[0].url.params["langpair"] == "en-GB|ja-JP"
+
+    client = translator._client
+    await translator.translate(db_session, "d", "en", ["ja"])
+    assert translator._client is client
+    await translator.shutdown()
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_loop_change_closes_stale_client():
+    translator = Translator(provider=MockProvider(), transport=httpx.MockTransport(None))
+    await translator._ensure_started()
+    stale = translator._client
+
+    # 模拟上一个用例的事件循环
+    translator._loop = None
+    await translator._ensure_started()
+    assert stale.is_closed
+    assert translator._client is not stale and not translator._client.is_closed
+    await translator.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_provider_contract():
+    class Incomplete(TranslationProvider):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        return httpx.Response(200, json={"translatedText": [q.upper() for q in payload["q"]]})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        provider = LibreTranslateProvider()
+        assert await provider.translate_one(client, "a", "en", "ja") == "A"
+
+
+@pytest.mark.asyncio
+async def test_translate_endpoint(client: AsyncClient, auth_headers, monkeypatch):
+    provider = CountingProvider()
+    monkeypatch.setattr(translation_service.translator, "provider", provider)
+    translation_service.translator.clear_memory()
+
+    payload = {"text": "你好\n\n世界", "source_lang": "zh", "target_langs": ["zh", "en", "xx"]}
+    response = await client.post("/api/translate", json=payload, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["translations"] == {"zh": "你好\n\n世界", "en": "[en]你好\n\n[en]世界"}
+
+    response = await client.post("/api/translate", json=payload, headers=auth_headers)
+    assert response.status_code == 200
+    assert len(provider.calls) == 2
+    await translation_service.translator.shutdown()
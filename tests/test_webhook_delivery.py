@@ -0,0 +1,254 @@
+"""
+Webhook 投递引擎测试（httpx.MockTransport 充当接收端；事务内暂存、重启恢复）
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.core import database
+from backend.models.webhook import WebhookDelivery, WebhookEndpoint
+from backend.services import webhook_service
+from backend.services.webhook_service import (
+    WebhookDispatcher,
+    WebhookSubscriptionIndex,
+    sign_payload,
+)
+
+
+@pytest.fixture(autouse=True)
+def session_maker(test_engine, monkeypatch):
+    maker = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(database, "async_session_maker", maker)
+    return maker
+
+
+async def _add_endpoint(session_maker, events: list[str], **kwargs) -> int:
+    async with session_maker() as session:
+        endpoint = WebhookEndpoint(
+            name=kwargs.pop("name", "hook"),
+            url=kwargs.pop("url", "https://hooks.example.com/in"),
+            events=json.dumps(events),
+            **kwargs,
+        )
+        session.add(endpoint)
+        await session.commit()
+        return endpoint.id
+
+
+async def _deliveries(session_maker) -> list[WebhookDelivery]:
+    async with session_maker() as session:
+        result = await session.execute(select(WebhookDelivery).order_by(WebhookDelivery.id))
+        return list(result.scalars().all())
+
+
+def _dispatcher(handler, **kwargs) -> WebhookDispatcher:
+    kwargs.setdefault("backoff_base", 0.01)
+    return WebhookDispatcher(
+        transport=httpx.MockTransport(handler), index=WebhookSubscriptionIndex(ttl=60), **kwargs
+    )
+
+
+class TestSubscriptionIndex:
+    """事件订阅索引"""
+
+    @pytest.mark.asyncio
+    async def test_groups_active_endpoints_by_event(self, session_maker):
+        """只索引活跃端点，失效后重新加载"""
+        first = await _add_endpoint(session_maker, ["post.created", "post.deleted"])
+        await _add_endpoint(session_maker, ["post.created"], is_active=False)
+        index = WebhookSubscriptionIndex(ttl=60)
+
+        assert [t.endpoint_id for t in await index.targets("post.created")] == [first]
+        assert await index.targets("user.registered") == ()
+
+        second = await _add_endpoint(session_maker, ["user.registered"])
+        assert await index.targets("user.registered") == ()  # 仍是缓存
+        index.invalidate()
+        assert [t.endpoint_id for t in await index.targets("user.registered")] == [second]
+
+
+class TestDispatcher:
+    """投递、签名、重试与批量落库"""
+
+    @pytest.mark.asyncio
+    async def test_signed_delivery_is_recorded(self, session_maker):
+        """请求体按端点密钥签名，投递结果写入 webhook_deliveries"""
+        endpoint_id = await _add_endpoint(session_maker, ["post.published"], secret="s3cret")
+        received: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            received.append(request)
+            return httpx.Response(200, text="ok")
+
+        dispatcher = _dispatcher(handler)
+        assert await dispatcher.publish("post.published", {"id": 7}) == 1
+        await dispatcher.drain(timeout=5)
+        await dispatcher.shutdown()
+
+        request = received[0]
+        assert request.headers["X-Webhook-Signature"] == sign_payload("s3cret", request.content)
+        assert json.loads(request.content)["data"] == {"id": 7}
+
+        (delivery,) = await _deliveries(session_maker)
+        assert delivery.endpoint_id == endpoint_id
+        assert delivery.status_code == 200
+        assert delivery.attempts == 1
+        assert delivery.latency_ms is not None
+        assert delivery.delivered_at is not None
+
+    @pytest.mark.asyncio
+    async def test_retries_with_backoff_until_success(self, session_maker):
+        """5xx 重试，同一投递保持相同的投递标识，只记录一行"""
+        await _add_endpoint(session_maker, ["comment.created"])
+        keys: list[str] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            keys.append(request.headers["X-Webhook-Delivery"])
+            return httpx.Response(503 if len(keys) < 3 else 204)
+
+        dispatcher = _dispatcher(handler)
+        await dispatcher.publish("comment.created", {"id": 1})
+        await dispatcher.drain(timeout=5)
+        await dispatcher.shutdown()
+
+        assert len(keys) == 3 and len(set(keys)) == 1
+        (delivery,) = await _deliveries(session_maker)
+        assert delivery.attempts == 3
+        assert delivery.status_code == 204
+        assert delivery.error is None
+
+    @pytest.mark.asyncio
+    async def test_gives_up_on_client_error_and_exhaustion(self, session_maker):
+        """4xx 不重试；网络错误重试耗尽后记录错误"""
+        await _add_endpoint(session_maker, ["media.uploaded"], url="https://gone.example.com/")
+        await _add_endpoint(session_maker, ["media.uploaded"], url="https://down.example.com/")
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == "gone.example.com":
+                return httpx.Response(410)
+            raise httpx.ConnectError("refused", request=request)
+
+        dispatcher = _dispatcher(handler, max_attempts=3)
+        await dispatcher.publish("media.uploaded", {"id": 3})
+        await dispatcher.drain(timeout=5)
+        await dispatcher.shutdown()
+
+        gone, down = await _deliveries(session_maker)
+        assert (gone.status_code, gone.attempts, gone.delivered_at) == (410, 1, None)
+        assert down.attempts == 3
+        assert down.status_code is None
+        assert "ConnectError" in down.error
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, session_maker):
+        """同时进行的请求数不超过 concurrency"""
+        for i in range(6):
+            await _add_endpoint(session_maker, ["post.updated"], name=f"h{i}")
+        in_flight = peak = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            return httpx.Response(200)
+
+        dispatcher = _dispatcher(handler, concurrency=2)
+        assert await dispatcher.publish("post.updated", {}) == 6
+        await dispatcher.drain(timeout=5)
+        await dispatcher.shutdown()
+
+        assert peak == 2
+        assert len(await _deliveries(session_maker)) == 6
+
+
+class TestDurableDelivery:
+    """随事务提交入队与重启后恢复"""
+
+    @pytest.mark.asyncio
+    async def test_staged_delivery_waits_for_commit(self, session_maker, monkeypatch):
+        """回滚的事务不投递；提交后才入队"""
+        await _add_endpoint(session_maker, ["post.created"])
+        received: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            received.append(request)
+            return httpx.Response(200)
+
+        dispatcher = _dispatcher(handler)
+        monkeypatch.setattr(webhook_service, "webhook_dispatcher", dispatcher)
+
+        async with session_maker() as session:
+            assert await dispatcher.stage(session, "post.created", {"id": 1}) == 1
+            await session.rollback()
+        await asyncio.sleep(0.05)
+        assert received == []
+        assert await _deliveries(session_maker) == []
+
+        async with session_maker() as session:
+            await dispatcher.stage(session, "post.created", {"id": 2})
+            assert received == []
+            await session.commit()
+        await asyncio.sleep(0.05)
+        await dispatcher.drain(timeout=5)
+        await dispatcher.shutdown()
+
+        assert [json.loads(r.content)["data"] for r in received] == [{"id": 2}]
+        (delivery,) = await _deliveries(session_maker)
+        assert received[0].headers["X-Webhook-Delivery"] == f"delivery-{delivery.id}"
+        assert delivery.delivered_at is not None
+
+    @pytest.mark.asyncio
+    async def test_resume_requeues_unfinished_deliveries(self, session_maker):
+        """未尝试与可重试的记录在重启后重新投递，已放弃的不再投递"""
+        endpoint_id = await _add_endpoint(session_maker, ["post.updated"])
+        async with session_maker() as session:
+            rows = [
+                WebhookDelivery(endpoint_id=endpoint_id, event_type="post.updated", payload="{}"),
+                WebhookDelivery(
+                    endpoint_id=endpoint_id,
+                    event_type="post.updated",
+                    payload="{}",
+                    status_code=503,
+                    attempts=1,
+                ),
+                WebhookDelivery(
+                    endpoint_id=endpoint_id,
+                    event_type="post.updated",
+                    payload="{}",
+                    status_code=410,
+                    attempts=1,
+                ),
+                WebhookDelivery(
+                    endpoint_id=endpoint_id,
+                    event_type="post.updated",
+                    payload="{}",
+                    status_code=503,
+                    attempts=5,
+                ),
+            ]
+            session.add_all(rows)
+            await session.commit()
+            ids = [row.id for row in rows]
+
+        keys: list[str] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            keys.append(request.headers["X-Webhook-Delivery"])
+            return httpx.Response(200)
+
+        dispatcher = _dispatcher(handler, max_attempts=5)
+        assert await dispatcher.resume() == 2
+        await dispatcher.drain(timeout=5)
+        await dispatcher.shutdown()
+
+        assert sorted(keys) == [f"delivery-{ids[0]}", f"delivery-{ids[1]}"]
+        deliveries = await _deliveries(session_maker)
+        assert [d.attempts for d in deliveries] == [1, 2, 1, 5]
+        assert [d.delivered_at is not None for d in deliveries] == [True, True, False, False]
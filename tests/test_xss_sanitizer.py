@@ -0,0 +1,74 @@
+"""
+单遍 HTML 清洗测试（XSS 向量、实体绕过、缓存、sanitize_many、基准脚本）
+"""
+
+import re
+
+import pytest
+
+from backend.core import xss_filter
+from backend.core.xss_filter import sanitize_html, sanitize_many
+from backend.scripts.bench_sanitizer import PLAIN_TEXTS, XSS_VECTORS, run_benchmark
+
+_EVENT_HANDLER_RE = re.compile(r"<[^>]*\son\w+\s*=", re.I)
+
+
+@pytest.mark.parametrize("payload", XSS_VECTORS)
+def test_xss_vectors_neutralised(payload: str):
+    out = sanitize_html(payload)
+    lower = out.lower()
+    for tag in ("<script", "<iframe", "<object", "<embed", "<link", "<meta", "<svg", "<style"):
+        assert tag not in lower
+    assert not _EVENT_HANDLER_RE.search(out)
+    assert 'href="javascript' not in lower and 'src="javascript' not in lower
+
+
+def test_single_pass_output():
+    # 危险标签转义为可见文本，与旧实现一致
+    assert sanitize_html("<script>bad</script>") == "&lt;script&gt;bad&lt;/script&gt;"
+    # 属性值反转义后再校验，实体编码的 javascript: 同样被拒
+    assert sanitize_html('<a href="&#106;avascript:alert(1)">x</a>') == "<a>x</a>"
+    # 自闭合的 a 标签同样校验 href
+    assert sanitize_html('<a href="javascript:x"/>') == "<a></a>"
+    # 注释丢弃、游离的 < 转义、未闭合标签补齐
+    assert sanitize_html("<p>a < b<!-- x --><strong>c") == "<p>a &lt; b<strong>c</strong></p>"
+    assert sanitize_html("<A HREF='/x' TITLE='a\"b'>t</A>") == '<a href="/x" title="a&quot;b">t</a>'
+
+
+def test_results_cached_and_sanitize_many():
+    xss_filter._sanitize_cache.clear()
+    text = PLAIN_TEXTS[1]
+    first = sanitize_html(text)
+    assert sanitize_html(text) == first
+    assert xss_filter._sanitize_cache.hits == 1
+
+    results = sanitize_many([text, None, "<b>x</b>", text, 42])
+    assert results == [first, "", "<b>x</b>", first, "42"]
+
+
+def test_oversized_text_not_cached(monkeypatch):
+    monkeypatch.setattr(xss_filter, "SANITIZE_CACHE_MAX_LENGTH", 10)
+    xss_filter._sanitize_cache.clear()
+    assert sanitize_html("<p>" + "x" * 20) == "<p>" + "x" * 20 + "</p>"
+    assert len(xss_filter._sanitize_cache) == 0
+
+
+def test_cache_bounded_by_total_size(monkeypatch):
+    monkeypatch.setattr(xss_filter, "SANITIZE_CACHE_MAX_BYTES", 100)
+    xss_filter._sanitize_cache.clear()
+    texts = [f"<p>{i}{'x' * 30}</p>" for i in range(10)]
+    for text in texts:
+        sanitize_html(text)
+    assert xss_filter._sanitize_cache.size <= 100
+    assert len(xss_filter._sanitize_cache) == 2
+    # 最早的条目已淘汰，最近的仍命中
+    sanitize_html(texts[-1])
+    assert xss_filter._sanitize_cache.hits == 1
+    sanitize_html(texts[0])
+    assert xss_filter._sanitize_cache.hits == 1
+
+
+def test_benchmark_runs():
+    results = run_benchmark(rounds=2)
+    assert set(results) == {"multipass", "single-pass", "cached", "sanitize_many"}
+    assert all(rate > 0 for rate in results.values())